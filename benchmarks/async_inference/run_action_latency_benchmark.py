@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the observation -> action latency of async inference with action polling and action streaming.
+
+A `PolicyServer` serving the dummy policy and a `RobotClient` driving the dummy robot (with dummy cameras) run
+in this process, over a local gRPC connection. For each delivery mode, the client runs its control loop for
+`--duration` seconds and the percentiles of the time between the capture of an observation and the reception
+of its action chunk are reported:
+- `poll`: the client repeatedly calls `GetActions` (`stream_actions=False`),
+- `stream`: the server pushes the chunks through `StreamActions` (`stream_actions=True`).
+
+Example:
+```bash
+python benchmarks/async_inference/run_action_latency_benchmark.py --duration 20 --num-cameras 2
+```
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+from lerobot.cameras.dummy.configuration_dummy import DummyCameraConfig
+from lerobot.robots.dummy.configuration_dummy import DummyRobotConfig
+from lerobot.scripts.server.configs import PolicyServerConfig, RobotClientConfig
+from lerobot.scripts.server.policy_server import PolicyServer
+from lerobot.scripts.server.robot_client import RobotClient
+from lerobot.transport import services_pb2_grpc  # type: ignore
+
+# Cameras of the dummy policy
+CAMERAS = ["front", "left_wrist", "right_wrist", "front_fisheye", "left_wrist_fisheye", "right_wrist_fisheye"]
+
+
+def run(stream_actions: bool, args: argparse.Namespace) -> tuple[dict[int, float], int]:
+    server_config = PolicyServerConfig(host="localhost", port=args.port, fps=args.fps)
+    policy_server = PolicyServer(server_config)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    services_pb2_grpc.add_AsyncInferenceServicer_to_server(policy_server, server)
+    server.add_insecure_port(f"localhost:{args.port}")
+    server.start()
+
+    cameras = {
+        name: DummyCameraConfig(fps=args.fps, width=args.width, height=args.height)
+        for name in CAMERAS[: args.num_cameras]
+    }
+    robot_config = DummyRobotConfig(cameras=cameras, visualize=False)
+    client_config = RobotClientConfig(
+        policy_type="dummy",
+        # One value per joint of the dummy robot
+        pretrained_name_or_path=str([0.0] * len(robot_config.joint_names)),
+        robot=robot_config,
+        actions_per_chunk=args.actions_per_chunk,
+        server_address=f"localhost:{args.port}",
+        fps=args.fps,
+        verify_robot_cameras=False,
+        stream_actions=stream_actions,
+    )
+    client = RobotClient(client_config)
+    client.start()
+    action_thread = threading.Thread(target=client.receive_actions, daemon=True)
+    control_thread = threading.Thread(target=client.control_loop, args=("benchmark",), daemon=True)
+    action_thread.start()
+    control_thread.start()
+
+    time.sleep(args.duration)
+    percentiles = client.action_latency_percentiles((50, 90, 99, 100))
+    num_chunks = len(client.action_latencies)
+    client.stop()
+    action_thread.join()
+    control_thread.join()
+    policy_server.stop()
+    server.stop(grace=None)
+    return percentiles, num_chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--num-cameras", type=int, default=2)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--actions-per-chunk", type=int, default=50)
+    parser.add_argument("--port", type=int, default=18090)
+    args = parser.parse_args()
+
+    results = {mode: run(mode == "stream", args) for mode in ["poll", "stream"]}
+    # The client and server log every step, only print the summary
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'mode':<10}{'chunks':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for mode, (percentiles, num_chunks) in results.items():
+        p50, p90, p99, p100 = percentiles.values()
+        print(f"{mode:<10}{num_chunks:>8}{p50:>10.1f}{p90:>10.1f}{p99:>10.1f}{p100:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
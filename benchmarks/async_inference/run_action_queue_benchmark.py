@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the former `queue.Queue` action queue of the `RobotClient` with the `ActionRingBuffer`.
+
+For each chunk size, chunks whose first half overlaps the second half of the queued actions are merged in a
+loop with the `weighted_average` aggregate function, as `RobotClient._aggregate_action_queues` does, with:
+- `queue`: a new `Queue` rebuilt one `TimedAction` at a time from a dict of the queued actions,
+- `ring`: one vectorized merge into the preallocated ring buffer.
+The actions of the last queue are then popped one by one, as `RobotClient.control_loop_action` does.
+
+The merge time bounds how long the action receiver thread holds the queue lock, the pop time how long the
+control loop does.
+
+Example:
+```bash
+python benchmarks/async_inference/run_action_queue_benchmark.py --chunk-sizes 10 50 100 --action-dim 14
+```
+"""
+
+import argparse
+import time
+from queue import Queue
+
+import torch
+
+from lerobot.scripts.server.configs import AGGREGATE_FUNCTIONS
+from lerobot.scripts.server.helpers import ActionRingBuffer, TimedAction
+
+
+def merge_into_queue(queue: Queue, incoming_actions: list[TimedAction], latest_action: int, aggregate_fn):
+    current_action_queue = {action.get_timestep(): action.get_action() for action in queue.queue}
+    future_action_queue = Queue()
+    for new_action in incoming_actions:
+        if new_action.get_timestep() <= latest_action:
+            continue
+        if new_action.get_timestep() not in current_action_queue:
+            future_action_queue.put(new_action)
+            continue
+        future_action_queue.put(
+            TimedAction(
+                timestamp=new_action.get_timestamp(),
+                timestep=new_action.get_timestep(),
+                action=aggregate_fn(current_action_queue[new_action.get_timestep()], new_action.get_action()),
+            )
+        )
+    return future_action_queue
+
+
+def merge_into_ring(
+    ring: ActionRingBuffer, incoming_actions: list[TimedAction], latest_action: int, aggregate_fn
+):
+    ring.merge(
+        incoming_actions[0].get_timestep(),
+        [action.get_timestamp() for action in incoming_actions],
+        torch.stack([action.get_action() for action in incoming_actions]),
+        latest_action,
+        aggregate_fn,
+    )
+    return ring
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--action-dim", type=int, default=14)
+    parser.add_argument("--num-chunks", type=int, default=1000)
+    args = parser.parse_args()
+    aggregate_fn = AGGREGATE_FUNCTIONS["weighted_average"]
+
+    print(f"{'chunk':>6}  {'queue':<6}{'merge us':>10}{'pop us':>10}")
+    for chunk_size in args.chunk_sizes:
+        stride = max(chunk_size // 2, 1)
+        chunks = [
+            [
+                TimedAction(timestamp=time.time(), timestep=i * stride + j, action=action)
+                for j, action in enumerate(torch.randn(chunk_size, args.action_dim))
+            ]
+            for i in range(args.num_chunks + 1)
+        ]
+
+        for name, queue, merge in [
+            ("queue", Queue(), merge_into_queue),
+            ("ring", ActionRingBuffer(capacity=chunk_size), merge_into_ring),
+        ]:
+            queue = merge(queue, chunks[0], -1, aggregate_fn)
+            start = time.perf_counter()
+            for chunk in chunks[1:]:
+                # The actions before the new chunk have been performed
+                queue = merge(queue, chunk, chunk[0].get_timestep() - 1, aggregate_fn)
+            merge_us = (time.perf_counter() - start) / args.num_chunks * 1e6
+
+            num_actions = queue.qsize()
+            pop = queue.get_nowait if isinstance(queue, Queue) else queue.pop
+            start = time.perf_counter()
+            for _ in range(num_actions):
+                pop()
+            pop_us = (time.perf_counter() - start) / num_actions * 1e6
+            print(f"{chunk_size:>6}  {name:<6}{merge_us:>10.1f}{pop_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
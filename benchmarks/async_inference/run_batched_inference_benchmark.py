@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the throughput and latency of a policy server serving several robot clients.
+
+A randomly initialized ACT policy (one camera, 14 joints) is served by `policy_server.serve` in a subprocess.
+For each number of clients, simulated clients run a closed loop over their own gRPC channel: send an
+observation, wait for its action chunk on `StreamActions`, repeat. The total number of chunks per second and
+the percentiles of the observation -> action chunk latency are reported for:
+- `sequential`: the observations are run one at a time (`max_batch_size=1`),
+- `batched`: the observations arriving within `--batch-window` seconds share a forward pass.
+
+Example:
+```bash
+python benchmarks/async_inference/run_batched_inference_benchmark.py --num-clients 1 2 4 8 --device cuda
+```
+"""
+
+import argparse
+import logging
+import multiprocessing as mp
+import tempfile
+import threading
+import time
+
+import grpc
+import numpy as np
+
+from lerobot.configs.types import FeatureType, NormalizationMode, PolicyFeature
+from lerobot.constants import ACTION, OBS_STATE
+from lerobot.policies.act.configuration_act import ACTConfig
+from lerobot.policies.act.modeling_act import ACTPolicy
+from lerobot.scripts.server.configs import PolicyServerConfig
+from lerobot.scripts.server.constants import CLIENT_ID_METADATA_KEY
+from lerobot.scripts.server.helpers import (
+    RemotePolicyConfig,
+    TimedObservation,
+    timed_observation_to_bytes,
+)
+from lerobot.scripts.server.policy_server import serve
+from lerobot.transport import services_pb2, services_pb2_grpc  # type: ignore
+from lerobot.transport.utils import send_bytes_in_chunks
+from lerobot.transport.wire_format import ObservationSchema
+
+NUM_JOINTS = 14
+
+
+def save_policy(path: str, height: int, width: int) -> None:
+    config = ACTConfig(
+        input_features={
+            OBS_STATE: PolicyFeature(type=FeatureType.STATE, shape=(NUM_JOINTS,)),
+            "observation.images.front": PolicyFeature(type=FeatureType.VISUAL, shape=(3, height, width)),
+        },
+        output_features={ACTION: PolicyFeature(type=FeatureType.ACTION, shape=(NUM_JOINTS,))},
+        # No dataset statistics nor backbone weights to download for a random policy
+        normalization_mapping={
+            "VISUAL": NormalizationMode.IDENTITY,
+            "STATE": NormalizationMode.IDENTITY,
+            "ACTION": NormalizationMode.IDENTITY,
+        },
+        pretrained_backbone_weights=None,
+    )
+    ACTPolicy(config).save_pretrained(path)
+
+
+def run_client(
+    client_id: int, policy_config: RemotePolicyConfig, args: argparse.Namespace, results: dict
+) -> None:
+    channel = grpc.insecure_channel(f"localhost:{args.port}")
+    stub = services_pb2_grpc.AsyncInferenceStub(channel)
+    metadata = ((CLIENT_ID_METADATA_KEY, f"client-{client_id}"),)
+    stub.Ready(services_pb2.Empty(), metadata=metadata)
+    stub.SendPolicyInstructions(services_pb2.PolicySetup(data=policy_config.to_bytes()), metadata=metadata)
+    action_stream = stub.StreamActions(services_pb2.Empty(), metadata=metadata)
+
+    rng = np.random.default_rng(client_id)
+    observation = {f"joint_{i}.pos": float(rng.normal()) for i in range(NUM_JOINTS)}
+    observation["front"] = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    observation["task"] = "pick up the cube"
+
+    latencies = []
+    timestep = 0
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        obs = TimedObservation(
+            timestamp=time.time(), timestep=timestep, observation=observation, must_go=True
+        )
+        start = time.perf_counter()
+        observation_bytes = timed_observation_to_bytes(obs, policy_config.observation_schema)
+        observation_iterator = send_bytes_in_chunks(observation_bytes, services_pb2.Observation)
+        stub.SendObservations(observation_iterator, metadata=metadata)
+        next(action_stream)
+        latencies.append(time.perf_counter() - start)
+        timestep += args.actions_per_chunk
+
+    action_stream.cancel()
+    channel.close()
+    results[client_id] = latencies
+
+
+def run(num_clients: int, max_batch_size: int, policy_path: str, args: argparse.Namespace):
+    server_config = PolicyServerConfig(
+        host="localhost",
+        port=args.port,
+        # Below 2 clients, the server would not batch
+        max_clients=max(num_clients, 2),
+        max_batch_size=max_batch_size,
+        batch_window=args.batch_window,
+    )
+    server = mp.get_context("spawn").Process(target=serve, args=(server_config,), daemon=True)
+    server.start()
+
+    robot_features = {f"joint_{i}.pos": float for i in range(NUM_JOINTS)}
+    robot_features["front"] = (args.height, args.width, 3)
+    policy_config = RemotePolicyConfig(
+        policy_type="act",
+        pretrained_name_or_path=policy_path,
+        lerobot_features={
+            OBS_STATE: {
+                "dtype": "float32",
+                "shape": (NUM_JOINTS,),
+                "names": [f"joint_{i}.pos" for i in range(NUM_JOINTS)],
+            },
+            "observation.images.front": {
+                "dtype": "image",
+                "shape": (args.height, args.width, 3),
+                "names": ["height", "width", "channels"],
+            },
+        },
+        actions_per_chunk=args.actions_per_chunk,
+        device=args.device,
+        observation_schema=ObservationSchema.from_features(robot_features),
+    )
+
+    # The first client loads the policy, wait for the server to be up
+    grpc.channel_ready_future(grpc.insecure_channel(f"localhost:{args.port}")).result(timeout=60)
+    run_client(0, policy_config, argparse.Namespace(**{**vars(args), "duration": 2.0}), {})
+
+    results = {}
+    clients = [
+        threading.Thread(target=run_client, args=(i, policy_config, args, results))
+        for i in range(num_clients)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    server.terminate()
+    server.join()
+
+    latencies = np.concatenate([results[i] for i in range(num_clients)]) * 1e3
+    throughput = len(latencies) / args.duration
+    return throughput, np.percentile(latencies, [50, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch-window", type=float, default=0.005)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--actions-per-chunk", type=int, default=50)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--port", type=int, default=18091)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as policy_path:
+        save_policy(policy_path, args.height, args.width)
+
+        print(f"{'clients':<10}{'mode':<12}{'chunks/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for num_clients in args.num_clients:
+            for mode, max_batch_size in [("sequential", 1), ("batched", num_clients)]:
+                throughput, (p50, p99) = run(num_clients, max_batch_size, policy_path, args)
+                print(f"{num_clients:<10}{mode:<12}{throughput:>10.1f}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the period jitter of the action loop of the `RobotClient` while observations are being sent.
+
+A `PolicyServer` serving the dummy policy and a `RobotClient` driving the dummy robot (with dummy cameras) run
+in this process, over a local gRPC connection. Each observation sent is delayed by `--send-delay` seconds to
+emulate a slow link. For each control loop, the period between two consecutive actions and the number of
+missed deadlines are reported, for:
+- `sequential`: the former loop, performing an action then capturing and sending an observation in the same
+  thread and sleeping for what is left of the period,
+- `deadline`: `RobotClient.control_loop`, performing the actions at absolute deadlines while a second thread
+  sends the observations.
+
+Example:
+```bash
+python benchmarks/async_inference/run_control_loop_jitter_benchmark.py --duration 20 --send-delay 0.02
+```
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+from lerobot.cameras.dummy.configuration_dummy import DummyCameraConfig
+from lerobot.robots.dummy.configuration_dummy import DummyRobotConfig
+from lerobot.scripts.server.configs import PolicyServerConfig, RobotClientConfig
+from lerobot.scripts.server.policy_server import PolicyServer
+from lerobot.scripts.server.robot_client import RobotClient
+from lerobot.transport import services_pb2_grpc  # type: ignore
+
+CAMERAS = ["front", "left_wrist", "right_wrist"]
+
+
+def sequential_control_loop(client: RobotClient, task: str) -> None:
+    """The control loop of the client before the actions got their own schedule"""
+    client.start_barrier.wait()
+    while client.running:
+        control_loop_start = time.perf_counter()
+        client.action_loop_timing.tick(control_loop_start)
+        if client.actions_available():
+            client.control_loop_action()
+        if client._ready_to_send_observation():
+            client.control_loop_observation(task)
+        elapsed = time.perf_counter() - control_loop_start
+        if elapsed > client.config.environment_dt:
+            client.action_loop_timing.miss(int(elapsed // client.config.environment_dt))
+        time.sleep(max(0, client.config.environment_dt - elapsed))
+
+
+def run(mode: str, args: argparse.Namespace) -> dict[str, float]:
+    server_config = PolicyServerConfig(host="localhost", port=args.port, fps=args.fps)
+    policy_server = PolicyServer(server_config)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    services_pb2_grpc.add_AsyncInferenceServicer_to_server(policy_server, server)
+    server.add_insecure_port(f"localhost:{args.port}")
+    server.start()
+
+    cameras = {
+        name: DummyCameraConfig(fps=args.fps, width=args.width, height=args.height)
+        for name in CAMERAS[: args.num_cameras]
+    }
+    robot_config = DummyRobotConfig(cameras=cameras, visualize=False)
+    client_config = RobotClientConfig(
+        policy_type="dummy",
+        # One value per joint of the dummy robot
+        pretrained_name_or_path=str([0.0] * len(robot_config.joint_names)),
+        robot=robot_config,
+        actions_per_chunk=args.actions_per_chunk,
+        server_address=f"localhost:{args.port}",
+        fps=args.fps,
+        verify_robot_cameras=False,
+    )
+    client = RobotClient(client_config)
+    client.start()
+
+    send_observation = client.send_observation
+
+    def slow_send_observation(obs):
+        time.sleep(args.send_delay)
+        return send_observation(obs)
+
+    client.send_observation = slow_send_observation
+
+    control_loop = client.control_loop if mode == "deadline" else sequential_control_loop.__get__(client)
+    action_thread = threading.Thread(target=client.receive_actions, daemon=True)
+    control_thread = threading.Thread(target=control_loop, args=("benchmark",), daemon=True)
+    action_thread.start()
+    control_thread.start()
+
+    time.sleep(args.duration)
+    client.shutdown_event.set()
+    control_thread.join()
+    statistics = client.action_loop_timing.statistics()
+    client.stop()
+    action_thread.join()
+    policy_server.stop()
+    server.stop(grace=None)
+    return statistics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--send-delay", type=float, default=0.02)
+    parser.add_argument("--num-cameras", type=int, default=2)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--actions-per-chunk", type=int, default=50)
+    parser.add_argument("--port", type=int, default=18092)
+    args = parser.parse_args()
+    # The client and server log every step, only print the summary
+    logging.disable(logging.CRITICAL)
+
+    print(
+        f"{'loop':<12}{'ticks':>8}{'missed':>8}{'mean ms':>10}{'p99 ms':>10}{'jitter ms':>11}{'max ms':>10}"
+    )
+    for mode in ["sequential", "deadline"]:
+        stats = run(mode, args)
+        print(
+            f"{mode:<12}{stats['ticks']:>8}{stats['missed_deadlines']:>8}{stats['mean_period_ms']:>10.2f}"
+            f"{stats['p99_period_ms']:>10.2f}{stats['mean_jitter_ms']:>11.2f}{stats['max_jitter_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the time per call of `PolicyServer._prepare_observation`.
+
+The observation of a bimanual robot (14 joints, `--num-cameras` cameras of `--height`x`--width`) is turned
+into the inputs of a policy taking `--policy-height`x`--policy-width` images on `--device`, with:
+- `per-camera`: the former path, converting each frame to a tensor, permuting, resizing and normalizing it on
+  the CPU, and moving the tensors to the device one key at a time,
+- `fused`: the `ObservationPreprocessor` of the server, uploading the uint8 frames once through reused
+  (pinned) buffers and processing the cameras with one batched op on the device.
+
+Example:
+```bash
+python benchmarks/async_inference/run_observation_preprocessing_benchmark.py --num-cameras 3 --device cuda
+```
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from lerobot.configs.types import FeatureType, PolicyFeature
+from lerobot.scripts.server.configs import PolicyServerConfig
+from lerobot.scripts.server.helpers import TimedObservation, prepare_image, prepare_raw_observation
+from lerobot.scripts.server.policy_server import PolicyServer
+
+NUM_JOINTS = 14
+
+
+def per_camera(raw_observation, lerobot_features, policy_image_features, device):
+    observation = prepare_raw_observation(raw_observation, lerobot_features, policy_image_features)
+    for k, v in observation.items():
+        if isinstance(v, torch.Tensor):
+            observation[k] = prepare_image(v).unsqueeze(0).to(device) if "image" in k else v.to(device)
+    return observation
+
+
+def time_ms(fn, num_iters: int, device: str) -> float:
+    fn()  # warmup, allocates the buffers
+    if device == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-cameras", type=int, default=3)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--policy-height", type=int, default=224)
+    parser.add_argument("--policy-width", type=int, default=224)
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--num-iters", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cameras = [f"camera_{i}" for i in range(args.num_cameras)]
+    joints = [f"joint_{i}.pos" for i in range(NUM_JOINTS)]
+    lerobot_features = {
+        "observation.state": {"dtype": "float32", "shape": (NUM_JOINTS,), "names": joints},
+        **{
+            f"observation.images.{camera}": {
+                "dtype": "image",
+                "shape": (args.height, args.width, 3),
+                "names": ["height", "width", "channels"],
+            }
+            for camera in cameras
+        },
+    }
+    policy_image_features = {
+        f"observation.images.{camera}": PolicyFeature(
+            type=FeatureType.VISUAL, shape=(3, args.policy_height, args.policy_width)
+        )
+        for camera in cameras
+    }
+    raw_observation = {joint: float(rng.normal()) for joint in joints}
+    raw_observation.update(
+        {camera: rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for camera in cameras}
+    )
+    raw_observation["task"] = "fold the towel"
+    observation = TimedObservation(timestamp=time.time(), timestep=0, observation=raw_observation)
+
+    server = PolicyServer(PolicyServerConfig())
+    server.policy = SimpleNamespace(config=SimpleNamespace(image_features=policy_image_features))
+    server.lerobot_features = lerobot_features
+    server.device = args.device
+
+    results = {
+        "per-camera": time_ms(
+            lambda: per_camera(raw_observation, lerobot_features, policy_image_features, args.device),
+            args.num_iters,
+            args.device,
+        ),
+        "fused": time_ms(lambda: server._prepare_observation(observation), args.num_iters, args.device),
+    }
+    server.stop()
+
+    print(f"{'preprocessing':<14}{'ms/call':>10}")
+    for name, ms in results.items():
+        print(f"{name:<14}{ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
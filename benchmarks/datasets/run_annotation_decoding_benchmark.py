@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the throughput of the end effector / gripper annotation decoding strategies.
+
+A synthetic Hugging Face dataset with every annotation column present is decoded with:
+- `legacy`: the former per-sample Python branches (`.tolist()` + dict lookups per column),
+- `per_item`: `AnnotationDecoder.decode_item` called in `__getitem__`,
+- `per_batch`: `AnnotationDecoder.collate_fn`, decoding once per collated batch.
+
+Example:
+```bash
+python benchmarks/datasets/run_annotation_decoding_benchmark.py --num-frames 20000 --batch-size 64
+```
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+from datasets import Dataset
+from torch.utils.data import default_collate
+
+from lerobot.datasets.annotations import (
+    ANNOTATION_FAMILIES,
+    ANNOTATION_SIDES,
+    ANNOTATION_SOURCES,
+    UNKNOWN_ANNOTATION,
+    AnnotationDecoder,
+)
+from lerobot.datasets.utils import hf_transform_to_torch
+
+VOCABULARY_SIZE = 8
+
+
+def make_vocabularies() -> dict[str, dict[int, str]]:
+    return {
+        vocab_attr: {i: f"{family}_{i}" for i in range(VOCABULARY_SIZE)}
+        for family, vocab_attr in ANNOTATION_FAMILIES.items()
+    }
+
+
+def make_synthetic_dataset(num_frames: int, seed: int = 0) -> Dataset:
+    rng = np.random.default_rng(seed)
+    data = {
+        "index": np.arange(num_frames),
+        "observation.state": rng.normal(size=(num_frames, 14)).astype(np.float32),
+    }
+    for family in ANNOTATION_FAMILIES:
+        for source in ANNOTATION_SOURCES:
+            data[f"{family}_{source}"] = rng.integers(0, VOCABULARY_SIZE, size=(num_frames, 2))
+    hf_dataset = Dataset.from_dict(data)
+    hf_dataset.set_transform(hf_transform_to_torch)
+    return hf_dataset
+
+
+def legacy_decode(item: dict, vocabularies: dict[str, dict[int, str]]) -> dict:
+    for family, vocab_attr in ANNOTATION_FAMILIES.items():
+        vocabulary = vocabularies[vocab_attr]
+        for source in ANNOTATION_SOURCES:
+            indices = item.get(f"{family}_{source}", None)
+            if indices is not None:
+                indices = indices.tolist()
+            for i, side in enumerate(ANNOTATION_SIDES):
+                key = f"{side}_{family}_{source}"
+                item[key] = vocabulary[indices[i]] if indices is not None else UNKNOWN_ANNOTATION
+    return item
+
+
+def run(hf_dataset: Dataset, mode: str, decoder: AnnotationDecoder, vocabularies: dict, batch_size: int):
+    num_frames = len(hf_dataset)
+    start = time.perf_counter()
+    for batch_start in range(0, num_frames - batch_size + 1, batch_size):
+        samples = [hf_dataset[idx] for idx in range(batch_start, batch_start + batch_size)]
+        if mode == "legacy":
+            default_collate([legacy_decode(s, vocabularies) for s in samples])
+        elif mode == "per_item":
+            default_collate([decoder.decode_item(s) for s in samples])
+        elif mode == "per_batch":
+            decoder.collate_fn(samples)
+    elapsed = time.perf_counter() - start
+    return (num_frames // batch_size) * batch_size / elapsed
+
+
+def run_decoding_only(samples: list[dict], mode: str, decoder: AnnotationDecoder, vocabularies: dict):
+    """Same as `run` but on pre-fetched samples, to isolate the decoding cost from the Arrow access."""
+    start = time.perf_counter()
+    if mode == "legacy":
+        for s in samples:
+            legacy_decode(dict(s), vocabularies)
+    elif mode == "per_item":
+        for s in samples:
+            decoder.decode_item(dict(s))
+    elif mode == "per_batch":
+        batch = {key: torch.stack([s[key] for s in samples]) for key in decoder.columns}
+        decoder.decode_batch(batch)
+    return len(samples) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-frames", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    vocabularies = make_vocabularies()
+    decoder = AnnotationDecoder.from_meta(SimpleNamespace(**vocabularies))
+    hf_dataset = make_synthetic_dataset(args.num_frames)
+    samples = [hf_dataset[idx] for idx in range(min(args.num_frames, 5_000))]
+
+    print(f"{'mode':<12}{'loader samples/s':>20}{'decode-only samples/s':>25}")
+    for mode in ["legacy", "per_item", "per_batch"]:
+        loader_sps = run(hf_dataset, mode, decoder, vocabularies, args.batch_size)
+        decode_sps = run_decoding_only(samples, mode, decoder, vocabularies)
+        print(f"{mode:<12}{loader_sps:>20,.0f}{decode_sps:>25,.0f}")
+
+
+if __name__ == "__main__":
+    main()
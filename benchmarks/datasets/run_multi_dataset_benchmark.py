@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the indexing overhead of `MultiLeRobotDataset` over many sub-datasets.
+
+Small synthetic datasets (no cameras) are written to a temporary directory and concatenated in a
+`MultiLeRobotDataset`. Random indices are then resolved with:
+- `legacy`: the former linear walk over the sub-datasets summing their `num_frames` on every call,
+- `bisect`: `MultiLeRobotDataset.locate`, a binary search over the precomputed cumulative sizes,
+and fetched end to end with `MultiLeRobotDataset.__getitem__`, drawn either uniformly or with
+`WeightedDatasetSampler`. The construction time of the `MultiLeRobotDataset` is also reported, serially, with
+a pool of loading threads and in lazy mode.
+
+Example:
+```bash
+python benchmarks/datasets/run_multi_dataset_benchmark.py --num-datasets 100 --frames-per-dataset 200
+```
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import datasets
+import numpy as np
+import torch
+
+from lerobot.datasets.lerobot_dataset import LeRobotDataset, MultiLeRobotDataset
+from lerobot.datasets.sampler import WeightedDatasetSampler
+
+FEATURES = {
+    "observation.state": {"dtype": "float32", "shape": (14,), "names": None},
+    "action": {"dtype": "float32", "shape": (14,), "names": None},
+}
+
+
+def make_synthetic_datasets(root: Path, num_datasets: int, frames_per_dataset: int) -> list[str]:
+    repo_ids = []
+    rng = np.random.default_rng(0)
+    for i in range(num_datasets):
+        repo_id = f"benchmark/dataset_{i:03d}"
+        dataset = LeRobotDataset.create(
+            repo_id, fps=30, features=FEATURES, root=root / repo_id, use_videos=False
+        )
+        for _ in range(frames_per_dataset):
+            frame = {key: rng.normal(size=ft["shape"]).astype(np.float32) for key, ft in FEATURES.items()}
+            dataset.add_frame(frame, task="benchmark")
+        dataset.save_episode()
+        repo_ids.append(repo_id)
+    return repo_ids
+
+
+def legacy_locate(dataset: MultiLeRobotDataset, idx: int) -> tuple[int, int]:
+    if idx >= sum(d.num_frames for d in dataset._datasets):
+        raise IndexError(f"Index {idx} out of bounds.")
+    start_idx = 0
+    dataset_idx = 0
+    for sub_dataset in dataset._datasets:
+        if idx >= start_idx + sub_dataset.num_frames:
+            start_idx += sub_dataset.num_frames
+            dataset_idx += 1
+            continue
+        break
+    return dataset_idx, idx - start_idx
+
+
+def time_per_call(fn, indices: list[int]) -> float:
+    start = time.perf_counter()
+    for idx in indices:
+        fn(idx)
+    return (time.perf_counter() - start) / len(indices) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-datasets", type=int, default=100)
+    parser.add_argument("--frames-per-dataset", type=int, default=200)
+    parser.add_argument("--num-samples", type=int, default=5_000)
+    parser.add_argument("--num-loading-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    datasets.disable_progress_bars()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        repo_ids = make_synthetic_datasets(root, args.num_datasets, args.frames_per_dataset)
+        print(f"{args.num_datasets} datasets")
+        print(f"{'construction':<24}{'s':>10}")
+        for name, kwargs in [
+            ("serial", {}),
+            (f"{args.num_loading_workers} threads", {"num_loading_workers": args.num_loading_workers}),
+            ("lazy", {"num_loading_workers": args.num_loading_workers, "lazy": True}),
+        ]:
+            start = time.perf_counter()
+            MultiLeRobotDataset(repo_ids, root=root, **kwargs)
+            print(f"{name:<24}{time.perf_counter() - start:>10.2f}")
+
+        # Mix the first dataset 10 times more than the others
+        dataset = MultiLeRobotDataset(repo_ids, root=root, sampling_weights={repo_ids[0]: 10.0})
+
+        generator = torch.Generator().manual_seed(0)
+        uniform = torch.randint(len(dataset), (args.num_samples,), generator=generator).tolist()
+        sampler = WeightedDatasetSampler(
+            dataset.cumulative_sizes, dataset.sampling_weights, args.num_samples, generator=generator
+        )
+        weighted = list(sampler)
+        first_dataset_ratio = np.mean([idx < dataset.cumulative_sizes[0] for idx in weighted])
+
+        print(f"\n{len(dataset)} frames")
+        print(f"{'lookup':<24}{'us/call':>10}")
+        print(f"{'legacy':<24}{time_per_call(lambda i: legacy_locate(dataset, i), uniform):>10.2f}")
+        print(f"{'bisect':<24}{time_per_call(dataset.locate, uniform):>10.2f}")
+        print(f"{'__getitem__ uniform':<24}{time_per_call(dataset.__getitem__, uniform):>10.2f}")
+        print(f"{'__getitem__ weighted':<24}{time_per_call(dataset.__getitem__, weighted):>10.2f}")
+        print(f"share of the first dataset with weight 10: {first_dataset_ratio:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure how the duration of `LeRobotDataset.save_episode` evolves as a dataset grows.
+
+Synthetic episodes (no cameras) are recorded in a temporary directory, with the recorded episodes kept in
+memory in `hf_dataset` (the default) or only written to disk (`keep_episodes_in_memory=False`). The mean
+save time of the first and last `--window` episodes is reported for both modes.
+
+Example:
+```bash
+python benchmarks/datasets/run_save_episode_benchmark.py --num-episodes 1000 --frames-per-episode 300
+```
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import datasets
+import numpy as np
+
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+FEATURES = {
+    "observation.state": {"dtype": "float32", "shape": (14,), "names": None},
+    "action": {"dtype": "float32", "shape": (14,), "names": None},
+}
+
+
+def record(root: Path, num_episodes: int, frames_per_episode: int, keep_episodes_in_memory: bool) -> list:
+    dataset = LeRobotDataset.create(
+        "benchmark/save_episode",
+        fps=30,
+        features=FEATURES,
+        root=root,
+        use_videos=False,
+        keep_episodes_in_memory=keep_episodes_in_memory,
+    )
+    rng = np.random.default_rng(0)
+    save_times = []
+    for _ in range(num_episodes):
+        for _ in range(frames_per_episode):
+            frame = {key: rng.normal(size=ft["shape"]).astype(np.float32) for key, ft in FEATURES.items()}
+            dataset.add_frame(frame, task="benchmark")
+        start = time.perf_counter()
+        dataset.save_episode()
+        save_times.append(time.perf_counter() - start)
+    return save_times
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-episodes", type=int, default=500)
+    parser.add_argument("--frames-per-episode", type=int, default=300)
+    parser.add_argument("--window", type=int, default=20)
+    args = parser.parse_args()
+
+    datasets.disable_progress_bars()
+    print(f"{'mode':<24}{'first ms/save':>16}{'last ms/save':>16}")
+    for name, keep in [("in memory", True), ("disk only", False)]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_times = record(Path(tmp_dir) / "dataset", args.num_episodes, args.frames_per_episode, keep)
+        first = np.mean(save_times[: args.window]) * 1e3
+        last = np.mean(save_times[-args.window :]) * 1e3
+        print(f"{name:<24}{first:>16.1f}{last:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the latency of sampling an action chunk from a diffusion policy against the number of steps.
+
+The `DiffusionModel.conditional_sample` of a diffusion policy with a Unet of `--down-dims` is timed for each
+inference noise scheduler of `--schedulers` and each number of steps of `--num-inference-steps`, the images
+being already encoded. `--compile` also times it with `compile_sampling`, the whole DDIM steps or the Unet of
+the other schedulers being compiled with `torch.compile`. Each configuration is sampled `--num-warmup` times
+before its `--num-samples` timed samples, whose median is reported.
+
+Example:
+```bash
+python benchmarks/policies/run_diffusion_sampling_benchmark.py --num-inference-steps 5 10 25 100 --device cpu
+```
+"""
+
+import argparse
+import statistics
+import time
+
+import torch
+
+from lerobot.configs.types import FeatureType, NormalizationMode, PolicyFeature
+from lerobot.policies.diffusion.configuration_diffusion import DiffusionConfig
+from lerobot.policies.diffusion.modeling_diffusion import DiffusionModel
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--schedulers", type=str, nargs="+", default=["DDPM", "DDIM", "DPMSolver"])
+    parser.add_argument("--num-inference-steps", type=int, nargs="+", default=[5, 10, 25, 100])
+    parser.add_argument("--down-dims", type=int, nargs="+", default=[512, 1024, 2048])
+    parser.add_argument("--num-cameras", type=int, default=2)
+    parser.add_argument("--num-warmup", type=int, default=3)
+    parser.add_argument("--num-samples", type=int, default=5)
+    parser.add_argument("--compile", action="store_true")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    input_features = {
+        f"observation.images.camera_{i}": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 96, 96))
+        for i in range(args.num_cameras)
+    }
+    input_features["observation.state"] = PolicyFeature(type=FeatureType.STATE, shape=(6,))
+    modes = [False, True] if args.compile else [False]
+
+    print(f"{'scheduler':<11}{'steps':>6}{'compiled':>10}{'ms/chunk':>10}{'ms/step':>9}")
+    for scheduler in args.schedulers:
+        for num_inference_steps in args.num_inference_steps:
+            for compile_sampling in modes:
+                config = DiffusionConfig(
+                    input_features=input_features,
+                    output_features={"action": PolicyFeature(type=FeatureType.ACTION, shape=(6,))},
+                    normalization_mapping=dict.fromkeys(
+                        ["VISUAL", "STATE", "ACTION"], NormalizationMode.IDENTITY
+                    ),
+                    down_dims=tuple(args.down_dims),
+                    inference_noise_scheduler_type=scheduler,
+                    num_inference_steps=num_inference_steps,
+                    compile_sampling=compile_sampling,
+                    device=args.device,
+                )
+                model = DiffusionModel(config).to(args.device).eval()
+                global_cond_dim = (6 + args.num_cameras * model.rgb_encoder.feature_dim) * config.n_obs_steps
+                global_cond = torch.randn(1, global_cond_dim, device=args.device)
+
+                times = []
+                with torch.no_grad():
+                    for i in range(args.num_warmup + args.num_samples):
+                        if args.device == "cuda":
+                            torch.cuda.synchronize()
+                        start = time.perf_counter()
+                        model.conditional_sample(1, global_cond=global_cond)
+                        if args.device == "cuda":
+                            torch.cuda.synchronize()
+                        if i >= args.num_warmup:
+                            times.append(time.perf_counter() - start)
+                chunk_ms = statistics.median(times) * 1e3
+                print(
+                    f"{scheduler:<11}{num_inference_steps:>6}{str(compile_sampling):>10}"
+                    f"{chunk_ms:>10.1f}{chunk_ms / num_inference_steps:>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the latency of the `sample_actions` calls of PI0 and SmolVLA with and without `cache_prefix`.
+
+A randomly initialized model is built with `--num-layers` transformer layers:
+- `pi0`: PaliGemma and the Gemma expert shrunk to a width of 64 and `--image-size` images,
+- `smolvla`: the VLM of `--vlm-model-name` (only its config and processor are downloaded) cut to its first
+  layers, with its own 512x512 images.
+
+`--num-calls` successive calls with the same task are timed for `--num-cameras` cameras whose frames:
+- `static`: never change,
+- `one moving`: change on the first camera only, the others being static overview cameras,
+- `all moving`: all change, which only measures the cost of comparing the frames.
+
+Example:
+```bash
+python benchmarks/policies/run_vla_prefix_cache_benchmark.py --policy pi0 --num-calls 10
+```
+"""
+
+import argparse
+import time
+
+import torch
+
+from lerobot.policies.pi0 import modeling_pi0
+from lerobot.policies.pi0.configuration_pi0 import PI0Config
+from lerobot.policies.pi0.paligemma_with_expert import PaliGemmaWithExpertConfig
+from lerobot.policies.smolvla.configuration_smolvla import SmolVLAConfig
+from lerobot.policies.smolvla.modeling_smolvla import VLAFlowMatching
+
+WIDTH = 64
+SCENARIOS = ["static", "one moving", "all moving"]
+
+
+def make_pi0(args: argparse.Namespace, cache_prefix: bool) -> modeling_pi0.PI0FlowMatching:
+    from transformers.models.auto import CONFIG_MAPPING
+
+    def tiny_config(**kwargs) -> PaliGemmaWithExpertConfig:
+        config = PaliGemmaWithExpertConfig(**kwargs)
+        text_config = {
+            "hidden_size": WIDTH,
+            "intermediate_size": 2 * WIDTH,
+            "num_attention_heads": 4,
+            "num_key_value_heads": 1,
+            "head_dim": 16,
+            "num_hidden_layers": args.num_layers,
+        }
+        config.paligemma_config = CONFIG_MAPPING["paligemma"](
+            hidden_size=WIDTH,
+            projection_dim=WIDTH,
+            image_token_index=257152,
+            text_config={"model_type": "gemma", "vocab_size": 257152, **text_config},
+            vision_config={
+                "model_type": "siglip_vision_model",
+                "hidden_size": WIDTH,
+                "intermediate_size": 2 * WIDTH,
+                "num_attention_heads": 4,
+                "num_hidden_layers": args.num_layers,
+                "image_size": args.image_size,
+                "patch_size": 14,
+                "projection_dim": WIDTH,
+                "vision_use_head": False,
+            },
+        )
+        config.gemma_expert_config = CONFIG_MAPPING["gemma"](vocab_size=257152, **text_config)
+        return config
+
+    config = PI0Config(
+        resize_imgs_with_padding=(args.image_size, args.image_size),
+        proj_width=WIDTH,
+        cache_prefix=cache_prefix,
+    )
+    modeling_pi0.PaliGemmaWithExpertConfig = tiny_config
+    try:
+        return modeling_pi0.PI0FlowMatching(config)
+    finally:
+        modeling_pi0.PaliGemmaWithExpertConfig = PaliGemmaWithExpertConfig
+
+
+def make_smolvla(args: argparse.Namespace, cache_prefix: bool) -> VLAFlowMatching:
+    config = SmolVLAConfig(
+        vlm_model_name=args.vlm_model_name,
+        load_vlm_weights=False,
+        num_vlm_layers=args.num_layers,
+        cache_prefix=cache_prefix,
+    )
+    return VLAFlowMatching(config)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--policy", type=str, choices=["pi0", "smolvla"], default="pi0")
+    parser.add_argument("--num-layers", type=int, default=2)
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument("--vlm-model-name", type=str, default=SmolVLAConfig.vlm_model_name)
+    parser.add_argument("--num-cameras", type=int, default=3)
+    parser.add_argument("--num-calls", type=int, default=10)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    image_size = args.image_size if args.policy == "pi0" else SmolVLAConfig.resize_imgs_with_padding[0]
+    lang_tokens = torch.randint(0, 1000, (1, PI0Config.tokenizer_max_length))
+    lang_masks = torch.ones_like(lang_tokens, dtype=torch.bool)
+    img_masks = [torch.ones(1, dtype=torch.bool) for _ in range(args.num_cameras)]
+
+    def frame() -> torch.Tensor:
+        return torch.rand(1, 3, image_size, image_size) * 2 - 1
+
+    print(f"{'frames':<12}{'uncached ms':>13}{'cached ms':>11}")
+    times = {scenario: {} for scenario in SCENARIOS}
+    for cache_prefix in [False, True]:
+        model = (make_pi0 if args.policy == "pi0" else make_smolvla)(args, cache_prefix).eval()
+        state = torch.randn(1, model.config.max_state_dim)
+
+        for scenario in SCENARIOS:
+            images = [frame() for _ in range(args.num_cameras)]
+            elapsed = 0.0
+            with torch.no_grad():
+                model.reset_prefix_cache()
+                model.sample_actions(images, img_masks, lang_tokens, lang_masks, state)
+                for _ in range(args.num_calls):
+                    if scenario != "static":
+                        num_moving = 1 if scenario == "one moving" else args.num_cameras
+                        images = [frame() for _ in range(num_moving)] + images[num_moving:]
+                    start = time.perf_counter()
+                    model.sample_actions(images, img_masks, lang_tokens, lang_masks, state)
+                    elapsed += time.perf_counter() - start
+            times[scenario][cache_prefix] = elapsed / args.num_calls * 1e3
+
+    for scenario in SCENARIOS:
+        print(f"{scenario:<12}{times[scenario][False]:>13.1f}{times[scenario][True]:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the memory and the sampling time of the `ReplayBuffer` of the RL learner.
+
+Episodes of `--episode-length` transitions of a robot with `--num-cameras` cameras of `--height`x`--width`
+and an 18-dimensional state are added to a buffer of `--capacity` transitions, stored:
+- `float32`: the former default, every state key as float32 and a separate `next_states` copy,
+- `uint8+shared`: the images as uint8, the next states read from the following transitions.
+
+The storage size per transition, the time to add a transition and to sample a batch of `--batch-size` on
+`--device` are reported.
+
+Example:
+```bash
+python benchmarks/rl/run_replay_buffer_benchmark.py --capacity 10000 --device cuda
+```
+"""
+
+import argparse
+import time
+
+import torch
+
+from lerobot.utils.buffer import ReplayBuffer
+
+STATE_DIM = 18
+
+
+def storage_bytes(buffer: ReplayBuffer) -> int:
+    storages = list(buffer.states.values())
+    if buffer.next_states is not buffer.states:
+        storages += list(buffer.next_states.values())
+    kept = [tensor for state in buffer.kept_next_states.values() for tensor in state.values()]
+    return sum(tensor.nelement() * tensor.element_size() for tensor in storages + kept)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--capacity", type=int, default=5000)
+    parser.add_argument("--episode-length", type=int, default=100)
+    parser.add_argument("--num-cameras", type=int, default=2)
+    parser.add_argument("--height", type=int, default=128)
+    parser.add_argument("--width", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--num-samples", type=int, default=50)
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    cameras = [f"observation.images.camera_{i}" for i in range(args.num_cameras)]
+    states = [
+        {
+            **{camera: torch.randint(0, 256, (1, 3, args.height, args.width)) / 255 for camera in cameras},
+            "observation.state": torch.randn(1, STATE_DIM),
+        }
+        for _ in range(args.episode_length + 1)
+    ]
+    action = torch.zeros(1, 4)
+
+    print(f"{'storage':<14}{'MB/transition':>15}{'add us':>10}{'sample ms':>11}")
+    for name, optimize_memory, state_dtypes in [
+        ("float32", False, dict.fromkeys(cameras, torch.float32)),
+        ("uint8+shared", True, None),
+    ]:
+        buffer = ReplayBuffer(
+            args.capacity,
+            device=args.device,
+            use_drq=False,
+            optimize_memory=optimize_memory,
+            state_dtypes=state_dtypes,
+        )
+
+        start = time.perf_counter()
+        for i in range(args.capacity):
+            step = i % args.episode_length
+            done = step == args.episode_length - 1
+            buffer.add(states[step], action, 0.0, states[step + 1], done, False)
+        add_us = (time.perf_counter() - start) / args.capacity * 1e6
+
+        buffer.sample(args.batch_size)  # warmup
+        if args.device == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(args.num_samples):
+            buffer.sample(args.batch_size)
+        if args.device == "cuda":
+            torch.cuda.synchronize()
+        sample_ms = (time.perf_counter() - start) / args.num_samples * 1e3
+
+        megabytes = storage_bytes(buffer) / args.capacity / 1e6
+        print(f"{name:<14}{megabytes:>15.3f}{add_us:>10.1f}{sample_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
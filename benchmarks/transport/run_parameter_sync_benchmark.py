@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the full state dicts with the delta encoding of the parameters pushed from the learner to the actor.
+
+The actor of a SAC policy with a frozen ResNet-18 vision encoder and a trainable MLP head is pushed
+`--num-pushes` times, its head moving a little between pushes as with an optimizer step, with:
+- `full`: the former `state_to_bytes` of the whole state dict, loaded whole by the actor,
+- `delta-<dtype>`: `ParameterEncoder` / `ParameterDecoder`, a snapshot every `--snapshot-interval` pushes and
+  the tensors that changed since in between, as `<dtype>` differences with the snapshot.
+
+The mean size of a push and of a push that is not a snapshot, the time to encode a push on the learner and
+the time the actor spends decoding and loading it are reported, with the mean transfer time of a push over a
+link of `--link-mbps` megabits per second.
+
+Example:
+```bash
+python benchmarks/transport/run_parameter_sync_benchmark.py --num-pushes 50 --link-mbps 100
+```
+"""
+
+import argparse
+import time
+
+import torch
+from torch import nn
+from torchvision.models import resnet18
+
+from lerobot.transport.parameter_sync import PARAMETER_DELTA_DTYPES, ParameterDecoder, ParameterEncoder
+from lerobot.transport.utils import bytes_to_state_dict, state_to_bytes
+
+
+class Actor(nn.Module):
+    def __init__(self, hidden_dim: int = 256, action_dim: int = 4):
+        super().__init__()
+        self.encoder = resnet18()
+        self.encoder.fc = nn.Identity()
+        self.encoder.requires_grad_(False)
+        self.head = nn.Sequential(
+            nn.Linear(512, hidden_dim),
+            nn.ReLU(),
+            nn.Linear(hidden_dim, hidden_dim),
+            nn.ReLU(),
+            nn.Linear(hidden_dim, 2 * action_dim),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-pushes", type=int, default=50)
+    parser.add_argument("--snapshot-interval", type=int, default=10)
+    parser.add_argument("--link-mbps", type=float, default=100.0)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    learner = Actor()
+    actor = Actor()
+
+    print(
+        f"{'encoding':<16}{'MB/push':>10}{'MB/delta':>10}{'encode ms':>11}{'load ms':>10}{'transfer ms':>13}"
+    )
+    for encoding in ["full"] + [f"delta-{dtype}" for dtype in PARAMETER_DELTA_DTYPES]:
+        if encoding != "full":
+            encoder = ParameterEncoder(encoding.removeprefix("delta-"), args.snapshot_interval)
+            decoder = ParameterDecoder()
+        num_bytes, delta_bytes, encode_time, load_time = 0, [], 0.0, 0.0
+
+        for push in range(args.num_pushes):
+            with torch.no_grad():
+                for parameter in learner.head.parameters():
+                    parameter.add_(torch.randn_like(parameter), alpha=1e-3)
+            state_dicts = {"policy": learner.state_dict()}
+
+            start = time.perf_counter()
+            buffer = state_to_bytes(state_dicts) if encoding == "full" else encoder.encode(state_dicts)
+            encode_time += time.perf_counter() - start
+            num_bytes += len(buffer)
+            if encoding == "full" or push % args.snapshot_interval != 0:
+                delta_bytes.append(len(buffer))
+
+            start = time.perf_counter()
+            if encoding == "full":
+                actor.load_state_dict(bytes_to_state_dict(buffer)["policy"])
+            else:
+                actor.load_state_dict(decoder.decode(buffer)["policy"], strict=False)
+            load_time += time.perf_counter() - start
+
+        megabytes = num_bytes / args.num_pushes / 1e6
+        print(
+            f"{encoding:<16}{megabytes:>10.2f}{sum(delta_bytes) / len(delta_bytes) / 1e6:>10.2f}"
+            f"{encode_time / args.num_pushes * 1e3:>11.2f}"
+            f"{load_time / args.num_pushes * 1e3:>10.2f}{megabytes * 8 / args.link_mbps * 1e3:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare pickle with the binary wire format of the async inference observations and action chunks.
+
+The messages of a bimanual robot with 3 cameras (14 joints, 3 x 480x640 RGB frames and a task) and of a
+chunk of 50 actions are serialized and deserialized with:
+- `pickle`: the former `pickle.dumps` / `pickle.loads` of `TimedObservation` and `list[TimedAction]`,
+- `wire`: `timed_observation_to_bytes` / `bytes_to_timed_observation` and their action counterparts,
+- `wire+png` / `wire+jpeg`: the same with the camera frames compressed by the client, decoded by the server
+  in a thread pool, optionally resized first to the `--policy-height`x`--policy-width` input of the policy.
+
+Random frames don't compress, so the camera frames are smooth synthetic images. The transfer time of each
+message over a link of `--link-mbps` megabits per second is reported alongside.
+
+Example:
+```bash
+python benchmarks/transport/run_wire_format_benchmark.py --num-cameras 3 --height 480 --width 640
+```
+"""
+
+import argparse
+import pickle  # nosec
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from lerobot.scripts.server.helpers import (
+    TimedAction,
+    TimedObservation,
+    bytes_to_timed_actions,
+    bytes_to_timed_observation,
+    timed_actions_to_bytes,
+    timed_observation_to_bytes,
+)
+from lerobot.transport.wire_format import ObservationSchema
+
+
+def make_frame(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    """Smooth gradients with a little sensor noise, closer to camera frames than uniform noise."""
+    y, x = np.mgrid[0:height, 0:width]
+    phase = rng.uniform(0, 2 * np.pi, 3)
+    frame = np.stack([np.sin(x / 40 + y / 60 + p) for p in phase], axis=-1) * 100 + 128
+    return np.clip(frame + rng.normal(0, 2, frame.shape), 0, 255).astype(np.uint8)
+
+
+def make_messages(num_cameras: int, height: int, width: int, num_joints: int, chunk_size: int):
+    rng = np.random.default_rng(0)
+    features = {f"joint_{i}.pos": float for i in range(num_joints)}
+    features.update({f"camera_{i}": (height, width, 3) for i in range(num_cameras)})
+    raw_observation = {
+        key: float(rng.normal()) if ft is float else make_frame(rng, height, width)
+        for key, ft in features.items()
+    }
+    raw_observation["task"] = "fold the towel and put it in the basket"
+    observation = TimedObservation(timestamp=time.time(), timestep=0, observation=raw_observation)
+    actions = torch.randn(chunk_size, num_joints)
+    timed_actions = [
+        TimedAction(timestamp=time.time() + i, timestep=i, action=a) for i, a in enumerate(actions)
+    ]
+    return features, observation, timed_actions
+
+
+def time_ms(fn, num_iters: int):
+    fn()  # warmup
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        result = fn()
+    return (time.perf_counter() - start) / num_iters * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-cameras", type=int, default=3)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--num-joints", type=int, default=14)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--num-iters", type=int, default=200)
+    parser.add_argument("--policy-height", type=int, default=224)
+    parser.add_argument("--policy-width", type=int, default=224)
+    parser.add_argument("--decode-workers", type=int, default=4)
+    parser.add_argument("--link-mbps", type=float, default=100.0)
+    args = parser.parse_args()
+
+    features, observation, timed_actions = make_messages(
+        args.num_cameras, args.height, args.width, args.num_joints, args.chunk_size
+    )
+    cameras = [key for key, ft in features.items() if isinstance(ft, tuple)]
+    policy_shapes = dict.fromkeys(cameras, (args.policy_height, args.policy_width, 3))
+    executor = ThreadPoolExecutor(args.decode_workers)
+
+    def wire(codec: str, resize: bool):
+        image_codecs = dict.fromkeys(cameras, (codec, None))
+        schema = ObservationSchema.from_features(features, image_codecs=image_codecs, resize_images=resize)
+        if resize:
+            schema = schema.resized(policy_shapes)
+        return (
+            lambda: bytes(timed_observation_to_bytes(observation, schema)),
+            lambda data: bytes_to_timed_observation(data, schema, executor),
+        )
+
+    # `bytes` matches what the receiver gets from the protobuf message
+    codecs = {
+        "observation": {
+            "pickle": (lambda: pickle.dumps(observation), pickle.loads),
+            "wire": wire("raw", resize=False),
+            "wire+png": wire("png", resize=False),
+            "wire+jpeg": wire("jpeg", resize=False),
+            "wire+resize": wire("raw", resize=True),
+            "wire+resize+png": wire("png", resize=True),
+            "wire+resize+jpeg": wire("jpeg", resize=True),
+        },
+        "actions": {
+            "pickle": (lambda: pickle.dumps(timed_actions), pickle.loads),
+            "wire": (lambda: bytes(timed_actions_to_bytes(timed_actions)), bytes_to_timed_actions),
+        },
+    }
+
+    header = f"{'message':<14}{'format':<20}{'bytes':>12}{'serialize ms':>16}{'deserialize ms':>18}"
+    print(f"{header}{'transfer ms':>14}")
+    for message, formats in codecs.items():
+        for name, (serialize, deserialize) in formats.items():
+            serialize_ms, data = time_ms(serialize, args.num_iters)
+            deserialize_ms, _ = time_ms(lambda: deserialize(data), args.num_iters)  # noqa: B023
+            transfer_ms = len(data) * 8 / (args.link_mbps * 1e6) * 1e3
+            print(
+                f"{message:<14}{name:<20}{len(data):>12,}{serialize_ms:>16.3f}{deserialize_ms:>18.3f}"
+                f"{transfer_ms:>14.1f}"
+            )
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,18 @@ class DatasetConfig:
     revision: str | None = None
     use_imagenet_stats: bool = True
     video_backend: str = field(default_factory=get_safe_default_codec)
+    # Number of video decoders kept open in each dataloader worker. 0 disables the cache.
+    video_decoder_cache_size: int = 0
+    # Size in bytes of the decoded video frames cache of each dataloader worker. 0 disables the cache.
+    video_frame_cache_bytes: int = 0
+    # When set, training samples contiguous chunks of this many frames, in order, within each episode (the
+    # chunks themselves are shuffled). This trades some sample diversity within a batch for a high hit rate
+    # of the video caches above.
+    sequential_chunk_size: int | None = None
+    # Load camera frames as uint8 and only convert them to float32 once on the training device.
+    uint8_images: bool = False
+    # Serve the numeric columns from a memory-mapped numpy cache built once under the dataset root.
+    use_columnar_cache: bool = False
 
 
 @dataclass
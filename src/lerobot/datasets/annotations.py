@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Decoding of the per-frame integer annotations (eef motion, gripper state, ...) into strings.
+
+Each annotation family is stored in the parquet files as two columns, `{family}_state` and
+`{family}_action`, holding one index per arm (left, right). The vocabulary of each family is loaded by
+`LeRobotDatasetMetadata` from the `annotations/` folder. Instead of resolving every index through a Python
+dict for every sample, `AnnotationDecoder` builds one numpy lookup table per family once and decodes a
+sample, or a whole collated batch, with a single fancy-indexing operation per column.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import torch
+from torch.utils.data import default_collate
+
+UNKNOWN_ANNOTATION = "unknown"
+
+# Annotation family -> attribute of `LeRobotDatasetMetadata` holding its {index: label} vocabulary.
+# Adding a new family only requires a new entry here (and its loader in `LeRobotDatasetMetadata`).
+ANNOTATION_FAMILIES = {
+    "eef_acc_mag": "eef_acc_mags",
+    "eef_direction": "eef_directions",
+    "eef_velocity": "eef_velocities",
+    "gripper_mode": "gripper_modes",
+    "gripper_activity": "gripper_activities",
+}
+ANNOTATION_SOURCES = ("state", "action")
+ANNOTATION_SIDES = ("left", "right")
+
+
+def build_lookup_table(vocabulary: dict[int, str] | None) -> np.ndarray | None:
+    """Converts an {index: label} vocabulary into a dense object array indexable by integer codes.
+
+    Indices missing from the vocabulary map to `UNKNOWN_ANNOTATION`.
+    """
+    if not vocabulary:
+        return None
+    table = np.full(max(vocabulary) + 1, UNKNOWN_ANNOTATION, dtype=object)
+    for index, label in vocabulary.items():
+        table[index] = label
+    return table
+
+
+class AnnotationDecoder:
+    """Vectorized integer -> string decoder for the annotation columns of a LeRobotDataset.
+
+    For every `{family}_{source}` column (e.g. `gripper_mode_state`) it produces the
+    `left_{family}_{source}` and `right_{family}_{source}` string keys. When the column is absent from the
+    item or the dataset has no vocabulary for the family, both keys are set to `UNKNOWN_ANNOTATION`.
+
+    The decoder can be applied per sample with `decode_item`, or, to keep it out of the DataLoader workers'
+    hot path, once per batch with `decode_batch` / `collate_fn`.
+    """
+
+    def __init__(self, tables: dict[str, np.ndarray | None]):
+        self.tables = tables
+        # Precompute (column, output keys, lookup table) so that decoding does no string formatting. Single
+        # items only hold one code per arm, for which a tuple lookup is cheaper than numpy fancy indexing.
+        self._columns = [
+            (
+                f"{family}_{source}",
+                tuple(f"{side}_{family}_{source}" for side in ANNOTATION_SIDES),
+                table,
+                tuple(table.tolist()) if table is not None else None,
+            )
+            for family, table in tables.items()
+            for source in ANNOTATION_SOURCES
+        ]
+
+    @classmethod
+    def from_meta(cls, meta: Any) -> "AnnotationDecoder":
+        tables = {
+            family: build_lookup_table(getattr(meta, vocab_attr, None))
+            for family, vocab_attr in ANNOTATION_FAMILIES.items()
+        }
+        return cls(tables)
+
+    @property
+    def columns(self) -> list[str]:
+        """Names of the integer annotation columns handled by this decoder."""
+        return [column for column, *_ in self._columns]
+
+    @staticmethod
+    def _to_numpy(codes: torch.Tensor | np.ndarray | Sequence[int]) -> np.ndarray:
+        if isinstance(codes, torch.Tensor):
+            return codes.numpy()
+        return np.asarray(codes)
+
+    def decode_item(self, item: dict) -> dict:
+        """Adds the decoded `left_*` / `right_*` string annotations to a single (un-batched) item."""
+        for column, out_keys, _, labels in self._columns:
+            codes = item.get(column)
+            if codes is None or labels is None:
+                for key in out_keys:
+                    item[key] = UNKNOWN_ANNOTATION
+                continue
+            for key, code in zip(out_keys, codes.tolist(), strict=True):
+                item[key] = labels[code]
+        return item
+
+    def decode_batch(self, batch: dict) -> dict:
+        """Adds the decoded annotations to a collated batch, as lists of strings of length batch_size.
+
+        The output matches what `default_collate` produces from items decoded with `decode_item`.
+        """
+        batch_size = None
+        for column, out_keys, table, _ in self._columns:
+            codes = batch.get(column)
+            if codes is None or table is None:
+                if batch_size is None:
+                    batch_size = _infer_batch_size(batch)
+                for key in out_keys:
+                    batch[key] = [UNKNOWN_ANNOTATION] * batch_size
+                continue
+            labels = table[self._to_numpy(codes)]
+            for i, key in enumerate(out_keys):
+                batch[key] = labels[:, i].tolist()
+        return batch
+
+    def collate_fn(self, samples: list[dict]) -> dict:
+        """Drop-in `collate_fn` for a DataLoader over a dataset created with `decode_annotations=False`."""
+        return self.decode_batch(default_collate(samples))
+
+
+def _infer_batch_size(batch: dict) -> int:
+    for value in batch.values():
+        if isinstance(value, (torch.Tensor, np.ndarray)) and value.ndim > 0:
+            return len(value)
+        if isinstance(value, list):
+            return len(value)
+    raise ValueError("Could not infer the batch size from the collated batch.")
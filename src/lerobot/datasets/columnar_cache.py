@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Memory-mapped columnar cache of the numeric columns of a LeRobotDataset.
+
+Reading a frame through `hf_dataset[idx]` goes through Arrow, Python objects and `hf_transform_to_torch`,
+and reading a whole column (e.g. `hf_dataset["timestamp"]`) materializes a Python list of tensors. The
+`ColumnarCache` compiles every numeric column of the parquet files once into one contiguous `.npy` file per
+column, stored under `{root}/.cache/columnar/`, which is then opened with `numpy.memmap`. Frames and
+`delta_timestamps` windows are read by direct slicing, and the pages are shared between DataLoader workers by
+the OS page cache.
+
+The cache is keyed by a fingerprint of `meta/info.json` (which holds the total number of episodes and frames),
+of the selected episodes and of the loaded columns, so recording new episodes or changing the episode
+selection triggers a rebuild.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import datasets
+import numpy as np
+import torch
+
+from lerobot.datasets.utils import INFO_PATH, write_json
+
+COLUMNAR_CACHE_DIR = Path(".cache/columnar")
+MANIFEST_NAME = "manifest.json"
+# Rows converted per Arrow batch when building the cache, bounding the memory used by the build.
+BUILD_BATCH_SIZE = 65_536
+
+
+def _numeric_spec(feature) -> tuple[np.dtype, tuple[int, ...]] | None:
+    """Returns the (dtype, per-frame shape) of a hf feature in the cache, or None if it can't be cached.
+
+    The dtypes mirror what `hf_transform_to_torch` returns (`torch.tensor` on Python scalars): floats are
+    stored as float32 and integers as int64.
+    """
+    if isinstance(feature, datasets.Sequence):
+        inner = _numeric_spec(feature.feature)
+        if inner is None or feature.length < 0:
+            return None
+        return inner[0], (feature.length, *inner[1])
+    if isinstance(feature, datasets.Value):
+        dtype_name, shape = feature.dtype, ()
+    elif isinstance(feature, (datasets.Array2D, datasets.Array3D, datasets.Array4D, datasets.Array5D)):
+        dtype_name, shape = feature.dtype, tuple(feature.shape)
+    else:
+        return None
+
+    if dtype_name == "bool":
+        return np.dtype(np.bool_), shape
+    if dtype_name.startswith("float"):
+        return np.dtype(np.float32), shape
+    if dtype_name.startswith(("int", "uint")):
+        return np.dtype(np.int64), shape
+    return None
+
+
+def get_numeric_columns(hf_features: datasets.Features) -> dict[str, tuple[np.dtype, tuple[int, ...]]]:
+    """Columns of the hf_dataset that can be stored in the cache, with their cache dtype and shape."""
+    columns = {}
+    for key, feature in hf_features.items():
+        spec = _numeric_spec(feature)
+        if spec is not None:
+            columns[key] = spec
+    return columns
+
+
+def compute_fingerprint(
+    root: Path, episodes: list[int] | None, num_frames: int, columns: dict[str, tuple]
+) -> tuple[str, str]:
+    """Returns the (info, cache) fingerprints identifying a cache built from the current files."""
+    info_hash = hashlib.sha256((root / INFO_PATH).read_bytes()).hexdigest()
+    content = {
+        "info": info_hash,
+        "episodes": episodes,
+        "num_frames": num_frames,
+        "columns": {key: [dtype.str, list(shape)] for key, (dtype, shape) in columns.items()},
+    }
+    fingerprint = hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+    return info_hash, fingerprint[:16]
+
+
+class ColumnarCache:
+    """Read-only, memory-mapped view of the numeric columns of a dataset, one `(num_frames, *shape)` array per
+    column.
+
+    Use `ColumnarCache.load_or_build` to get an up-to-date cache for a dataset. Row `i` of every column
+    corresponds to `hf_dataset[i]`.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        manifest = json.loads((self.cache_dir / MANIFEST_NAME).read_text())
+        self.num_frames = manifest["num_frames"]
+        self.column_names = list(manifest["columns"])
+        self._columns = None
+
+    @classmethod
+    def load_or_build(
+        cls, root: str | Path, hf_dataset: datasets.Dataset, episodes: list[int] | None = None
+    ) -> "ColumnarCache":
+        root = Path(root)
+        columns = get_numeric_columns(hf_dataset.features)
+        info_hash, fingerprint = compute_fingerprint(root, episodes, len(hf_dataset), columns)
+        cache_dir = root / COLUMNAR_CACHE_DIR / fingerprint
+        if not (cache_dir / MANIFEST_NAME).is_file():
+            build_columnar_cache(hf_dataset, columns, cache_dir, info_hash)
+        return cls(cache_dir)
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        # Opened lazily so that the memmaps are created in the process (e.g. DataLoader worker) using them.
+        if self._columns is None:
+            self._columns = {
+                key: np.load(self.cache_dir / f"{key}.npy", mmap_mode="r") for key in self.column_names
+            }
+        return self._columns
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.column_names
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.columns[key]
+
+    def get_item(self, idx: int) -> dict[str, torch.Tensor]:
+        """Same values as the numeric entries of `hf_dataset[idx]`."""
+        return {key: torch.from_numpy(np.array(column[idx])) for key, column in self.columns.items()}
+
+    def query(self, key: str, indices: list[int]) -> torch.Tensor:
+        """Same values as `torch.stack(hf_dataset.select(indices)[key])`."""
+        # Fancy indexing a memmap returns an in-memory copy.
+        return torch.from_numpy(self.columns[key][indices])
+
+    def __getstate__(self) -> dict:
+        # Pickling a memmap copies its content; workers started with `spawn` re-open the files instead.
+        state = self.__dict__.copy()
+        state["_columns"] = None
+        return state
+
+
+def build_columnar_cache(
+    hf_dataset: datasets.Dataset, columns: dict[str, tuple], cache_dir: Path, info_hash: str
+) -> None:
+    """Writes one `.npy` file per column of `columns`, plus a manifest, to `cache_dir`.
+
+    The files are written to a temporary directory which is renamed once complete, so that concurrent
+    processes never read a partial cache. Caches built for a previous version of `info.json` are removed.
+    """
+    logging.info(f"Building the columnar cache of {len(hf_dataset)} frames in {cache_dir}")
+    tmp_dir = cache_dir.with_name(f"{cache_dir.name}.tmp-{os.getpid()}")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    num_frames = len(hf_dataset)
+    arrays = {
+        key: np.lib.format.open_memmap(
+            tmp_dir / f"{key}.npy", mode="w+", dtype=dtype, shape=(num_frames, *shape)
+        )
+        for key, (dtype, shape) in columns.items()
+    }
+    if columns and num_frames > 0:
+        table = hf_dataset.select_columns(list(columns)).with_format("numpy")
+        for start, batch in zip(
+            range(0, num_frames, BUILD_BATCH_SIZE), table.iter(batch_size=BUILD_BATCH_SIZE), strict=True
+        ):
+            for key, array in arrays.items():
+                array[start : start + BUILD_BATCH_SIZE] = batch[key]
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    manifest = {
+        "info_hash": info_hash,
+        "num_frames": num_frames,
+        "columns": {key: [dtype.str, list(shape)] for key, (dtype, shape) in columns.items()},
+    }
+    write_json(manifest, tmp_dir / MANIFEST_NAME)
+
+    try:
+        tmp_dir.rename(cache_dir)
+    except OSError:
+        # Another process completed the same cache first.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for other_dir in cache_dir.parent.iterdir():
+        manifest_path = other_dir / MANIFEST_NAME
+        if other_dir == cache_dir or not manifest_path.is_file():
+            continue
+        if json.loads(manifest_path.read_text()).get("info_hash") != info_hash:
+            shutil.rmtree(other_dir, ignore_errors=True)
@@ -95,6 +95,10 @@ def make_dataset(cfg: TrainPipelineConfig) -> LeRobotDataset | MultiLeRobotDatas
             image_transforms=image_transforms,
             revision=cfg.dataset.revision,
             video_backend=cfg.dataset.video_backend,
+            video_decoder_cache_size=cfg.dataset.video_decoder_cache_size,
+            video_frame_cache_bytes=cfg.dataset.video_frame_cache_bytes,
+            uint8_images=cfg.dataset.uint8_images,
+            use_columnar_cache=cfg.dataset.use_columnar_cache,
         )
     else:
         raise NotImplementedError("The MultiLeRobotDataset isn't supported for now.")
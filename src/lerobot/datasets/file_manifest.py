@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Incremental record of the data and video files written for each episode of a dataset.
+
+`LeRobotDataset.save_episode` checks that every saved episode has its parquet file and, once encoded, its
+videos. Walking the whole dataset tree to count these files makes each save O(total episodes); the
+`EpisodeFilesManifest` instead keeps the files of every episode in `{root}/.cache/episode_files.jsonl`, to
+which one line is appended whenever files are written, so that the counts are updated in O(1).
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from pathlib import Path
+
+EPISODE_FILES_MANIFEST_PATH = Path(".cache/episode_files.jsonl")
+# Suffixes of the files tracked by the manifest
+MANIFEST_SUFFIXES = (".parquet", ".mp4")
+
+
+class EpisodeFilesManifest:
+    """Files of each episode, as paths relative to the dataset root.
+
+    Every call to `add` appends a single JSON line, written in one `write` call and flushed to disk, so that an
+    interrupted save leaves at most a truncated last line, which is ignored when loading. The manifest is built
+    once by walking the dataset tree when it doesn't exist (e.g. for datasets recorded before it was
+    introduced) or doesn't match the `num_episodes` of the metadata.
+    """
+
+    def __init__(self, root: str | Path, num_episodes: int | None = None):
+        self.root = Path(root)
+        self.path = self.root / EPISODE_FILES_MANIFEST_PATH
+        self.files: dict[int, set[str]] = {}
+        self._num_files = Counter()
+
+        if self.path.is_file():
+            self._load()
+            if num_episodes is not None and self.num_files(".parquet") != num_episodes:
+                logging.warning(f"{self.path} is out of date, rebuilding it from the files in {self.root}.")
+                self.path.unlink()
+                self.files, self._num_files = {}, Counter()
+                self._build()
+        else:
+            self._build()
+
+    def _load(self) -> None:
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._register(record["episode_index"], record["files"])
+
+    def _build(self) -> None:
+        files = {}
+        for suffix in MANIFEST_SUFFIXES:
+            for path in sorted(self.root.rglob(f"episode_*{suffix}")):
+                episode_index = int(path.stem.removeprefix("episode_"))
+                files.setdefault(episode_index, []).append(path)
+        for episode_index in sorted(files):
+            self.add(episode_index, files[episode_index])
+
+    def _register(self, episode_index: int, files: list[str]) -> list[str]:
+        episode_files = self.files.setdefault(episode_index, set())
+        new_files = [file for file in files if file not in episode_files]
+        for file in new_files:
+            episode_files.add(file)
+            self._num_files[Path(file).suffix] += 1
+        return new_files
+
+    def add(self, episode_index: int, files: list[str | Path]) -> None:
+        """Records files written for `episode_index`, given as absolute paths or relative to the dataset root."""
+        paths = [Path(file) for file in files]
+        paths = [path.relative_to(self.root) if path.is_absolute() else path for path in paths]
+        missing = [path for path in paths if not (self.root / path).is_file()]
+        if missing:
+            raise FileNotFoundError(f"Files of episode {episode_index} not found in {self.root}: {missing}")
+
+        new_files = self._register(episode_index, [path.as_posix() for path in paths])
+        if not new_files:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({"episode_index": episode_index, "files": new_files}) + "\n"
+        with open(self.path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def num_files(self, suffix: str) -> int:
+        """Number of recorded files with the given suffix, e.g. '.parquet' or '.mp4'."""
+        return self._num_files[suffix]
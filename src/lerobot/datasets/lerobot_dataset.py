@@ -13,13 +13,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import bisect
 import contextlib
+import itertools
 import logging
 import shutil
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
-import av
 import datasets
 import numpy as np
 import packaging.version
@@ -32,7 +35,10 @@ from huggingface_hub.constants import REPOCARD_NAME
 from huggingface_hub.errors import RevisionNotFoundError
 
 from lerobot.constants import HF_LEROBOT_HOME
+from lerobot.datasets.annotations import AnnotationDecoder
+from lerobot.datasets.columnar_cache import COLUMNAR_CACHE_DIR, ColumnarCache
 from lerobot.datasets.compute_stats import aggregate_stats, compute_episode_stats
+from lerobot.datasets.file_manifest import EPISODE_FILES_MANIFEST_PATH, EpisodeFilesManifest
 from lerobot.datasets.image_writer import AsyncImageWriter, write_image
 from lerobot.datasets.utils import (
     DEFAULT_FEATURES,
@@ -74,11 +80,16 @@ from lerobot.datasets.utils import (
     write_json,
 )
 from lerobot.datasets.video_utils import (
+    DecodedFrameCache,
+    StreamingVideoEncoder,
+    VideoDecoderCache,
+    VideoEncodingPool,
     VideoFrame,
     decode_video_frames,
-    encode_video_frames,
+    encode_and_validate_video,
     get_safe_default_codec,
     get_video_info,
+    validate_video_pyav,
 )
 
 CODEBASE_VERSION = "v2.1"
@@ -356,6 +367,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         download_videos: bool = True,
         video_backend: str | None = None,
         batch_encoding_size: int = 1,
+        decode_annotations: bool = True,
+        video_decoder_cache_size: int = 0,
+        video_frame_cache_bytes: int = 0,
+        uint8_images: bool = False,
+        use_columnar_cache: bool = False,
     ):
         """
         2 modes are available for instantiating this class, depending on 2 different use cases:
@@ -459,6 +475,31 @@ class LeRobotDataset(torch.utils.data.Dataset):
                 You can also use the 'pyav' decoder used by Torchvision, which used to be the default option, or 'video_reader' which is another decoder of Torchvision.
             batch_encoding_size (int, optional): Number of episodes to accumulate before batch encoding videos.
                 Set to 1 for immediate encoding (default), or higher for batched encoding. Defaults to 1.
+            decode_annotations (bool, optional): Flag to decode the end effector and gripper annotation indices
+                into strings in '__getitem__'. Set to False to keep the integer columns only and decode them
+                once per batch instead, by passing `dataset.annotation_decoder.collate_fn` as the DataLoader
+                'collate_fn'. Defaults to True.
+            video_decoder_cache_size (int, optional): Number of video decoders kept open per process (i.e. per
+                DataLoader worker) to avoid re-opening and re-parsing the same mp4 files across consecutive
+                queries. Most useful with sequential or episode-aware sampling, in which case it should be at
+                least the number of cameras. Set to 0 to open a new decoder for every query. Defaults to 0.
+            video_frame_cache_bytes (int, optional): Size in bytes of the per-process cache of decoded video
+                frames (stored as uint8), consulted before decoding. It pays off when consecutive queries
+                overlap, i.e. with multi-frame `delta_timestamps` and a sampler walking episodes in order (see
+                `EpisodeAwareSampler(sequential_chunk_size=...)`). Its hit rate and size are reported by
+                `dataset.video_frame_cache.stats()`. Set to 0 to disable it. Defaults to 0.
+            uint8_images (bool, optional): Flag to return camera frames (from videos or images) as uint8 in
+                [0, 255] instead of float32 in [0, 1]. This divides by 4 the size of the frames going through
+                the DataLoader workers' shared memory and the host to device copy. The conversion to float must
+                then be done on device, e.g. with `ImageToFloatProcessor` (or by `train.py` when
+                `dataset.uint8_images=true`). Note that `image_transforms` then receive uint8 tensors.
+                Defaults to False.
+            use_columnar_cache (bool, optional): Flag to serve the numeric columns (state, action, timestamps,
+                indices, ...) from a memory-mapped numpy cache instead of going through Arrow and
+                `hf_transform_to_torch` for every item. The cache is built on first use under
+                '{root}/.cache/columnar' (one .npy file per column) and rebuilt whenever 'meta/info.json' or the
+                selected episodes change. Image and string columns are still read from 'hf_dataset'.
+                Defaults to False.
         """
         super().__init__()
         self.repo_id = repo_id
@@ -472,6 +513,16 @@ class LeRobotDataset(torch.utils.data.Dataset):
         self.delta_indices = None
         self.batch_encoding_size = batch_encoding_size
         self.episodes_since_last_encoding = 0
+        self.decode_annotations = decode_annotations
+        self.video_decoder_cache = (
+            VideoDecoderCache(video_decoder_cache_size) if video_decoder_cache_size > 0 else None
+        )
+        self.video_frame_cache = (
+            DecodedFrameCache(video_frame_cache_bytes) if video_frame_cache_bytes > 0 else None
+        )
+        self.uint8_images = uint8_images
+        self.columnar_cache = None
+        self._hf_extra_columns = None
 
         # using a temp directory to cache images
         self.image_cache_root = Path(f"./temp/{repo_id.replace('/', '_')}")
@@ -479,6 +530,15 @@ class LeRobotDataset(torch.utils.data.Dataset):
         # Unused attributes
         self.image_writer = None
         self.episode_buffer = None
+        self.streaming_encoding = False
+        self._video_encoders = {}
+        self.video_encoding_pool = None
+        self.async_video_encoding = False
+        self._pending_video_encodings = []
+        self.full_video_validation = False
+        self.keep_episodes_in_memory = True
+        self._files_manifest = None
+        self._unmerged_episodes = []
 
         self.root.mkdir(exist_ok=True, parents=True)
 
@@ -486,6 +546,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         self.meta = LeRobotDatasetMetadata(
             self.repo_id, self.root, self.revision, force_cache_sync=force_cache_sync
         )
+        self.annotation_decoder = AnnotationDecoder.from_meta(self.meta)
         if self.episodes is not None and self.meta._version >= packaging.version.parse("v2.1"):
             episodes_stats = [self.meta.episodes_stats[ep_idx] for ep_idx in self.episodes]
             self.stats = aggregate_stats(episodes_stats)
@@ -503,9 +564,22 @@ class LeRobotDataset(torch.utils.data.Dataset):
 
         self.episode_data_index = get_episode_data_index(self.meta.episodes, self.episodes)
 
+        if use_columnar_cache:
+            self.columnar_cache = ColumnarCache.load_or_build(self.root, self.hf_dataset, self.episodes)
+            extra_columns = [key for key in self.hf_dataset.column_names if key not in self.columnar_cache]
+            if extra_columns:
+                self._hf_extra_columns = self.hf_dataset.select_columns(extra_columns)
+                self._hf_extra_columns.set_transform(
+                    partial(hf_transform_to_torch, uint8_images=self.uint8_images)
+                )
+
         # Check timestamps
-        timestamps = torch.stack(self.hf_dataset["timestamp"]).numpy()
-        episode_indices = torch.stack(self.hf_dataset["episode_index"]).numpy()
+        if self.columnar_cache is not None:
+            timestamps = np.asarray(self.columnar_cache["timestamp"])
+            episode_indices = np.asarray(self.columnar_cache["episode_index"])
+        else:
+            timestamps = torch.stack(self.hf_dataset["timestamp"]).numpy()
+            episode_indices = torch.stack(self.hf_dataset["episode_index"]).numpy()
         ep_data_index_np = {k: t.numpy() for k, t in self.episode_data_index.items()}
         check_timestamps_sync(timestamps, episode_indices, ep_data_index_np, self.fps, self.tolerance_s)
 
@@ -526,7 +600,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         upload_large_folder: bool = False,
         **card_kwargs,
     ) -> None:
-        ignore_patterns = ["images/"]
+        ignore_patterns = ["images/", f"{COLUMNAR_CACHE_DIR}/", str(EPISODE_FILES_MANIFEST_PATH)]
         if not push_videos:
             ignore_patterns.append("videos/")
 
@@ -622,9 +696,24 @@ class LeRobotDataset(torch.utils.data.Dataset):
             hf_dataset = load_dataset("parquet", data_files=files, split="train")
 
         # TODO(aliberts): hf_dataset.set_format("torch")
-        hf_dataset.set_transform(hf_transform_to_torch)
+        hf_dataset.set_transform(partial(hf_transform_to_torch, uint8_images=self.uint8_images))
         return hf_dataset
 
+    @property
+    def hf_dataset(self) -> datasets.Dataset | None:
+        """The frames of the dataset. The episodes saved since it was last read are appended to it when it is
+        next read, in one concatenation, rather than by every `save_episode`."""
+        if self._unmerged_episodes:
+            self._hf_dataset = concatenate_datasets([self._hf_dataset, *self._unmerged_episodes])
+            self._hf_dataset.set_transform(hf_transform_to_torch)
+            self._unmerged_episodes = []
+        return self._hf_dataset
+
+    @hf_dataset.setter
+    def hf_dataset(self, hf_dataset: datasets.Dataset | None) -> None:
+        self._hf_dataset = hf_dataset
+        self._unmerged_episodes = []
+
     def create_hf_dataset(self) -> datasets.Dataset:
         features = get_hf_features_from_features(self.features)
         ft_dict = {col: [] for col in features}
@@ -656,8 +745,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
     @property
     def hf_features(self) -> datasets.Features:
         """Features of the hf_dataset."""
-        if self.hf_dataset is not None:
-            return self.hf_dataset.features
+        if self._hf_dataset is not None:
+            return self._hf_dataset.features
         else:
             return get_hf_features_from_features(self.features)
 
@@ -683,7 +772,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
     ) -> dict[str, list[float]]:
         query_timestamps = {}
         for key in self.meta.video_keys:
-            if query_indices is not None and key in query_indices:
+            if query_indices is not None and key in query_indices and self.columnar_cache is not None:
+                query_timestamps[key] = self.columnar_cache.query("timestamp", query_indices[key]).tolist()
+            elif query_indices is not None and key in query_indices:
                 timestamps = self.hf_dataset.select(query_indices[key])["timestamp"]
                 query_timestamps[key] = torch.stack(timestamps).tolist()
             else:
@@ -693,7 +784,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
 
     def _query_hf_dataset(self, query_indices: dict[str, list[int]]) -> dict:
         return {
-            key: torch.stack(self.hf_dataset.select(q_idx)[key])
+            key: self.columnar_cache.query(key, q_idx)
+            if self.columnar_cache is not None and key in self.columnar_cache
+            else torch.stack(self.hf_dataset.select(q_idx)[key])
             for key, q_idx in query_indices.items()
             if key not in self.meta.video_keys
         }
@@ -707,7 +800,15 @@ class LeRobotDataset(torch.utils.data.Dataset):
         item = {}
         for vid_key, query_ts in query_timestamps.items():
             video_path = self.root / self.meta.get_video_file_path(ep_idx, vid_key)
-            frames = decode_video_frames(video_path, query_ts, self.tolerance_s, self.video_backend)
+            frames = decode_video_frames(
+                video_path,
+                query_ts,
+                self.tolerance_s,
+                self.video_backend,
+                decoder_cache=self.video_decoder_cache,
+                frame_cache=self.video_frame_cache,
+                return_uint8=self.uint8_images,
+            )
             item[vid_key] = frames.squeeze(0)
 
         return item
@@ -720,8 +821,16 @@ class LeRobotDataset(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
+    def _get_hf_item(self, idx: int) -> dict:
+        if self.columnar_cache is None:
+            return self.hf_dataset[idx]
+        item = self.columnar_cache.get_item(idx)
+        if self._hf_extra_columns is not None:
+            item.update(self._hf_extra_columns[idx])
+        return item
+
     def __getitem__(self, idx) -> dict:
-        item = self.hf_dataset[idx]
+        item = self._get_hf_item(idx)
         ep_idx = item["episode_index"].item()
 
         query_indices = None
@@ -761,110 +870,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
             scene_index = item["scene_annotation"].item()
             item["scene"] = self.meta.scenes[scene_index]
 
-        # End Effector Acceleration Magnitude Annotation
-        eef_acc_mag_indices = item.get("eef_acc_mag_state", None)
-        if eef_acc_mag_indices is not None:
-            eef_acc_mag_indices = eef_acc_mag_indices.tolist()
-        if eef_acc_mag_indices is not None and self.meta.eef_acc_mags is not None:
-            item["left_eef_acc_mag_state"] = self.meta.eef_acc_mags[eef_acc_mag_indices[0]]
-            item["right_eef_acc_mag_state"] = self.meta.eef_acc_mags[eef_acc_mag_indices[1]]
-        else:
-            item["left_eef_acc_mag_state"] = "unknown"
-            item["right_eef_acc_mag_state"] = "unknown"
-
-        eef_acc_mag_indices = item.get("eef_acc_mag_action", None)
-        if eef_acc_mag_indices is not None:
-            eef_acc_mag_indices = eef_acc_mag_indices.tolist()
-        if eef_acc_mag_indices is not None and self.meta.eef_acc_mags is not None:
-            item["left_eef_acc_mag_action"] = self.meta.eef_acc_mags[eef_acc_mag_indices[0]]
-            item["right_eef_acc_mag_action"] = self.meta.eef_acc_mags[eef_acc_mag_indices[1]]
-        else:
-            item["left_eef_acc_mag_action"] = "unknown"
-            item["right_eef_acc_mag_action"] = "unknown"
-
-        # End Effector Direction Annotation
-        eef_direction_indices = item.get("eef_direction_state", None)
-        if eef_direction_indices is not None:
-            eef_direction_indices = eef_direction_indices.tolist()
-        if eef_direction_indices is not None and self.meta.eef_directions is not None:
-            item["left_eef_direction_state"] = self.meta.eef_directions[eef_direction_indices[0]]
-            item["right_eef_direction_state"] = self.meta.eef_directions[eef_direction_indices[1]]
-        else:
-            item["left_eef_direction_state"] = "unknown"
-            item["right_eef_direction_state"] = "unknown"
-
-        eef_direction_indices = item.get("eef_direction_action", None)
-        if eef_direction_indices is not None:
-            eef_direction_indices = eef_direction_indices.tolist()
-        if eef_direction_indices is not None and self.meta.eef_directions is not None:
-            item["left_eef_direction_action"] = self.meta.eef_directions[eef_direction_indices[0]]
-            item["right_eef_direction_action"] = self.meta.eef_directions[eef_direction_indices[1]]
-        else:
-            item["left_eef_direction_action"] = "unknown"
-            item["right_eef_direction_action"] = "unknown"
-
-        # End Effector Velocity Annotation
-        eef_velocity_indices = item.get("eef_velocity_state", None)
-        if eef_velocity_indices is not None:
-            eef_velocity_indices = eef_velocity_indices.tolist()
-        if eef_velocity_indices is not None and self.meta.eef_velocities is not None:
-            item["left_eef_velocity_state"] = self.meta.eef_velocities[eef_velocity_indices[0]]
-            item["right_eef_velocity_state"] = self.meta.eef_velocities[eef_velocity_indices[1]]
-        else:
-            item["left_eef_velocity_state"] = "unknown"
-            item["right_eef_velocity_state"] = "unknown"
-
-        eef_velocity_indices = item.get("eef_velocity_action", None)
-        if eef_velocity_indices is not None:
-            eef_velocity_indices = eef_velocity_indices.tolist()
-        if eef_velocity_indices is not None and self.meta.eef_velocities is not None:
-            item["left_eef_velocity_action"] = self.meta.eef_velocities[eef_velocity_indices[0]]
-            item["right_eef_velocity_action"] = self.meta.eef_velocities[eef_velocity_indices[1]]
-        else:
-            item["left_eef_velocity_action"] = "unknown"
-            item["right_eef_velocity_action"] = "unknown"
-
-        # Gripper Mode Annotation
-        gripper_mode_indices = item.get("gripper_mode_state", None)
-        if gripper_mode_indices is not None:
-            gripper_mode_indices = gripper_mode_indices.tolist()
-        if gripper_mode_indices is not None and self.meta.gripper_modes is not None:
-            item["left_gripper_mode_state"] = self.meta.gripper_modes[gripper_mode_indices[0]]
-            item["right_gripper_mode_state"] = self.meta.gripper_modes[gripper_mode_indices[1]]
-        else:
-            item["left_gripper_mode_state"] = "unknown"
-            item["right_gripper_mode_state"] = "unknown"
-
-        gripper_mode_indices = item.get("gripper_mode_action", None)
-        if gripper_mode_indices is not None:
-            gripper_mode_indices = gripper_mode_indices.tolist()
-        if gripper_mode_indices is not None and self.meta.gripper_modes is not None:
-            item["left_gripper_mode_action"] = self.meta.gripper_modes[gripper_mode_indices[0]]
-            item["right_gripper_mode_action"] = self.meta.gripper_modes[gripper_mode_indices[1]]
-        else:
-            item["left_gripper_mode_action"] = "unknown"
-            item["right_gripper_mode_action"] = "unknown"
-
-        # Gripper Activity Annotation
-        gripper_activity_indices = item.get("gripper_activity_state", None)
-        if gripper_activity_indices is not None:
-            gripper_activity_indices = gripper_activity_indices.tolist()
-        if gripper_activity_indices is not None and self.meta.gripper_activities is not None:
-            item["left_gripper_activity_state"] = self.meta.gripper_activities[gripper_activity_indices[0]]
-            item["right_gripper_activity_state"] = self.meta.gripper_activities[gripper_activity_indices[1]]
-        else:
-            item["left_gripper_activity_state"] = "unknown"
-            item["right_gripper_activity_state"] = "unknown"
-
-        gripper_activity_indices = item.get("gripper_activity_action", None)
-        if gripper_activity_indices is not None:
-            gripper_activity_indices = gripper_activity_indices.tolist()
-        if gripper_activity_indices is not None and self.meta.gripper_activities is not None:
-            item["left_gripper_activity_action"] = self.meta.gripper_activities[gripper_activity_indices[0]]
-            item["right_gripper_activity_action"] = self.meta.gripper_activities[gripper_activity_indices[1]]
-        else:
-            item["left_gripper_activity_action"] = "unknown"
-            item["right_gripper_activity_action"] = "unknown"
+        # End effector / gripper annotations
+        if self.decode_annotations:
+            item = self.annotation_decoder.decode_item(item)
 
         return item
 
@@ -912,8 +920,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
     def add_frame(self, frame: dict, task: str, timestamp: float | None = None) -> None:
         """
         This function only adds the frame to the episode_buffer. Apart from images — which are written in a
-        temporary directory — nothing is written to disk. To save those frames, the 'save_episode()' method
-        then needs to be called.
+        temporary directory, or encoded on the fly with `streaming_encoding` — nothing is written to disk. To
+        save those frames, the 'save_episode()' method then needs to be called.
         """
         # Convert torch to numpy if needed
         for name in frame:
@@ -940,7 +948,10 @@ class LeRobotDataset(torch.utils.data.Dataset):
                     f"An element of the frame is not in the features. '{key}' not in '{self.features.keys()}'."
                 )
 
-            if self.features[key]["dtype"] in ["image", "video"]:
+            if self.streaming_encoding and self.features[key]["dtype"] == "video":
+                # The frame is encoded on the fly, its statistics are gathered by the encoder
+                self._get_video_encoder(key, self.episode_buffer["episode_index"]).add_frame(frame[key])
+            elif self.features[key]["dtype"] in ["image", "video"]:
                 # img_path = self._get_image_file_path(
                 #     episode_index=self.episode_buffer["episode_index"], image_key=key, frame_index=frame_index
                 # )
@@ -974,6 +985,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if not episode_data:
             episode_buffer = self.episode_buffer
 
+        self._collect_video_encodings(block=False)
         validate_episode_buffer(episode_buffer, self.meta.total_episodes, self.features)
 
         # size and task are special cases that won't be added to hf_dataset
@@ -1002,20 +1014,25 @@ class LeRobotDataset(torch.utils.data.Dataset):
             episode_buffer[key] = np.stack(episode_buffer[key])
 
         self._wait_image_writer()
+        if self.streaming_encoding:
+            episode_buffer.update(self._close_video_encoders())
         self._save_episode_table(episode_buffer, episode_index)
         ep_stats = compute_episode_stats(episode_buffer, self.features)
 
         has_video_keys = len(self.meta.video_keys) > 0
         use_batched_encoding = self.batch_encoding_size > 1
 
-        if has_video_keys and not use_batched_encoding:
+        if self.streaming_encoding:
+            self._update_video_info(episode_index)
+            self._add_videos_to_manifest(episode_index, self.meta.video_keys)
+        elif has_video_keys and not use_batched_encoding:
             self.encode_episode_videos(episode_index)
 
         # `meta.save_episode` should be executed after encoding the videos
         self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats)
 
         # Check if we should trigger batch encoding
-        if has_video_keys and use_batched_encoding:
+        if has_video_keys and use_batched_encoding and not self.streaming_encoding:
             self.episodes_since_last_encoding += 1
             if self.episodes_since_last_encoding == self.batch_encoding_size:
                 start_ep = self.num_episodes - self.batch_encoding_size
@@ -1038,12 +1055,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         )
 
         # Verify that we have one parquet file per episode and the number of video files matches the number of encoded episodes
-        parquet_files = list(self.root.rglob("*.parquet"))
-        assert len(parquet_files) == self.num_episodes
-        video_files = list(self.root.rglob("*.mp4"))
-        assert len(video_files) == (self.num_episodes - self.episodes_since_last_encoding) * len(
-            self.meta.video_keys
-        )
+        assert self.files_manifest.num_files(".parquet") == self.num_episodes
+        if not self._pending_video_encodings:
+            assert self.files_manifest.num_files(".mp4") == (
+                self.num_episodes - self.episodes_since_last_encoding
+            ) * len(self.meta.video_keys)
 
         if not episode_data:  # Reset the buffer
             self.episode_buffer = self.create_episode_buffer()
@@ -1052,11 +1068,28 @@ class LeRobotDataset(torch.utils.data.Dataset):
         episode_dict = {key: episode_buffer[key] for key in self.hf_features}
         ep_dataset = datasets.Dataset.from_dict(episode_dict, features=self.hf_features, split="train")
         ep_dataset = embed_images(ep_dataset)
-        self.hf_dataset = concatenate_datasets([self.hf_dataset, ep_dataset])
-        self.hf_dataset.set_transform(hf_transform_to_torch)
+        if self.keep_episodes_in_memory:
+            # Concatenating to a table of many episodes gets slower as the table grows, the saved episodes
+            # are concatenated at once when `hf_dataset` is next read
+            self._unmerged_episodes.append(ep_dataset)
+        # The columnar cache no longer covers all the frames, fall back to hf_dataset
+        self.columnar_cache = None
+        self._hf_extra_columns = None
         ep_data_path = self.root / self.meta.get_data_file_path(ep_index=episode_index)
         ep_data_path.parent.mkdir(parents=True, exist_ok=True)
         ep_dataset.to_parquet(ep_data_path)
+        self.files_manifest.add(episode_index, [ep_data_path])
+
+    @property
+    def files_manifest(self) -> EpisodeFilesManifest:
+        """Data and video files of the saved episodes, loaded (or built) on first use."""
+        if self._files_manifest is None:
+            self._files_manifest = EpisodeFilesManifest(self.root, self.meta.total_episodes)
+        return self._files_manifest
+
+    def _add_videos_to_manifest(self, episode_index: int, video_keys: list[str]) -> None:
+        video_paths = [self.root / self.meta.get_video_file_path(episode_index, key) for key in video_keys]
+        self.files_manifest.add(episode_index, video_paths)
 
     def clear_episode_buffer(self) -> None:
         episode_index = self.episode_buffer["episode_index"]
@@ -1075,6 +1108,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
                 if img_dir.is_dir():
                     shutil.rmtree(img_dir)
 
+        self._abort_video_encoders()
+
         # Reset the buffer
         self.episode_buffer = self.create_episode_buffer()
 
@@ -1103,20 +1138,99 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if self.image_writer is not None:
             self.image_writer.wait_until_done()
 
-    def encode_episode_videos(self, episode_index: int) -> None:
+    def _get_video_encoder(self, key: str, episode_index: int) -> StreamingVideoEncoder:
+        if key not in self._video_encoders:
+            video_path = self.root / self.meta.get_video_file_path(episode_index, key)
+            self._video_encoders[key] = StreamingVideoEncoder(video_path, self.fps)
+        return self._video_encoders[key]
+
+    def _close_video_encoders(self) -> dict[str, np.ndarray]:
+        """Finalizes the videos of the current episode and returns the frames sampled for its statistics."""
+        stats_frames = {}
+        for key, encoder in self._video_encoders.items():
+            encoder.close()
+            if not validate_video_pyav(
+                encoder.video_path, encoder.num_frames, full_decode=self.full_video_validation
+            ):
+                raise RuntimeError(f"Video {encoder.video_path} is invalid")
+            stats_frames[key] = encoder.stats_frames
+        self._video_encoders = {}
+        return stats_frames
+
+    def _abort_video_encoders(self) -> None:
+        for encoder in self._video_encoders.values():
+            encoder.abort()
+        self._video_encoders = {}
+
+    def _update_video_info(self, episode_index: int) -> None:
+        # Update video info (only needed when first episode is encoded since it reads from episode 0)
+        if len(self.meta.video_keys) > 0 and episode_index == 0:
+            self.meta.update_video_info()
+            write_info(self.meta.info, self.meta.root)  # ensure video info always written properly
+
+    def start_video_encoding_pool(
+        self, num_workers: int, encoder_threads: int | None = None, async_encoding: bool = False
+    ) -> None:
+        """Encodes the videos with a `VideoEncodingPool` of `num_workers` processes.
+
+        The (episode, camera) videos of `encode_episode_videos` and `batch_encode_videos` are then encoded
+        concurrently, each encoder using at most `encoder_threads` threads. With `async_encoding=True`, these
+        methods return as soon as the jobs are submitted so that the next episode can be recorded while the
+        previous ones are encoded. The metadata is updated as the jobs complete (checked at each
+        `save_episode`), and `wait_video_encoding` blocks until all of them are done.
         """
-        Use ffmpeg to convert frames stored as png into mp4 videos.
-        Note: `encode_video_frames` is a blocking call. Making it asynchronous shouldn't speedup encoding,
-        since video encoding with ffmpeg is already using multithreading.
+        if self.video_encoding_pool is not None:
+            logging.warning(
+                "You are starting a new VideoEncodingPool that is replacing an already existing one in the dataset."
+            )
+            self.stop_video_encoding_pool()
 
-        This method handles video encoding steps:
-        - Video encoding via ffmpeg
-        - Video info updating in metadata
-        - Raw image cleanup
+        self.video_encoding_pool = VideoEncodingPool(num_workers, encoder_threads, self.full_video_validation)
+        self.async_video_encoding = async_encoding
 
-        Args:
-            episode_index (int): Index of the episode to encode.
+    def stop_video_encoding_pool(self) -> None:
+        """
+        Waits for the pending videos and stops the encoding processes. Like `stop_image_writer`, this needs to
+        be called before wrapping this dataset inside a parallelized DataLoader.
         """
+        if self.video_encoding_pool is not None:
+            try:
+                self.wait_video_encoding()
+            finally:
+                self.video_encoding_pool.stop()
+                self.video_encoding_pool = None
+
+    def wait_video_encoding(self) -> None:
+        """Blocks until all the videos submitted to the encoding pool are written."""
+        self._collect_video_encodings(block=True)
+
+    def _collect_video_encodings(self, block: bool) -> None:
+        """Updates the metadata affected by the finished encoding jobs, then raises the first of their errors.
+        Failed jobs are not pending anymore, the videos of the others are recorded in the manifest either way."""
+        pending = []
+        failed = []
+        first_episode_submitted = False
+        for episode_index, key, future in self._pending_video_encodings:
+            first_episode_submitted |= episode_index == 0
+            if not (block or future.done()):
+                pending.append((episode_index, key, future))
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Encoding of the {key} video of episode {episode_index} failed: {e}")
+                failed.append((episode_index, e))
+                continue
+            self._add_videos_to_manifest(episode_index, [key])
+        self._pending_video_encodings = pending
+
+        # The video info is read from the videos of episode 0, so it can only be updated once they are all written
+        if first_episode_submitted and not any(episode_index == 0 for episode_index, *_ in pending + failed):
+            self._update_video_info(0)
+        if failed:
+            raise failed[0][1]
+
+    def _submit_episode_videos(self, episode_index: int) -> None:
         for key in self.meta.video_keys:
             video_path = self.root / self.meta.get_video_file_path(episode_index, key)
             if video_path.is_file():
@@ -1129,34 +1243,36 @@ class LeRobotDataset(torch.utils.data.Dataset):
             img_dir = self._get_cached_image_file_path(
                 episode_index=episode_index, image_key=key, frame_index=0
             ).parent
-            encode_video_frames(img_dir, video_path, self.fps, overwrite=True)
+            if self.video_encoding_pool is not None:
+                future = self.video_encoding_pool.submit(img_dir, video_path, self.fps)
+                self._pending_video_encodings.append((episode_index, key, future))
+            else:
+                encode_and_validate_video(
+                    img_dir, video_path, self.fps, full_validation=self.full_video_validation
+                )
 
-            if not self._validate_video_pyav(video_path):
-                encode_video_frames(img_dir, video_path, self.fps, overwrite=True)
-                if not self._validate_video_pyav(video_path):
-                    raise RuntimeError(f"Video {video_path} is invalid")
-            shutil.rmtree(img_dir)
+        if self.video_encoding_pool is None:
+            self._update_video_info(episode_index)
+            self._add_videos_to_manifest(episode_index, self.meta.video_keys)
 
-        # Update video info (only needed when first episode is encoded since it reads from episode 0)
-        if len(self.meta.video_keys) > 0 and episode_index == 0:
-            self.meta.update_video_info()
-            write_info(self.meta.info, self.meta.root)  # ensure video info always written properly
+    def encode_episode_videos(self, episode_index: int) -> None:
+        """
+        Use ffmpeg to convert frames stored as png into mp4 videos.
+        Note: `encode_video_frames` is a blocking call. Without a video encoding pool (see
+        `start_video_encoding_pool`), the cameras are encoded one after the other, each with a multithreaded
+        encoder.
 
-    def _validate_video_pyav(self, video_path: Path) -> bool:
-        try:
-            container = av.open(str(video_path))
-            stream = container.streams.video[0]
-            stream.thread_count = 1  # 单线程更稳定解码错误捕获
-
-            for frame in container.decode(video=0):
-                try:
-                    frame.to_rgb()  # 触发解码
-                except Exception:
-                    return False
-            container.close()
-        except Exception:
-            return False
-        return True
+        This method handles video encoding steps:
+        - Video encoding via ffmpeg
+        - Video info updating in metadata
+        - Raw image cleanup
+
+        Args:
+            episode_index (int): Index of the episode to encode.
+        """
+        self._submit_episode_videos(episode_index)
+        if not self.async_video_encoding:
+            self.wait_video_encoding()
 
     def batch_encode_videos(self, start_episode: int = 0, end_episode: int | None = None) -> None:
         """
@@ -1174,9 +1290,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         # Encode all episodes with cleanup enabled for individual episodes
         for ep_idx in range(start_episode, end_episode):
             logging.info(f"Encoding videos for episode {ep_idx}")
-            self.encode_episode_videos(ep_idx)
+            self._submit_episode_videos(ep_idx)
 
-        logging.info("Batch video encoding completed")
+        if not self.async_video_encoding:
+            self.wait_video_encoding()
+            logging.info("Batch video encoding completed")
 
     @classmethod
     def create(
@@ -1192,8 +1310,30 @@ class LeRobotDataset(torch.utils.data.Dataset):
         image_writer_threads: int = 0,
         video_backend: str | None = None,
         batch_encoding_size: int = 1,
+        streaming_encoding: bool = False,
+        video_encoding_workers: int = 0,
+        video_encoder_threads: int | None = None,
+        async_video_encoding: bool = False,
+        full_video_validation: bool = False,
+        keep_episodes_in_memory: bool = True,
     ) -> "LeRobotDataset":
-        """Create a LeRobot Dataset from scratch in order to record data."""
+        """Create a LeRobot Dataset from scratch in order to record data.
+
+        With `streaming_encoding=True`, the frames of the video features are not written as PNG images but
+        encoded on the fly by one `StreamingVideoEncoder` per camera, and `save_episode` only has to finalize
+        the mp4 files. `batch_encoding_size` is then ignored.
+
+        Otherwise, `video_encoding_workers > 0` encodes the videos of all the cameras (and of all the episodes
+        of a batch) concurrently, see `start_video_encoding_pool`.
+
+        Each encoded video is checked by decoding a few sampled keyframes and comparing its number of frames
+        with the episode length; `full_video_validation=True` decodes all of its frames instead.
+
+        With `keep_episodes_in_memory=False`, the saved episodes are only written to their parquet files and
+        not appended to `hf_dataset`, which stays None, so that the time and memory of `save_episode` don't
+        grow with the number of recorded episodes. The frames can't be accessed through this object; load
+        the dataset again with `LeRobotDataset(repo_id, root=...)` to read them.
+        """
         obj = cls.__new__(cls)
         obj.meta = LeRobotDatasetMetadata.create(
             repo_id=repo_id,
@@ -1210,21 +1350,40 @@ class LeRobotDataset(torch.utils.data.Dataset):
         obj.image_writer = None
         obj.batch_encoding_size = batch_encoding_size
         obj.episodes_since_last_encoding = 0
+        obj.streaming_encoding = streaming_encoding
+        obj._video_encoders = {}
+        obj.video_encoding_pool = None
+        obj.async_video_encoding = False
+        obj._pending_video_encodings = []
+        obj.full_video_validation = full_video_validation
+        obj.keep_episodes_in_memory = keep_episodes_in_memory
+        obj._files_manifest = None
+        obj._unmerged_episodes = []
 
         if image_writer_processes or image_writer_threads:
             obj.start_image_writer(image_writer_processes, image_writer_threads)
 
+        if video_encoding_workers > 0:
+            obj.start_video_encoding_pool(video_encoding_workers, video_encoder_threads, async_video_encoding)
+
         # TODO(aliberts, rcadene, alexander-soare): Merge this with OnlineBuffer/DataBuffer
         obj.episode_buffer = obj.create_episode_buffer()
 
         obj.episodes = None
-        obj.hf_dataset = obj.create_hf_dataset()
+        obj.hf_dataset = obj.create_hf_dataset() if keep_episodes_in_memory else None
         obj.image_transforms = None
         obj.delta_timestamps = None
         obj.delta_indices = None
         obj.episode_data_index = None
         obj.video_backend = video_backend if video_backend is not None else get_safe_default_codec()
         obj.image_cache_root = Path(f"./temp/{repo_id.replace('/', '_')}")
+        obj.decode_annotations = True
+        obj.video_decoder_cache = None
+        obj.video_frame_cache = None
+        obj.uint8_images = False
+        obj.columnar_cache = None
+        obj._hf_extra_columns = None
+        obj.annotation_decoder = AnnotationDecoder.from_meta(obj.meta)
         return obj
 
 
@@ -1233,6 +1392,18 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
 
     The underlying `LeRobotDataset`s are effectively concatenated, and this class adopts much of the API
     structure of `LeRobotDataset`.
+
+    `sampling_weights` optionally maps a repo_id to its relative weight in the mixture (1.0 for the
+    unspecified ones). The weights are not applied by the dataset itself: pass
+    `WeightedDatasetSampler(dataset.cumulative_sizes, dataset.sampling_weights)` as the DataLoader sampler to
+    draw each sub-dataset with probability proportional to its weight, independently of its number of frames.
+
+    Sub-datasets are constructed by a thread pool of `num_loading_workers` threads. With `lazy=True`, only
+    their metadata (features, stats, episode lengths) is loaded up front: each `LeRobotDataset`, i.e. its
+    parquet files, timestamp checks and video access, is constructed on the first access to one of its frames,
+    which happens in the DataLoader worker processes when `num_workers > 0`. In that mode the data files are
+    expected to be present under `root` already (they are otherwise downloaded by the first process accessing
+    them).
     """
 
     def __init__(
@@ -1245,53 +1416,109 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
         tolerances_s: dict | None = None,
         download_videos: bool = True,
         video_backend: str | None = None,
+        sampling_weights: dict[str, float] | None = None,
+        num_loading_workers: int = 1,
+        lazy: bool = False,
     ):
         super().__init__()
         self.repo_ids = repo_ids
         self.root = Path(root) if root else HF_LEROBOT_HOME
         self.tolerances_s = tolerances_s if tolerances_s else dict.fromkeys(repo_ids, 0.0001)
-        # Construct the underlying datasets passing everything but `transform` and `delta_timestamps` which
-        # are handled by this class.
-        self._datasets = [
-            LeRobotDataset(
-                repo_id,
-                root=self.root / repo_id,
-                episodes=episodes[repo_id] if episodes else None,
-                image_transforms=image_transforms,
-                delta_timestamps=delta_timestamps,
-                tolerance_s=self.tolerances_s[repo_id],
-                download_videos=download_videos,
-                video_backend=video_backend,
-            )
+        self.episodes = episodes
+        self.lazy = lazy
+        # Arguments of the underlying datasets, passing everything but `transform` and `delta_timestamps`
+        # which are handled by this class.
+        self._dataset_kwargs = [
+            {
+                "root": self.root / repo_id,
+                "episodes": episodes[repo_id] if episodes else None,
+                "image_transforms": image_transforms,
+                "delta_timestamps": delta_timestamps,
+                "tolerance_s": self.tolerances_s[repo_id],
+                "download_videos": download_videos,
+                "video_backend": video_backend,
+            }
             for repo_id in repo_ids
         ]
+        with ThreadPoolExecutor(max_workers=max(1, num_loading_workers)) as executor:
+            if lazy:
+                self._datasets = [None] * len(repo_ids)
+                self._metas = list(
+                    executor.map(
+                        lambda repo_id: LeRobotDatasetMetadata(repo_id, root=self.root / repo_id), repo_ids
+                    )
+                )
+            else:
+                self._datasets = list(
+                    executor.map(
+                        lambda args: LeRobotDataset(args[0], **args[1]),
+                        zip(repo_ids, self._dataset_kwargs, strict=True),
+                    )
+                )
+                self._metas = [ds.meta for ds in self._datasets]
 
         # Disable any data keys that are not common across all of the datasets. Note: we may relax this
         # restriction in future iterations of this class. For now, this is necessary at least for being able
         # to use PyTorch's default DataLoader collate function.
         self.disabled_features = set()
-        intersection_features = set(self._datasets[0].features)
-        for ds in self._datasets:
-            intersection_features.intersection_update(ds.features)
+        intersection_features = set(self._metas[0].features)
+        for meta in self._metas:
+            intersection_features.intersection_update(meta.features)
         if len(intersection_features) == 0:
             raise RuntimeError(
                 "Multiple datasets were provided but they had no keys common to all of them. "
                 "The multi-dataset functionality currently only keeps common keys."
             )
-        for repo_id, ds in zip(self.repo_ids, self._datasets, strict=True):
-            extra_keys = set(ds.features).difference(intersection_features)
+        for repo_id, meta in zip(self.repo_ids, self._metas, strict=True):
+            extra_keys = set(meta.features).difference(intersection_features)
+            if not extra_keys:
+                continue
             logging.warning(
                 f"keys {extra_keys} of {repo_id} were disabled as they are not contained in all the "
                 "other datasets."
             )
             self.disabled_features.update(extra_keys)
+        # Keys to remove from the items of each sub-dataset, precomputed to keep `__getitem__` cheap.
+        self._disabled_keys_per_dataset = [
+            tuple(key for key in meta.features if key in self.disabled_features) for meta in self._metas
+        ]
+
+        # Index of the first frame after each sub-dataset, used to locate a frame with a binary search.
+        if lazy:
+            sizes = [
+                meta.total_frames
+                if kwargs["episodes"] is None
+                else sum(meta.episodes[ep_idx]["length"] for ep_idx in kwargs["episodes"])
+                for meta, kwargs in zip(self._metas, self._dataset_kwargs, strict=True)
+            ]
+        else:
+            sizes = [ds.num_frames for ds in self._datasets]
+        self.cumulative_sizes = list(itertools.accumulate(sizes))
+
+        if sampling_weights is not None:
+            unknown_repo_ids = set(sampling_weights).difference(repo_ids)
+            if unknown_repo_ids:
+                raise ValueError(f"Sampling weights were given for unknown repo_ids: {unknown_repo_ids}.")
+            if any(weight < 0 for weight in sampling_weights.values()):
+                raise ValueError(f"Sampling weights must be non-negative, got {sampling_weights}.")
+            self.sampling_weights = [sampling_weights.get(repo_id, 1.0) for repo_id in repo_ids]
+        else:
+            self.sampling_weights = None
 
         self.image_transforms = image_transforms
         self.delta_timestamps = delta_timestamps
         # TODO(rcadene, aliberts): We should not perform this aggregation for datasets
         # with multiple robots of different ranges. Instead we should have one normalization
         # per robot.
-        self.stats = aggregate_stats([dataset.meta.stats for dataset in self._datasets])
+        self.stats = aggregate_stats([meta.stats for meta in self._metas])
+
+    def get_dataset(self, dataset_idx: int) -> LeRobotDataset:
+        """Returns the `dataset_idx`-th sub-dataset, constructing it first in lazy mode."""
+        dataset = self._datasets[dataset_idx]
+        if dataset is None:
+            dataset = LeRobotDataset(self.repo_ids[dataset_idx], **self._dataset_kwargs[dataset_idx])
+            self._datasets[dataset_idx] = dataset
+        return dataset
 
     @property
     def repo_id_to_index(self):
@@ -1312,7 +1539,7 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
 
         NOTE: Fow now, this relies on a check in __init__ to make sure all sub-datasets have the same info.
         """
-        return self._datasets[0].meta.info["fps"]
+        return self._metas[0].info["fps"]
 
     @property
     def video(self) -> bool:
@@ -1322,13 +1549,16 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
 
         NOTE: Fow now, this relies on a check in __init__ to make sure all sub-datasets have the same info.
         """
-        return self._datasets[0].meta.info.get("video", False)
+        return self._metas[0].info.get("video", False)
 
     @property
     def features(self) -> datasets.Features:
         features = {}
-        for dataset in self._datasets:
-            features.update({k: v for k, v in dataset.hf_features.items() if k not in self.disabled_features})
+        for dataset, meta in zip(self._datasets, self._metas, strict=True):
+            hf_features = (
+                dataset.hf_features if dataset is not None else get_hf_features_from_features(meta.features)
+            )
+            features.update({k: v for k, v in hf_features.items() if k not in self.disabled_features})
         return features
 
     @property
@@ -1357,12 +1587,15 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
     @property
     def num_frames(self) -> int:
         """Number of samples/frames."""
-        return sum(d.num_frames for d in self._datasets)
+        return self.cumulative_sizes[-1] if self.cumulative_sizes else 0
 
     @property
     def num_episodes(self) -> int:
         """Number of episodes."""
-        return sum(d.num_episodes for d in self._datasets)
+        return sum(
+            len(kwargs["episodes"]) if kwargs["episodes"] is not None else meta.total_episodes
+            for meta, kwargs in zip(self._metas, self._dataset_kwargs, strict=True)
+        )
 
     @property
     def tolerance_s(self) -> float:
@@ -1376,25 +1609,20 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
-    def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
-        if idx >= len(self):
+    def locate(self, idx: int) -> tuple[int, int]:
+        """Returns the index of the sub-dataset holding frame `idx` and the index of the frame within it."""
+        if idx < 0 or idx >= len(self):
             raise IndexError(f"Index {idx} out of bounds.")
-        # Determine which dataset to get an item from based on the index.
-        start_idx = 0
-        dataset_idx = 0
-        for dataset in self._datasets:
-            if idx >= start_idx + dataset.num_frames:
-                start_idx += dataset.num_frames
-                dataset_idx += 1
-                continue
-            break
-        else:
-            raise AssertionError("We expect the loop to break out as long as the index is within bounds.")
-        item = self._datasets[dataset_idx][idx - start_idx]
+        dataset_idx = bisect.bisect_right(self.cumulative_sizes, idx)
+        start_idx = self.cumulative_sizes[dataset_idx - 1] if dataset_idx > 0 else 0
+        return dataset_idx, idx - start_idx
+
+    def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
+        dataset_idx, frame_idx = self.locate(idx)
+        item = self.get_dataset(dataset_idx)[frame_idx]
         item["dataset_index"] = torch.tensor(dataset_idx)
-        for data_key in self.disabled_features:
-            if data_key in item:
-                del item[data_key]
+        for data_key in self._disabled_keys_per_dataset[dataset_idx]:
+            item.pop(data_key, None)
 
         return item
 
@@ -26,6 +26,7 @@ class EpisodeAwareSampler:
         drop_n_first_frames: int = 0,
         drop_n_last_frames: int = 0,
         shuffle: bool = False,
+        sequential_chunk_size: int | None = None,
     ):
         """Sampler that optionally incorporates episode boundary information.
 
@@ -36,21 +37,42 @@ class EpisodeAwareSampler:
             drop_n_first_frames: Number of frames to drop from the start of each episode.
             drop_n_last_frames: Number of frames to drop from the end of each episode.
             shuffle: Whether to shuffle the indices.
+            sequential_chunk_size: If set, the indices of each episode are split into contiguous chunks of
+                                   this many frames. When shuffling, the order of the chunks is shuffled
+                                   but the frames of a chunk are still yielded in order, which keeps the
+                                   video frame and decoder caches of `LeRobotDataset` hot.
         """
+        if sequential_chunk_size is not None and sequential_chunk_size < 1:
+            raise ValueError(
+                f"sequential_chunk_size must be a positive integer, got {sequential_chunk_size}."
+            )
+
         indices = []
+        chunks = []
         for episode_idx, (start_index, end_index) in enumerate(
             zip(episode_data_index["from"], episode_data_index["to"], strict=True)
         ):
             if episode_indices_to_use is None or episode_idx in episode_indices_to_use:
-                indices.extend(
-                    range(start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames)
+                ep_indices = range(
+                    start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames
                 )
+                indices.extend(ep_indices)
+                if sequential_chunk_size is not None:
+                    chunks.extend(
+                        ep_indices[i : i + sequential_chunk_size]
+                        for i in range(0, len(ep_indices), sequential_chunk_size)
+                    )
 
         self.indices = indices
+        self.chunks = chunks
         self.shuffle = shuffle
+        self.sequential_chunk_size = sequential_chunk_size
 
     def __iter__(self) -> Iterator[int]:
-        if self.shuffle:
+        if self.shuffle and self.sequential_chunk_size is not None:
+            for c in torch.randperm(len(self.chunks)):
+                yield from self.chunks[c]
+        elif self.shuffle:
             for i in torch.randperm(len(self.indices)):
                 yield self.indices[i]
         else:
@@ -59,3 +81,52 @@ class EpisodeAwareSampler:
 
     def __len__(self) -> int:
         return len(self.indices)
+
+
+class WeightedDatasetSampler:
+    def __init__(
+        self,
+        cumulative_sizes: list[int],
+        weights: list[float],
+        num_samples: int | None = None,
+        generator: torch.Generator | None = None,
+    ):
+        """Sampler drawing frames from a concatenation of datasets according to per-dataset weights.
+
+        A dataset is drawn with probability proportional to its weight, then a frame is drawn uniformly within
+        it (with replacement). This sets the mixing ratio of the datasets independently of their number of
+        frames, without duplicating any of them.
+
+        Args:
+            cumulative_sizes: Index of the first frame after each dataset in the concatenation, e.g.
+                              `MultiLeRobotDataset.cumulative_sizes`.
+            weights: Non-negative weight of each dataset, e.g. `MultiLeRobotDataset.sampling_weights`.
+            num_samples: Number of indices yielded per iteration. Defaults to the total number of frames.
+            generator: Optional random number generator.
+        """
+        if len(weights) != len(cumulative_sizes):
+            raise ValueError(
+                f"Expected one weight per dataset ({len(cumulative_sizes)}), got {len(weights)}."
+            )
+        starts = torch.tensor([0, *cumulative_sizes[:-1]], dtype=torch.long)
+        sizes = torch.tensor(cumulative_sizes, dtype=torch.long) - starts
+        weights = torch.tensor(weights, dtype=torch.double) * (sizes > 0)
+        if weights.sum() <= 0:
+            raise ValueError("At least one non-empty dataset must have a positive weight.")
+
+        self.starts = starts
+        self.sizes = sizes
+        self.weights = weights
+        self.num_samples = num_samples if num_samples is not None else int(sizes.sum())
+        self.generator = generator
+
+    def __iter__(self) -> Iterator[int]:
+        dataset_indices = torch.multinomial(
+            self.weights, self.num_samples, replacement=True, generator=self.generator
+        )
+        offsets = torch.rand(self.num_samples, dtype=torch.double, generator=self.generator)
+        frame_indices = (offsets * self.sizes[dataset_indices]).long()
+        yield from (self.starts[dataset_indices] + frame_indices).tolist()
+
+    def __len__(self) -> int:
+        return self.num_samples
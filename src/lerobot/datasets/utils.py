@@ -142,7 +142,7 @@ def embed_images(dataset: datasets.Dataset) -> datasets.Dataset:
     # Embed image bytes into the table before saving to parquet
     format = dataset.format
     dataset = dataset.with_format("arrow")
-    dataset = dataset.map(embed_table_storage, batched=False)
+    dataset = dataset.map(embed_table_storage, batched=True)
     dataset = dataset.with_format(**format)
     return dataset
 
@@ -347,17 +347,28 @@ def load_image_as_numpy(
     return img_array
 
 
-def hf_transform_to_torch(items_dict: dict[torch.Tensor | None]):
+def _pil_to_uint8_tensor(img: PILImage.Image) -> torch.Tensor:
+    img_array = np.array(img)
+    if img_array.ndim == 2:  # grayscale
+        img_array = img_array[..., None]
+    return torch.from_numpy(img_array).permute(2, 0, 1)
+
+
+def hf_transform_to_torch(items_dict: dict[torch.Tensor | None], uint8_images: bool = False):
     """Get a transform function that convert items from Hugging Face dataset (pyarrow)
     to torch tensors. Importantly, images are converted from PIL, which corresponds to
     a channel last representation (h w c) of uint8 type, to a torch image representation
-    with channel first (c h w) of float32 type in range [0,1].
+    with channel first (c h w) of float32 type in range [0,1]. With `uint8_images=True`, images are
+    kept as uint8 in [0,255] (still channel first).
     """
     for key in items_dict:
         first_item = items_dict[key][0]
         if isinstance(first_item, PILImage.Image):
-            to_tensor = transforms.ToTensor()
-            items_dict[key] = [to_tensor(img) for img in items_dict[key]]
+            if uint8_images:
+                items_dict[key] = [_pil_to_uint8_tensor(img) for img in items_dict[key]]
+            else:
+                to_tensor = transforms.ToTensor()
+                items_dict[key] = [to_tensor(img) for img in items_dict[key]]
         elif first_item is None:
             pass
         else:
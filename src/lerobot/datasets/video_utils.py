@@ -16,19 +16,32 @@
 import glob
 import importlib
 import logging
+import multiprocessing
+import os
+import queue
 import shutil
+import threading
 import warnings
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, ClassVar
 
 import av
+import numpy as np
 import pyarrow as pa
 import torch
 import torchvision
 from datasets.features.features import register_feature
 from PIL import Image
 
+from lerobot.datasets.compute_stats import auto_downsample_height_width
+
+# Number of keyframes decoded by the default (fast) validation of the encoded videos
+VALIDATION_NUM_SAMPLED_FRAMES = 3
+
 
 def get_safe_default_codec():
     if importlib.util.find_spec("torchcodec"):
@@ -40,11 +53,210 @@ def get_safe_default_codec():
         return "pyav"
 
 
+class _ProcessLocalLRUCache:
+    """Thread-safe LRU mapping whose entries are only valid in the process that created them.
+
+    Cached objects (open decoders, decoded frames) are dropped when the cache is inherited by a forked
+    DataLoader worker (detected by a change of pid) or pickled for a spawned one, so that each worker lazily
+    builds its own cache.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.hits = 0
+        self.misses = 0
+
+    def _reset_if_forked(self) -> None:
+        # Entries inherited from the parent process may share its file offsets and native state. They must
+        # neither be used nor released from the child.
+        if os.getpid() != self._pid:
+            self._entries = OrderedDict()
+            self._pid = os.getpid()
+            self.hits = 0
+            self.misses = 0
+
+    def _on_evict(self, key: Any, value: Any) -> None:
+        pass
+
+    def clear(self) -> None:
+        """Releases and drops all the cached entries."""
+        with self._lock:
+            if os.getpid() == self._pid:
+                for key, value in self._entries.items():
+                    self._on_evict(key, value)
+            self._entries.clear()
+            self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_entries"] = OrderedDict()
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+
+class VideoDecoderCache(_ProcessLocalLRUCache):
+    """LRU cache of open video decoders, keyed by (video path, backend).
+
+    Opening a decoder re-opens the mp4 file and re-parses its container, which dominates the cost of
+    decoding a handful of frames. Keeping the decoders of the most recently accessed videos open lets
+    sequential or episode-aware sampling reuse them across `__getitem__` calls.
+
+    The cache is meant to be owned by a single process: decoders hold file handles and native state that
+    can't be shared with forked DataLoader workers. Each worker therefore lazily starts from an empty cache,
+    whether it was forked (detected by a change of pid) or spawned (decoders are dropped when pickled).
+
+    Args:
+        max_size (int): Maximum number of decoders kept open. The least recently used one is closed when
+            the cache is full.
+    """
+
+    def __init__(self, max_size: int = 16):
+        if max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, got {max_size}.")
+        super().__init__()
+        self.max_size = max_size
+
+    def get(self, video_path: Path | str, backend: str, open_decoder: Callable[[], Any]) -> Any:
+        """Returns the cached decoder for `video_path`, opening it with `open_decoder()` on a miss."""
+        key = (str(video_path), backend)
+        with self._lock:
+            self._reset_if_forked()
+            decoder = self._entries.get(key)
+            if decoder is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return decoder
+
+            self.misses += 1
+            decoder = open_decoder()
+            self._entries[key] = decoder
+            while len(self._entries) > self.max_size:
+                self._on_evict(*self._entries.popitem(last=False))
+            return decoder
+
+    def _on_evict(self, key: tuple[str, str], decoder: Any) -> None:
+        _close_decoder(decoder, backend=key[1])
+
+
+class DecodedFrameCache(_ProcessLocalLRUCache):
+    """LRU cache of decoded video frames, keyed by (video path, timestamp) and bounded in bytes.
+
+    When `delta_timestamps` request several frames per camera, consecutive dataset indices query heavily
+    overlapping sets of frames. Frames are stored as uint8 (c h w) tensors, 4x smaller than the float32
+    frames returned to the user, and decoders insert every frame they have to decode on their way to the
+    requested ones (e.g. from the previous key frame), so that walking an episode in order mostly hits
+    the cache. See `EpisodeAwareSampler(sequential_chunk_size=...)` to sample that way.
+
+    Like `VideoDecoderCache`, the cache is local to each process, hence to each DataLoader worker.
+
+    Args:
+        max_bytes (int): Maximum number of bytes of frame data held by the cache.
+        timestamp_resolution_s (float): Timestamps are rounded to this resolution to build the cache keys.
+            It should be smaller than the dataset frame period.
+    """
+
+    def __init__(self, max_bytes: int, timestamp_resolution_s: float = 1e-4):
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be a positive integer, got {max_bytes}.")
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.timestamp_resolution_s = timestamp_resolution_s
+        self.num_bytes = 0
+
+    def _key(self, video_path: str, timestamp: float) -> tuple[str, int]:
+        return video_path, round(timestamp / self.timestamp_resolution_s)
+
+    def get(self, video_path: Path | str, timestamps: list[float]) -> list[torch.Tensor | None]:
+        """Returns the cached uint8 frame for each timestamp, or None for the ones not cached."""
+        video_path = str(video_path)
+        frames = []
+        with self._lock:
+            self._reset_if_forked()
+            for ts in timestamps:
+                key = self._key(video_path, ts)
+                frame = self._entries.get(key)
+                if frame is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                frames.append(frame)
+        return frames
+
+    def put(self, video_path: Path | str, timestamp: float, frame: torch.Tensor) -> None:
+        """Inserts a uint8 frame, evicting the least recently used frames to stay within `max_bytes`."""
+        if frame.dtype != torch.uint8:
+            raise TypeError(f"Only uint8 frames can be cached, got {frame.dtype}.")
+        frame_bytes = frame.numel() * frame.element_size()
+        if frame_bytes > self.max_bytes:
+            return
+        key = self._key(str(video_path), timestamp)
+        with self._lock:
+            self._reset_if_forked()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            # Own the storage: the frame may be a view on a larger decoded batch.
+            if frame.untyped_storage().nbytes() > frame_bytes:
+                frame = frame.clone()
+            self._entries[key] = frame
+            self.num_bytes += frame_bytes
+            while self.num_bytes > self.max_bytes:
+                self._on_evict(*self._entries.popitem(last=False))
+
+    def _on_evict(self, key: tuple[str, int], frame: torch.Tensor) -> None:
+        self.num_bytes -= frame.numel() * frame.element_size()
+
+    def _reset_if_forked(self) -> None:
+        if os.getpid() != self._pid:
+            self.num_bytes = 0
+        super()._reset_if_forked()
+
+    def clear(self) -> None:
+        super().clear()
+        self.num_bytes = 0
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        state["num_bytes"] = 0
+        return state
+
+    def stats(self) -> dict[str, float]:
+        """Hit rate and memory usage of the cache in the current process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+            "num_frames": len(self._entries),
+            "num_bytes": self.num_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _close_decoder(decoder: Any, backend: str) -> None:
+    if backend == "pyav":
+        decoder.container.close()
+
+
 def decode_video_frames(
     video_path: Path | str,
     timestamps: list[float],
     tolerance_s: float,
     backend: str | None = None,
+    decoder_cache: VideoDecoderCache | None = None,
+    frame_cache: DecodedFrameCache | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """
     Decodes video frames using the specified backend.
@@ -54,21 +266,56 @@ def decode_video_frames(
         timestamps (list[float]): List of timestamps to extract frames.
         tolerance_s (float): Allowed deviation in seconds for frame retrieval.
         backend (str, optional): Backend to use for decoding. Defaults to "torchcodec" when available in the platform; otherwise, defaults to "pyav"..
+        decoder_cache (VideoDecoderCache, optional): Cache of open decoders to reuse instead of opening the
+            video file again. Defaults to None.
+        frame_cache (DecodedFrameCache, optional): Cache of already decoded frames, looked up first. Only the
+            timestamps missing from it are decoded. Defaults to None.
+        return_uint8 (bool, optional): Return the frames as uint8 in [0, 255] instead of float32 in [0, 1],
+            deferring the conversion (e.g. to the GPU). Defaults to False.
 
     Returns:
-        torch.Tensor: Decoded frames.
+        torch.Tensor: Decoded frames (c h w).
 
     Currently supports torchcodec on cpu and pyav.
     """
     if backend is None:
         backend = get_safe_default_codec()
-    if backend == "torchcodec":
-        return decode_video_frames_torchcodec(video_path, timestamps, tolerance_s)
-    elif backend in ["pyav", "video_reader"]:
-        return decode_video_frames_torchvision(video_path, timestamps, tolerance_s, backend)
-    else:
+    if backend not in ["torchcodec", "pyav", "video_reader"]:
         raise ValueError(f"Unsupported video backend: {backend}")
 
+    if frame_cache is None:
+        return _decode_video_frames(
+            video_path, timestamps, tolerance_s, backend, decoder_cache, return_uint8=return_uint8
+        )
+
+    frames = frame_cache.get(video_path, timestamps)
+    missing_ts = [ts for ts, frame in zip(timestamps, frames, strict=True) if frame is None]
+    if len(missing_ts) > 0:
+        decoded = iter(
+            _decode_video_frames(
+                video_path, missing_ts, tolerance_s, backend, decoder_cache, frame_cache, return_uint8=True
+            )
+        )
+        frames = [frame if frame is not None else next(decoded) for frame in frames]
+
+    frames = torch.stack(frames)
+    return frames if return_uint8 else frames.type(torch.float32) / 255
+
+
+def _decode_video_frames(
+    video_path: Path | str,
+    timestamps: list[float],
+    tolerance_s: float,
+    backend: str,
+    decoder_cache: VideoDecoderCache | None = None,
+    frame_cache: DecodedFrameCache | None = None,
+    return_uint8: bool = False,
+) -> torch.Tensor:
+    kwargs = {"decoder_cache": decoder_cache, "frame_cache": frame_cache, "return_uint8": return_uint8}
+    if backend == "torchcodec":
+        return decode_video_frames_torchcodec(video_path, timestamps, tolerance_s, **kwargs)
+    return decode_video_frames_torchvision(video_path, timestamps, tolerance_s, backend, **kwargs)
+
 
 def decode_video_frames_torchvision(
     video_path: Path | str,
@@ -76,6 +323,9 @@ def decode_video_frames_torchvision(
     tolerance_s: float,
     backend: str = "pyav",
     log_loaded_timestamps: bool = False,
+    decoder_cache: VideoDecoderCache | None = None,
+    frame_cache: DecodedFrameCache | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """Loads frames associated to the requested timestamps of a video
 
@@ -95,6 +345,10 @@ def decode_video_frames_torchvision(
     that key frame. As a consequence, to access a requested frame, we need to load the preceding key frame,
     and all subsequent frames until reaching the requested frame. The number of key frames in a video
     can be adjusted during encoding to take into account decoding time and video size in bytes.
+
+    When a `frame_cache` is provided, every loaded frame (including the ones decoded on the way from the
+    previous key frame) is inserted in it. Set `return_uint8` to get the frames as uint8 in [0, 255] instead
+    of float32 in [0, 1].
     """
     video_path = str(video_path)
 
@@ -106,8 +360,12 @@ def decode_video_frames_torchvision(
 
     # set a video stream reader
     # TODO(rcadene): also load audio stream at the same time
-    # video_path = "/home/lxc/.cache/huggingface/lerobot/robocoin/stir_coffee/videos/chunk-000/observation.images.cam_high_rgb/episode_000037.mp4"
-    reader = torchvision.io.VideoReader(video_path, "video")
+    if decoder_cache is not None:
+        reader = decoder_cache.get(
+            video_path, backend, lambda: torchvision.io.VideoReader(video_path, "video")
+        )
+    else:
+        reader = torchvision.io.VideoReader(video_path, "video")
 
     # set the first and last requested timestamps
     # Note: previous timestamps are usually loaded, since we need to access the previous key frame
@@ -131,11 +389,15 @@ def decode_video_frames_torchvision(
         if current_ts >= last_ts:
             break
 
-    if backend == "pyav":
+    if decoder_cache is None and backend == "pyav":
         reader.container.close()
 
     reader = None
 
+    if frame_cache is not None:
+        for frame, ts in zip(loaded_frames, loaded_ts, strict=True):
+            frame_cache.put(video_path, ts, frame)
+
     query_ts = torch.tensor(timestamps)
     loaded_ts = torch.tensor(loaded_ts)
 
@@ -162,6 +424,15 @@ def decode_video_frames_torchvision(
     if log_loaded_timestamps:
         logging.info(f"{closest_ts=}")
 
+    if frame_cache is not None:
+        # also index the frames by their query timestamps, which can differ from their pts within tolerance
+        for frame, ts in zip(closest_frames, timestamps, strict=True):
+            frame_cache.put(video_path, ts, frame)
+
+    if return_uint8:
+        assert len(timestamps) == len(closest_frames)
+        return closest_frames
+
     # convert to the pytorch format which is float32 in [0,1] range (and channel first)
     closest_frames = closest_frames.type(torch.float32) / 255
 
@@ -175,6 +446,9 @@ def decode_video_frames_torchcodec(
     tolerance_s: float,
     device: str = "cpu",
     log_loaded_timestamps: bool = False,
+    decoder_cache: VideoDecoderCache | None = None,
+    frame_cache: DecodedFrameCache | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """Loads frames associated with the requested timestamps of a video using torchcodec.
 
@@ -193,7 +467,13 @@ def decode_video_frames_torchcodec(
         raise ImportError("torchcodec is required but not available.")
 
     # initialize video decoder
-    decoder = VideoDecoder(video_path, device=device, seek_mode="approximate")
+    def open_decoder() -> VideoDecoder:
+        return VideoDecoder(video_path, device=device, seek_mode="approximate")
+
+    if decoder_cache is not None:
+        decoder = decoder_cache.get(video_path, f"torchcodec:{device}", open_decoder)
+    else:
+        decoder = open_decoder()
     loaded_frames = []
     loaded_ts = []
     # get metadata for frame information
@@ -237,6 +517,14 @@ def decode_video_frames_torchcodec(
     if log_loaded_timestamps:
         logging.info(f"{closest_ts=}")
 
+    if frame_cache is not None:
+        for frame, ts in zip(closest_frames, timestamps, strict=True):
+            frame_cache.put(video_path, ts, frame)
+
+    if return_uint8:
+        assert len(timestamps) == len(closest_frames)
+        return closest_frames
+
     # convert to float32 in [0,1] range (channel first)
     closest_frames = closest_frames.type(torch.float32) / 255
 
@@ -244,6 +532,38 @@ def decode_video_frames_torchcodec(
     return closest_frames
 
 
+def _get_video_options(
+    vcodec: str, pix_fmt: str, g: int | None, crf: int | None, fast_decode: int
+) -> tuple[dict[str, str], str]:
+    """Returns the codec options and the (possibly corrected) pixel format used to encode a video."""
+    # Check encoder availability
+    if vcodec not in ["h264", "hevc", "libsvtav1"]:
+        raise ValueError(f"Unsupported video codec: {vcodec}. Supported codecs are: h264, hevc, libsvtav1.")
+
+    # Encoders/pixel formats incompatibility check
+    if (vcodec == "libsvtav1" or vcodec == "hevc") and pix_fmt == "yuv444p":
+        logging.warning(
+            f"Incompatible pixel format 'yuv444p' for codec {vcodec}, auto-selecting format 'yuv420p'"
+        )
+        pix_fmt = "yuv420p"
+
+    # Define video codec options
+    video_options = {}
+
+    if g is not None:
+        video_options["g"] = str(g)
+
+    if crf is not None:
+        video_options["crf"] = str(crf)
+
+    if fast_decode:
+        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
+        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
+        video_options[key] = value
+
+    return video_options, pix_fmt
+
+
 def encode_video_frames(
     imgs_dir: Path | str,
     video_path: Path | str,
@@ -255,24 +575,20 @@ def encode_video_frames(
     fast_decode: int = 1,
     log_level: int | None = av.logging.ERROR,
     overwrite: bool = False,
+    encoder_threads: int | None = None,
 ) -> None:
-    """More info on ffmpeg arguments tuning on `benchmark/video/README.md`"""
-    # Check encoder availability
-    if vcodec not in ["h264", "hevc", "libsvtav1"]:
-        raise ValueError(f"Unsupported video codec: {vcodec}. Supported codecs are: h264, hevc, libsvtav1.")
+    """More info on ffmpeg arguments tuning on `benchmark/video/README.md`
+
+    `encoder_threads` caps the number of threads used by the encoder (by default, ffmpeg picks one per core),
+    which is useful when several videos are encoded concurrently.
+    """
+    video_options, pix_fmt = _get_video_options(vcodec, pix_fmt, g, crf, fast_decode)
 
     video_path = Path(video_path)
     imgs_dir = Path(imgs_dir)
 
     video_path.parent.mkdir(parents=True, exist_ok=overwrite)
 
-    # Encoders/pixel formats incompatibility check
-    if (vcodec == "libsvtav1" or vcodec == "hevc") and pix_fmt == "yuv444p":
-        logging.warning(
-            f"Incompatible pixel format 'yuv444p' for codec {vcodec}, auto-selecting format 'yuv420p'"
-        )
-        pix_fmt = "yuv420p"
-
     # Get input frames
     template = "frame_" + ("[0-9]" * 6) + ".png"
     input_list = sorted(
@@ -285,20 +601,6 @@ def encode_video_frames(
     dummy_image = Image.open(input_list[0])
     width, height = dummy_image.size
 
-    # Define video codec options
-    video_options = {}
-
-    if g is not None:
-        video_options["g"] = str(g)
-
-    if crf is not None:
-        video_options["crf"] = str(crf)
-
-    if fast_decode:
-        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
-        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
-        video_options[key] = value
-
     # Set logging level
     if log_level is not None:
         # "While less efficient, it is generally preferable to modify logging with Python’s logging"
@@ -310,6 +612,8 @@ def encode_video_frames(
         output_stream.pix_fmt = pix_fmt
         output_stream.width = width
         output_stream.height = height
+        if encoder_threads is not None:
+            output_stream.thread_count = encoder_threads
 
         # Loop through input frames and encode them
         for input_data in input_list:
@@ -338,6 +642,251 @@ def encode_video_frames(
         raise OSError(f"Video encoding did not work. File not found: {video_path}.")
 
 
+def validate_video_pyav(
+    video_path: Path | str,
+    expected_num_frames: int | None = None,
+    full_decode: bool = False,
+    num_sampled_frames: int = VALIDATION_NUM_SAMPLED_FRAMES,
+) -> bool:
+    """Returns True if the video can be opened and decoded.
+
+    By default, the check is cheap: the container must have a video stream, its number of frames (read from
+    the container, or counted from the packets without decoding them) must match `expected_num_frames` when
+    given, and `num_sampled_frames` keyframes evenly spread over the video are decoded. With
+    `full_decode=True`, every frame is decoded and converted to RGB instead, which costs about as much as the
+    encoding itself.
+    """
+    try:
+        with av.open(str(video_path)) as container:
+            stream = container.streams.video[0]
+            if stream.width <= 0 or stream.height <= 0:
+                return False
+
+            if full_decode:
+                stream.thread_count = 1  # 单线程更稳定解码错误捕获
+                num_frames = 0
+                for frame in container.decode(stream):
+                    frame.to_rgb()  # 触发解码
+                    num_frames += 1
+            else:
+                num_frames = stream.frames or sum(1 for packet in container.demux(stream) if packet.size > 0)
+                if num_frames > 0 and num_sampled_frames > 0:
+                    start_pts = stream.start_time or 0
+                    duration = stream.duration or 0
+                    for frame_index in np.linspace(0, num_frames - 1, num_sampled_frames).round():
+                        container.seek(
+                            int(start_pts + frame_index * duration / num_frames),
+                            stream=stream,
+                            backward=True,
+                            any_frame=False,
+                        )
+                        next(container.decode(stream)).to_rgb()
+
+        if num_frames == 0 or (expected_num_frames is not None and num_frames != expected_num_frames):
+            return False
+    except Exception:
+        return False
+    return True
+
+
+def encode_and_validate_video(
+    imgs_dir: Path | str,
+    video_path: Path | str,
+    fps: int,
+    encoder_threads: int | None = None,
+    full_validation: bool = False,
+) -> Path:
+    """Encodes the frames of `imgs_dir` into `video_path`, re-encoding once if the video is invalid (see
+    `validate_video_pyav`), and removes `imgs_dir` on success.
+
+    This is the unit of work of `VideoEncodingPool`, it is also used for serial encoding.
+    """
+    num_frames = len(list(Path(imgs_dir).glob("frame_" + ("[0-9]" * 6) + ".png")))
+    for _ in range(2):
+        encode_video_frames(imgs_dir, video_path, fps, overwrite=True, encoder_threads=encoder_threads)
+        if validate_video_pyav(video_path, num_frames, full_decode=full_validation):
+            break
+    else:
+        raise RuntimeError(f"Video {video_path} is invalid")
+    shutil.rmtree(imgs_dir)
+    return Path(video_path)
+
+
+class VideoEncodingPool:
+    """Pool of processes encoding (episode, camera) videos concurrently.
+
+    Each job runs `encode_and_validate_video` in one of `num_workers` processes, with at most
+    `encoder_threads` encoder threads per job, so that `num_workers * encoder_threads` roughly matches the
+    number of cores to dedicate to encoding. `submit` returns immediately; blocking until the videos are
+    written is up to the caller (see `LeRobotDataset.wait_video_encoding`). `full_validation` decodes every
+    frame of the videos to validate them instead of sampling a few.
+
+    Processes are started with `spawn`, as forking the recording process (which runs camera and image writer
+    threads) is not safe.
+    """
+
+    def __init__(self, num_workers: int, encoder_threads: int | None = None, full_validation: bool = False):
+        if num_workers <= 0:
+            raise ValueError(f"num_workers must be a positive integer, got {num_workers}.")
+        self.num_workers = num_workers
+        self.encoder_threads = encoder_threads
+        self.full_validation = full_validation
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def submit(self, imgs_dir: Path | str, video_path: Path | str, fps: int) -> Future:
+        return self._executor.submit(
+            encode_and_validate_video, imgs_dir, video_path, fps, self.encoder_threads, self.full_validation
+        )
+
+    def stop(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class StreamingVideoEncoder:
+    """Encodes the frames of one camera into an mp4 file as they are recorded.
+
+    Frames given to `add_frame` are queued and encoded by a background thread owning a PyAV encoder, so that
+    no intermediate PNG is written to disk and the video is complete as soon as `close` returns, instead of
+    being encoded from the images at the end of the episode. Codec arguments are the same as for
+    `encode_video_frames`.
+
+    At most `queue_seconds` of frames wait for the encoder. Once they are reached, `add_frame` blocks until a
+    frame is encoded, slowing the recording down rather than letting the queued frames fill the memory.
+
+    The encoder also keeps a bounded, downsampled subset of the frames (see `stats_frames`) from which the
+    episode statistics of the camera are computed.
+    """
+
+    # Maximum number of downsampled frames kept for the statistics. Once reached, every other frame is
+    # dropped and only one frame out of twice as many is kept from then on.
+    MAX_STATS_FRAMES = 1024
+
+    def __init__(
+        self,
+        video_path: Path | str,
+        fps: int,
+        vcodec: str = "h264",
+        pix_fmt: str = "yuv420p",
+        g: int | None = 2,
+        crf: int | None = 30,
+        fast_decode: int = 1,
+        queue_seconds: float = 2.0,
+    ):
+        self.video_path = Path(video_path)
+        self.fps = fps
+        self.vcodec = vcodec
+        self.video_options, self.pix_fmt = _get_video_options(vcodec, pix_fmt, g, crf, fast_decode)
+        self.num_frames = 0
+        self._stats_frames = []
+        self._stats_stride = 1
+        self._error = None
+        self._closed = False
+        self._queue = queue.Queue(maxsize=max(1, round(queue_seconds * fps)))
+        self._warned_full = False
+        self._thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self._thread.start()
+
+    def add_frame(self, image: np.ndarray | Image.Image) -> None:
+        """Queues a (C, H, W) or (H, W, C) frame, uint8 or float in [0, 1], for encoding."""
+        if self._error is not None:
+            raise RuntimeError(f"Encoding of {self.video_path} failed.") from self._error
+        if self._closed:
+            raise RuntimeError(f"Encoder of {self.video_path} is already closed.")
+        try:
+            self._queue.put_nowait(image)
+        except queue.Full:
+            if not self._warned_full:
+                self._warned_full = True
+                logging.warning(
+                    f"Encoding of {self.video_path} is slower than the recording, waiting for the encoder."
+                )
+            self._queue.put(image)
+
+    def close(self) -> None:
+        """Flushes the encoder and finalizes the mp4 file, blocking until all queued frames are encoded."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"Encoding of {self.video_path} failed.") from self._error
+        if self.num_frames == 0:
+            raise ValueError(f"No frame was added to {self.video_path}.")
+
+    def abort(self) -> None:
+        """Stops the encoder and removes the partial video file."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        self.video_path.unlink(missing_ok=True)
+
+    @property
+    def stats_frames(self) -> np.ndarray:
+        """Downsampled (N, C, H, W) uint8 frames spread over the episode, to compute its statistics."""
+        return np.stack(self._stats_frames)
+
+    def _encode_loop(self) -> None:
+        output = None
+        output_stream = None
+        while True:
+            image = self._queue.get()
+            if image is None:
+                break
+            if self._error is not None:
+                continue  # drain the queue until `close` or `abort` is called
+            try:
+                frame = _to_hwc_uint8(image)
+                if output is None:
+                    self.video_path.parent.mkdir(parents=True, exist_ok=True)
+                    output = av.open(str(self.video_path), "w")
+                    output_stream = output.add_stream(self.vcodec, self.fps, options=self.video_options)
+                    output_stream.pix_fmt = self.pix_fmt
+                    output_stream.height, output_stream.width = frame.shape[:2]
+
+                input_frame = av.VideoFrame.from_ndarray(frame, format="rgb24")
+                for packet in output_stream.encode(input_frame):
+                    if packet.pts is None:
+                        raise ValueError("Packet PTS is None, cannot mux.")
+                    output.mux(packet)
+                self._keep_stats_frame(frame)
+                self.num_frames += 1
+            except Exception as e:
+                self._error = e
+
+        if output is None:
+            return
+        try:
+            if self._error is None:
+                # Flush the encoder
+                for packet in output_stream.encode():
+                    output.mux(packet)
+            output.close()
+        except Exception as e:
+            self._error = e
+
+    def _keep_stats_frame(self, frame: np.ndarray) -> None:
+        if self.num_frames % self._stats_stride != 0:
+            return
+        self._stats_frames.append(auto_downsample_height_width(frame.transpose(2, 0, 1)).copy())
+        if len(self._stats_frames) >= self.MAX_STATS_FRAMES:
+            self._stats_frames = self._stats_frames[::2]
+            self._stats_stride *= 2
+
+
+def _to_hwc_uint8(image: np.ndarray | Image.Image) -> np.ndarray:
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert("RGB"))
+    if image.shape[0] == 3:
+        # Transpose from pytorch convention (C, H, W) to (H, W, C)
+        image = image.transpose(1, 2, 0)
+    if image.dtype != np.uint8:
+        image = (image * 255).astype(np.uint8)
+    return np.ascontiguousarray(image)
+
+
 def encode_video_frames_gpu(
     imgs_dir: Path | str,
     video_path: Path | str,
@@ -607,9 +1156,19 @@ class VideoEncodingManager:
                 f"from episode {start_ep} to {end_ep - 1}"
             )
             self.dataset.batch_encode_videos(start_ep, end_ep)
+        # Block until the videos of the encoding pool, if any, are written
+        try:
+            self.dataset.wait_video_encoding()
+        finally:
+            self._clean_up_images(interrupted=exc_type is not None)
 
-        # Clean up episode images if recording was interrupted
-        if exc_type is not None:
+        return False  # Don't suppress the original exception
+
+    def _clean_up_images(self, interrupted: bool) -> None:
+        """Removes the images and partial videos of the interrupted episode, if any, and the empty images
+        directory."""
+        if interrupted:
+            self.dataset._abort_video_encoders()
             interrupted_episode_index = self.dataset.num_episodes
             for key in self.dataset.meta.video_keys:
                 img_dir = self.dataset._get_image_file_path(
@@ -632,5 +1191,3 @@ class VideoEncodingManager:
                 logging.debug("Cleaned up empty images directory")
         else:
             logging.debug(f"Images directory is not empty, containing {len(png_files)} PNG files")
-
-        return False  # Don't suppress the original exception
@@ -98,6 +98,19 @@ class DiffusionConfig(PreTrainedConfig):
         clip_sample_range: The magnitude of the clipping range as described above.
         num_inference_steps: Number of reverse diffusion steps to use at inference time (steps are evenly
             spaced). If not provided, this defaults to be the same as `num_train_timesteps`.
+        inference_noise_scheduler_type: Name of the noise scheduler to sample actions with, if it is not the
+            one the model is trained with, `noise_scheduler_type`. Supported options: ["DDPM", "DDIM",
+            "DPMSolver"]. "DDIM" and "DPMSolver" (DPM-Solver++, which doesn't clip the samples) give good
+            samples with much fewer `num_inference_steps` than DDPM.
+        compile_sampling: Whether to compile the denoising steps with `torch.compile`. With DDIM, the whole
+            step is compiled, otherwise only the Unet.
+        cache_image_features: Whether `select_action` keeps the encoded image features of each step in its
+            observation queue, so that the images of a step are encoded once rather than on each generation
+            of actions whose `n_obs_steps` observations include them.
+        precompute_image_features: Whether `select_action` encodes the images of a step as soon as they are
+            received when they will be used by the next generation of actions, while the previous actions
+            are still being executed, rather than all at once on that generation. Requires
+            `cache_image_features`.
         do_mask_loss_for_padding: Whether to mask the loss when there are copy-padded actions. See
             `LeRobotDataset` and `load_previous_and_future_frames` for more information. Note, this defaults
             to False as the original Diffusion Policy implementation does the same.
@@ -147,6 +160,10 @@ class DiffusionConfig(PreTrainedConfig):
 
     # Inference
     num_inference_steps: int | None = None
+    inference_noise_scheduler_type: str | None = None
+    compile_sampling: bool = False
+    cache_image_features: bool = True
+    precompute_image_features: bool = False
 
     # Loss computation
     do_mask_loss_for_padding: bool = False
@@ -179,6 +196,18 @@ class DiffusionConfig(PreTrainedConfig):
                 f"`noise_scheduler_type` must be one of {supported_noise_schedulers}. "
                 f"Got {self.noise_scheduler_type}."
             )
+        supported_inference_noise_schedulers = [*supported_noise_schedulers, "DPMSolver"]
+        if (
+            self.inference_noise_scheduler_type is not None
+            and self.inference_noise_scheduler_type not in supported_inference_noise_schedulers
+        ):
+            raise ValueError(
+                f"`inference_noise_scheduler_type` must be one of {supported_inference_noise_schedulers}. "
+                f"Got {self.inference_noise_scheduler_type}."
+            )
+
+        if self.precompute_image_features and not self.cache_image_features:
+            raise ValueError("`precompute_image_features` requires `cache_image_features`.")
 
         # Check that the horizon size and U-Net downsampling is compatible.
         # U-Net downsamples by 2 with each stage.
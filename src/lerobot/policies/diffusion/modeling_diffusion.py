@@ -22,7 +22,7 @@ TODO(alexander-soare):
 
 import math
 from collections import deque
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 import einops
 import numpy as np
@@ -31,6 +31,7 @@ import torch.nn.functional as F  # noqa: N812
 import torchvision
 from diffusers.schedulers.scheduling_ddim import DDIMScheduler
 from diffusers.schedulers.scheduling_ddpm import DDPMScheduler
+from diffusers.schedulers.scheduling_dpmsolver_multistep import DPMSolverMultistepScheduler
 from torch import Tensor, nn
 
 from lerobot.constants import ACTION, OBS_ENV_STATE, OBS_IMAGES, OBS_STATE
@@ -44,6 +45,9 @@ from lerobot.policies.utils import (
     populate_queues,
 )
 
+# Key of the image features of the observations encoded by `DiffusionPolicy.select_action`
+OBS_IMAGE_FEATURES = "observation.image_features"
+
 
 class DiffusionPolicy(PreTrainedPolicy):
     """
@@ -94,7 +98,10 @@ class DiffusionPolicy(PreTrainedPolicy):
             "observation.state": deque(maxlen=self.config.n_obs_steps),
             "action": deque(maxlen=self.config.n_action_steps),
         }
-        if self.config.image_features:
+        if self.config.image_features and self.config.cache_image_features:
+            # The images of each step, with their features once encoded
+            self._queues[OBS_IMAGE_FEATURES] = deque(maxlen=self.config.n_obs_steps)
+        elif self.config.image_features:
             self._queues["observation.images"] = deque(maxlen=self.config.n_obs_steps)
         if self.config.env_state_feature:
             self._queues["observation.environment_state"] = deque(maxlen=self.config.n_obs_steps)
@@ -104,6 +111,8 @@ class DiffusionPolicy(PreTrainedPolicy):
         """Predict a chunk of actions given environment observations."""
         # stack n latest observations from the queue
         batch = {k: torch.stack(list(self._queues[k]), dim=1) for k in batch if k in self._queues}
+        if OBS_IMAGE_FEATURES in self._queues:
+            batch[OBS_IMAGE_FEATURES] = self._get_image_features(self._queues[OBS_IMAGE_FEATURES])
         actions = self.diffusion.generate_actions(batch)
 
         # TODO(rcadene): make above methods return output dictionary?
@@ -143,6 +152,16 @@ class DiffusionPolicy(PreTrainedPolicy):
             batch[OBS_IMAGES] = torch.stack([batch[key] for key in self.config.image_features], dim=-4)
         # NOTE: It's important that this happens after stacking the images into a single key.
         self._queues = populate_queues(self._queues, batch)
+        if OBS_IMAGE_FEATURES in self._queues:
+            step = {OBS_IMAGES: batch[OBS_IMAGES], OBS_IMAGE_FEATURES: None}
+            self._queues = populate_queues(self._queues, {OBS_IMAGE_FEATURES: step})
+            # The images of this step are used by the next generation of actions if it happens within
+            # `n_obs_steps` steps
+            if (
+                self.config.precompute_image_features
+                and 0 < len(self._queues[ACTION]) < self.config.n_obs_steps
+            ):
+                self._get_image_features([step])
 
         if len(self._queues[ACTION]) == 0:
             actions = self.predict_action_chunk(batch)
@@ -151,6 +170,19 @@ class DiffusionPolicy(PreTrainedPolicy):
         action = self._queues[ACTION].popleft()
         return action
 
+    def _get_image_features(self, steps: Iterable[dict]) -> Tensor:
+        """Returns the image features of the queued `steps`, (B, len(steps), num_cameras * feature_dim),
+        encoding the images of the steps that were not encoded yet at once."""
+        steps = list(steps)
+        # The first observation fills the queue several times, its images are only encoded once
+        missing = list({id(step): step for step in steps if step[OBS_IMAGE_FEATURES] is None}.values())
+        if missing:
+            images = torch.stack([step[OBS_IMAGES] for step in missing], dim=1)
+            features = self.diffusion.encode_images(images)
+            for i, step in enumerate(missing):
+                step[OBS_IMAGE_FEATURES] = features[:, i]
+        return torch.stack([step[OBS_IMAGE_FEATURES] for step in steps], dim=1)
+
     def forward(self, batch: dict[str, Tensor]) -> tuple[Tensor, None]:
         """Run the batch through the model and compute the loss for training or validation."""
         batch = self.normalize_inputs(batch)
@@ -163,7 +195,9 @@ class DiffusionPolicy(PreTrainedPolicy):
         return loss, None
 
 
-def _make_noise_scheduler(name: str, **kwargs: dict) -> DDPMScheduler | DDIMScheduler:
+def _make_noise_scheduler(
+    name: str, **kwargs: dict
+) -> DDPMScheduler | DDIMScheduler | DPMSolverMultistepScheduler:
     """
     Factory for noise scheduler instances of the requested type. All kwargs are passed
     to the scheduler.
@@ -172,6 +206,10 @@ def _make_noise_scheduler(name: str, **kwargs: dict) -> DDPMScheduler | DDIMSche
         return DDPMScheduler(**kwargs)
     elif name == "DDIM":
         return DDIMScheduler(**kwargs)
+    elif name == "DPMSolver":
+        # DPM-Solver++ doesn't clip the samples
+        kwargs = {k: v for k, v in kwargs.items() if k not in ("clip_sample", "clip_sample_range")}
+        return DPMSolverMultistepScheduler(**kwargs)
     else:
         raise ValueError(f"Unsupported noise scheduler type {name}")
 
@@ -197,16 +235,27 @@ class DiffusionModel(nn.Module):
 
         self.unet = DiffusionConditionalUnet1d(config, global_cond_dim=global_cond_dim * config.n_obs_steps)
 
-        self.noise_scheduler = _make_noise_scheduler(
-            config.noise_scheduler_type,
-            num_train_timesteps=config.num_train_timesteps,
-            beta_start=config.beta_start,
-            beta_end=config.beta_end,
-            beta_schedule=config.beta_schedule,
-            clip_sample=config.clip_sample,
-            clip_sample_range=config.clip_sample_range,
-            prediction_type=config.prediction_type,
-        )
+        scheduler_kwargs = {
+            "num_train_timesteps": config.num_train_timesteps,
+            "beta_start": config.beta_start,
+            "beta_end": config.beta_end,
+            "beta_schedule": config.beta_schedule,
+            "clip_sample": config.clip_sample,
+            "clip_sample_range": config.clip_sample_range,
+            "prediction_type": config.prediction_type,
+        }
+        self.noise_scheduler = _make_noise_scheduler(config.noise_scheduler_type, **scheduler_kwargs)
+        # The model can be sampled from with another scheduler than the one it is trained with, e.g. with
+        # fewer steps
+        if config.inference_noise_scheduler_type in (None, config.noise_scheduler_type):
+            self.inference_noise_scheduler = self.noise_scheduler
+        else:
+            self.inference_noise_scheduler = _make_noise_scheduler(
+                config.inference_noise_scheduler_type, **scheduler_kwargs
+            )
+        # Coefficients of the DDIM steps, and the compiled sampling functions, created on the first sampling
+        self._ddim_schedule = None
+        self._compiled = {}
 
         if config.num_inference_steps is None:
             self.num_inference_steps = self.noise_scheduler.config.num_train_timesteps
@@ -214,6 +263,14 @@ class DiffusionModel(nn.Module):
             self.num_inference_steps = config.num_inference_steps
 
     # ========= inference  ============
+    def _get_sampling_function(self, name: str, function: Callable) -> Callable:
+        """Returns `function`, compiled with `torch.compile` when `compile_sampling` is set."""
+        if not self.config.compile_sampling:
+            return function
+        if name not in self._compiled:
+            self._compiled[name] = torch.compile(function)
+        return self._compiled[name]
+
     def conditional_sample(
         self, batch_size: int, global_cond: Tensor | None = None, generator: torch.Generator | None = None
     ) -> Tensor:
@@ -228,51 +285,113 @@ class DiffusionModel(nn.Module):
             generator=generator,
         )
 
-        self.noise_scheduler.set_timesteps(self.num_inference_steps)
+        if isinstance(self.inference_noise_scheduler, DDIMScheduler):
+            return self._ddim_sample(sample, global_cond=global_cond)
 
-        for t in self.noise_scheduler.timesteps:
+        self.inference_noise_scheduler.set_timesteps(self.num_inference_steps)
+        unet = self._get_sampling_function("unet", self.unet.forward)
+        timesteps = self.inference_noise_scheduler.timesteps
+        for t, timestep in zip(timesteps, timesteps.to(device), strict=True):
             # Predict model output.
-            model_output = self.unet(
-                sample,
-                torch.full(sample.shape[:1], t, dtype=torch.long, device=sample.device),
-                global_cond=global_cond,
-            )
+            model_output = unet(sample, timestep.expand(batch_size), global_cond=global_cond)
             # Compute previous image: x_t -> x_t-1
-            sample = self.noise_scheduler.step(model_output, t, sample, generator=generator).prev_sample
+            sample = self.inference_noise_scheduler.step(
+                model_output, t, sample, generator=generator
+            ).prev_sample
 
         return sample
 
+    def _get_ddim_schedule(self, device: torch.device, dtype: torch.dtype) -> tuple[Tensor, Tensor]:
+        """Returns the timesteps of the DDIM sampling, (num_inference_steps,), and the coefficients of each of
+        its steps, (num_inference_steps, 4), on `device`, computed once."""
+        key = (self.num_inference_steps, device, dtype)
+        if self._ddim_schedule is not None and self._ddim_schedule[0] == key:
+            return self._ddim_schedule[1:]
+
+        scheduler = self.inference_noise_scheduler
+        scheduler.set_timesteps(self.num_inference_steps)
+        prev_timesteps = (
+            scheduler.timesteps - scheduler.config.num_train_timesteps // self.num_inference_steps
+        )
+        alpha_prods = scheduler.alphas_cumprod[scheduler.timesteps]
+        alpha_prods_prev = torch.where(
+            prev_timesteps >= 0,
+            scheduler.alphas_cumprod[prev_timesteps.clamp(min=0)],
+            scheduler.final_alpha_cumprod,
+        )
+        coefficients = torch.stack(
+            [
+                alpha_prods.sqrt(),
+                (1 - alpha_prods).sqrt(),
+                alpha_prods_prev.sqrt(),
+                (1 - alpha_prods_prev).sqrt(),
+            ],
+            dim=1,
+        )
+        timesteps = scheduler.timesteps.to(device)
+        coefficients = coefficients.to(device=device, dtype=dtype)
+        self._ddim_schedule = (key, timesteps, coefficients)
+        return timesteps, coefficients
+
+    def _ddim_step(self, sample: Tensor, timestep: Tensor, coefficients: Tensor, global_cond: Tensor | None):
+        """Predicts the model output and computes x_t -> x_t-1, as `DDIMScheduler.step` with `eta=0` but only
+        with tensor operations, so that it can be compiled as a whole."""
+        sqrt_alpha_prod, sqrt_beta_prod, sqrt_alpha_prod_prev, sqrt_beta_prod_prev = coefficients.unbind()
+        model_output = self.unet(sample, timestep, global_cond=global_cond)
+        if self.config.prediction_type == "epsilon":
+            pred_original_sample = (sample - sqrt_beta_prod * model_output) / sqrt_alpha_prod
+            pred_epsilon = model_output
+        else:
+            pred_original_sample = model_output
+            pred_epsilon = (sample - sqrt_alpha_prod * pred_original_sample) / sqrt_beta_prod
+        if self.config.clip_sample:
+            pred_original_sample = pred_original_sample.clamp(
+                -self.config.clip_sample_range, self.config.clip_sample_range
+            )
+        return sqrt_alpha_prod_prev * pred_original_sample + sqrt_beta_prod_prev * pred_epsilon
+
+    def _ddim_sample(self, sample: Tensor, global_cond: Tensor | None = None) -> Tensor:
+        """Deterministic DDIM sampling, with the coefficients of the steps computed once."""
+        timesteps, coefficients = self._get_ddim_schedule(sample.device, sample.dtype)
+        step = self._get_sampling_function("ddim_step", self._ddim_step)
+        for timestep, step_coefficients in zip(timesteps, coefficients, strict=True):
+            sample = step(sample, timestep.expand(len(sample)), step_coefficients, global_cond)
+        return sample
+
+    def encode_images(self, images: Tensor) -> Tensor:
+        """Encode images of shape (B, n_obs_steps, num_cameras, C, H, W) into features of shape
+        (B, n_obs_steps, num_cameras * feature_dim)."""
+        batch_size, n_obs_steps = images.shape[:2]
+        if self.config.use_separate_rgb_encoder_per_camera:
+            # Combine batch and sequence dims while rearranging to make the camera index dimension first.
+            images_per_camera = einops.rearrange(images, "b s n ... -> n (b s) ...")
+            img_features_list = torch.cat(
+                [
+                    encoder(camera_images)
+                    for encoder, camera_images in zip(self.rgb_encoder, images_per_camera, strict=True)
+                ]
+            )
+            # Separate batch and sequence dims back out. The camera index dim gets absorbed into the
+            # feature dim (effectively concatenating the camera features).
+            return einops.rearrange(
+                img_features_list, "(n b s) ... -> b s (n ...)", b=batch_size, s=n_obs_steps
+            )
+
+        # Combine batch, sequence, and "which camera" dims before passing to shared encoder.
+        img_features = self.rgb_encoder(einops.rearrange(images, "b s n ... -> (b s n) ..."))
+        # Separate batch dim and sequence dim back out. The camera index dim gets absorbed into the
+        # feature dim (effectively concatenating the camera features).
+        return einops.rearrange(img_features, "(b s n) ... -> b s (n ...)", b=batch_size, s=n_obs_steps)
+
     def _prepare_global_conditioning(self, batch: dict[str, Tensor]) -> Tensor:
         """Encode image features and concatenate them all together along with the state vector."""
-        batch_size, n_obs_steps = batch[OBS_STATE].shape[:2]
         global_cond_feats = [batch[OBS_STATE]]
-        # Extract image features.
+        # Extract image features, unless they were already encoded by the policy.
         if self.config.image_features:
-            if self.config.use_separate_rgb_encoder_per_camera:
-                # Combine batch and sequence dims while rearranging to make the camera index dimension first.
-                images_per_camera = einops.rearrange(batch["observation.images"], "b s n ... -> n (b s) ...")
-                img_features_list = torch.cat(
-                    [
-                        encoder(images)
-                        for encoder, images in zip(self.rgb_encoder, images_per_camera, strict=True)
-                    ]
-                )
-                # Separate batch and sequence dims back out. The camera index dim gets absorbed into the
-                # feature dim (effectively concatenating the camera features).
-                img_features = einops.rearrange(
-                    img_features_list, "(n b s) ... -> b s (n ...)", b=batch_size, s=n_obs_steps
-                )
+            if OBS_IMAGE_FEATURES in batch:
+                global_cond_feats.append(batch[OBS_IMAGE_FEATURES])
             else:
-                # Combine batch, sequence, and "which camera" dims before passing to shared encoder.
-                img_features = self.rgb_encoder(
-                    einops.rearrange(batch["observation.images"], "b s n ... -> (b s n) ...")
-                )
-                # Separate batch dim and sequence dim back out. The camera index dim gets absorbed into the
-                # feature dim (effectively concatenating the camera features).
-                img_features = einops.rearrange(
-                    img_features, "(b s n) ... -> b s (n ...)", b=batch_size, s=n_obs_steps
-                )
-            global_cond_feats.append(img_features)
+                global_cond_feats.append(self.encode_images(batch["observation.images"]))
 
         if self.config.env_state_feature:
             global_cond_feats.append(batch[OBS_ENV_STATE])
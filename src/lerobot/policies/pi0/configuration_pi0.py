@@ -68,6 +68,9 @@ class PI0Config(PreTrainedConfig):
 
     # Attention utils
     use_cache: bool = True
+    # Reuse across inference calls the tokenized tasks, the embeddings of the camera frames that did not change
+    # and, when neither the frames nor the task changed, the key value cache of the whole prefix.
+    cache_prefix: bool = False
     attention_implementation: str = "eager"  # or fa2, flex
 
     # Finetuning settings
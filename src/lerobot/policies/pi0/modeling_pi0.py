@@ -66,9 +66,12 @@ from lerobot.policies.pi0.paligemma_with_expert import (
     PaliGemmaWithExpertModel,
 )
 from lerobot.policies.pretrained import PreTrainedPolicy
-from lerobot.policies.utils import log_model_loading_keys
+from lerobot.policies.utils import log_model_loading_keys, same_tensors
 from lerobot.utils.utils import get_safe_dtype, init_logging
 
+# Maximum number of distinct task batches whose tokens are kept by `PI0Policy.prepare_language`
+LANGUAGE_CACHE_SIZE = 64
+
 
 def create_sinusoidal_pos_embedding(
     time: torch.tensor, dimension: int, min_period: float, max_period: float, device="cpu"
@@ -245,6 +248,8 @@ class PI0Policy(PreTrainedPolicy):
         )
 
         self.language_tokenizer = AutoTokenizer.from_pretrained("google/paligemma-3b-pt-224")
+        # Tokens of the tasks seen at inference, by tasks and device
+        self._language_cache: dict[tuple, tuple[Tensor, Tensor]] = {}
         self.model = PI0FlowMatching(config)
 
         self.reset()
@@ -252,6 +257,7 @@ class PI0Policy(PreTrainedPolicy):
     def reset(self):
         """This should be called whenever the environment is reset."""
         self._action_queue = deque([], maxlen=self.config.n_action_steps)
+        self.model.reset_prefix_cache()
 
     @classmethod
     def _transform_state_dict_keys(cls, state_dict: dict) -> dict:
@@ -490,6 +496,12 @@ class PI0Policy(PreTrainedPolicy):
         # PaliGemma prompt has to end with a new line
         tasks = [task if task.endswith("\n") else f"{task}\n" for task in tasks]
 
+        # The task rarely changes between inference calls, so its tokens are only computed once
+        use_cache = self.config.cache_prefix and not self.training
+        cache_key = (tuple(tasks), device)
+        if use_cache and cache_key in self._language_cache:
+            return self._language_cache[cache_key]
+
         tokenized_prompt = self.language_tokenizer.__call__(
             tasks,
             padding="max_length",
@@ -500,6 +512,11 @@ class PI0Policy(PreTrainedPolicy):
         lang_tokens = tokenized_prompt["input_ids"].to(device=device)
         lang_masks = tokenized_prompt["attention_mask"].to(device=device, dtype=torch.bool)
 
+        if use_cache:
+            if len(self._language_cache) >= LANGUAGE_CACHE_SIZE:
+                del self._language_cache[next(iter(self._language_cache))]
+            self._language_cache[cache_key] = (lang_tokens, lang_masks)
+
         return lang_tokens, lang_masks
 
     def _pi_aloha_decode_state(self, state):
@@ -587,11 +604,19 @@ class PI0FlowMatching(nn.Module):
         self.action_time_mlp_out = nn.Linear(self.config.proj_width, self.config.proj_width)
 
         self.set_requires_grad()
+        self.reset_prefix_cache()
 
     def set_requires_grad(self):
         for params in self.state_proj.parameters():
             params.requires_grad = self.config.train_state_proj
 
+    def reset_prefix_cache(self):
+        """Forget the camera frames and the prefix of the previous `sample_actions` calls."""
+        # Last frame of each camera with its embedding
+        self._image_cache: dict[int, tuple[Tensor, Tensor]] = {}
+        # Inputs of the last prefix with its padding masks and key value cache
+        self._prefix_cache = None
+
     def sample_noise(self, shape, device):
         noise = torch.normal(
             mean=0.0,
@@ -608,8 +633,23 @@ class PI0FlowMatching(nn.Module):
         time = time_beta * 0.999 + 0.001
         return time
 
+    def embed_image(self, camera_idx: int, img: Tensor, use_cache: bool = False) -> Tensor:
+        """Embed the frame of a camera with SigLIP, reusing the embedding of the previous frame of the camera
+        when `use_cache` is set and the frame did not change (e.g. a static overview camera).
+        """
+        if not use_cache:
+            return self.paligemma_with_expert.embed_image(img)
+
+        cached = self._image_cache.get(camera_idx)
+        if cached is not None and same_tensors([cached[0]], [img]):
+            return cached[1]
+        img_emb = self.paligemma_with_expert.embed_image(img)
+        # A copy of the frame, the caller may refill its buffer in place with the next frame
+        self._image_cache[camera_idx] = (img.clone(), img_emb)
+        return img_emb
+
     def embed_prefix(
-        self, images, img_masks, lang_tokens, lang_masks
+        self, images, img_masks, lang_tokens, lang_masks, cache_images: bool = False
     ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """Embed images with SigLIP and language tokens with embedding layer to prepare
         for PaliGemma transformer processing.
@@ -620,11 +660,11 @@ class PI0FlowMatching(nn.Module):
         att_masks = []
 
         # TODO: remove for loop
-        for (
+        for camera_idx, (
             img,
             img_mask,
-        ) in zip(images, img_masks, strict=False):
-            img_emb = self.paligemma_with_expert.embed_image(img)
+        ) in enumerate(zip(images, img_masks, strict=False)):
+            img_emb = self.embed_image(camera_idx, img, use_cache=cache_images)
             img_emb = img_emb.to(dtype=torch.bfloat16)
 
             # Normalize image embeddings
@@ -763,21 +803,34 @@ class PI0FlowMatching(nn.Module):
             actions_shape = (bsize, self.config.n_action_steps, self.config.max_action_dim)
             noise = self.sample_noise(actions_shape, device)
 
-        prefix_embs, prefix_pad_masks, prefix_att_masks = self.embed_prefix(
-            images, img_masks, lang_tokens, lang_masks
-        )
-        prefix_att_2d_masks = make_att_2d_masks(prefix_pad_masks, prefix_att_masks)
-        prefix_position_ids = torch.cumsum(prefix_pad_masks, dim=1) - 1
-
-        # Compute image and language key value cache
-        _, past_key_values = self.paligemma_with_expert.forward(
-            attention_mask=prefix_att_2d_masks,
-            position_ids=prefix_position_ids,
-            past_key_values=None,
-            inputs_embeds=[prefix_embs, None],
-            use_cache=self.config.use_cache,
-            fill_kv_cache=True,
-        )
+        # The state is not part of the prefix, so its key value cache only depends on the frames and the task
+        prefix_inputs = [*images, *img_masks, lang_tokens, lang_masks]
+        cache_prefix = self.config.cache_prefix and self.config.use_cache
+        if (
+            cache_prefix
+            and self._prefix_cache is not None
+            and same_tensors(self._prefix_cache[0], prefix_inputs)
+        ):
+            _, prefix_pad_masks, past_key_values = self._prefix_cache
+        else:
+            prefix_embs, prefix_pad_masks, prefix_att_masks = self.embed_prefix(
+                images, img_masks, lang_tokens, lang_masks, cache_images=self.config.cache_prefix
+            )
+            prefix_att_2d_masks = make_att_2d_masks(prefix_pad_masks, prefix_att_masks)
+            prefix_position_ids = torch.cumsum(prefix_pad_masks, dim=1) - 1
+
+            # Compute image and language key value cache
+            _, past_key_values = self.paligemma_with_expert.forward(
+                attention_mask=prefix_att_2d_masks,
+                position_ids=prefix_position_ids,
+                past_key_values=None,
+                inputs_embeds=[prefix_embs, None],
+                use_cache=self.config.use_cache,
+                fill_kv_cache=True,
+            )
+            if cache_prefix:
+                prefix_inputs = [tensor.clone() for tensor in prefix_inputs]
+                self._prefix_cache = (prefix_inputs, prefix_pad_masks, past_key_values)
 
         dt = -1.0 / self.config.num_steps
         dt = torch.tensor(dt, dtype=torch.float32, device=device)
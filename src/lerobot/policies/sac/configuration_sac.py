@@ -52,6 +52,11 @@ class ActorLearnerConfig:
     learner_host: str = "127.0.0.1"
     learner_port: int = 50051
     policy_parameters_push_frequency: int = 4
+    # Stream only the tensors that changed since the last full snapshot, as float32, float16, bfloat16 or int8
+    # differences with it, instead of the whole state dicts at every push. None sends the whole state dicts
+    policy_parameters_delta_dtype: str | None = None
+    # Number of pushes between two full snapshots when streaming deltas
+    policy_parameters_snapshot_interval: int = 10
     queue_get_timeout: float = 2
 
 
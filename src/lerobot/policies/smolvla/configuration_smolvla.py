@@ -65,6 +65,9 @@ class SmolVLAConfig(PreTrainedConfig):
 
     # Attention utils
     use_cache: bool = True
+    # Reuse across inference calls the tokenized tasks, the embeddings of the camera frames that did not change
+    # and, when neither the frames nor the task changed, the key value cache of the images and language.
+    cache_prefix: bool = False
 
     # Finetuning settings
     freeze_vision_encoder: bool = True
@@ -73,9 +73,13 @@ from lerobot.policies.smolvla.configuration_smolvla import SmolVLAConfig
 from lerobot.policies.smolvla.smolvlm_with_expert import SmolVLMWithExpertModel
 from lerobot.policies.utils import (
     populate_queues,
+    same_tensors,
 )
 from lerobot.utils.utils import get_safe_dtype
 
+# Maximum number of distinct task batches whose tokens are kept by `SmolVLAPolicy.prepare_language`
+LANGUAGE_CACHE_SIZE = 64
+
 # Matches ".soNNN", optionally followed by "-something", up to the "_buffer_" marker
 _VARIANT_RE = re.compile(r"\.so\d+(?:-[\w]+)?_buffer_")
 
@@ -348,6 +352,8 @@ class SmolVLAPolicy(PreTrainedPolicy):
         )
 
         self.language_tokenizer = AutoProcessor.from_pretrained(self.config.vlm_model_name).tokenizer
+        # Tokens of the tasks seen at inference, by tasks and device
+        self._language_cache: dict[tuple, tuple[Tensor, Tensor]] = {}
         self.model = VLAFlowMatching(config)
         self.reset()
 
@@ -356,6 +362,7 @@ class SmolVLAPolicy(PreTrainedPolicy):
         self._queues = {
             ACTION: deque(maxlen=self.config.n_action_steps),
         }
+        self.model.reset_prefix_cache()
 
     # HACK(aliberts, danaaubakirova): we overwrite this classmethod here to fix smolVLA-specific issues
     @classmethod
@@ -530,6 +537,12 @@ class SmolVLAPolicy(PreTrainedPolicy):
 
         tasks = [task if task.endswith("\n") else f"{task}\n" for task in tasks]
 
+        # The task rarely changes between inference calls, so its tokens are only computed once
+        use_cache = self.config.cache_prefix and not self.training
+        cache_key = (tuple(tasks), device)
+        if use_cache and cache_key in self._language_cache:
+            return self._language_cache[cache_key]
+
         tokenized_prompt = self.language_tokenizer.__call__(
             tasks,
             padding=self.config.pad_language_to,
@@ -540,6 +553,11 @@ class SmolVLAPolicy(PreTrainedPolicy):
         lang_tokens = tokenized_prompt["input_ids"].to(device=device)
         lang_masks = tokenized_prompt["attention_mask"].to(device=device, dtype=torch.bool)
 
+        if use_cache:
+            if len(self._language_cache) >= LANGUAGE_CACHE_SIZE:
+                del self._language_cache[next(iter(self._language_cache))]
+            self._language_cache[cache_key] = (lang_tokens, lang_masks)
+
         return lang_tokens, lang_masks
 
     def _pi_aloha_decode_state(self, state):
@@ -668,11 +686,19 @@ class VLAFlowMatching(nn.Module):
         self.add_image_special_tokens = self.config.add_image_special_tokens
         self.image_end_token = torch.tensor([self.fake_image_token], dtype=torch.long)
         self.prefix_length = self.config.prefix_length
+        self.reset_prefix_cache()
 
     def set_requires_grad(self):
         for params in self.state_proj.parameters():
             params.requires_grad = self.config.train_state_proj
 
+    def reset_prefix_cache(self):
+        """Forget the camera frames and the prefix of the previous `sample_actions` calls."""
+        # Last frame of each camera with its embedding
+        self._image_cache: dict[int, tuple[Tensor, Tensor]] = {}
+        # Image and language inputs of the last prefix with their key value cache
+        self._prefix_cache = None
+
     def sample_noise(self, shape, device):
         noise = torch.normal(
             mean=0.0,
@@ -689,8 +715,29 @@ class VLAFlowMatching(nn.Module):
         time = time_beta * 0.999 + 0.001
         return time
 
+    def embed_image(self, camera_idx: int, img: Tensor, use_cache: bool = False) -> Tensor:
+        """Embed the frame of a camera with SigLIP, reusing the embedding of the previous frame of the camera
+        when `use_cache` is set and the frame did not change (e.g. a static overview camera).
+        """
+        if not use_cache:
+            return self.vlm_with_expert.embed_image(img)
+
+        cached = self._image_cache.get(camera_idx)
+        if cached is not None and same_tensors([cached[0]], [img]):
+            return cached[1]
+        img_emb = self.vlm_with_expert.embed_image(img)
+        # A copy of the frame, the caller may refill its buffer in place with the next frame
+        self._image_cache[camera_idx] = (img.clone(), img_emb)
+        return img_emb
+
     def embed_prefix(
-        self, images, img_masks, lang_tokens, lang_masks, state: torch.Tensor = None
+        self,
+        images,
+        img_masks,
+        lang_tokens,
+        lang_masks,
+        state: torch.Tensor = None,
+        cache_images: bool = False,
     ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """Embed images with SigLIP and language tokens with embedding layer to prepare
         for SmolVLM transformer processing.
@@ -698,7 +745,7 @@ class VLAFlowMatching(nn.Module):
         embs = []
         pad_masks = []
         att_masks = []
-        for _img_idx, (
+        for img_idx, (
             img,
             img_mask,
         ) in enumerate(zip(images, img_masks, strict=False)):
@@ -717,8 +764,7 @@ class VLAFlowMatching(nn.Module):
                 embs.append(image_start_token)
                 pad_masks.append(image_start_mask)
 
-            img_emb = self.vlm_with_expert.embed_image(img)
-            img_emb = img_emb
+            img_emb = self.embed_image(img_idx, img, use_cache=cache_images)
 
             # Normalize image embeddings
             img_emb_dim = img_emb.shape[-1]
@@ -874,19 +920,44 @@ class VLAFlowMatching(nn.Module):
             noise = self.sample_noise(actions_shape, device)
 
         prefix_embs, prefix_pad_masks, prefix_att_masks = self.embed_prefix(
-            images, img_masks, lang_tokens, lang_masks, state=state
+            images, img_masks, lang_tokens, lang_masks, state=state, cache_images=self.config.cache_prefix
         )
         prefix_att_2d_masks = make_att_2d_masks(prefix_pad_masks, prefix_att_masks)
         prefix_position_ids = torch.cumsum(prefix_pad_masks, dim=1) - 1
-        # Compute image and language key value cache
-        _, past_key_values = self.vlm_with_expert.forward(
-            attention_mask=prefix_att_2d_masks,
-            position_ids=prefix_position_ids,
-            past_key_values=None,
-            inputs_embeds=[prefix_embs, None],
-            use_cache=self.config.use_cache,
-            fill_kv_cache=True,
-        )
+
+        # The images and language do not attend to the state that follows them in the prefix, so their key value
+        # cache only depends on the frames and the task: when these did not change, only the state is computed
+        vl_inputs = [*images, *img_masks, lang_tokens, lang_masks]
+        cache_prefix = self.config.cache_prefix and self.config.use_cache
+        if cache_prefix and self._prefix_cache is not None and same_tensors(self._prefix_cache[0], vl_inputs):
+            vl_key_values = self._prefix_cache[1]
+            num_vl_tokens = vl_key_values[0]["key_states"].shape[1]
+            _, past_key_values = self.vlm_with_expert.forward(
+                attention_mask=prefix_att_2d_masks[:, num_vl_tokens:],
+                position_ids=prefix_position_ids[:, num_vl_tokens:],
+                past_key_values=dict(vl_key_values),
+                inputs_embeds=[prefix_embs[:, num_vl_tokens:], None],
+                use_cache=True,
+                fill_kv_cache=True,
+            )
+        else:
+            # Compute image and language key value cache
+            _, past_key_values = self.vlm_with_expert.forward(
+                attention_mask=prefix_att_2d_masks,
+                position_ids=prefix_position_ids,
+                past_key_values=None,
+                inputs_embeds=[prefix_embs, None],
+                use_cache=self.config.use_cache,
+                fill_kv_cache=True,
+            )
+            if cache_prefix:
+                # The state tokens are the first ones of the prefix that the previous ones cannot attend to
+                num_vl_tokens = int(prefix_att_masks[0].int().argmax())
+                vl_key_values = {
+                    layer_idx: {name: states[:, :num_vl_tokens] for name, states in layer_cache.items()}
+                    for layer_idx, layer_cache in past_key_values.items()
+                }
+                self._prefix_cache = ([tensor.clone() for tensor in vl_inputs], vl_key_values)
         dt = -1.0 / self.config.num_steps
         dt = torch.tensor(dt, dtype=torch.float32, device=device)
 
@@ -252,6 +252,12 @@ class SmolVLMWithExpertModel(nn.Module):
 
         if use_cache:
             if fill_kv_cache:
+                if layer_idx in past_key_values:
+                    # Extend the key value cache of the first tokens of the prefix with the following ones
+                    key_states = torch.cat([past_key_values[layer_idx]["key_states"], key_states], dim=1)
+                    value_states = torch.cat(
+                        [past_key_values[layer_idx]["value_states"], value_states], dim=1
+                    )
                 past_key_values[layer_idx] = {
                     "key_states": key_states,
                     "value_states": value_states,
@@ -41,6 +41,14 @@ def populate_queues(
     return queues
 
 
+def same_tensors(tensors, others) -> bool:
+    """Whether two sequences of tensors hold the same values, with the same shapes, dtypes and devices."""
+    return len(tensors) == len(others) and all(
+        a.shape == b.shape and a.dtype == b.dtype and a.device == b.device and torch.equal(a, b)
+        for a, b in zip(tensors, others, strict=True)
+    )
+
+
 def get_device_from_parameters(module: nn.Module) -> torch.device:
     """Get a module's device by checking one of its parameters.
 
@@ -16,7 +16,7 @@
 
 from .device_processor import DeviceProcessor
 from .normalize_processor import NormalizerProcessor, UnnormalizerProcessor
-from .observation_processor import VanillaObservationProcessor
+from .observation_processor import ImageToFloatProcessor, VanillaObservationProcessor
 from .pipeline import (
     ActionProcessor,
     DoneProcessor,
@@ -39,6 +39,7 @@ __all__ = [
     "DoneProcessor",
     "EnvTransition",
     "IdentityProcessor",
+    "ImageToFloatProcessor",
     "InfoProcessor",
     "NormalizerProcessor",
     "UnnormalizerProcessor",
@@ -155,3 +155,25 @@ class VanillaObservationProcessor(ObservationProcessor):
                         break
 
         return features
+
+
+@dataclass
+@ProcessorStepRegistry.register(name="image_to_float_processor")
+class ImageToFloatProcessor(ObservationProcessor):
+    """
+    Converts uint8 camera frames ([0, 255]) to float32 ([0, 1]) on the device they live on.
+
+    Meant to be placed after a `DeviceProcessor` when the dataset returns uint8 frames
+    (`LeRobotDataset(uint8_images=True)`), so that the frames cross the dataloader and host to device
+    boundaries at a quarter of their float32 size. Observations that are not uint8 images are left untouched.
+    """
+
+    def observation(self, observation):
+        processed_obs = observation.copy()
+        for key, value in observation.items():
+            if key.startswith(OBS_IMAGE) and isinstance(value, Tensor) and value.dtype == torch.uint8:
+                processed_obs[key] = value.type(torch.float32) / 255.0
+        return processed_obs
+
+    def feature_contract(self, features: dict[str, PolicyFeature]) -> dict[str, PolicyFeature]:
+        return features
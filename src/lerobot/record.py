@@ -149,6 +149,23 @@ class DatasetRecordConfig:
     # Number of episodes to record before batch encoding videos
     # Set to 1 for immediate encoding (default behavior), or higher for batched encoding
     video_encoding_batch_size: int = 1
+    # Encode the camera frames into the episode videos while recording, instead of writing them as PNG images
+    # and encoding them at the end of each episode. `video_encoding_batch_size` is then ignored.
+    streaming_encoding: bool = False
+    # Number of subprocesses encoding the episode videos concurrently (one job per camera and episode). Set to 0
+    # to encode the videos one after the other in the main process.
+    num_video_encoding_workers: int = 0
+    # Number of threads used by each video encoder. Defaults to ffmpeg's choice, one per core, which
+    # oversubscribes the CPU when several videos are encoded at the same time.
+    video_encoder_threads: int | None = None
+    # Return to recording as soon as the videos are submitted to the encoding workers, instead of waiting for
+    # them to be written. Requires `num_video_encoding_workers > 0`.
+    async_video_encoding: bool = False
+    # Validate the encoded videos by decoding all their frames, instead of only a few sampled keyframes.
+    full_video_validation: bool = False
+    # Keep the recorded episodes in memory in the returned dataset. Set to False to only write them to disk, so
+    # that saving an episode doesn't get slower as the dataset grows. Only applies to new datasets.
+    keep_episodes_in_memory: bool = True
 
     def __post_init__(self):
         if self.single_task is None:
@@ -304,6 +321,14 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             root=cfg.dataset.root,
             batch_encoding_size=cfg.dataset.video_encoding_batch_size,
         )
+        dataset.streaming_encoding = cfg.dataset.streaming_encoding
+        dataset.full_video_validation = cfg.dataset.full_video_validation
+        if cfg.dataset.num_video_encoding_workers > 0:
+            dataset.start_video_encoding_pool(
+                cfg.dataset.num_video_encoding_workers,
+                cfg.dataset.video_encoder_threads,
+                cfg.dataset.async_video_encoding,
+            )
 
         if hasattr(robot, "cameras") and len(robot.cameras) > 0:
             dataset.start_image_writer(
@@ -324,6 +349,12 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             image_writer_processes=cfg.dataset.num_image_writer_processes,
             image_writer_threads=cfg.dataset.num_image_writer_threads_per_camera * len(robot.cameras),
             batch_encoding_size=cfg.dataset.video_encoding_batch_size,
+            streaming_encoding=cfg.dataset.streaming_encoding,
+            video_encoding_workers=cfg.dataset.num_video_encoding_workers,
+            video_encoder_threads=cfg.dataset.video_encoder_threads,
+            async_video_encoding=cfg.dataset.async_video_encoding,
+            full_video_validation=cfg.dataset.full_video_validation,
+            keep_episodes_in_memory=cfg.dataset.keep_episodes_in_memory,
         )
 
     # Load pretrained policy
@@ -378,6 +409,7 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             recorded_episodes += 1
 
     log_say("Stop recording", cfg.play_sounds, blocking=True)
+    dataset.stop_video_encoding_pool()
 
     robot.disconnect()
     if teleop is not None:
@@ -278,6 +278,14 @@ class BaseRobot(Robot):
         - obs_dict: Dictionary containing joint positions and camera images
                     in model units
         """
+        return {**self.get_motor_observation(), **self.get_camera_observation()}
+
+    def get_motor_observation(self) -> Dict[str, Any]:
+        """
+        Get joint states from robot, in model units.
+        Returns:
+        - obs_dict: Dictionary containing joint positions in model units
+        """
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
         
@@ -285,12 +293,24 @@ class BaseRobot(Robot):
         state_to_send = self.model_joint_transform.output_transform(state) # standard -> model
         obs_dict = {k: v for k, v in zip(self._motors_ft.keys(), state_to_send)}
 
+        self._current_state = state
+
+        return obs_dict
+
+    def get_camera_observation(self) -> Dict[str, Any]:
+        """
+        Get camera images from robot.
+        Returns:
+        - obs_dict: Dictionary containing camera images
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+
+        obs_dict = {}
         for cam_key, cam in self.cameras.items():
             outputs = cam.async_read()
             obs_dict[cam_key] = outputs
 
-        self._current_state = state
-
         return obs_dict
     
     @property
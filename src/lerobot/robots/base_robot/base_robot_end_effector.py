@@ -69,14 +69,14 @@ class BaseRobotEndEffector(BaseRobot):
         super().connect()
         self._init_state = self.get_ee_state()
     
-    def get_observation(self) -> Dict[str, Any]:
+    def get_motor_observation(self) -> Dict[str, Any]:
         """
-        Get current observation and update EE state.
+        Get current joint states and update EE state.
         Calls the base class method and updates current EE state.
         Returns:
-        - obs_dict: Dictionary of current observations
+        - obs_dict: Dictionary of current joint states
         """
-        obs_dict = super().get_observation()
+        obs_dict = super().get_motor_observation()
         self._current_state = self.get_ee_state()
         return obs_dict
     
@@ -225,12 +225,33 @@ class BiBaseRobot(Robot):
         Returns:
         - obs_dict: Combined observations from both arms and cameras, with appropriate prefixes.
         """
-        state_left = self.left_robot.get_observation()
-        state_right = self.right_robot.get_observation()
+        return {**self.get_motor_observation(), **self.get_camera_observation()}
+
+    def get_motor_observation(self) -> Dict[str, Any]:
+        """
+        Get joint states from both arms.
+        Returns:
+        - obs_dict: Combined joint states of both arms, with appropriate prefixes.
+        """
+        state_left = self.left_robot.get_motor_observation()
+        state_right = self.right_robot.get_motor_observation()
 
         state_left = {f"left_{k}": v for k, v in state_left.items()}
         state_right = {f"right_{k}": v for k, v in state_right.items()}
-        obs_dict = {**state_left, **state_right}
+        return {**state_left, **state_right}
+
+    def get_camera_observation(self) -> Dict[str, Any]:
+        """
+        Get images from the cameras of both arms and from the shared cameras.
+        Returns:
+        - obs_dict: Combined camera images, with appropriate prefixes for the cameras of the arms.
+        """
+        images_left = self.left_robot.get_camera_observation()
+        images_right = self.right_robot.get_camera_observation()
+
+        images_left = {f"left_{k}": v for k, v in images_left.items()}
+        images_right = {f"right_{k}": v for k, v in images_right.items()}
+        obs_dict = {**images_left, **images_right}
 
         for cam_key, cam in self.cameras.items():
             outputs = cam.async_read()
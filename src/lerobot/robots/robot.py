@@ -164,6 +164,28 @@ class Robot(abc.ABC):
 
         pass
 
+    def get_motor_observation(self) -> dict[str, Any]:
+        """
+        Retrieve the part of the observation read from the motors.
+
+        Together with :pymeth:`get_camera_observation` it splits :pymeth:`get_observation`, so that a caller
+        sharing the motor bus with another thread does not have to hold it while waiting for camera frames.
+        Robots that do not split their observation return all of it here.
+
+        Returns:
+            dict[str, Any]: The motor entries of the observation.
+        """
+        return self.get_observation()
+
+    def get_camera_observation(self) -> dict[str, Any]:
+        """
+        Retrieve the part of the observation read from the cameras, see :pymeth:`get_motor_observation`.
+
+        Returns:
+            dict[str, Any]: The camera entries of the observation, empty for robots that do not split it.
+        """
+        return {}
+
     @abc.abstractmethod
     def send_action(self, action: dict[str, Any]) -> dict[str, Any]:
         """
@@ -66,6 +66,7 @@ from lerobot.robots import so100_follower  # noqa: F401
 from lerobot.scripts.rl.gym_manipulator import make_robot_env
 from lerobot.teleoperators import gamepad, so101_leader  # noqa: F401
 from lerobot.transport import services_pb2, services_pb2_grpc
+from lerobot.transport.parameter_sync import ParameterDecoder
 from lerobot.transport.utils import (
     bytes_to_state_dict,
     grpc_channel_options,
@@ -75,13 +76,14 @@ from lerobot.transport.utils import (
     transitions_to_bytes,
 )
 from lerobot.utils.process import ProcessSignalHandler
-from lerobot.utils.queue import get_last_item_from_queue
+from lerobot.utils.queue import get_all_items_from_queue, get_last_item_from_queue
 from lerobot.utils.random_utils import set_seed
 from lerobot.utils.robot_utils import busy_wait
 from lerobot.utils.transition import (
     Transition,
     move_state_dict_to_device,
     move_transition_to_device,
+    stack_transitions,
 )
 from lerobot.utils.utils import (
     TimerManager,
@@ -256,6 +258,10 @@ def act_with_policy(
     policy = policy.eval()
     assert isinstance(policy, nn.Module)
 
+    parameters_decoder = None
+    if cfg.policy.actor_learner_config.policy_parameters_delta_dtype is not None:
+        parameters_decoder = ParameterDecoder()
+
     obs, info = online_env.reset()
 
     # NOTE: For the moment we will solely handle the case of a single environment
@@ -317,7 +323,12 @@ def act_with_policy(
         if done or truncated:
             logging.info(f"[ACTOR] Global step {interaction_step}: Episode reward: {sum_reward_episode}")
 
-            update_policy_parameters(policy=policy, parameters_queue=parameters_queue, device=device)
+            update_policy_parameters(
+                policy=policy,
+                parameters_queue=parameters_queue,
+                device=device,
+                parameters_decoder=parameters_decoder,
+            )
 
             if len(list_transition_to_send_to_learner) > 0:
                 push_transitions_to_transport_queue(
@@ -611,7 +622,38 @@ def interactions_stream(
 #################################################
 
 
-def update_policy_parameters(policy: SACPolicy, parameters_queue: Queue, device):
+def receive_parameters_deltas(parameters_queue: Queue, parameters_decoder: ParameterDecoder) -> dict | None:
+    """Decodes every message received from the Learner, and returns the tensors that changed since the
+    parameters currently loaded, or None if there are none."""
+    state_dicts = None
+    # Unlike full state dicts, a delta needs the snapshot before it, so no message can be skipped
+    for buffer in get_all_items_from_queue(parameters_queue):
+        tensors = parameters_decoder.decode(buffer)
+        if tensors is None:
+            continue
+        state_dicts = state_dicts or {}
+        for group, state in tensors.items():
+            state_dicts.setdefault(group, {}).update(state)
+    return state_dicts
+
+
+def update_policy_parameters(
+    policy: SACPolicy, parameters_queue: Queue, device, parameters_decoder: ParameterDecoder | None = None
+):
+    if parameters_decoder is not None:
+        state_dicts = receive_parameters_deltas(parameters_queue, parameters_decoder)
+        if state_dicts is not None:
+            logging.info("[ACTOR] Load parameters changes from Learner.")
+            # The deltas only hold the tensors that changed, the frozen ones are kept
+            policy.actor.load_state_dict(
+                move_state_dict_to_device(state_dicts["policy"], device=device), strict=False
+            )
+            if hasattr(policy, "discrete_critic") and "discrete_critic" in state_dicts:
+                policy.discrete_critic.load_state_dict(
+                    move_state_dict_to_device(state_dicts["discrete_critic"], device=device), strict=False
+                )
+        return
+
     bytes_state_dict = get_last_item_from_queue(parameters_queue, block=False)
     if bytes_state_dict is not None:
         logging.info("[ACTOR] Load new parameters from Learner.")
@@ -646,23 +688,19 @@ def update_policy_parameters(policy: SACPolicy, parameters_queue: Queue, device)
 
 
 def push_transitions_to_transport_queue(transitions: list, transitions_queue):
-    """Send transitions to learner in smaller chunks to avoid network issues.
+    """Send transitions to learner as one columnar transition batch, see `stack_transitions`, so that the
+    learner adds them to its replay buffer at once.
 
     Args:
         transitions: List of transitions to send
-        message_queue: Queue to send messages to learner
-        chunk_size: Size of each chunk to send
+        transitions_queue: Queue to send the serialized transitions to the learner
     """
-    transition_to_send_to_learner = []
-    for transition in transitions:
-        tr = move_transition_to_device(transition=transition, device="cpu")
-        for key, value in tr["state"].items():
-            if torch.isnan(value).any():
-                logging.warning(f"Found NaN values in transition {key}")
-
-        transition_to_send_to_learner.append(tr)
+    transition_batch = move_transition_to_device(transition=stack_transitions(transitions), device="cpu")
+    for key, value in transition_batch["state"].items():
+        if torch.isnan(value).any():
+            logging.warning(f"Found NaN values in transition {key}")
 
-    transitions_queue.put(transitions_to_bytes(transition_to_send_to_learner))
+    transitions_queue.put(transitions_to_bytes(transition_batch))
 
 
 def get_frequency_stats(timer: TimerManager) -> dict[str, float]:
@@ -79,7 +79,7 @@ from lerobot.transport import services_pb2_grpc
 from lerobot.transport.utils import (
     MAX_MESSAGE_SIZE,
     bytes_to_python_object,
-    bytes_to_transitions,
+    bytes_to_transition_batch,
     state_to_bytes,
 )
 from lerobot.utils.buffer import ReplayBuffer, concatenate_batch_transitions
@@ -91,7 +91,12 @@ from lerobot.utils.train_utils import (
     save_checkpoint,
     update_last_checkpoint,
 )
-from lerobot.utils.transition import move_state_dict_to_device, move_transition_to_device
+from lerobot.utils.transition import (
+    Transition,
+    move_state_dict_to_device,
+    move_transition_to_device,
+    select_transitions,
+)
 from lerobot.utils.utils import (
     format_big_number,
     get_safe_torch_device,
@@ -652,6 +657,8 @@ def start_learner(
         transition_queue=transition_queue,
         interaction_message_queue=interaction_message_queue,
         queue_get_timeout=cfg.policy.actor_learner_config.queue_get_timeout,
+        parameters_delta_dtype=cfg.policy.actor_learner_config.policy_parameters_delta_dtype,
+        parameters_snapshot_interval=cfg.policy.actor_learner_config.policy_parameters_snapshot_interval,
     )
 
     server = grpc.server(
@@ -1106,6 +1113,30 @@ def check_nan_in_transition(
     return nan_detected
 
 
+def find_nan_in_transitions(transitions: Transition) -> torch.Tensor:
+    """
+    Vectorized `check_nan_in_transition` for a columnar transition batch, see `stack_transitions`.
+
+    Args:
+        transitions: Transition batch, with one tensor per key whose first dimension indexes the transitions
+
+    Returns:
+        torch.Tensor: Boolean mask of the transitions with NaN values in their state, next state or action
+    """
+    tensors = [
+        *transitions["state"].values(),
+        *transitions["next_state"].values(),
+        transitions["action"],
+    ]
+    nan_detected = torch.zeros(
+        len(transitions["action"]), dtype=torch.bool, device=transitions["action"].device
+    )
+    for tensor in tensors:
+        if tensor.is_floating_point():
+            nan_detected |= torch.isnan(tensor).reshape(len(tensor), -1).any(dim=1)
+    return nan_detected
+
+
 def push_actor_policy_to_queue(parameters_queue: Queue, policy: nn.Module):
     logging.debug("[LEARNER] Pushing actor policy to the queue")
 
@@ -1157,28 +1188,25 @@ def process_transitions(
         shutdown_event: Event to signal shutdown
     """
     while not transition_queue.empty() and not shutdown_event.is_set():
-        transition_list = transition_queue.get()
-        transition_list = bytes_to_transitions(buffer=transition_list)
-
-        for transition in transition_list:
-            transition = move_transition_to_device(transition=transition, device=device)
-
-            # Skip transitions with NaN values
-            if check_nan_in_transition(
-                observations=transition["state"],
-                actions=transition["action"],
-                next_state=transition["next_state"],
-            ):
-                logging.warning("[LEARNER] NaN detected in transition, skipping")
-                continue
-
-            replay_buffer.add(**transition)
-
-            # Add to offline buffer if it's an intervention
-            if dataset_repo_id is not None and transition.get("complementary_info", {}).get(
-                "is_intervention"
-            ):
-                offline_replay_buffer.add(**transition)
+        transitions = bytes_to_transition_batch(buffer=transition_queue.get())
+        if transitions is None:
+            continue
+        transitions = move_transition_to_device(transition=transitions, device=device)
+
+        # Skip transitions with NaN values
+        nan_detected = find_nan_in_transitions(transitions)
+        if nan_detected.any():
+            logging.warning(f"[LEARNER] NaN detected in {int(nan_detected.sum())} transitions, skipping them")
+            transitions = select_transitions(transitions, ~nan_detected)
+
+        replay_buffer.add_batch(**transitions)
+
+        # Add to offline buffer the interventions
+        is_intervention = (transitions.get("complementary_info") or {}).get("is_intervention")
+        if dataset_repo_id is not None and is_intervention is not None:
+            is_intervention = is_intervention.reshape(-1).bool()
+            if is_intervention.any():
+                offline_replay_buffer.add_batch(**select_transitions(transitions, is_intervention))
 
 
 def process_interaction_messages(
@@ -20,7 +20,8 @@ import time
 from multiprocessing import Event, Queue
 
 from lerobot.transport import services_pb2, services_pb2_grpc
-from lerobot.transport.utils import receive_bytes_in_chunks, send_bytes_in_chunks
+from lerobot.transport.parameter_sync import ParameterEncoder
+from lerobot.transport.utils import bytes_to_state_dict, receive_bytes_in_chunks, send_bytes_in_chunks
 from lerobot.utils.queue import get_last_item_from_queue
 
 MAX_WORKERS = 3  # Stream parameters, send transitions and interactions
@@ -42,6 +43,8 @@ class LearnerService(services_pb2_grpc.LearnerServiceServicer):
         transition_queue: Queue,
         interaction_message_queue: Queue,
         queue_get_timeout: float = 0.001,
+        parameters_delta_dtype: str | None = None,
+        parameters_snapshot_interval: int = 10,
     ):
         self.shutdown_event = shutdown_event
         self.parameters_queue = parameters_queue
@@ -49,12 +52,19 @@ class LearnerService(services_pb2_grpc.LearnerServiceServicer):
         self.transition_queue = transition_queue
         self.interaction_message_queue = interaction_message_queue
         self.queue_get_timeout = queue_get_timeout
+        # When set, the parameters are streamed as deltas against periodic snapshots, not as full state dicts
+        self.parameters_delta_dtype = parameters_delta_dtype
+        self.parameters_snapshot_interval = parameters_snapshot_interval
 
     def StreamParameters(self, request, context):  # noqa: N802
         # TODO: authorize the request
         logging.info("[LEARNER] Received request to stream parameters from the Actor")
 
         last_push_time = 0
+        # Each stream starts with a snapshot, so a reconnecting actor gets the full parameters again
+        encoder = None
+        if self.parameters_delta_dtype is not None:
+            encoder = ParameterEncoder(self.parameters_delta_dtype, self.parameters_snapshot_interval)
 
         while not self.shutdown_event.is_set():
             time_since_last_push = time.time() - last_push_time
@@ -72,6 +82,9 @@ class LearnerService(services_pb2_grpc.LearnerServiceServicer):
             if buffer is None:
                 continue
 
+            if encoder is not None:
+                buffer = encoder.encode(bytes_to_state_dict(buffer))
+
             yield from send_bytes_in_chunks(
                 buffer,
                 services_pb2.Parameters,
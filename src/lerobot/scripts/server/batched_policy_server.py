@@ -0,0 +1,411 @@
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+PolicyServer serving several robot clients with one policy, batching their observations.
+
+Each `RobotClient` is identified by the `client-id` metadata of its calls and gets its own `ClientSession`:
+the features and wire schema of its robot, its timestep bookkeeping, its latest observation and its latest
+action chunk. A single inference thread waits for a pending observation, gathers those of the other clients
+arriving within `batch_window` seconds (at most `max_batch_size`), and runs them through one forward pass of
+the policy. The rows of the predicted chunk are then routed back to their clients.
+Only the policies of `BATCHED_POLICIES`, without observation or action queues, can be shared this way, and
+every client must send the observation features the policy expects.
+
+Started by `policy_server.py` when `max_clients > 1`:
+```shell
+python src/lerobot/scripts/server/policy_server.py \
+     --host=127.0.0.1 \
+     --port=8080 \
+     --fps=30 \
+     --max_clients=8 \
+     --batch_window=0.005
+```
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from queue import Empty, Queue
+
+import grpc
+import torch
+
+from lerobot.constants import OBS_STATE
+from lerobot.policies.factory import get_policy_class
+from lerobot.scripts.server.configs import PolicyServerConfig
+from lerobot.scripts.server.constants import (
+    BATCHED_POLICIES,
+    POLICY_ACTION_DIM_METADATA_KEY,
+    POLICY_IMAGE_SHAPES_METADATA_KEY,
+)
+from lerobot.scripts.server.helpers import (
+    ObservationPreprocessor,
+    RemotePolicyConfig,
+    TimedAction,
+    TimedObservation,
+    bytes_to_timed_observation,
+    get_logger,
+    is_image_key,
+    policy_camera_shapes,
+    timed_actions_to_bytes,
+)
+from lerobot.scripts.server.policy_server import PolicyServer, get_client_id
+from lerobot.transport import services_pb2  # type: ignore
+from lerobot.transport.utils import receive_bytes_in_chunks
+from lerobot.transport.wire_format import ObservationSchema
+
+
+@dataclass
+class ClientSession:
+    """State of a robot client connected to a `BatchedPolicyServer`."""
+
+    client_id: str
+    # Set by SendPolicyInstructions
+    lerobot_features: dict[str, dict] | None = None
+    observation_schema: ObservationSchema | None = None
+    observation_preprocessor: ObservationPreprocessor | None = None
+    actions_per_chunk: int = 0
+    # Latest observation waiting for inference, and when it started waiting
+    pending_observation: TimedObservation | None = None
+    pending_since: float = 0.0
+    last_processed_obs: TimedObservation | None = None
+    predicted_timesteps: set[int] = field(default_factory=set)
+    # Latest action chunk predicted for the client, not yet sent
+    actions: Queue = field(default_factory=lambda: Queue(maxsize=1))
+    last_seen: float = field(default_factory=time.perf_counter)
+
+    @property
+    def configured(self) -> bool:
+        return self.lerobot_features is not None
+
+
+class BatchedPolicyServer(PolicyServer):
+    prefix = "batched_policy_server"
+    logger = get_logger(prefix)
+
+    def __init__(self, config: PolicyServerConfig):
+        super().__init__(config)
+        self.pretrained_name_or_path = None
+        self.sessions: dict[str, ClientSession] = {}
+        # Guards the sessions and their pending observations, notified when an observation arrives
+        self._sessions_condition = threading.Condition()
+        self._policy_lock = threading.Lock()
+
+        self._inference_thread = threading.Thread(
+            target=self._inference_loop, name="batched_inference", daemon=True
+        )
+        self._inference_thread.start()
+
+    def _get_session(self, context: grpc.ServicerContext, configured: bool = True) -> ClientSession:
+        client_id = get_client_id(context)
+        with self._sessions_condition:
+            session = self.sessions.get(client_id)
+        if session is None:
+            context.abort(
+                grpc.StatusCode.FAILED_PRECONDITION, f"Unknown client {client_id}, call Ready first"
+            )
+        if configured and not session.configured:
+            context.abort(
+                grpc.StatusCode.FAILED_PRECONDITION, "No policy instructions received from the client"
+            )
+        session.last_seen = time.perf_counter()
+        return session
+
+    def _update_actions_per_chunk(self) -> None:
+        """The policy predicts the longest chunk requested by the connected clients, each client gets its own
+        length. Called with `_sessions_condition` held whenever the sessions change."""
+        self.actions_per_chunk = max(
+            (s.actions_per_chunk for s in self.sessions.values() if s.configured), default=None
+        )
+
+    def _remove_session(self, session: ClientSession) -> None:
+        with self._sessions_condition:
+            if self.sessions.get(session.client_id) is session:
+                del self.sessions[session.client_id]
+                self._update_actions_per_chunk()
+                self.logger.info(f"Client {session.client_id} disconnected")
+
+    def Ready(self, request, context):  # noqa: N802
+        client_id = get_client_id(context)
+        with self._sessions_condition:
+            if client_id not in self.sessions and len(self.sessions) >= self.config.max_clients:
+                # Give the slots of the clients that stopped sending observations to the new one
+                now = time.perf_counter()
+                for session in list(self.sessions.values()):
+                    if now - session.last_seen > self.config.client_timeout:
+                        self.logger.info(f"Client {session.client_id} timed out")
+                        del self.sessions[session.client_id]
+
+            if client_id not in self.sessions and len(self.sessions) >= self.config.max_clients:
+                context.abort(
+                    grpc.StatusCode.RESOURCE_EXHAUSTED,
+                    f"The server already serves {self.config.max_clients} clients",
+                )
+            # A client connecting again starts from a fresh session
+            self.sessions[client_id] = ClientSession(client_id)
+            self._update_actions_per_chunk()
+            num_clients = len(self.sessions)
+
+        self.logger.info(f"Client {client_id} connected and ready ({num_clients}/{self.config.max_clients})")
+        return services_pb2.Empty()
+
+    def SendPolicyInstructions(self, request, context):  # noqa: N802
+        """Loads the policy for the first client, the following ones must request the same policy and send
+        the observation features it expects."""
+        session = self._get_session(context, configured=False)
+        policy_specs = RemotePolicyConfig.from_bytes(request.data)
+
+        # The clients share the policy, which must not keep state from one observation to the next
+        if policy_specs.policy_type not in BATCHED_POLICIES:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"Policy type {policy_specs.policy_type} cannot serve several clients. "
+                f"Supported policies: {BATCHED_POLICIES}",
+            )
+
+        self.logger.info(
+            f"Receiving policy instructions from {session.client_id} | "
+            f"Policy type: {policy_specs.policy_type} | "
+            f"Pretrained name or path: {policy_specs.pretrained_name_or_path} | "
+            f"Actions per chunk: {policy_specs.actions_per_chunk} | "
+            f"Device: {policy_specs.device}"
+        )
+
+        requested_policy = (
+            policy_specs.policy_type,
+            policy_specs.pretrained_name_or_path,
+            policy_specs.device,
+        )
+        with self._policy_lock:
+            if self.policy is None:
+                self.policy_type, self.pretrained_name_or_path, self.device = requested_policy
+                policy_class = get_policy_class(self.policy_type)
+
+                start = time.perf_counter()
+                self.policy = policy_class.from_pretrained(self.pretrained_name_or_path)
+                self.policy.to(self.device)
+                end = time.perf_counter()
+
+                self.logger.info(f"Time taken to put policy on {self.device}: {end - start:.4f} seconds")
+
+            elif requested_policy != (self.policy_type, self.pretrained_name_or_path, self.device):
+                context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    f"The server serves the {self.policy_type} policy {self.pretrained_name_or_path} on "
+                    f"{self.device}, all its clients must use it",
+                )
+
+        # The observations of all the clients are stacked in one batch, they must all match the policy inputs
+        mismatch = self._features_mismatch(policy_specs.lerobot_features)
+        if mismatch is not None:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT, f"Features of client {session.client_id}: {mismatch}"
+            )
+
+        image_shapes = policy_camera_shapes(self.policy_image_features)
+        observation_schema = policy_specs.observation_schema
+        if observation_schema is not None and observation_schema.resize_images:
+            observation_schema = observation_schema.resized(image_shapes)
+
+        observation_preprocessor = ObservationPreprocessor(
+            policy_specs.lerobot_features, self.policy_image_features, self.device
+        )
+
+        with self._sessions_condition:
+            session.observation_schema = observation_schema
+            session.observation_preprocessor = observation_preprocessor
+            session.actions_per_chunk = policy_specs.actions_per_chunk
+            session.lerobot_features = policy_specs.lerobot_features
+            self._update_actions_per_chunk()
+
+        context.set_trailing_metadata(
+            (
+                (POLICY_IMAGE_SHAPES_METADATA_KEY, json.dumps(image_shapes)),
+                (POLICY_ACTION_DIM_METADATA_KEY, str(self.policy.config.action_feature.shape[0])),
+            )
+        )
+        return services_pb2.Empty()
+
+    def _features_mismatch(self, lerobot_features: dict[str, dict]) -> str | None:
+        """Describes how the observation features of a client differ from the inputs of the policy, if they
+        do. The cameras may have any resolution, their frames are resized to the policy image shapes."""
+        cameras = {key for key in lerobot_features if is_image_key(key)}
+        if cameras != set(self.policy_image_features):
+            return f"cameras {sorted(cameras)} instead of {sorted(self.policy_image_features)}"
+
+        state_feature = self.policy.config.robot_state_feature
+        state_shape = tuple(lerobot_features[OBS_STATE]["shape"]) if OBS_STATE in lerobot_features else None
+        expected_shape = tuple(state_feature.shape) if state_feature is not None else None
+        if state_shape != expected_shape:
+            return f"{OBS_STATE} of shape {state_shape} instead of {expected_shape}"
+        return None
+
+    def SendObservations(self, request_iterator, context):  # noqa: N802
+        """Receive observations from a robot client"""
+        session = self._get_session(context)
+        if session.observation_schema is None:
+            context.abort(
+                grpc.StatusCode.FAILED_PRECONDITION, "No observation schema, send policy instructions"
+            )
+
+        receive_time = time.time()  # comparing timestamps so need time.time()
+        received_bytes = receive_bytes_in_chunks(request_iterator, None, self.shutdown_event, self.logger)
+        timed_observation = bytes_to_timed_observation(
+            received_bytes, session.observation_schema, self.image_decode_executor
+        )
+
+        self.logger.debug(
+            f"Received observation #{timed_observation.get_timestep()} from {session.client_id} | "
+            f"One-way latency: {(receive_time - timed_observation.get_timestamp()) * 1000:.2f}ms"
+        )
+
+        if not self._enqueue_client_observation(session, timed_observation):
+            self.logger.debug(f"Observation #{timed_observation.get_timestep()} has been filtered out")
+
+        return services_pb2.Empty()
+
+    def _enqueue_client_observation(self, session: ClientSession, obs: TimedObservation) -> bool:
+        """Makes `obs` the pending observation of its client, replacing an older one waiting for inference.
+        Observations of a timestep that was already predicted are skipped, unless they must go."""
+        with self._sessions_condition:
+            if not obs.must_go and obs.get_timestep() in session.predicted_timesteps:
+                return False
+
+            if session.pending_observation is None:
+                session.pending_since = time.perf_counter()
+            session.pending_observation = obs
+            self._sessions_condition.notify()
+        return True
+
+    def GetActions(self, request, context):  # noqa: N802
+        """Returns the latest action chunk of the client, or `Empty` if none is predicted in time."""
+        session = self._get_session(context)
+        try:
+            action_chunk = session.actions.get(timeout=self.config.obs_queue_timeout)
+        except Empty:
+            return services_pb2.Empty()
+
+        return services_pb2.Actions(data=bytes(timed_actions_to_bytes(action_chunk)))
+
+    def StreamActions(self, request, context):  # noqa: N802
+        """Pushes the action chunks of the client as they are predicted. The session of the client ends with
+        its stream."""
+        session = self._get_session(context)
+        self.logger.info(f"Client {session.client_id} connected for action streaming")
+
+        while self.running and context.is_active() and self.sessions.get(session.client_id) is session:
+            try:
+                action_chunk = session.actions.get(timeout=self.config.obs_queue_timeout)
+            except Empty:
+                continue
+            yield services_pb2.Actions(data=bytes(timed_actions_to_bytes(action_chunk)))
+
+        if not context.is_active():
+            self._remove_session(session)
+
+    def _next_batch(self) -> list[tuple[ClientSession, TimedObservation]]:
+        """Waits for pending observations, for at most `batch_window` after the oldest one arrived, and takes
+        up to `max_batch_size` of them, oldest first."""
+
+        def pending_sessions() -> list[ClientSession]:
+            return [s for s in self.sessions.values() if s.pending_observation is not None]
+
+        with self._sessions_condition:
+            if (
+                not self._sessions_condition.wait_for(
+                    lambda: pending_sessions() or not self.running, timeout=self.config.obs_queue_timeout
+                )
+                or not self.running
+            ):
+                return []
+
+            deadline = min(s.pending_since for s in pending_sessions()) + self.config.batch_window
+            while self.running and len(pending_sessions()) < self.config.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._sessions_condition.wait(remaining)
+
+            sessions = sorted(pending_sessions(), key=lambda s: s.pending_since)[: self.config.max_batch_size]
+            batch = []
+            for session in sessions:
+                obs = session.pending_observation
+                session.pending_observation = None
+                session.last_processed_obs = obs
+                session.predicted_timesteps.add(obs.get_timestep())
+                batch.append((session, obs))
+        return batch
+
+    def _inference_loop(self) -> None:
+        while self.running:
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                action_chunks = self._predict_action_chunks(batch)
+            except Exception as e:
+                self.logger.error(f"Error running inference on a batch of {len(batch)} observations: {e}")
+                continue
+
+            for (session, _), action_chunk in zip(batch, action_chunks, strict=True):
+                # Only the latest chunk is kept, the client aggregates it with the actions it already has
+                if session.actions.full():
+                    _ = session.actions.get_nowait()
+                session.actions.put(action_chunk)
+
+    def _predict_action_chunks(
+        self, batch: list[tuple[ClientSession, TimedObservation]]
+    ) -> list[list[TimedAction]]:
+        """Predicts the action chunks of the observations of several clients with one forward pass."""
+        inference_starts = time.perf_counter()
+        observations = [
+            self._prepare_observation(obs, session.observation_preprocessor) for session, obs in batch
+        ]
+        # Tensors have a batch dimension of 1, strings (e.g. the task) are gathered in lists
+        batched_observation = {
+            key: torch.cat([o[key] for o in observations])
+            if isinstance(observations[0][key], torch.Tensor)
+            else [o[key] for o in observations]
+            for key in observations[0]
+        }
+        preprocessing_time = time.perf_counter()
+
+        action_tensor = self._get_action_chunk(batched_observation).cpu()
+        inference_time = time.perf_counter()
+
+        action_chunks = [
+            self._time_action_chunk(
+                obs.get_timestamp(),
+                list(action_tensor[i, : session.actions_per_chunk]),
+                obs.get_timestep(),
+            )
+            for i, (session, obs) in enumerate(batch)
+        ]
+
+        self.logger.info(
+            f"Batch of {len(batch)} observations | "
+            f"Preprocessing time: {1000 * (preprocessing_time - inference_starts):.2f}ms | "
+            f"Inference time: {1000 * (inference_time - preprocessing_time):.2f}ms"
+        )
+        return action_chunks
+
+    def stop(self):
+        """Stop the server and its inference thread"""
+        self.shutdown_event.set()
+        with self._sessions_condition:
+            self._sessions_condition.notify_all()
+        self._inference_thread.join()
+        self.logger.info("Server stopping...")
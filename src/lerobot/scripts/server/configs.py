@@ -19,10 +19,14 @@ import torch
 
 from lerobot.robots.config import RobotConfig
 from lerobot.scripts.server.constants import (
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_CLIENT_TIMEOUT,
     DEFAULT_FPS,
+    DEFAULT_IMAGE_DECODE_WORKERS,
     DEFAULT_INFERENCE_LATENCY,
     DEFAULT_OBS_QUEUE_TIMEOUT,
 )
+from lerobot.transport.wire_format import DEFAULT_IMAGE_QUALITY, IMAGE_CODECS
 
 # Aggregate function registry for CLI usage
 AGGREGATE_FUNCTIONS = {
@@ -63,6 +67,31 @@ class PolicyServerConfig:
         default=DEFAULT_OBS_QUEUE_TIMEOUT, metadata={"help": "Timeout for observation queue in seconds"}
     )
 
+    image_decode_workers: int = field(
+        default=DEFAULT_IMAGE_DECODE_WORKERS,
+        metadata={"help": "Number of threads decoding the camera frames compressed by the client"},
+    )
+
+    # Multi-client configuration
+    max_clients: int = field(
+        default=1,
+        metadata={
+            "help": "Number of robot clients served concurrently with the same policy, their observations "
+            "are batched. With 1, a new client replaces the previous one."
+        },
+    )
+    max_batch_size: int = field(
+        default=8, metadata={"help": "Maximum number of observations run in one forward pass"}
+    )
+    batch_window: float = field(
+        default=DEFAULT_BATCH_WINDOW,
+        metadata={"help": "Maximum time in seconds to wait for other clients' observations to batch them"},
+    )
+    client_timeout: float = field(
+        default=DEFAULT_CLIENT_TIMEOUT,
+        metadata={"help": "Seconds without observations after which a client's slot can be reused"},
+    )
+
     def __post_init__(self):
         """Validate configuration after initialization."""
         if self.port < 1 or self.port > 65535:
@@ -77,6 +106,18 @@ class PolicyServerConfig:
         if self.obs_queue_timeout < 0:
             raise ValueError(f"obs_queue_timeout must be non-negative, got {self.obs_queue_timeout}")
 
+        if self.image_decode_workers < 1:
+            raise ValueError(f"image_decode_workers must be positive, got {self.image_decode_workers}")
+
+        if self.max_clients < 1:
+            raise ValueError(f"max_clients must be positive, got {self.max_clients}")
+
+        if self.max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, got {self.max_batch_size}")
+
+        if self.batch_window < 0:
+            raise ValueError(f"batch_window must be non-negative, got {self.batch_window}")
+
     @classmethod
     def from_dict(cls, config_dict: dict) -> "PolicyServerConfig":
         """Create a PolicyServerConfig from a dictionary."""
@@ -95,6 +136,9 @@ class PolicyServerConfig:
             "fps": self.fps,
             "environment_dt": self.environment_dt,
             "inference_latency": self.inference_latency,
+            "max_clients": self.max_clients,
+            "max_batch_size": self.max_batch_size,
+            "batch_window": self.batch_window,
         }
 
 
@@ -129,6 +173,13 @@ class RobotClientConfig:
     # Control behavior configuration
     chunk_size_threshold: float = field(default=0.5, metadata={"help": "Threshold for chunk size control"})
     fps: int = field(default=DEFAULT_FPS, metadata={"help": "Frames per second"})
+    action_thread_priority: int | None = field(
+        default=None,
+        metadata={
+            "help": "Real-time (SCHED_FIFO) priority, 1-99, of the thread performing the actions. "
+            "Linux only, requires the CAP_SYS_NICE capability"
+        },
+    )
 
     # Aggregate function configuration (CLI-compatible)
     aggregate_fn_name: str = field(
@@ -141,11 +192,40 @@ class RobotClientConfig:
         default=False, metadata={"help": "Visualize the action queue size"}
     )
 
+    # Action delivery configuration
+    stream_actions: bool = field(
+        default=True,
+        metadata={
+            "help": "Receive the action chunks from a StreamActions stream as soon as they are predicted, "
+            "instead of polling the server with GetActions"
+        },
+    )
+
     # Verification configuration
     verify_robot_cameras: bool = field(
         default=True, metadata={"help": "Verify that the robot cameras match the policy cameras"}
     )
 
+    # Observation transport configuration: on slow links (e.g. Wi-Fi), the camera frames dominate the latency
+    image_codecs: dict[str, str] = field(
+        default_factory=dict,
+        metadata={
+            "help": f"Codec of the frames of each camera, one of {list(IMAGE_CODECS)}. "
+            "Cameras that are not listed are sent raw."
+        },
+    )
+    image_quality: dict[str, int] = field(
+        default_factory=dict,
+        metadata={
+            "help": "JPEG quality (0-100) or PNG compression level (0-9) of each camera, "
+            f"defaults to {DEFAULT_IMAGE_QUALITY}"
+        },
+    )
+    resize_images: bool = field(
+        default=False,
+        metadata={"help": "Resize the frames to the input resolution of the policy before sending them"},
+    )
+
     @property
     def environment_dt(self) -> float:
         """Environment time step, in seconds"""
@@ -174,6 +254,15 @@ class RobotClientConfig:
         if self.actions_per_chunk <= 0:
             raise ValueError(f"actions_per_chunk must be positive, got {self.actions_per_chunk}")
 
+        if self.action_thread_priority is not None and not 1 <= self.action_thread_priority <= 99:
+            raise ValueError(
+                f"action_thread_priority must be between 1 and 99, got {self.action_thread_priority}"
+            )
+
+        for camera, codec in self.image_codecs.items():
+            if codec not in IMAGE_CODECS:
+                raise ValueError(f"image_codecs must be one of {IMAGE_CODECS}, got '{codec}' for '{camera}'")
+
         self.aggregate_fn = get_aggregate_function(self.aggregate_fn_name)
 
     @classmethod
@@ -194,4 +283,6 @@ class RobotClientConfig:
             "task": self.task,
             "debug_visualize_queue_size": self.debug_visualize_queue_size,
             "aggregate_fn_name": self.aggregate_fn_name,
+            "stream_actions": self.stream_actions,
+            "action_thread_priority": self.action_thread_priority,
         }
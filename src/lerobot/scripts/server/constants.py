@@ -22,6 +22,31 @@ DEFAULT_INFERENCE_LATENCY = 1 / DEFAULT_FPS
 """Server side: Timeout for observation queue in seconds"""
 DEFAULT_OBS_QUEUE_TIMEOUT = 2
 
+"""Server side: Number of threads decoding the compressed camera frames of an observation"""
+DEFAULT_IMAGE_DECODE_WORKERS = 4
+
+"""Client side: Initial and maximum delays in seconds before reopening an interrupted action stream"""
+DEFAULT_RECONNECT_BACKOFF = 0.05
+MAX_RECONNECT_BACKOFF = 2.0
+
+"""Client side: Number of observation -> action latencies kept to report their percentiles"""
+LATENCY_WINDOW = 1000
+
+"""Server side: Maximum time in seconds to wait for other clients' observations to run them in one batch"""
+DEFAULT_BATCH_WINDOW = 0.005
+
+"""Server side: Seconds without observations after which a client's slot can be given to a new client"""
+DEFAULT_CLIENT_TIMEOUT = 30
+
+"""Metadata of every call of a client, identifying it to a server that serves several clients"""
+CLIENT_ID_METADATA_KEY = "client-id"
+
+"""Trailing metadata of `SendPolicyInstructions`: JSON {camera: (H, W, C)} input image shapes of the policy"""
+POLICY_IMAGE_SHAPES_METADATA_KEY = "policy-image-shapes"
+
+"""Trailing metadata of `SendPolicyInstructions`: number of values of the actions predicted by the policy"""
+POLICY_ACTION_DIM_METADATA_KEY = "policy-action-dim"
+
 # All action chunking policies
 SUPPORTED_POLICIES = [
     "act", "smolvla", "diffusion", "pi0", "tdmpc", "vqbet",
@@ -29,6 +54,9 @@ SUPPORTED_POLICIES = [
     "dummy",
 ]
 
+# Policies without observation or action queues, whose `predict_action_chunk` can serve several clients
+BATCHED_POLICIES = ["act", "smolvla", "pi0"]
+
 # TODO: Add all other robots
 SUPPORTED_ROBOTS = [
     "so100_follower", "so101_follower", 
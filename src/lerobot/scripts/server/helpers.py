@@ -12,13 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
 import logging.handlers
 import os
 import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from pathlib import Path
+from queue import Empty
 
+import numpy as np
 import torch
 
 from lerobot.configs.types import PolicyFeature
@@ -28,6 +34,7 @@ from lerobot.datasets.utils import build_dataset_frame, hw_to_dataset_features
 # NOTE: Configs need to be loaded for the client to be able to instantiate the policy config
 from lerobot.policies import ACTConfig, DiffusionConfig, PI0Config, SmolVLAConfig, VQBeTConfig  # noqa: F401
 from lerobot.robots.robot import Robot
+from lerobot.transport.wire_format import ObservationSchema, decode_action_chunk, encode_action_chunk
 from lerobot.utils.utils import init_logging
 
 Action = torch.Tensor
@@ -65,6 +72,14 @@ def validate_robot_cameras_for_policy(
     )
 
 
+def validate_robot_actions_for_policy(robot_action_features: dict[str, type], policy_action_dim: int) -> None:
+    if len(robot_action_features) != policy_action_dim:
+        raise ValueError(
+            f"The policy predicts actions of {policy_action_dim} values, the robot expects "
+            f"{len(robot_action_features)}: {list(robot_action_features)}"
+        )
+
+
 def map_robot_keys_to_lerobot_features(robot: Robot) -> dict[str, dict]:
     return hw_to_dataset_features(robot.observation_features, "observation", use_video=False)
 
@@ -73,11 +88,23 @@ def is_image_key(k: str) -> bool:
     return k.startswith(OBS_IMAGES)
 
 
+def policy_camera_shapes(policy_image_features: dict[str, PolicyFeature]) -> dict[str, tuple[int, int, int]]:
+    """Maps the (C, H, W) policy image features to the (H, W, C) frame shapes of the robot cameras, e.g.
+    {"observation.images.front": (3, 224, 224)} -> {"front": (224, 224, 3)}."""
+    return {
+        key.removeprefix(f"{OBS_IMAGES}."): (ft.shape[1], ft.shape[2], ft.shape[0])
+        for key, ft in policy_image_features.items()
+    }
+
+
 def resize_robot_observation_image(image: torch.tensor, resize_dims: tuple[int, int, int]) -> torch.tensor:
     assert image.ndim == 3, f"Image must be (C, H, W)! Received {image.shape}"
     # (H, W, C) -> (C, H, W) for resizing from robot obsevation resolution to policy image resolution
     image = image.permute(2, 0, 1)
     dims = (resize_dims[1], resize_dims[2])
+    if tuple(image.shape[1:]) == dims:
+        # Already at the policy resolution, e.g. resized by the client before sending it
+        return image
     # Add batch dimension for interpolate: (C, H, W) -> (1, C, H, W)
     image_batched = image.unsqueeze(0)
     # Interpolate and remove batch dimension: (1, C, H, W) -> (C, H, W)
@@ -92,20 +119,99 @@ def raw_observation_to_observation(
     policy_image_features: dict[str, PolicyFeature],
     device: str,
 ) -> Observation:
-    observation = {}
+    return ObservationPreprocessor(lerobot_features, policy_image_features, device)(raw_observation)
+
+
+class ObservationPreprocessor:
+    """Turns the raw observations of a robot into policy inputs on `device`: a (1, state_dim) state,
+    (1, C, H, W) float images in [0, 1] resized to the policy image shapes, and the task if any.
 
-    observation = prepare_raw_observation(raw_observation, lerobot_features, policy_image_features)
-    for k, v in observation.items():
-        if isinstance(v, torch.Tensor):  # VLAs present natural-language instructions in observations
-            if "image" in k:
-                # Policy expects images in shape (B, C, H, W)
-                observation[k] = prepare_image(v).unsqueeze(0).to(device)
-            else:
-                observation[k] = v.to(device)
-        else:
-            observation[k] = v
+    The camera frames are copied once into a staging buffer (pinned when `device` is a GPU) and uploaded as
+    uint8. The (H, W, C) -> (C, H, W) permutation, the conversion to float in [0, 1] and the resizing to the
+    policy image shapes then run on the device, in one batched op for the cameras sharing a frame and a policy
+    shape.
+    The staging buffers are reused across calls, so a preprocessor must not be called concurrently.
+    """
 
-    return observation
+    def __init__(
+        self,
+        lerobot_features: dict[str, dict],
+        policy_image_features: dict[str, PolicyFeature],
+        device: str | torch.device,
+    ):
+        self.device = torch.device(device)
+        self.state_names = lerobot_features[OBS_STATE]["names"] if OBS_STATE in lerobot_features else None
+        # observation.images.<camera> -> (camera, (H, W) of the policy image)
+        self.cameras = {
+            key: (key.removeprefix(f"{OBS_IMAGES}."), tuple(policy_image_features[key].shape[1:]))
+            for key in lerobot_features
+            if is_image_key(key)
+        }
+        self.pin_memory = self.device.type == "cuda"
+        # (num_cameras, H, W, C, dtype) -> (host staging buffer, device buffer)
+        self._buffers: dict[tuple, tuple[torch.Tensor, torch.Tensor]] = {}
+        self._upload_done = torch.cuda.Event() if self.pin_memory else None
+
+    def _get_buffers(self, shape: tuple[int, ...], dtype: torch.dtype) -> tuple[torch.Tensor, torch.Tensor]:
+        key = (*shape, dtype)
+        if key not in self._buffers:
+            host = torch.empty(shape, dtype=dtype, pin_memory=self.pin_memory)
+            on_device = host
+            if self.device.type != "cpu":
+                on_device = torch.empty(shape, dtype=dtype, device=self.device)
+            self._buffers[key] = (host, on_device)
+        return self._buffers[key]
+
+    def __call__(self, raw_observation: RawObservation) -> Observation:
+        observation = {}
+        if self.state_names is not None:
+            # state's shape is expected as (B, state_dim)
+            state = torch.tensor([raw_observation[name] for name in self.state_names], dtype=torch.float32)
+            observation[OBS_STATE] = state.unsqueeze(0).to(self.device)
+
+        groups: dict[tuple, list[str]] = {}
+        for key, (camera, size) in self.cameras.items():
+            frame = torch.as_tensor(raw_observation[camera])
+            assert frame.ndim == 3, f"Image must be (H, W, C)! Received {frame.shape}"
+            groups.setdefault((tuple(frame.shape), frame.dtype, size), []).append(key)
+
+        if self._upload_done is not None:
+            # The previous uploads must be done before their staging buffers are written again
+            self._upload_done.synchronize()
+
+        for (frame_shape, dtype, size), keys in groups.items():
+            host, on_device = self._get_buffers((len(keys), *frame_shape), dtype)
+            for i, key in enumerate(keys):
+                host[i].copy_(torch.as_tensor(raw_observation[self.cameras[key][0]]))
+            if on_device is not host:
+                on_device.copy_(host, non_blocking=self.pin_memory)
+
+            # (N, H, W, C) -> (N, C, H, W), a channels-last view of the frames
+            images = on_device.permute(0, 3, 1, 2)
+            # The CPU resizes uint8 channels-last frames much faster than float ones, GPUs resize in float
+            resize_first = self.device.type == "cpu"
+            if resize_first and tuple(images.shape[2:]) != size:
+                images = torch.nn.functional.interpolate(
+                    images, size=size, mode="bilinear", align_corners=False
+                )
+            # float32 in [0, 1], in a new contiguous tensor
+            images = images.to(torch.float32, memory_format=torch.contiguous_format, copy=True).div_(255)
+            if not resize_first and tuple(images.shape[2:]) != size:
+                images = torch.nn.functional.interpolate(
+                    images, size=size, mode="bilinear", align_corners=False
+                )
+            # Policy expects images in shape (B, C, H, W)
+            for i, key in enumerate(keys):
+                observation[key] = images[i : i + 1]
+
+        if self._upload_done is not None:
+            self._upload_done.record()
+
+        # VLAs present natural-language instructions in observations
+        if "task" in raw_observation:
+            observation["task"] = raw_observation["task"]
+
+        return observation
 
 
 def prepare_image(image: torch.Tensor) -> torch.Tensor:
@@ -159,14 +265,13 @@ def prepare_raw_observation(
     image_keys = list(filter(is_image_key, lerobot_obs))
     # state's shape is expected as (B, state_dim)
     state_dict = {OBS_STATE: extract_state_from_raw_observation(lerobot_obs)}
-    image_dict = {
-        image_k: extract_images_from_raw_observation(lerobot_obs, image_k) for image_k in image_keys
-    }
 
     # Turns the image features to (C, H, W) with H, W matching the policy image features.
     # This reduces the resolution of the images
     image_dict = {
-        key: resize_robot_observation_image(torch.tensor(lerobot_obs[key]), policy_image_features[key].shape)
+        key: resize_robot_observation_image(
+            extract_images_from_raw_observation(lerobot_obs, key), policy_image_features[key].shape
+        )
         for key in image_keys
     }
 
@@ -238,6 +343,145 @@ class TimedObservation(TimedData):
         return self.observation
 
 
+def timed_observation_to_bytes(obs: TimedObservation, schema: ObservationSchema) -> bytearray:
+    return schema.encode(obs.get_observation(), obs.get_timestep(), obs.get_timestamp(), obs.must_go)
+
+
+def bytes_to_timed_observation(
+    data: bytes, schema: ObservationSchema, executor: Executor | None = None
+) -> TimedObservation:
+    observation, timestep, timestamp, must_go = schema.decode(data, executor)
+    return TimedObservation(timestamp=timestamp, timestep=timestep, observation=observation, must_go=must_go)
+
+
+def timed_actions_to_bytes(timed_actions: list[TimedAction]) -> bytearray:
+    return encode_action_chunk(
+        [action.get_timestamp() for action in timed_actions],
+        [action.get_timestep() for action in timed_actions],
+        torch.stack([action.get_action() for action in timed_actions]),
+    )
+
+
+def bytes_to_timed_actions(data: bytes) -> list[TimedAction]:
+    timestamps, timesteps, actions = decode_action_chunk(data)
+    return [
+        TimedAction(timestamp=timestamp, timestep=timestep, action=action)
+        for timestamp, timestep, action in zip(timestamps.tolist(), timesteps.tolist(), actions, strict=True)
+    ]
+
+
+class ActionRingBuffer:
+    """Queue of the actions of consecutive timesteps, held in one preallocated (capacity, action_dim) tensor.
+
+    The action of timestep t lives in slot t % capacity, so popping the next action is O(1) and merging a new
+    chunk aggregates all the timesteps it shares with the queue in a single call of the aggregate function.
+    It is not thread-safe, `RobotClient` guards it with its `action_queue_lock`.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # Allocated with the first chunk, whose actions give the shape and dtype
+        self._actions: torch.Tensor | None = None
+        self._timestamps = [0.0] * capacity
+        # The queue holds the timesteps in [start, end)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def qsize(self) -> int:
+        return len(self)
+
+    def empty(self) -> bool:
+        return self._end == self._start
+
+    @property
+    def timesteps(self) -> range:
+        return range(self._start, self._end)
+
+    def __iter__(self):
+        for timestep in self.timesteps:
+            slot = timestep % self.capacity
+            yield TimedAction(
+                timestamp=self._timestamps[slot], timestep=timestep, action=self._actions[slot].clone()
+            )
+
+    def _slices(self, start: int, end: int) -> list[tuple[slice, slice]]:
+        """(slots, rows) slices covering timesteps [start, end) in the buffer and in a (end - start) tensor,
+        split where the ring wraps around."""
+        first = start % self.capacity
+        head = min(end - start, self.capacity - first)
+        return [
+            (slice(first, first + head), slice(0, head)),
+            (slice(0, end - start - head), slice(head, None)),
+        ]
+
+    def _read(self, start: int, end: int) -> torch.Tensor:
+        return torch.cat([self._actions[slots] for slots, _ in self._slices(start, end)])
+
+    def _write(self, start: int, actions: torch.Tensor, timestamps: list[float] | None = None) -> None:
+        for slots, rows in self._slices(start, start + len(actions)):
+            self._actions[slots] = actions[rows]
+            if timestamps is not None:
+                self._timestamps[slots] = timestamps[rows]
+
+    def merge(
+        self,
+        first_timestep: int,
+        timestamps: list[float],
+        actions: torch.Tensor,
+        latest_timestep: int,
+        aggregate_fn: Callable[[torch.Tensor, torch.Tensor], torch.Tensor] | None = None,
+    ) -> None:
+        """Replaces the queue with the actions of a chunk starting at `first_timestep` that come after
+        `latest_timestep`. The actions of the timesteps already queued are aggregated with
+        `aggregate_fn(old, new)`, by default the new ones are kept."""
+        start = max(first_timestep, latest_timestep + 1)
+        end = first_timestep + len(actions)
+        if start >= end:
+            # All the actions of the chunk are stale
+            self._start = self._end = start
+            return
+
+        new_actions = actions[start - first_timestep :]
+        new_timestamps = timestamps[start - first_timestep :]
+        overlap_start, overlap_end = max(start, self._start), min(end, self._end)
+        aggregated = None
+        if aggregate_fn is not None and overlap_start < overlap_end:
+            aggregated = aggregate_fn(
+                self._read(overlap_start, overlap_end),
+                new_actions[overlap_start - start : overlap_end - start],
+            )
+
+        if (
+            self._actions is None
+            or end - start > self.capacity
+            or self._actions.shape[1:] != new_actions.shape[1:]
+            or self._actions.dtype != new_actions.dtype
+        ):
+            # Chunks longer than the buffer are not expected, grow it rather than dropping actions
+            self.capacity = max(self.capacity, end - start)
+            self._actions = torch.empty((self.capacity, *new_actions.shape[1:]), dtype=new_actions.dtype)
+            self._timestamps = [0.0] * self.capacity
+
+        self._write(start, new_actions, new_timestamps)
+        if aggregated is not None:
+            self._write(overlap_start, aggregated)
+        self._start, self._end = start, end
+
+    def pop(self) -> TimedAction:
+        """Removes and returns the action of the earliest timestep, raises `queue.Empty` if there is none."""
+        if self.empty():
+            raise Empty
+        slot = self._start % self.capacity
+        timed_action = TimedAction(
+            timestamp=self._timestamps[slot], timestep=self._start, action=self._actions[slot].clone()
+        )
+        self._start += 1
+        return timed_action
+
+
 @dataclass
 class FPSTracker:
     """Utility class to track FPS metrics over time."""
@@ -266,6 +510,59 @@ class FPSTracker:
         self.total_obs_count = 0
 
 
+@dataclass
+class DeadlineTracker:
+    """Tracks the timing of a periodic loop: its periods and its missed deadlines."""
+
+    target_period: float
+    window: int = 1000
+    ticks: int = 0
+    missed_deadlines: int = 0
+    last_tick: float | None = None
+
+    def __post_init__(self):
+        # Seconds between the starts of consecutive iterations, over the last `window` ones
+        self.periods = deque(maxlen=self.window)
+
+    def tick(self, now: float) -> None:
+        """Records the start of an iteration of the loop"""
+        self.ticks += 1
+        if self.last_tick is not None:
+            self.periods.append(now - self.last_tick)
+        self.last_tick = now
+
+    def miss(self, num_deadlines: int = 1) -> None:
+        """Records deadlines missed because an iteration ran past them"""
+        self.missed_deadlines += num_deadlines
+
+    def statistics(self) -> dict[str, float]:
+        """Period statistics in ms, the jitter being the deviation of the periods from the target one"""
+        periods_ms = np.array(self.periods) * 1e3
+        jitter_ms = np.abs(periods_ms - self.target_period * 1e3)
+        return {
+            "ticks": self.ticks,
+            "missed_deadlines": self.missed_deadlines,
+            "mean_period_ms": float(periods_ms.mean()) if len(periods_ms) else 0.0,
+            "p99_period_ms": float(np.percentile(periods_ms, 99)) if len(periods_ms) else 0.0,
+            "mean_jitter_ms": float(jitter_ms.mean()) if len(jitter_ms) else 0.0,
+            "max_jitter_ms": float(jitter_ms.max()) if len(jitter_ms) else 0.0,
+        }
+
+    def histogram(self, num_bins: int = 10) -> tuple[np.ndarray, np.ndarray]:
+        """Counts of the periods, and the edges in ms of their `num_bins` bins"""
+        return np.histogram(np.array(self.periods) * 1e3, bins=num_bins)
+
+
+def set_realtime_priority(priority: int) -> bool:
+    """Gives the calling thread a real-time (SCHED_FIFO) priority, on Linux. Returns whether it succeeded,
+    which requires the CAP_SYS_NICE capability."""
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError):
+        return False
+    return True
+
+
 @dataclass
 class RemotePolicyConfig:
     policy_type: str
@@ -273,6 +570,31 @@ class RemotePolicyConfig:
     lerobot_features: dict[str, PolicyFeature]
     actions_per_chunk: int
     device: str = "cpu"
+    # Layout of the observations sent by the client, see `lerobot.transport.wire_format`
+    observation_schema: ObservationSchema | None = None
+
+    def to_bytes(self) -> bytes:
+        """Serializes the config as JSON, so the server never unpickles data received from the network."""
+        config = {
+            "policy_type": self.policy_type,
+            "pretrained_name_or_path": self.pretrained_name_or_path,
+            "lerobot_features": self.lerobot_features,
+            "actions_per_chunk": self.actions_per_chunk,
+            "device": self.device,
+            "observation_schema": self.observation_schema.to_dict() if self.observation_schema else None,
+        }
+        return json.dumps(config).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RemotePolicyConfig":
+        config = json.loads(data)
+        # JSON turns the shape tuples into lists
+        config["lerobot_features"] = {
+            key: {**ft, "shape": tuple(ft["shape"])} for key, ft in config["lerobot_features"].items()
+        }
+        if config["observation_schema"] is not None:
+            config["observation_schema"] = ObservationSchema.from_dict(config["observation_schema"])
+        return cls(**config)
 
 
 def _compare_observation_states(obs1_state: torch.Tensor, obs2_state: torch.Tensor, atol: float) -> bool:
@@ -22,8 +22,8 @@ python src/lerobot/scripts/server/policy_server.py \
 ```
 """
 
+import json
 import logging
-import pickle  # nosec
 import threading
 import time
 from concurrent import futures
@@ -40,16 +40,24 @@ sys.path.append('src/')
 
 from lerobot.policies.factory import get_policy_class
 from lerobot.scripts.server.configs import PolicyServerConfig
-from lerobot.scripts.server.constants import SUPPORTED_POLICIES
+from lerobot.scripts.server.constants import (
+    CLIENT_ID_METADATA_KEY,
+    POLICY_ACTION_DIM_METADATA_KEY,
+    POLICY_IMAGE_SHAPES_METADATA_KEY,
+    SUPPORTED_POLICIES,
+)
 from lerobot.scripts.server.helpers import (
     FPSTracker,
     Observation,
+    ObservationPreprocessor,
     RemotePolicyConfig,
     TimedAction,
     TimedObservation,
+    bytes_to_timed_observation,
     get_logger,
     observations_similar,
-    raw_observation_to_observation,
+    policy_camera_shapes,
+    timed_actions_to_bytes,
 )
 from lerobot.transport import (
     services_pb2,  # type: ignore
@@ -58,6 +66,12 @@ from lerobot.transport import (
 from lerobot.transport.utils import receive_bytes_in_chunks
 
 
+def get_client_id(context: grpc.ServicerContext) -> str:
+    """Identifies the robot client of a call by its `client-id` metadata, or by its address otherwise."""
+    metadata = dict(context.invocation_metadata() or ())
+    return metadata.get(CLIENT_ID_METADATA_KEY, context.peer())
+
+
 class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
     prefix = "policy_server"
     logger = get_logger(prefix)
@@ -75,14 +89,23 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
         self._predicted_timesteps = set()
 
         self.last_processed_obs = None
+        # Incremented when a new client connects, to close the action streams of the previous one
+        self._session = 0
 
         # Attributes will be set by SendPolicyInstructions
         self.device = None
         self.policy_type = None
         self.lerobot_features = None
+        self.observation_schema = None
+        self.observation_preprocessor = None
         self.actions_per_chunk = None
         self.policy = None
 
+        # Decodes the camera frames compressed by the client concurrently
+        self.image_decode_executor = futures.ThreadPoolExecutor(
+            max_workers=config.image_decode_workers, thread_name_prefix="image_decode"
+        )
+
     @property
     def running(self):
         return not self.shutdown_event.is_set()
@@ -95,6 +118,7 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
         """Flushes server state when new client connects."""
         # only running inference on the latest observation received by the server
         self.shutdown_event.set()
+        self._session += 1
         self.observation_queue = Queue(maxsize=1)
 
         with self._predicted_timesteps_lock:
@@ -117,10 +141,7 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
 
         client_id = context.peer()
 
-        policy_specs = pickle.loads(request.data)  # nosec
-
-        if not isinstance(policy_specs, RemotePolicyConfig):
-            raise TypeError(f"Policy specs must be a RemotePolicyConfig. Got {type(policy_specs)}")
+        policy_specs = RemotePolicyConfig.from_bytes(request.data)
 
         if policy_specs.policy_type not in SUPPORTED_POLICIES:
             raise ValueError(
@@ -150,11 +171,31 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
 
         self.logger.info(f"Time taken to put policy on {self.device}: {end - start:.4f} seconds")
 
+        self.observation_preprocessor = ObservationPreprocessor(
+            self.lerobot_features, self.policy_image_features, self.device
+        )
+
+        # The client may resize its frames to the policy resolution, both ends derive the same schema
+        image_shapes = policy_camera_shapes(self.policy_image_features)
+        self.observation_schema = policy_specs.observation_schema
+        if self.observation_schema is not None and self.observation_schema.resize_images:
+            self.observation_schema = self.observation_schema.resized(image_shapes)
+        context.set_trailing_metadata(
+            (
+                (POLICY_IMAGE_SHAPES_METADATA_KEY, json.dumps(image_shapes)),
+                (POLICY_ACTION_DIM_METADATA_KEY, str(self.policy.config.action_feature.shape[0])),
+            )
+        )
+
         return services_pb2.Empty()
 
     def SendObservations(self, request_iterator, context):  # noqa: N802
         """Receive observations from the robot client"""
         client_id = context.peer()
+        if self.observation_schema is None:
+            context.abort(
+                grpc.StatusCode.FAILED_PRECONDITION, "No observation schema, send policy instructions"
+            )
         self.logger.debug(f"Receiving observations from {client_id}")
 
         receive_time = time.time()  # comparing timestamps so need time.time()
@@ -162,7 +203,9 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
         received_bytes = receive_bytes_in_chunks(
             request_iterator, None, self.shutdown_event, self.logger
         )  # blocking call while looping over request_iterator
-        timed_observation = pickle.loads(received_bytes)  # nosec
+        timed_observation = bytes_to_timed_observation(
+            received_bytes, self.observation_schema, self.image_decode_executor
+        )
         deserialize_time = time.perf_counter() - start_deserialize
 
         self.logger.debug(f"Received observation #{timed_observation.get_timestep()}")
@@ -203,35 +246,7 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
         try:
             getactions_starts = time.perf_counter()
             obs = self.observation_queue.get(timeout=self.config.obs_queue_timeout)
-            self.logger.info(
-                f"Running inference for observation #{obs.get_timestep()} (must_go: {obs.must_go})"
-            )
-
-            with self._predicted_timesteps_lock:
-                self._predicted_timesteps.add(obs.get_timestep())
-
-            start_time = time.perf_counter()
-            action_chunk = self._predict_action_chunk(obs)
-            inference_time = time.perf_counter() - start_time
-
-            start_time = time.perf_counter()
-            actions_bytes = pickle.dumps(action_chunk)  # nosec
-            serialize_time = time.perf_counter() - start_time
-
-            # Create and return the action chunk
-            actions = services_pb2.Actions(data=actions_bytes)
-
-            self.logger.info(
-                f"Action chunk #{obs.get_timestep()} generated | "
-                f"Total time: {(inference_time + serialize_time) * 1000:.2f}ms"
-            )
-
-            self.logger.debug(
-                f"Action chunk #{obs.get_timestep()} generated | "
-                f"Inference time: {inference_time:.2f}s |"
-                f"Serialize time: {serialize_time:.2f}s |"
-                f"Total time: {inference_time + serialize_time:.2f}s"
-            )
+            actions = self._run_inference(obs)
 
             time.sleep(
                 max(0, self.config.inference_latency - max(0, time.perf_counter() - getactions_starts))
@@ -243,10 +258,69 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
             return services_pb2.Empty()
 
         except Exception as e:
-            self.logger.error(f"Error in StreamActions: {e}")
+            self.logger.error(f"Error in GetActions: {e}")
 
             return services_pb2.Empty()
 
+    def StreamActions(self, request, context):  # noqa: N802
+        """Pushes each action chunk to the robot client as soon as its inference finishes.
+
+        Unlike `GetActions`, the client doesn't poll and `inference_latency` isn't emulated. The generator is
+        only resumed once gRPC has sent the previous chunk, so a slow client delays the next inference
+        instead of having chunks pile up (backpressure). The stream ends when the client cancels it, or
+        when a new client connects with `Ready`.
+        """
+        client_id = context.peer()
+        if self.policy is None:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "No policy loaded, send policy instructions")
+
+        session = self._session
+        self.logger.info(f"Client {client_id} connected for action streaming")
+        while self.running and session == self._session and context.is_active():
+            try:
+                obs = self.observation_queue.get(timeout=self.config.obs_queue_timeout)
+            except Empty:  # no observation in obs_queue_timeout, check that the stream is still alive
+                continue
+
+            try:
+                actions = self._run_inference(obs)
+            except Exception as e:
+                self.logger.error(f"Error in StreamActions: {e}")
+                continue
+
+            yield actions
+
+        self.logger.info(f"Action stream of client {client_id} closed")
+
+    def _run_inference(self, obs: TimedObservation) -> services_pb2.Actions:
+        """Predicts the action chunk of an observation and serializes it."""
+        self.logger.info(f"Running inference for observation #{obs.get_timestep()} (must_go: {obs.must_go})")
+
+        with self._predicted_timesteps_lock:
+            self._predicted_timesteps.add(obs.get_timestep())
+
+        start_time = time.perf_counter()
+        action_chunk = self._predict_action_chunk(obs)
+        inference_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        actions_bytes = bytes(timed_actions_to_bytes(action_chunk))
+        serialize_time = time.perf_counter() - start_time
+
+        self.logger.info(
+            f"Action chunk #{obs.get_timestep()} generated | "
+            f"Total time: {(inference_time + serialize_time) * 1000:.2f}ms"
+        )
+
+        self.logger.debug(
+            f"Action chunk #{obs.get_timestep()} generated | "
+            f"Inference time: {inference_time:.2f}s |"
+            f"Serialize time: {serialize_time:.2f}s |"
+            f"Total time: {inference_time + serialize_time:.2f}s"
+        )
+
+        return services_pb2.Actions(data=actions_bytes)
+
     def _obs_sanity_checks(self, obs: TimedObservation, previous_obs: TimedObservation) -> bool:
         """Check if the observation is valid to be processed by the policy"""
         return True
@@ -305,19 +379,24 @@ class PolicyServer(services_pb2_grpc.AsyncInferenceServicer):
             for i, action in enumerate(action_chunk)
         ]
 
-    def _prepare_observation(self, observation_t: TimedObservation) -> Observation:
+    def _prepare_observation(
+        self, observation_t: TimedObservation, preprocessor: ObservationPreprocessor | None = None
+    ) -> Observation:
         """
         Prepare observation, ready for policy inference.
         E.g.: To keep observation sampling rate high (and network packet tiny) we send int8 [0,255] images from the
-        client and then convert them to float32 [0,1] images here, before running inference.
+        client and then convert them to float32 [0,1] images here, on the policy device, before running inference.
+        `preprocessor` defaults to the one of the connected robot.
         """
+        if preprocessor is None:
+            if self.observation_preprocessor is None:
+                self.observation_preprocessor = ObservationPreprocessor(
+                    self.lerobot_features, self.policy_image_features, self.device
+                )
+            preprocessor = self.observation_preprocessor
+
         # RawObservation from robot.get_observation() - wrong keys, wrong dtype, wrong image shape
-        observation: Observation = raw_observation_to_observation(
-            observation_t.get_observation(),
-            self.lerobot_features,
-            self.policy_image_features,
-            self.device,
-        )
+        observation: Observation = preprocessor(observation_t.get_observation())
         # processed Observation - right keys, right dtype, right image shape
 
         return observation
@@ -389,10 +468,16 @@ def serve(cfg: PolicyServerConfig):
     logging.info(pformat(asdict(cfg)))
 
     # Create the server instance first
-    policy_server = PolicyServer(cfg)
+    if cfg.max_clients > 1:
+        from lerobot.scripts.server.batched_policy_server import BatchedPolicyServer
+
+        policy_server = BatchedPolicyServer(cfg)
+    else:
+        policy_server = PolicyServer(cfg)
 
     # Setup and start gRPC server
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    # Each client holds a worker with its action stream, and needs others to send its observations
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4 * cfg.max_clients))
     services_pb2_grpc.add_AsyncInferenceServicer_to_server(policy_server, server)
     server.add_insecure_port(f"{cfg.host}:{cfg.port}")
 
@@ -276,18 +276,20 @@ python src/lerobot/scripts/server/robot_client.py \
     --verify_robot_cameras=False
 """
 
+import json
 import logging
-import pickle  # nosec
 import threading
 import time
+import uuid
+from collections import deque
 from collections.abc import Callable
 from dataclasses import asdict
 from pprint import pformat
-from queue import Queue
 from typing import Any
 
 import draccus
 import grpc
+import numpy as np
 import torch
 
 import sys
@@ -315,17 +317,31 @@ from lerobot.robots import (  # noqa: F401
     ros_robot,
 )
 from lerobot.scripts.server.configs import RobotClientConfig
-from lerobot.scripts.server.constants import SUPPORTED_ROBOTS
+from lerobot.scripts.server.constants import (
+    CLIENT_ID_METADATA_KEY,
+    DEFAULT_RECONNECT_BACKOFF,
+    LATENCY_WINDOW,
+    MAX_RECONNECT_BACKOFF,
+    POLICY_ACTION_DIM_METADATA_KEY,
+    POLICY_IMAGE_SHAPES_METADATA_KEY,
+    SUPPORTED_ROBOTS,
+)
 from lerobot.scripts.server.helpers import (
     Action,
+    ActionRingBuffer,
+    DeadlineTracker,
     FPSTracker,
     Observation,
     RawObservation,
     RemotePolicyConfig,
     TimedAction,
     TimedObservation,
+    bytes_to_timed_actions,
     get_logger,
     map_robot_keys_to_lerobot_features,
+    set_realtime_priority,
+    timed_observation_to_bytes,
+    validate_robot_actions_for_policy,
     validate_robot_cameras_for_policy,
     visualize_action_queue_size,
 )
@@ -334,6 +350,7 @@ from lerobot.transport import (
     services_pb2_grpc,  # type: ignore
 )
 from lerobot.transport.utils import grpc_channel_options, send_bytes_in_chunks
+from lerobot.transport.wire_format import ObservationSchema
 
 
 class RobotClient:
@@ -370,11 +387,24 @@ class RobotClient:
             lerobot_features,
             config.actions_per_chunk,
             config.policy_device,
+            ObservationSchema.from_features(
+                self.robot.observation_features,
+                image_codecs={
+                    camera: (codec, config.image_quality.get(camera))
+                    for camera, codec in config.image_codecs.items()
+                },
+                resize_images=config.resize_images,
+            ),
         )
+        # Layout of the observations actually sent, resized once the server returns the policy image shapes
+        self.observation_schema = self.policy_config.observation_schema
         self.channel = grpc.insecure_channel(
             self.server_address, grpc_channel_options(initial_backoff=f"{config.environment_dt:.4f}s")
         )
         self.stub = services_pb2_grpc.AsyncInferenceStub(self.channel)
+        # Identifies this client to a server serving several robots
+        self.client_id = uuid.uuid4().hex
+        self.grpc_metadata = ((CLIENT_ID_METADATA_KEY, self.client_id),)
         self.logger.info(f"Initializing client to connect to server at {self.server_address}")
 
         self.shutdown_event = threading.Event()
@@ -386,13 +416,22 @@ class RobotClient:
 
         self._chunk_size_threshold = config.chunk_size_threshold
 
-        self.action_queue = Queue()
+        self.action_queue = ActionRingBuffer(capacity=config.actions_per_chunk)
         self.action_queue_lock = threading.Lock()  # Protect queue operations
         self.action_queue_size = []
         self.start_barrier = threading.Barrier(2)  # 2 threads: action receiver, control loop
+        # The robot is read by the observation thread and driven by the action thread
+        self.robot_lock = threading.Lock()
+        # Wakes the observation thread up after each action
+        self.observation_trigger = threading.Event()
+
+        # Periods and missed deadlines of the action loop
+        self.action_loop_timing = DeadlineTracker(target_period=config.environment_dt)
 
         # FPS measurement
         self.fps_tracker = FPSTracker(target_fps=self.config.fps)
+        # Seconds between the capture of an observation and the reception of its action chunk
+        self.action_latencies = deque(maxlen=LATENCY_WINDOW)
 
         self.logger.info("Robot connected and ready")
 
@@ -409,12 +448,12 @@ class RobotClient:
         try:
             # client-server handshake
             start_time = time.perf_counter()
-            self.stub.Ready(services_pb2.Empty())
+            self.stub.Ready(services_pb2.Empty(), metadata=self.grpc_metadata)
             end_time = time.perf_counter()
             self.logger.debug(f"Connected to policy server in {end_time - start_time:.4f}s")
 
             # send policy instructions
-            policy_config_bytes = pickle.dumps(self.policy_config)
+            policy_config_bytes = self.policy_config.to_bytes()
             policy_setup = services_pb2.PolicySetup(data=policy_config_bytes)
 
             self.logger.info("Sending policy instructions to policy server")
@@ -424,7 +463,17 @@ class RobotClient:
                 f"Device: {self.policy_config.device}"
             )
 
-            self.stub.SendPolicyInstructions(policy_setup)
+            _, call = self.stub.SendPolicyInstructions.with_call(policy_setup, metadata=self.grpc_metadata)
+            metadata = dict(call.trailing_metadata() or ())
+            # Fail before the control loop starts rather than on the first action
+            if POLICY_ACTION_DIM_METADATA_KEY in metadata:
+                validate_robot_actions_for_policy(
+                    self.robot.action_features, int(metadata[POLICY_ACTION_DIM_METADATA_KEY])
+                )
+            if self.observation_schema.resize_images and POLICY_IMAGE_SHAPES_METADATA_KEY in metadata:
+                image_shapes = json.loads(metadata[POLICY_IMAGE_SHAPES_METADATA_KEY])
+                self.observation_schema = self.policy_config.observation_schema.resized(image_shapes)
+                self.logger.info(f"Resizing the camera frames to the policy image shapes: {image_shapes}")
 
             self.shutdown_event.clear()
 
@@ -438,12 +487,33 @@ class RobotClient:
         """Stop the robot client"""
         self.shutdown_event.set()
 
+        if self.action_latencies:
+            latencies = self.action_latency_percentiles()
+            self.logger.info(
+                "Observation -> action latency | "
+                + " | ".join(f"p{p}: {latency:.2f}ms" for p, latency in latencies.items())
+            )
+        if self.action_loop_timing.ticks:
+            timing = self.action_loop_timing.statistics()
+            self.logger.info(
+                f"Action loop | ticks: {timing['ticks']} | missed deadlines: {timing['missed_deadlines']} | "
+                f"mean period: {timing['mean_period_ms']:.2f}ms | "
+                f"p99 period: {timing['p99_period_ms']:.2f}ms | "
+                f"max jitter: {timing['max_jitter_ms']:.2f}ms"
+            )
+
         self.robot.disconnect()
         self.logger.debug("Robot disconnected")
 
         self.channel.close()
         self.logger.debug("Client stopped, channel closed")
 
+    def action_latency_percentiles(self, percentiles: tuple[int, ...] = (50, 90, 99)) -> dict[int, float]:
+        """Percentiles, in ms, of the time between the capture of an observation and the reception of its
+        action chunk, over the last `LATENCY_WINDOW` chunks."""
+        latencies = np.percentile(np.array(self.action_latencies) * 1e3, percentiles)
+        return dict(zip(percentiles, latencies.tolist(), strict=True))
+
     def send_observation(
         self,
         obs: TimedObservation,
@@ -457,7 +527,7 @@ class RobotClient:
             raise ValueError("Input observation needs to be a TimedObservation!")
 
         start_time = time.perf_counter()
-        observation_bytes = pickle.dumps(obs)
+        observation_bytes = timed_observation_to_bytes(obs, self.observation_schema)
         serialize_time = time.perf_counter() - start_time
         self.logger.debug(f"Observation serialization time: {serialize_time:.6f}s")
 
@@ -468,7 +538,7 @@ class RobotClient:
                 log_prefix="[CLIENT] Observation",
                 silent=True,
             )
-            _ = self.stub.SendObservations(observation_iterator)
+            _ = self.stub.SendObservations(observation_iterator, metadata=self.grpc_metadata)
             obs_timestep = obs.get_timestep()
             self.logger.info(f"Sent observation #{obs_timestep} | ")
 
@@ -481,7 +551,7 @@ class RobotClient:
     def _inspect_action_queue(self):
         with self.action_queue_lock:
             queue_size = self.action_queue.qsize()
-            timestamps = sorted([action.get_timestep() for action in self.action_queue.queue])
+            timestamps = list(self.action_queue.timesteps)
         self.logger.debug(f"Queue size: {queue_size}, Queue contents: {timestamps}")
         return queue_size, timestamps
 
@@ -490,127 +560,149 @@ class RobotClient:
         incoming_actions: list[TimedAction],
         aggregate_fn: Callable[[torch.Tensor, torch.Tensor], torch.Tensor] | None = None,
     ):
-        """Finds the same timestep actions in the queue and aggregates them using the aggregate_fn"""
-        if aggregate_fn is None:
-            # default aggregate function: take the latest action
-            def aggregate_fn(x1, x2):
-                return x2
+        """Replaces the queue with the incoming actions that are not stale, aggregating those of the timesteps
+        already in the queue with the aggregate_fn (default: keep the incoming action)"""
+        if not incoming_actions:
+            return
 
-        future_action_queue = Queue()
-        with self.action_queue_lock:
-            internal_queue = self.action_queue.queue
-
-        current_action_queue = {action.get_timestep(): action.get_action() for action in internal_queue}
+        # Chunks hold the actions of consecutive timesteps
+        actions = torch.stack([action.get_action() for action in incoming_actions])
+        timestamps = [action.get_timestamp() for action in incoming_actions]
 
-        for new_action in incoming_actions:
+        with self.action_queue_lock:
+            # Read under the queue lock, so that no action popped meanwhile is queued again
             with self.latest_action_lock:
                 latest_action = self.latest_action
-
-            # New action is older than the latest action in the queue, skip it
-            if new_action.get_timestep() <= latest_action:
-                continue
-
-            # If the new action's timestep is not in the current action queue, add it directly
-            elif new_action.get_timestep() not in current_action_queue:
-                future_action_queue.put(new_action)
-                continue
-
-            # If the new action's timestep is in the current action queue, aggregate it
-            # TODO: There is probably a way to do this with broadcasting of the two action tensors
-            future_action_queue.put(
-                TimedAction(
-                    timestamp=new_action.get_timestamp(),
-                    timestep=new_action.get_timestep(),
-                    action=aggregate_fn(
-                        current_action_queue[new_action.get_timestep()], new_action.get_action()
-                    ),
-                )
+            self.action_queue.merge(
+                incoming_actions[0].get_timestep(), timestamps, actions, latest_action, aggregate_fn
             )
 
-        with self.action_queue_lock:
-            self.action_queue = future_action_queue
-
     def receive_actions(self, verbose: bool = False):
         """Receive actions from the policy server"""
         # Wait at barrier for synchronized start
         self.start_barrier.wait()
         self.logger.info("Action receiving thread starting")
 
+        if self.config.stream_actions:
+            self._receive_action_stream(verbose)
+        else:
+            self._poll_actions(verbose)
+
+    def _poll_actions(self, verbose: bool = False) -> None:
+        """Repeatedly calls GetActions, which returns `Empty` when no observation was received in time."""
         while self.running:
             try:
-                # Use StreamActions to get a stream of actions from the server
-                actions_chunk = self.stub.GetActions(services_pb2.Empty())
+                actions_chunk = self.stub.GetActions(services_pb2.Empty(), metadata=self.grpc_metadata)
                 if len(actions_chunk.data) == 0:
                     continue  # received `Empty` from server, wait for next call
 
-                receive_time = time.time()
+                self._process_action_chunk(actions_chunk, verbose)
 
-                # Deserialize bytes back into list[TimedAction]
-                deserialize_start = time.perf_counter()
-                timed_actions = pickle.loads(actions_chunk.data)  # nosec
-                deserialize_time = time.perf_counter() - deserialize_start
+            except grpc.RpcError as e:
+                self.logger.error(f"Error receiving actions: {e}")
 
-                self.action_chunk_size = max(self.action_chunk_size, len(timed_actions))
+    def _receive_action_stream(self, verbose: bool = False) -> None:
+        """Receives the action chunks pushed by the server through StreamActions.
 
-                # Calculate network latency if we have matching observations
-                if len(timed_actions) > 0 and verbose:
-                    with self.latest_action_lock:
-                        latest_action = self.latest_action
+        The stream is reopened with an exponential backoff when it is interrupted (e.g. the server restarted or
+        the network dropped). If the server lost the policy, the policy instructions are sent again.
+        """
+        backoff = DEFAULT_RECONNECT_BACKOFF
+        while self.running:
+            try:
+                action_stream = self.stub.StreamActions(services_pb2.Empty(), metadata=self.grpc_metadata)
+                for actions_chunk in action_stream:
+                    backoff = DEFAULT_RECONNECT_BACKOFF
+                    self._process_action_chunk(actions_chunk, verbose)
+                if not self.running:
+                    break
+                self.logger.warning("Action stream closed by the server, reopening it")
 
-                    self.logger.debug(f"Current latest action: {latest_action}")
+            except grpc.RpcError as e:
+                if not self.running:
+                    break
+                self.logger.warning(f"Action stream interrupted ({e.code()}), reopening it in {backoff:.2f}s")
+                time.sleep(backoff)
+                backoff = min(2 * backoff, MAX_RECONNECT_BACKOFF)
+                if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
+                    self.start()
+
+            # The last observation may have been lost, let the next one trigger an inference
+            self.must_go.set()
+
+    def _process_action_chunk(self, actions_chunk: services_pb2.Actions, verbose: bool = False) -> None:
+        """Deserializes a chunk of actions received from the server and merges it into the action queue."""
+        receive_time = time.time()
+
+        # Deserialize bytes back into list[TimedAction]
+        deserialize_start = time.perf_counter()
+        timed_actions = bytes_to_timed_actions(actions_chunk.data)
+        deserialize_time = time.perf_counter() - deserialize_start
+
+        # The first action of a chunk is timestamped with the capture time of its observation
+        if len(timed_actions) > 0:
+            self.action_latencies.append(receive_time - timed_actions[0].get_timestamp())
+            # Validated against the policy in `start`
+            assert len(timed_actions[0].get_action()) == len(self.robot.action_features)
+
+        self.action_chunk_size = max(self.action_chunk_size, len(timed_actions))
+
+        # Calculate network latency if we have matching observations
+        if len(timed_actions) > 0 and verbose:
+            with self.latest_action_lock:
+                latest_action = self.latest_action
 
-                    # Get queue state before changes
-                    old_size, old_timesteps = self._inspect_action_queue()
-                    if not old_timesteps:
-                        old_timesteps = [latest_action]  # queue was empty
+            self.logger.debug(f"Current latest action: {latest_action}")
 
-                    # Get queue state before changes
-                    old_size, old_timesteps = self._inspect_action_queue()
-                    if not old_timesteps:
-                        old_timesteps = [latest_action]  # queue was empty
+            # Get queue state before changes
+            old_size, old_timesteps = self._inspect_action_queue()
+            if not old_timesteps:
+                old_timesteps = [latest_action]  # queue was empty
 
-                    # Log incoming actions
-                    incoming_timesteps = [a.get_timestep() for a in timed_actions]
+            # Get queue state before changes
+            old_size, old_timesteps = self._inspect_action_queue()
+            if not old_timesteps:
+                old_timesteps = [latest_action]  # queue was empty
 
-                    first_action_timestep = timed_actions[0].get_timestep()
-                    server_to_client_latency = (receive_time - timed_actions[0].get_timestamp()) * 1000
+            # Log incoming actions
+            incoming_timesteps = [a.get_timestep() for a in timed_actions]
 
-                    self.logger.info(
-                        f"Received action chunk for step #{first_action_timestep} | "
-                        f"Latest action: #{latest_action} | "
-                        f"Incoming actions: {incoming_timesteps[0]}:{incoming_timesteps[-1]} | "
-                        f"Network latency (server->client): {server_to_client_latency:.2f}ms | "
-                        f"Deserialization time: {deserialize_time * 1000:.2f}ms"
-                    )
+            first_action_timestep = timed_actions[0].get_timestep()
+            server_to_client_latency = (receive_time - timed_actions[0].get_timestamp()) * 1000
 
-                # Update action queue
-                start_time = time.perf_counter()
-                self._aggregate_action_queues(timed_actions, self.config.aggregate_fn)
-                queue_update_time = time.perf_counter() - start_time
+            self.logger.info(
+                f"Received action chunk for step #{first_action_timestep} | "
+                f"Latest action: #{latest_action} | "
+                f"Incoming actions: {incoming_timesteps[0]}:{incoming_timesteps[-1]} | "
+                f"Network latency (server->client): {server_to_client_latency:.2f}ms | "
+                f"Deserialization time: {deserialize_time * 1000:.2f}ms"
+            )
 
-                self.must_go.set()  # after receiving actions, next empty queue triggers must-go processing!
+        # Update action queue
+        start_time = time.perf_counter()
+        self._aggregate_action_queues(timed_actions, self.config.aggregate_fn)
+        queue_update_time = time.perf_counter() - start_time
 
-                if verbose:
-                    # Get queue state after changes
-                    new_size, new_timesteps = self._inspect_action_queue()
+        self.must_go.set()  # after receiving actions, next empty queue triggers must-go processing!
 
-                    with self.latest_action_lock:
-                        latest_action = self.latest_action
+        if verbose:
+            # Get queue state after changes
+            new_size, new_timesteps = self._inspect_action_queue()
 
-                    self.logger.info(
-                        f"Latest action: {latest_action} | "
-                        f"Old action steps: {old_timesteps[0]}:{old_timesteps[-1]} | "
-                        f"Incoming action steps: {incoming_timesteps[0]}:{incoming_timesteps[-1]} | "
-                        f"Updated action steps: {new_timesteps[0]}:{new_timesteps[-1]}"
-                    )
-                    self.logger.debug(
-                        f"Queue update complete ({queue_update_time:.6f}s) | "
-                        f"Before: {old_size} items | "
-                        f"After: {new_size} items | "
-                    )
+            with self.latest_action_lock:
+                latest_action = self.latest_action
 
-            except grpc.RpcError as e:
-                self.logger.error(f"Error receiving actions: {e}")
+            self.logger.info(
+                f"Latest action: {latest_action} | "
+                f"Old action steps: {old_timesteps[0]}:{old_timesteps[-1]} | "
+                f"Incoming action steps: {incoming_timesteps[0]}:{incoming_timesteps[-1]} | "
+                f"Updated action steps: {new_timesteps[0]}:{new_timesteps[-1]}"
+            )
+            self.logger.debug(
+                f"Queue update complete ({queue_update_time:.6f}s) | "
+                f"Before: {old_size} items | "
+                f"After: {new_size} items | "
+            )
 
     def actions_available(self):
         """Check if there are actions available in the queue"""
@@ -618,8 +710,8 @@ class RobotClient:
             return not self.action_queue.empty()
 
     def _action_tensor_to_action_dict(self, action_tensor: torch.Tensor) -> dict[str, float]:
-        action = {key: action_tensor[i].item() for i, key in enumerate(self.robot.action_features)}
-        return action
+        # One conversion for the whole action, indexing and converting each joint is much slower
+        return dict(zip(self.robot.action_features, action_tensor.tolist(), strict=False))
 
     def control_loop_action(self, verbose: bool = False) -> dict[str, Any]:
         """Reading and performing actions in local queue"""
@@ -629,14 +721,14 @@ class RobotClient:
         with self.action_queue_lock:
             self.action_queue_size.append(self.action_queue.qsize())
             # Get action from queue
-            timed_action = self.action_queue.get_nowait()
+            timed_action = self.action_queue.pop()
+            with self.latest_action_lock:
+                self.latest_action = timed_action.get_timestep()
         get_end = time.perf_counter() - get_start
 
-        _performed_action = self.robot.send_action(
-            self._action_tensor_to_action_dict(timed_action.get_action())
-        )
-        with self.latest_action_lock:
-            self.latest_action = timed_action.get_timestep()
+        action = self._action_tensor_to_action_dict(timed_action.get_action())
+        with self.robot_lock:
+            _performed_action = self.robot.send_action(action)
 
         if verbose:
             with self.action_queue_lock:
@@ -659,12 +751,21 @@ class RobotClient:
         with self.action_queue_lock:
             return self.action_queue.qsize() / self.action_chunk_size <= self._chunk_size_threshold
 
+    def _get_robot_observation(self) -> RawObservation:
+        """Reads the robot holding `robot_lock` only while its motors are read. Its cameras are read afterwards,
+        outside the lock, so that waiting for a new frame never delays an action."""
+        with self.robot_lock:
+            raw_observation = self.robot.get_motor_observation()
+
+        raw_observation.update(self.robot.get_camera_observation())
+        return raw_observation
+
     def control_loop_observation(self, task: str, verbose: bool = False) -> RawObservation:
         try:
             # Get serialized observation bytes from the function
             start_time = time.perf_counter()
 
-            raw_observation: RawObservation = self.robot.get_observation()
+            raw_observation: RawObservation = self._get_robot_observation()
             raw_observation["task"] = task
 
             with self.latest_action_lock:
@@ -711,32 +812,68 @@ class RobotClient:
             self.logger.error(f"Error in observation sender: {e}")
 
     def control_loop(self, task: str, verbose: bool = False) -> tuple[Observation, Action]:
-        """Combined function for executing actions and streaming observations"""
+        """Combined function for executing actions and streaming observations.
+
+        The actions are performed by the calling thread on a fixed schedule, while the observations are
+        captured, serialized and sent by a second thread, so that a slow network never delays an action.
+        """
         # Wait at barrier for synchronized start
         self.start_barrier.wait()
         self.logger.info("Control loop thread starting")
 
-        _performed_action = None
-        _captured_observation = None
+        self._captured_observation = None
+        observation_thread = threading.Thread(
+            target=self._observation_loop, args=(task, verbose), name="observation_sender", daemon=True
+        )
+        observation_thread.start()
+
+        try:
+            _performed_action = self._action_loop(verbose)
+        finally:
+            # Wakes the observation thread up for it to see the shutdown
+            self.shutdown_event.set()
+            self.observation_trigger.set()
+            observation_thread.join()
 
-        #import rospy
+        return self._captured_observation, _performed_action
+
+    def _action_loop(self, verbose: bool = False) -> Action:
+        """Performs the queued actions at absolute deadlines, one every `environment_dt` from the start, so
+        that the time spent performing each action does not accumulate into drift"""
+        priority = self.config.action_thread_priority
+        if priority is not None and not set_realtime_priority(priority):
+            self.logger.warning(f"Could not set the real-time priority {priority} of the action loop")
+
+        _performed_action = None
+        period = self.config.environment_dt
+        deadline = time.perf_counter()
 
-        # while self.running and not rospy.is_shutdown():
         while self.running:
-            control_loop_start = time.perf_counter()
-            """Control loop: (1) Performing actions, when available"""
+            self.action_loop_timing.tick(time.perf_counter())
             if self.actions_available():
                 _performed_action = self.control_loop_action(verbose)
+            # The observation thread captures the robot state that results from the action
+            self.observation_trigger.set()
+
+            deadline += period
+            overrun = time.perf_counter() - deadline
+            if overrun > 0:
+                # Skip the deadlines already passed, staying on the schedule rather than shifting it
+                missed_deadlines = int(overrun // period) + 1
+                self.action_loop_timing.miss(missed_deadlines)
+                deadline += missed_deadlines * period
+            time.sleep(max(0, deadline - time.perf_counter()))
 
-            """Control loop: (2) Streaming observations to the remote policy server"""
-            if self._ready_to_send_observation():
-                _captured_observation = self.control_loop_observation(task, verbose)
-
-            self.logger.info(f"Control loop (ms): {(time.perf_counter() - control_loop_start) * 1000:.2f}")
-            # Dynamically adjust sleep time to maintain the desired control frequency
-            time.sleep(max(0, self.config.environment_dt - (time.perf_counter() - control_loop_start)))
+        return _performed_action
 
-        return _captured_observation, _performed_action
+    def _observation_loop(self, task: str, verbose: bool = False) -> None:
+        """Streams an observation to the policy server once an action is performed, when the queue runs low.
+        The actions performed while an observation is being sent wake this thread up only once."""
+        while self.running:
+            self.observation_trigger.wait()
+            self.observation_trigger.clear()
+            if self.running and self._ready_to_send_observation():
+                self._captured_observation = self.control_loop_observation(task, verbose)
 
 
 @draccus.wrap()
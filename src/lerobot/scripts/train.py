@@ -163,12 +163,13 @@ def train(cfg: TrainPipelineConfig):
     logging.info(f"{num_total_params=} ({format_big_number(num_total_params)})")
 
     # create dataloader for offline training
-    if hasattr(cfg.policy, "drop_n_last_frames"):
+    if hasattr(cfg.policy, "drop_n_last_frames") or cfg.dataset.sequential_chunk_size is not None:
         shuffle = False
         sampler = EpisodeAwareSampler(
             dataset.episode_data_index,
-            drop_n_last_frames=cfg.policy.drop_n_last_frames,
+            drop_n_last_frames=getattr(cfg.policy, "drop_n_last_frames", 0),
             shuffle=True,
+            sequential_chunk_size=cfg.dataset.sequential_chunk_size,
         )
     else:
         shuffle = True
@@ -184,6 +185,7 @@ def train(cfg: TrainPipelineConfig):
         drop_last=False,
     )
     dl_iter = cycle(dataloader)
+    camera_keys = set(dataset.meta.camera_keys)
 
     policy.train()
 
@@ -208,6 +210,9 @@ def train(cfg: TrainPipelineConfig):
         for key in batch:
             if isinstance(batch[key], torch.Tensor):
                 batch[key] = batch[key].to(device, non_blocking=device.type == "cuda")
+                if batch[key].dtype == torch.uint8 and key in camera_keys:
+                    # `dataset.uint8_images`: convert on device rather than in the dataloader workers
+                    batch[key] = batch[key].type(torch.float32) / 255
 
         train_tracker, output_dict = update_policy(
             train_tracker,
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Delta encoding of the policy parameters streamed from the learner to the actor.
+
+The first message of a parameter stream, and then one every `snapshot_interval` pushes, is a full snapshot of
+the state dicts. The messages in between only hold the tensors that changed since that snapshot (the frozen
+vision encoder never does), optionally as float16/bfloat16 or int8 differences with the snapshot.
+
+Each message is versioned: a delta names the snapshot it applies to, so that the actor can tell when it
+missed a snapshot and must wait for the next one rather than loading parameters built on another base.
+Deltas are relative to the snapshot rather than to the previous push, so any of them can be dropped by the
+queues that only keep the latest parameters.
+"""
+
+import logging
+import uuid
+
+import torch
+
+from lerobot.transport.utils import bytes_to_state_dict, state_to_bytes
+
+PARAMETER_DELTA_DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+    "int8": torch.int8,
+}
+
+StateDicts = dict[str, dict[str, torch.Tensor]]
+
+
+class ParameterEncoder:
+    """Encodes the successive state dicts pushed on one parameter stream."""
+
+    def __init__(self, dtype: str = "float32", snapshot_interval: int = 10):
+        if dtype not in PARAMETER_DELTA_DTYPES:
+            raise ValueError(f"dtype must be one of {list(PARAMETER_DELTA_DTYPES)}, got '{dtype}'")
+        if snapshot_interval < 1:
+            raise ValueError(f"snapshot_interval must be at least 1, got {snapshot_interval}")
+
+        self.dtype = dtype
+        self.snapshot_interval = snapshot_interval
+        self.stream_id = uuid.uuid4().hex
+        self.version = 0
+        self.snapshot: StateDicts | None = None
+        self.snapshot_version = 0
+        # Keys that changed since the snapshot, sent in every delta so that the latest delta is enough
+        self._changed: dict[str, set[str]] = {}
+
+    def _needs_snapshot(self, state_dicts: StateDicts) -> bool:
+        if self.snapshot is None or self.version - self.snapshot_version >= self.snapshot_interval:
+            return True
+        return {group: state.keys() for group, state in state_dicts.items()} != {
+            group: state.keys() for group, state in self.snapshot.items()
+        }
+
+    def _encode_tensor(self, tensor: torch.Tensor, reference: torch.Tensor):
+        if self.dtype == "float32" or not tensor.is_floating_point():
+            return tensor
+        difference = tensor.float() - reference.float()
+        if self.dtype != "int8":
+            return difference.to(PARAMETER_DELTA_DTYPES[self.dtype])
+        scale = difference.abs().max().item() / 127
+        if scale == 0:
+            return torch.zeros_like(difference, dtype=torch.int8), 0.0
+        return torch.round(difference / scale).to(torch.int8), scale
+
+    def encode(self, state_dicts: StateDicts) -> bytes:
+        """Serializes the state dicts, `{"policy": ..., "discrete_critic": ...}`, as a snapshot or a delta."""
+        self.version += 1
+        message = {"version": (self.stream_id, self.version), "dtype": self.dtype}
+
+        if self._needs_snapshot(state_dicts):
+            self.snapshot = {
+                group: {key: tensor.clone() for key, tensor in state.items()}
+                for group, state in state_dicts.items()
+            }
+            self.snapshot_version = self.version
+            self._changed = {group: set() for group in state_dicts}
+            message.update(base=None, tensors=state_dicts)
+            return state_to_bytes(message)
+
+        tensors = {}
+        for group, state in state_dicts.items():
+            snapshot, changed = self.snapshot[group], self._changed[group]
+            changed.update(key for key, tensor in state.items() if not torch.equal(tensor, snapshot[key]))
+            tensors[group] = {key: self._encode_tensor(state[key], snapshot[key]) for key in changed}
+        message.update(base=(self.stream_id, self.snapshot_version), tensors=tensors)
+        return state_to_bytes(message)
+
+
+class ParameterDecoder:
+    """Decodes the messages of a `ParameterEncoder` on the actor side."""
+
+    def __init__(self):
+        self.snapshot: StateDicts | None = None
+        self.snapshot_version: tuple[str, int] | None = None
+
+    @staticmethod
+    def _decode_tensor(payload, reference: torch.Tensor, dtype: str) -> torch.Tensor:
+        if dtype == "float32" or not reference.is_floating_point():
+            return payload
+        if dtype == "int8":
+            quantized, scale = payload
+            difference = quantized.float() * scale
+        else:
+            difference = payload.float()
+        return (reference.float() + difference).to(reference.dtype)
+
+    def decode(self, buffer: bytes) -> StateDicts | None:
+        """Returns the tensors to load: all of them for a snapshot, those that changed since it for a delta.
+        Returns None for a delta of a snapshot that was not received."""
+        message = bytes_to_state_dict(buffer)
+
+        if message["base"] is None:
+            self.snapshot = message["tensors"]
+            self.snapshot_version = message["version"]
+            return self.snapshot
+
+        if message["base"] != self.snapshot_version:
+            logging.warning(
+                f"[ACTOR] Missed the parameters snapshot {message['base']}, waiting for the next snapshot"
+            )
+            return None
+
+        return {
+            group: {
+                key: self._decode_tensor(payload, self.snapshot[group][key], message["dtype"])
+                for key, payload in tensors.items()
+            }
+            for group, tensors in message["tensors"].items()
+        }
@@ -26,7 +26,7 @@ from typing import Any
 import torch
 
 from lerobot.transport import services_pb2
-from lerobot.utils.transition import Transition
+from lerobot.utils.transition import Transition, stack_transitions, unstack_transitions
 
 CHUNK_SIZE = 2 * 1024 * 1024  # 2 MB
 MAX_MESSAGE_SIZE = 4 * 1024 * 1024  # 4 MB
@@ -138,10 +138,23 @@ def bytes_to_transitions(buffer: bytes) -> list[Transition]:
     buffer = io.BytesIO(buffer)
     buffer.seek(0)
     transitions = torch.load(buffer, weights_only=True)
+    if isinstance(transitions, dict):
+        transitions = unstack_transitions(transitions)
     return transitions
 
 
-def transitions_to_bytes(transitions: list[Transition]) -> bytes:
+def bytes_to_transition_batch(buffer: bytes) -> Transition | None:
+    """Deserializes transitions as a columnar transition batch, see `stack_transitions`, whether they were
+    serialized as one or as a list. Returns None for an empty list."""
+    buffer = io.BytesIO(buffer)
+    buffer.seek(0)
+    transitions = torch.load(buffer, weights_only=True)
+    if isinstance(transitions, list):
+        transitions = stack_transitions(transitions) if transitions else None
+    return transitions
+
+
+def transitions_to_bytes(transitions: list[Transition] | Transition) -> bytes:
     buffer = io.BytesIO()
     torch.save(transitions, buffer)
     return buffer.getvalue()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Binary wire format of the observations and action chunks exchanged by the async inference stack.
+
+Pickling a `TimedObservation` for every step costs CPU time on both ends of the control loop, and unpickling
+data received from the network can execute arbitrary code. Instead, the layout of the observations is
+described once by an `ObservationSchema`, sent by the client with the policy instructions, and every
+observation is then sent as a fixed-size header followed by raw buffers:
+
+    header | float64[num_scalars] | array_0 | array_1 | ... | (uint32 length, bytes) per encoded image
+    | (uint32 length, utf-8 bytes) per string field
+
+Each raw array starts at an `ALIGNMENT`-byte boundary, so that the receiver can view it with `np.frombuffer`
+(or `torch.frombuffer`) without copying it. Camera frames can instead be compressed (`IMAGE_CODECS`), which
+trades some CPU time on both ends for much smaller messages on slow links. Action chunks are self-describing:
+
+    header | float64[num_actions] timestamps | int64[num_actions] timesteps | actions[num_actions, action_dim]
+"""
+
+import json
+import struct
+import zlib
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any
+
+import cv2
+import numpy as np
+import torch
+
+WIRE_FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+OBSERVATION_MAGIC = b"LROB"
+ACTIONS_MAGIC = b"LRAC"
+# magic, version, schema id, timestep, timestamp, must_go
+_OBSERVATION_HEADER = struct.Struct("<4sHIqd?")
+# magic, version, actions dtype, num_actions, action_dim
+_ACTIONS_HEADER = struct.Struct("<4sH4sII6x")
+_STRING_LENGTH = struct.Struct("<I")
+
+# Codecs of the camera frames: "raw" arrays are sent as is, "jpeg" is lossy and "png" is lossless
+IMAGE_CODECS = ("raw", "jpeg", "png")
+# JPEG quality (0-100) and PNG compression level (0-9) used when none is given. A low PNG level is much faster
+# to encode and only slightly larger.
+DEFAULT_IMAGE_QUALITY = {"raw": None, "jpeg": 90, "png": 1}
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_image(image: np.ndarray, codec: str, quality: int | None = None) -> bytes:
+    """Compresses an RGB (H, W, 3) or grayscale (H, W) / (H, W, 1) uint8 frame with `codec`."""
+    quality = DEFAULT_IMAGE_QUALITY[codec] if quality is None else quality
+    if image.ndim == 3 and image.shape[2] == 3:
+        # OpenCV expects BGR frames
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    if codec == "jpeg":
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    elif codec == "png":
+        ok, encoded = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, quality])
+    else:
+        raise ValueError(
+            f"Cannot compress an image with codec '{codec}', expected one of {IMAGE_CODECS[1:]}."
+        )
+    if not ok:
+        raise ValueError(f"Failed to encode an image of shape {image.shape} with codec '{codec}'.")
+    return encoded.tobytes()
+
+
+def decode_image(data: bytes | memoryview, shape: tuple[int, ...]) -> np.ndarray:
+    """Decompresses a frame produced by `encode_image` into a uint8 array of `shape`."""
+    flags = cv2.IMREAD_GRAYSCALE if len(shape) == 2 or shape[2] == 1 else cv2.IMREAD_COLOR
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+    if image is None:
+        raise ValueError("Failed to decode a compressed image.")
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    elif len(shape) == 3:
+        image = image[..., None]
+    if image.shape != tuple(shape):
+        raise ValueError(f"Decoded an image of shape {image.shape}, the schema expects {tuple(shape)}.")
+    return image
+
+
+def resize_image(image: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    """Resizes an (H, W, C) frame to the (H, W) of `shape` with a bilinear interpolation, like the server does."""
+    height, width = shape[:2]
+    resized = cv2.resize(image, (width, height), interpolation=cv2.INTER_LINEAR)
+    # OpenCV drops the channel dimension of single-channel frames
+    return resized.reshape(shape)
+
+
+@dataclass
+class ObservationSchema:
+    """Layout of the raw observations of a robot (`robot.get_observation()`).
+
+    Args:
+        scalar_keys: Keys of the float values (e.g. joint positions), packed in one float64 buffer.
+        array_keys: {key: (numpy dtype string, shape)} of the array values (e.g. camera frames).
+        string_keys: Keys of the string values (e.g. the task), sent with their length.
+        image_codecs: {key: (codec, quality)} of the uint8 arrays that are compressed with one of
+            `IMAGE_CODECS`. The other arrays are sent raw.
+        resize_images: Whether the sender resizes the frames whose shape differs from `array_keys`, e.g. after
+            `resized` replaced the camera resolution with the smaller input resolution of the policy.
+    """
+
+    scalar_keys: list[str] = field(default_factory=list)
+    array_keys: dict[str, tuple[str, tuple[int, ...]]] = field(default_factory=dict)
+    string_keys: list[str] = field(default_factory=list)
+    image_codecs: dict[str, tuple[str, int | None]] = field(default_factory=dict)
+    resize_images: bool = False
+
+    def __post_init__(self):
+        self.array_keys = {
+            key: (np.dtype(dtype).str, tuple(shape)) for key, (dtype, shape) in self.array_keys.items()
+        }
+        image_codecs = {}
+        for key, (codec, quality) in self.image_codecs.items():
+            if codec not in IMAGE_CODECS:
+                raise ValueError(
+                    f"Unknown image codec '{codec}' for '{key}', expected one of {IMAGE_CODECS}."
+                )
+            if key not in self.array_keys or self.array_keys[key][0] != np.dtype(np.uint8).str:
+                raise ValueError(f"Only the uint8 arrays of the schema can be compressed, got '{key}'.")
+            image_codecs[key] = (codec, DEFAULT_IMAGE_QUALITY[codec] if quality is None else quality)
+        self.image_codecs = image_codecs
+        self._compressed_keys = [key for key, (codec, _) in self.image_codecs.items() if codec != "raw"]
+
+        # Offsets of the buffers in an observation message
+        self._scalars_offset = _align(_OBSERVATION_HEADER.size)
+        offset = self._scalars_offset + 8 * len(self.scalar_keys)
+        self._array_offsets = {}
+        for key, (dtype, shape) in self.array_keys.items():
+            if key in self._compressed_keys:
+                continue
+            offset = _align(offset)
+            self._array_offsets[key] = offset
+            offset += np.dtype(dtype).itemsize * int(np.prod(shape))
+        self._fixed_size = offset
+        self.schema_id = zlib.crc32(json.dumps(self.to_dict(), sort_keys=True).encode())
+
+    @classmethod
+    def from_features(
+        cls,
+        observation_features: dict[str, type | tuple],
+        string_keys: tuple[str, ...] = ("task",),
+        image_codecs: dict[str, tuple[str, int | None]] | None = None,
+        resize_images: bool = False,
+    ) -> "ObservationSchema":
+        """Builds the schema from `robot.observation_features`: floats are scalars, and tuples are the (H, W, C)
+        shapes of uint8 camera frames."""
+        scalar_keys = [key for key, ft in observation_features.items() if ft is float]
+        array_keys = {
+            key: (np.uint8, ft) for key, ft in observation_features.items() if isinstance(ft, tuple)
+        }
+        return cls(scalar_keys, array_keys, list(string_keys), dict(image_codecs or {}), resize_images)
+
+    def resized(self, image_shapes: dict[str, tuple[int, ...]]) -> "ObservationSchema":
+        """Returns the schema where the arrays of `image_shapes` have the given (H, W, C) shapes instead.
+
+        Both ends derive the schema actually used on the wire this way, from the schema sent with the policy
+        instructions and the image shapes of the policy returned by the server.
+        """
+        array_keys = {
+            key: (dtype, tuple(image_shapes.get(key, shape)))
+            for key, (dtype, shape) in self.array_keys.items()
+        }
+        return ObservationSchema(
+            self.scalar_keys, array_keys, self.string_keys, self.image_codecs, self.resize_images
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "scalar_keys": list(self.scalar_keys),
+            "array_keys": {key: [dtype, list(shape)] for key, (dtype, shape) in self.array_keys.items()},
+            "string_keys": list(self.string_keys),
+            "image_codecs": {key: [codec, quality] for key, (codec, quality) in self.image_codecs.items()},
+            "resize_images": self.resize_images,
+        }
+
+    @classmethod
+    def from_dict(cls, schema: dict) -> "ObservationSchema":
+        return cls(
+            schema["scalar_keys"],
+            schema["array_keys"],
+            schema["string_keys"],
+            schema.get("image_codecs", {}),
+            schema.get("resize_images", False),
+        )
+
+    def _prepare_array(self, key: str, value: np.ndarray) -> np.ndarray:
+        dtype, shape = self.array_keys[key]
+        value = np.asarray(value)
+        if value.shape != shape:
+            if not (self.resize_images and value.ndim == len(shape) == 3 and value.shape[2] == shape[2]):
+                raise ValueError(f"'{key}' has shape {value.shape}, the schema expects {shape}.")
+            value = resize_image(value, shape)
+        return value
+
+    def encode(
+        self, observation: dict[str, Any], timestep: int, timestamp: float, must_go: bool
+    ) -> bytearray:
+        """Serializes an observation following the schema. Each raw array is copied once, into the message.
+
+        Keys of `observation` that are not in the schema are not sent.
+        """
+        missing_keys = {*self.scalar_keys, *self.array_keys, *self.string_keys} - set(observation)
+        if missing_keys:
+            raise ValueError(f"Observation is missing the keys {sorted(missing_keys)} of the schema.")
+        blobs = [
+            encode_image(self._prepare_array(key, observation[key]), *self.image_codecs[key])
+            for key in self._compressed_keys
+        ]
+        blobs += [observation[key].encode() for key in self.string_keys]
+        buffer = bytearray(self._fixed_size + sum(_STRING_LENGTH.size + len(b) for b in blobs))
+        _OBSERVATION_HEADER.pack_into(
+            buffer, 0, OBSERVATION_MAGIC, WIRE_FORMAT_VERSION, self.schema_id, timestep, timestamp, must_go
+        )
+
+        scalars = np.frombuffer(buffer, np.float64, len(self.scalar_keys), self._scalars_offset)
+        scalars[:] = [observation[key] for key in self.scalar_keys]
+        for key, offset in self._array_offsets.items():
+            dtype, shape = self.array_keys[key]
+            count = int(np.prod(shape))
+            value = self._prepare_array(key, observation[key])
+            np.frombuffer(buffer, dtype, count, offset).reshape(shape)[...] = value
+
+        offset = self._fixed_size
+        for blob in blobs:
+            _STRING_LENGTH.pack_into(buffer, offset, len(blob))
+            offset += _STRING_LENGTH.size
+            buffer[offset : offset + len(blob)] = blob
+            offset += len(blob)
+        return buffer
+
+    def decode(
+        self, data: bytes | bytearray, executor: Executor | None = None
+    ) -> tuple[dict[str, Any], int, float, bool]:
+        """Returns (observation, timestep, timestamp, must_go) from a message produced by `encode`.
+
+        The raw arrays of the observation are read-only views of `data`, they are not copied. The compressed
+        frames are decoded concurrently in `executor` when one is given (OpenCV releases the GIL).
+        """
+        if len(data) < self._fixed_size:
+            raise ValueError(f"Observation message of {len(data)} bytes is shorter than its schema.")
+        magic, version, schema_id, timestep, timestamp, must_go = _OBSERVATION_HEADER.unpack_from(data, 0)
+        if magic != OBSERVATION_MAGIC or version != WIRE_FORMAT_VERSION:
+            raise ValueError(f"Not an observation message of version {WIRE_FORMAT_VERSION}.")
+        if schema_id != self.schema_id:
+            raise ValueError("The observation was encoded with a different schema.")
+
+        scalars = np.frombuffer(data, np.float64, len(self.scalar_keys), self._scalars_offset).tolist()
+        observation = dict(zip(self.scalar_keys, scalars, strict=True))
+        for key, offset in self._array_offsets.items():
+            dtype, shape = self.array_keys[key]
+            count = int(np.prod(shape))
+            observation[key] = np.frombuffer(data, dtype, count, offset).reshape(shape)
+
+        blobs = []
+        view = memoryview(data)
+        offset = self._fixed_size
+        for _ in range(len(self._compressed_keys) + len(self.string_keys)):
+            (length,) = _STRING_LENGTH.unpack_from(data, offset)
+            offset += _STRING_LENGTH.size
+            blobs.append(view[offset : offset + length])
+            offset += length
+
+        image_blobs = blobs[: len(self._compressed_keys)]
+        image_shapes = [self.array_keys[key][1] for key in self._compressed_keys]
+        if executor is not None and len(image_blobs) > 1:
+            images = executor.map(decode_image, image_blobs, image_shapes)
+        else:
+            images = map(decode_image, image_blobs, image_shapes)
+        observation.update(zip(self._compressed_keys, images, strict=True))
+        for key, blob in zip(self.string_keys, blobs[len(self._compressed_keys) :], strict=True):
+            observation[key] = bytes(blob).decode()
+        return observation, timestep, timestamp, must_go
+
+
+def encode_action_chunk(timestamps: list[float], timesteps: list[int], actions: torch.Tensor) -> bytearray:
+    """Serializes a chunk of `num_actions` actions of shape (num_actions, action_dim) with their timing."""
+    if actions.dtype == torch.bfloat16:
+        actions = actions.float()
+    actions = actions.detach().cpu().reshape(len(timestamps), -1).numpy()
+    num_actions, action_dim = actions.shape
+    dtype = actions.dtype.str.encode()
+
+    offset = _ACTIONS_HEADER.size
+    buffer = bytearray(offset + 16 * num_actions + actions.nbytes)
+    _ACTIONS_HEADER.pack_into(buffer, 0, ACTIONS_MAGIC, WIRE_FORMAT_VERSION, dtype, num_actions, action_dim)
+    np.frombuffer(buffer, np.float64, num_actions, offset)[:] = timestamps
+    np.frombuffer(buffer, np.int64, num_actions, offset + 8 * num_actions)[:] = timesteps
+    np.frombuffer(buffer, actions.dtype, actions.size, offset + 16 * num_actions)[:] = actions.reshape(-1)
+    return buffer
+
+
+def decode_action_chunk(data: bytes | bytearray) -> tuple[np.ndarray, np.ndarray, torch.Tensor]:
+    """Returns the (timestamps, timesteps, actions) of a message produced by `encode_action_chunk`."""
+    magic, version, dtype, num_actions, action_dim = _ACTIONS_HEADER.unpack_from(data, 0)
+    if magic != ACTIONS_MAGIC or version != WIRE_FORMAT_VERSION:
+        raise ValueError(f"Not an action chunk message of version {WIRE_FORMAT_VERSION}.")
+    dtype = np.dtype(dtype.rstrip(b"\x00").decode())
+
+    offset = _ACTIONS_HEADER.size
+    timestamps = np.frombuffer(data, np.float64, num_actions, offset)
+    timesteps = np.frombuffer(data, np.int64, num_actions, offset + 8 * num_actions)
+    actions = np.frombuffer(data, dtype, num_actions * action_dim, offset + 16 * num_actions)
+    # The actions are tiny, copying them gives a writable tensor that the client can aggregate in place
+    return timestamps, timesteps, torch.from_numpy(actions.reshape(num_actions, action_dim).copy())
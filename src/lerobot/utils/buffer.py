@@ -15,6 +15,8 @@
 # limitations under the License.
 
 import functools
+import math
+import threading
 from collections.abc import Callable, Sequence
 from contextlib import suppress
 from typing import TypedDict
@@ -24,7 +26,7 @@ import torch.nn.functional as F  # noqa: N812
 from tqdm import tqdm
 
 from lerobot.datasets.lerobot_dataset import LeRobotDataset
-from lerobot.utils.transition import Transition
+from lerobot.utils.transition import Transition, select_transitions
 
 
 class BatchTransition(TypedDict):
@@ -69,6 +71,10 @@ def random_crop_vectorized(images: torch.Tensor, output_size: tuple) -> torch.Te
     return cropped
 
 
+def is_image_key(key: str) -> bool:
+    return key.startswith("observation.image")
+
+
 def random_shift(images: torch.Tensor, pad: int = 4):
     """Vectorized random shift, imgs: (B,C,H,W), pad: #pixels"""
     _, _, h, w = images.shape
@@ -85,13 +91,14 @@ class ReplayBuffer:
         image_augmentation_function: Callable | None = None,
         use_drq: bool = True,
         storage_device: str = "cpu",
-        optimize_memory: bool = False,
+        optimize_memory: bool = True,
+        state_dtypes: dict[str, torch.dtype] | None = None,
     ):
         """
         Replay buffer for storing transitions.
         It will allocate tensors on the specified device, when the first transition is added.
-        NOTE: If you encounter memory issues, you can try to use the `optimize_memory` flag to save memory or
-        and use the `storage_device` flag to store the buffer on a different device.
+        NOTE: If you encounter memory issues, you can use the `storage_device` flag to store the buffer on a
+        different device.
         Args:
             capacity (int): Maximum number of transitions to store in the buffer.
             device (str): The device where the tensors will be moved when sampling ("cuda:0" or "cpu").
@@ -103,6 +110,13 @@ class ReplayBuffer:
                 Using "cpu" can help save GPU memory.
             optimize_memory (bool): If True, optimizes memory by not storing duplicate next_states when
                 they can be derived from states. This is useful for large datasets where next_state[i] = state[i+1].
+                The next states that differ from the following state (e.g. at the end of an episode) are
+                stored aside.
+            state_dtypes (dict[str, torch.dtype] | None): The dtype in which each state key is stored. By
+                default the images are stored as uint8 and the other keys as float32. Floating point images
+                stored as uint8 must be in [0, 1], `add` raises a ValueError otherwise; store the images as
+                float32 to keep other ranges, e.g. normalized images. The sampled states are float32 whatever
+                their storage dtype.
         """
         if capacity <= 0:
             raise ValueError("Capacity must be greater than 0.")
@@ -114,9 +128,14 @@ class ReplayBuffer:
         self.size = 0
         self.initialized = False
         self.optimize_memory = optimize_memory
+        self.state_dtypes = dict(state_dtypes) if state_dtypes is not None else {}
 
-        # Track episode boundaries for memory optimization
-        self.episode_ends = torch.zeros(capacity, dtype=torch.bool, device=storage_device)
+        # With `optimize_memory`, the next states that are not the state of the following transition
+        self.next_state_is_kept = torch.zeros(capacity, dtype=torch.bool, device=storage_device)
+        self.kept_next_states: dict[int, dict[str, torch.Tensor]] = {}
+        # Held while the kept next states change and while they are sampled, possibly from the prefetching
+        # thread of `get_iterator`
+        self._kept_next_states_lock = threading.Lock()
 
         # If no state_keys provided, default to an empty list
         self.state_keys = state_keys if state_keys is not None else []
@@ -128,6 +147,11 @@ class ReplayBuffer:
             self.image_augmentation_function = torch.compile(base_function)
         self.use_drq = use_drq
 
+        # Staging buffers of `sample`, allocated for the batch size of the first sample
+        self._sample_layout = None
+        self._sample_slot = 0
+        self._copy_stream = None
+
     def _initialize_storage(
         self,
         state: dict[str, torch.Tensor],
@@ -139,9 +163,22 @@ class ReplayBuffer:
         state_shapes = {key: val.squeeze(0).shape for key, val in state.items()}
         action_shape = action.squeeze(0).shape
 
+        # Images in [0, 1] are stored as uint8 and scaled back when sampled, images that already are uint8
+        # are stored as they are
+        for key in state:
+            if key not in self.state_dtypes:
+                self.state_dtypes[key] = torch.uint8 if is_image_key(key) else torch.float32
+        self.state_scales = {
+            key: 255.0
+            for key, value in state.items()
+            if self.state_dtypes[key] == torch.uint8 and value.is_floating_point()
+        }
+
         # Pre-allocate tensors for storage
         self.states = {
-            key: torch.empty((self.capacity, *shape), device=self.storage_device)
+            key: torch.empty(
+                (self.capacity, *shape), dtype=self.state_dtypes[key], device=self.storage_device
+            )
             for key, shape in state_shapes.items()
         }
         self.actions = torch.empty((self.capacity, *action_shape), device=self.storage_device)
@@ -150,7 +187,9 @@ class ReplayBuffer:
         if not self.optimize_memory:
             # Standard approach: store states and next_states separately
             self.next_states = {
-                key: torch.empty((self.capacity, *shape), device=self.storage_device)
+                key: torch.empty(
+                    (self.capacity, *shape), dtype=self.state_dtypes[key], device=self.storage_device
+                )
                 for key, shape in state_shapes.items()
             }
         else:
@@ -186,6 +225,53 @@ class ReplayBuffer:
     def __len__(self):
         return self.size
 
+    def encode_state(self, key: str, value: torch.Tensor) -> torch.Tensor:
+        """Converts the values of a state key to the values stored in the buffer."""
+        if key in self.state_scales:
+            # Values outside of [0, 1] would be clipped by the conversion to uint8
+            low, high = torch.aminmax(value)
+            if low < 0 or high > 1:
+                raise ValueError(
+                    f"The values of '{key}' are in [{low.item():.4f}, {high.item():.4f}], the images stored "
+                    f"as uint8 must be in [0, 1]. Store them as floats with "
+                    f"`state_dtypes={{'{key}': torch.float32}}`."
+                )
+            value = (value * self.state_scales[key]).round_()
+        return value
+
+    def decode_state(self, key: str, value: torch.Tensor) -> torch.Tensor:
+        """Converts values stored in the buffer back to the float32 values of a state key."""
+        value = value.to(torch.float32)
+        if key in self.state_scales:
+            value.div_(self.state_scales[key])
+        return value
+
+    def _keep_next_state(self, next_state: dict[str, torch.Tensor] | None):
+        """With `optimize_memory`, the next state of a transition is read from the transition added after it.
+        The next state of the last transition is kept aside until then, and for good if it differs from the
+        state that follows it, e.g. at the end of an episode."""
+        with self._kept_next_states_lock:
+            previous = (self.position - 1) % self.capacity
+            if self.size > 0 and self.next_state_is_kept[previous]:
+                kept = self.kept_next_states[previous]
+                if all(torch.equal(kept[key], self.states[key][self.position]) for key in self.states):
+                    del self.kept_next_states[previous]
+                    self.next_state_is_kept[previous] = False
+
+            if next_state is None:
+                # Treated as the end of an episode, whose next state is the state itself
+                self.kept_next_states[self.position] = {
+                    key: self.states[key][self.position].clone() for key in self.states
+                }
+            else:
+                self.kept_next_states[self.position] = {
+                    key: self.encode_state(key, next_state[key].squeeze(dim=0)).to(
+                        dtype=self.state_dtypes[key], device=self.storage_device, copy=True
+                    )
+                    for key in self.states
+                }
+            self.next_state_is_kept[self.position] = True
+
     def add(
         self,
         state: dict[str, torch.Tensor],
@@ -203,11 +289,16 @@ class ReplayBuffer:
 
         # Store the transition in pre-allocated tensors
         for key in self.states:
-            self.states[key][self.position].copy_(state[key].squeeze(dim=0))
+            self.states[key][self.position].copy_(self.encode_state(key, state[key].squeeze(dim=0)))
 
             if not self.optimize_memory:
                 # Only store next_states if not optimizing memory
-                self.next_states[key][self.position].copy_(next_state[key].squeeze(dim=0))
+                self.next_states[key][self.position].copy_(
+                    self.encode_state(key, next_state[key].squeeze(dim=0))
+                )
+
+        if self.optimize_memory:
+            self._keep_next_state(next_state)
 
         self.actions[self.position].copy_(action.squeeze(dim=0))
         self.rewards[self.position] = reward
@@ -228,77 +319,317 @@ class ReplayBuffer:
         self.position = (self.position + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
+    def _write_rows(self, storage: torch.Tensor, values: torch.Tensor):
+        """Writes consecutive rows from the current position, wrapping around the end of the storage."""
+        first = min(len(values), self.capacity - self.position)
+        storage[self.position : self.position + first] = values[:first]
+        storage[: len(values) - first] = values[first:]
+
+    def _keep_next_states(self, next_states: dict[str, torch.Tensor], states: dict[str, torch.Tensor]):
+        """Batched `_keep_next_state`, once the `states` of `add_batch` are written, for their `next_states`.
+        Only the next states that differ from the state that follows them are encoded and compared as stored.
+        """
+        first = next(iter(next_states.values()))
+        num_transitions = len(first)
+        with self._kept_next_states_lock:
+            previous = (self.position - 1) % self.capacity
+            if self.size > 0 and self.next_state_is_kept[previous]:
+                kept = self.kept_next_states[previous]
+                if all(torch.equal(kept[key], self.states[key][self.position]) for key in self.states):
+                    del self.kept_next_states[previous]
+                    self.next_state_is_kept[previous] = False
+
+            # The last next state of the chunk is kept until the next one is added
+            rows = [num_transitions - 1]
+            if num_transitions > 1:
+                differs = torch.zeros(num_transitions - 1, dtype=torch.bool, device=first.device)
+                for key in self.states:
+                    differs |= (
+                        (next_states[key][:-1] != states[key][1:]).reshape(num_transitions - 1, -1).any(dim=1)
+                    )
+                rows = [*differs.nonzero().flatten().tolist(), *rows]
+
+            for position in list(self.kept_next_states):
+                if (position - self.position) % self.capacity < num_transitions:
+                    del self.kept_next_states[position]
+            is_kept = torch.zeros(num_transitions, dtype=torch.bool, device=self.storage_device)
+            for row in rows:
+                position = (self.position + row) % self.capacity
+                kept = {
+                    key: self.encode_state(key, next_states[key][row]).to(
+                        dtype=self.state_dtypes[key], device=self.storage_device
+                    )
+                    for key in self.states
+                }
+                following = (position + 1) % self.capacity
+                if row == num_transitions - 1 or not all(
+                    torch.equal(kept[key], self.states[key][following]) for key in self.states
+                ):
+                    self.kept_next_states[position] = kept
+                    is_kept[row] = True
+            self._write_rows(self.next_state_is_kept, is_kept)
+
+    def add_batch(
+        self,
+        state: dict[str, torch.Tensor],
+        action: torch.Tensor,
+        reward: torch.Tensor,
+        next_state: dict[str, torch.Tensor],
+        done: torch.Tensor,
+        truncated: torch.Tensor,
+        complementary_info: dict[str, torch.Tensor] | None = None,
+    ):
+        """Saves a columnar batch of transitions, see `stack_transitions`, with one slice assignment per key.
+        Equivalent to adding the transitions one by one with `add`."""
+        num_transitions = len(action)
+        if num_transitions > self.capacity:
+            # Only the last `capacity` transitions stay in the buffer
+            batch = Transition(
+                state=state,
+                action=action,
+                reward=reward,
+                next_state=next_state,
+                done=done,
+                truncated=truncated,
+                complementary_info=complementary_info,
+            )
+            for start in range(0, num_transitions, self.capacity):
+                self.add_batch(**select_transitions(batch, slice(start, start + self.capacity)))
+            return
+        if num_transitions == 0:
+            return
+
+        # Initialize storage if this is the first transition
+        if not self.initialized:
+            self._initialize_storage(
+                state={key: value[0] for key, value in state.items()},
+                action=action[0],
+                complementary_info=(
+                    {key: value[0] for key, value in complementary_info.items()}
+                    if complementary_info is not None
+                    else None
+                ),
+            )
+
+        def stored(storage: torch.Tensor, values: torch.Tensor) -> torch.Tensor:
+            # Converted to the dtype and device of the storage when written
+            return torch.as_tensor(values).reshape(num_transitions, *storage.shape[1:])
+
+        state = {key: stored(self.states[key], state[key]) for key in self.states}
+        next_state = {key: stored(self.states[key], next_state[key]) for key in self.states}
+
+        for key in self.states:
+            self._write_rows(self.states[key], self.encode_state(key, state[key]))
+            if not self.optimize_memory:
+                self._write_rows(self.next_states[key], self.encode_state(key, next_state[key]))
+
+        if self.optimize_memory:
+            self._keep_next_states(next_state, state)
+
+        self._write_rows(self.actions, stored(self.actions, action))
+        self._write_rows(self.rewards, stored(self.rewards, reward))
+        self._write_rows(self.dones, stored(self.dones, done))
+        self._write_rows(self.truncateds, stored(self.truncateds, truncated))
+
+        if complementary_info is not None and self.has_complementary_info:
+            for key in self.complementary_info_keys:
+                if key in complementary_info:
+                    storage = self.complementary_info[key]
+                    self._write_rows(storage, stored(storage, complementary_info[key]))
+
+        self.position = (self.position + num_transitions) % self.capacity
+        self.size = min(self.size + num_transitions, self.capacity)
+
+    def _transfers_to_cuda(self) -> bool:
+        return torch.device(self.device).type == "cuda" and torch.device(self.storage_device).type == "cpu"
+
+    def _get_sample_layout(self, batch_size: int) -> dict:
+        """Lays the tensors of a batch out in one flat staging buffer per storage dtype and scale, so that a
+        batch is gathered without intermediate tensors and moved and converted to float32 in a few calls.
+
+        The states of a key are followed by its next states, `2 * batch_size` rows, which is the layout of the
+        images that the DrQ augmentation is applied to."""
+        if self._sample_layout is not None and self._sample_layout["batch_size"] == batch_size:
+            return self._sample_layout
+
+        # Image keys first, so that the images sharing a staging buffer are contiguous
+        state_keys = sorted(self.states, key=lambda key: not is_image_key(key))
+        fields = [
+            ("state", key, (2 * batch_size, *self.states[key].shape[1:]), self.states[key])
+            for key in state_keys
+        ]
+        fields += [
+            ("action", None, (batch_size, *self.actions.shape[1:]), self.actions),
+            ("reward", None, (batch_size,), self.rewards),
+            ("done", None, (batch_size,), self.dones),
+            ("truncated", None, (batch_size,), self.truncateds),
+        ]
+        fields += [
+            ("complementary_info", key, (batch_size, *value.shape[1:]), value)
+            for key, value in self.complementary_info.items()
+        ]
+
+        groups = {}
+        for name, key, shape, storage in fields:
+            scale = self.state_scales.get(key) if name == "state" else None
+            group = groups.setdefault((storage.dtype, scale), {"numel": 0, "fields": []})
+            group["fields"].append((name, key, group["numel"], shape))
+            group["numel"] += math.prod(shape)
+
+        pin_memory = self._transfers_to_cuda()
+        # Two staging buffers when copying to the GPU: one is gathered into while the other is being copied
+        num_slots = 2 if pin_memory else 0
+        self._sample_layout = {
+            "batch_size": batch_size,
+            "groups": groups,
+            "slots": [
+                {
+                    "staging": {
+                        group_key: torch.empty(group["numel"], dtype=group_key[0], pin_memory=True)
+                        for group_key, group in groups.items()
+                    },
+                    "copied": torch.cuda.Event(),
+                }
+                for _ in range(num_slots)
+            ],
+        }
+        if pin_memory and self._copy_stream is None:
+            self._copy_stream = torch.cuda.Stream(device=self.device)
+        return self._sample_layout
+
+    def _gather(self, name: str, key: str | None, out: torch.Tensor, idx: torch.Tensor):
+        """Gathers the sampled rows of a field into `out`, the states followed by the next states."""
+        if name != "state":
+            source = {
+                "action": self.actions,
+                "reward": self.rewards,
+                "done": self.dones,
+                "truncated": self.truncateds,
+            }.get(name)
+            if source is None:
+                source = self.complementary_info[key]
+            torch.index_select(source, 0, idx, out=out)
+            return
+
+        batch_size = len(idx)
+        if not self.optimize_memory:
+            torch.index_select(self.states[key], 0, idx, out=out[:batch_size])
+            torch.index_select(self.next_states[key], 0, idx, out=out[batch_size:])
+            return
+
+        # Memory-optimized approach - get next_state from the next index, unless it was kept aside
+        torch.index_select(self.states[key], 0, torch.cat([idx, (idx + 1) % self.capacity]), out=out)
+        with self._kept_next_states_lock:
+            for row in self.next_state_is_kept[idx].nonzero().flatten().tolist():
+                out[batch_size + row] = self.kept_next_states[int(idx[row])][key]
+
     def sample(self, batch_size: int) -> BatchTransition:
-        """Sample a random batch of transitions and collate them into batched tensors."""
+        """Sample a random batch of transitions and collate them into batched tensors.
+
+        The batch is gathered into flat staging buffers, one per storage dtype. When the storage is on the CPU
+        and the batch on a GPU, the staging buffers are pinned and copied with non-blocking copies on a
+        dedicated stream, alternating between two of them so that a batch is gathered while the previous one
+        is still being copied."""
         if not self.initialized:
             raise RuntimeError("Cannot sample from an empty buffer. Add transitions first.")
 
         batch_size = min(batch_size, self.size)
-        high = max(0, self.size - 1) if self.optimize_memory and self.size < self.capacity else self.size
 
         # Random indices for sampling - create on the same device as storage
-        idx = torch.randint(low=0, high=high, size=(batch_size,), device=self.storage_device)
+        idx = torch.randint(low=0, high=self.size, size=(batch_size,), device=self.storage_device)
+
+        layout = self._get_sample_layout(batch_size)
+        if layout["slots"]:
+            slot = layout["slots"][self._sample_slot]
+            self._sample_slot = (self._sample_slot + 1) % len(layout["slots"])
+            # The staging buffer can only be written once its previous copy to the GPU is done
+            slot["copied"].synchronize()
+            staging = slot["staging"]
+        else:
+            # The batch is returned as views of the staging buffers, which are not reused
+            staging = {
+                group_key: torch.empty(group["numel"], dtype=group_key[0], device=self.storage_device)
+                for group_key, group in layout["groups"].items()
+            }
 
-        # Identify image keys that need augmentation
-        image_keys = [k for k in self.states if k.startswith("observation.image")] if self.use_drq else []
+        for group_key, group in layout["groups"].items():
+            for name, key, offset, shape in group["fields"]:
+                out = staging[group_key][offset : offset + math.prod(shape)].view(shape)
+                self._gather(name, key, out, idx)
+
+        # Move each staging buffer to the target device and convert it to float32 as a whole
+        if layout["slots"]:
+            current_stream = torch.cuda.current_stream(self.device)
+            with torch.cuda.stream(self._copy_stream):
+                moved = {
+                    group_key: flat.to(self.device, non_blocking=True) for group_key, flat in staging.items()
+                }
+                slot["copied"].record(self._copy_stream)
+            current_stream.wait_stream(self._copy_stream)
+            for flat in moved.values():
+                flat.record_stream(current_stream)
+        else:
+            moved = {group_key: flat.to(self.device) for group_key, flat in staging.items()}
+
+        fields = {}
+        for group_key, group in layout["groups"].items():
+            _, scale = group_key
+            flat = moved[group_key].to(torch.float32)
+            if scale is not None:
+                flat.div_(scale)
+            for name, key, offset, shape in group["fields"]:
+                fields[name, key] = (flat, offset, shape)
+
+        def view(name: str, key: str | None = None) -> torch.Tensor:
+            flat, offset, shape = fields[name, key]
+            return flat[offset : offset + math.prod(shape)].view(shape)
 
-        # Create batched state and next_state
         batch_state = {}
         batch_next_state = {}
-
-        # First pass: load all state tensors to target device
         for key in self.states:
-            batch_state[key] = self.states[key][idx].to(self.device)
+            states = view("state", key)
+            batch_state[key], batch_next_state[key] = states[:batch_size], states[batch_size:]
 
-            if not self.optimize_memory:
-                # Standard approach - load next_states directly
-                batch_next_state[key] = self.next_states[key][idx].to(self.device)
-            else:
-                # Memory-optimized approach - get next_state from the next index
-                next_idx = (idx + 1) % self.capacity
-                batch_next_state[key] = self.states[key][next_idx].to(self.device)
+        # Identify image keys that need augmentation
+        image_keys = [k for k in self.states if is_image_key(k)] if self.use_drq else []
 
         # Apply image augmentation in a batched way if needed
-        if self.use_drq and image_keys:
-            # Concatenate all images from state and next_state
-            all_images = []
-            for key in image_keys:
-                all_images.append(batch_state[key])
-                all_images.append(batch_next_state[key])
-
-            # Optimization: Batch all images and apply augmentation once
-            all_images_tensor = torch.cat(all_images, dim=0)
+        if image_keys:
+            # All the images, the states then the next states of each key, are augmented at once. When they
+            # share a staging buffer they already are contiguous, otherwise they are concatenated.
+            image_fields = [fields["state", key] for key in image_keys]
+            flat, offset, shape = image_fields[0]
+            contiguous = all(
+                field[0] is flat and field[2] == shape and field[1] == offset + i * math.prod(shape)
+                for i, field in enumerate(image_fields)
+            )
+            if contiguous:
+                numel = len(image_keys) * math.prod(shape)
+                all_images_tensor = flat[offset : offset + numel].view(-1, *shape[1:])
+            else:
+                all_images_tensor = torch.cat([view("state", key) for key in image_keys], dim=0)
             augmented_images = self.image_augmentation_function(all_images_tensor)
 
             # Split the augmented images back to their sources
             for i, key in enumerate(image_keys):
-                # Calculate offsets for the current image key:
                 # For each key, we have 2*batch_size images (batch_size for states, batch_size for next_states)
-                # States start at index i*2*batch_size and take up batch_size slots
                 batch_state[key] = augmented_images[i * 2 * batch_size : (i * 2 + 1) * batch_size]
-                # Next states start after the states at index (i*2+1)*batch_size and also take up batch_size slots
                 batch_next_state[key] = augmented_images[(i * 2 + 1) * batch_size : (i + 1) * 2 * batch_size]
 
-        # Sample other tensors
-        batch_actions = self.actions[idx].to(self.device)
-        batch_rewards = self.rewards[idx].to(self.device)
-        batch_dones = self.dones[idx].to(self.device).float()
-        batch_truncateds = self.truncateds[idx].to(self.device).float()
-
         # Sample complementary_info if available
         batch_complementary_info = None
         if self.has_complementary_info:
-            batch_complementary_info = {}
-            for key in self.complementary_info_keys:
-                batch_complementary_info[key] = self.complementary_info[key][idx].to(self.device)
+            batch_complementary_info = {
+                key: view("complementary_info", key) for key in self.complementary_info_keys
+            }
 
         return BatchTransition(
             state=batch_state,
-            action=batch_actions,
-            reward=batch_rewards,
+            action=view("action"),
+            reward=view("reward"),
             next_state=batch_next_state,
-            done=batch_dones,
-            truncated=batch_truncateds,
+            done=view("done"),
+            truncated=view("truncated"),
             complementary_info=batch_complementary_info,
         )
 
@@ -346,7 +677,6 @@ class ReplayBuffer:
             BatchTransition: A batch sampled from the replay buffer.
         """
         import queue
-        import threading
 
         data_queue: queue.Queue = queue.Queue(maxsize=queue_size)
         shutdown_event = threading.Event()
@@ -420,7 +750,8 @@ class ReplayBuffer:
         image_augmentation_function: Callable | None = None,
         use_drq: bool = True,
         storage_device: str = "cpu",
-        optimize_memory: bool = False,
+        optimize_memory: bool = True,
+        state_dtypes: dict[str, torch.dtype] | None = None,
     ) -> "ReplayBuffer":
         """
         Convert a LeRobotDataset into a ReplayBuffer.
@@ -436,6 +767,7 @@ class ReplayBuffer:
             use_drq (bool): Whether to use DrQ image augmentation when sampling.
             storage_device (str): Device for storing tensor data. Using "cpu" saves GPU memory.
             optimize_memory (bool): If True, reduces memory usage by not duplicating state data.
+            state_dtypes (dict[str, torch.dtype] | None): The dtype in which each state key is stored.
 
         Returns:
             ReplayBuffer: The replay buffer with dataset transitions.
@@ -457,6 +789,7 @@ class ReplayBuffer:
             use_drq=use_drq,
             storage_device=storage_device,
             optimize_memory=optimize_memory,
+            state_dtypes=state_dtypes,
         )
 
         # Convert dataset to transitions
@@ -538,7 +871,7 @@ class ReplayBuffer:
 
         # Add state keys
         for key in self.states:
-            sample_val = self.states[key][0]
+            sample_val = self.decode_state(key, self.states[key][0])
             f_info = guess_feature_info(t=sample_val, name=key)
             features[key] = f_info
 
@@ -576,7 +909,7 @@ class ReplayBuffer:
 
             # Fill the data for state keys
             for key in self.states:
-                frame_dict[key] = self.states[key][actual_idx].cpu()
+                frame_dict[key] = self.decode_state(key, self.states[key][actual_idx]).cpu()
 
             # Fill action, reward, done
             frame_dict["action"] = self.actions[actual_idx].cpu()
@@ -50,3 +50,20 @@ def get_last_item_from_queue(queue: Queue, block=True, timeout: float = 0.1) ->
             item = queue.get_nowait()
 
     return item
+
+
+def get_all_items_from_queue(queue: Queue) -> list[Any]:
+    """Drains the queue without blocking, and returns its items in order."""
+    items = []
+    if platform.system() == "Darwin":
+        # On Mac, avoid using `qsize`, see `get_last_item_from_queue`
+        with suppress(Empty):
+            while True:
+                items.append(queue.get_nowait())
+        return items
+
+    while queue.qsize() > 0:
+        with suppress(Empty):
+            items.append(queue.get_nowait())
+
+    return items
@@ -68,6 +68,49 @@ def move_transition_to_device(transition: Transition, device: str = "cpu") -> Tr
     return transition
 
 
+def stack_transitions(transitions: list[Transition]) -> Transition:
+    """Stacks a list of transitions into a columnar transition batch, with one tensor per key whose first
+    dimension indexes the transitions. The complementary info keys that are not in every transition are
+    dropped."""
+    first = transitions[0]
+
+    def stack(values: list) -> torch.Tensor:
+        return torch.stack([torch.as_tensor(value) for value in values])
+
+    batch = Transition(
+        state={key: stack([t["state"][key] for t in transitions]) for key in first["state"]},
+        next_state={key: stack([t["next_state"][key] for t in transitions]) for key in first["next_state"]},
+    )
+    for field in ("action", "reward", "done", "truncated"):
+        if field in first:
+            batch[field] = stack([t[field] for t in transitions])
+
+    if first.get("complementary_info") is not None:
+        keys = set.intersection(*(set(t.get("complementary_info") or {}) for t in transitions))
+        batch["complementary_info"] = {
+            key: stack([t["complementary_info"][key] for t in transitions])
+            for key in first["complementary_info"]
+            if key in keys
+        }
+    return batch
+
+
+def select_transitions(batch: Transition, index: torch.Tensor | slice | int) -> Transition:
+    """Selects the transitions of a columnar transition batch at `index`, a mask, indices or a slice."""
+    selected = {}
+    for field, value in batch.items():
+        if isinstance(value, dict):
+            selected[field] = {key: tensor[index] for key, tensor in value.items()}
+        else:
+            selected[field] = value[index] if value is not None else None
+    return Transition(**selected)
+
+
+def unstack_transitions(batch: Transition) -> list[Transition]:
+    """Splits a columnar transition batch back into a list of transitions."""
+    return [select_transitions(batch, i) for i in range(len(batch["action"]))]
+
+
 def move_state_dict_to_device(state_dict, device="cpu"):
     """
     Recursively move all tensors in a (potentially) nested
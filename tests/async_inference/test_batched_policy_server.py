@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit-tests for the `BatchedPolicyServer` serving several robot clients.
+
+The RPC handlers are called directly with a minimal servicer context, and the policy is a stub returning the
+state of each observation, so that the routing of the batched chunks back to their clients can be checked.
+"""
+
+import time
+
+import pytest
+import torch
+
+from lerobot.configs.types import FeatureType, PolicyFeature
+
+pytest.importorskip("grpc")
+
+ACTION_DIM = 6
+
+
+class MockPolicy:
+    """Predicts chunks whose actions are the state of the observation, and records the batch sizes."""
+
+    class _Config:
+        @property
+        def image_features(self) -> dict[str, PolicyFeature]:
+            return {}
+
+        @property
+        def robot_state_feature(self) -> PolicyFeature:
+            return PolicyFeature(type=FeatureType.STATE, shape=(ACTION_DIM,))
+
+        @property
+        def action_feature(self) -> PolicyFeature:
+            return PolicyFeature(type=FeatureType.ACTION, shape=(ACTION_DIM,))
+
+    def __init__(self):
+        self.config = self._Config()
+        self.batch_sizes = []
+
+    def predict_action_chunk(self, observation: dict[str, torch.Tensor]) -> torch.Tensor:
+        state = observation["observation.state"]
+        self.batch_sizes.append(len(state))
+        return state.unsqueeze(1).repeat(1, 20, 1)
+
+
+class FakeContext:
+    """Minimal `grpc.ServicerContext` of the calls of one client."""
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+
+    def invocation_metadata(self):
+        return (("client-id", self.client_id),)
+
+    def peer(self):
+        return "ipv4:127.0.0.1:1234"
+
+    def is_active(self):
+        return True
+
+    def abort(self, code, details):
+        raise RuntimeError(f"{code}: {details}")
+
+    def set_trailing_metadata(self, metadata):
+        self.trailing_metadata = metadata
+
+
+@pytest.fixture
+def batched_server():
+    from lerobot.scripts.server.batched_policy_server import BatchedPolicyServer
+    from lerobot.scripts.server.configs import PolicyServerConfig
+
+    config = PolicyServerConfig(max_clients=2, max_batch_size=2, batch_window=0.5, obs_queue_timeout=0.05)
+    server = BatchedPolicyServer(config)
+    server.policy = MockPolicy()
+    server.policy_type = "act"
+    server.pretrained_name_or_path = "mock"
+    server.device = "cpu"
+    server.actions_per_chunk = 20
+
+    yield server
+
+    server.stop()
+
+
+def _connect(server, client_id: str, actions_per_chunk: int):
+    """Connects a client and sets the features of its robot, as `SendPolicyInstructions` would."""
+    from lerobot.scripts.server.helpers import ObservationPreprocessor
+
+    context = FakeContext(client_id)
+    server.Ready(None, context)
+    session = server.sessions[client_id]
+    session.lerobot_features = _state_features(ACTION_DIM)
+    session.observation_preprocessor = ObservationPreprocessor(session.lerobot_features, {}, "cpu")
+    session.actions_per_chunk = actions_per_chunk
+    server._update_actions_per_chunk()
+    return context, session
+
+
+def _state_features(state_dim: int) -> dict[str, dict]:
+    return {
+        "observation.state": {
+            "dtype": "float32",
+            "shape": (state_dim,),
+            "names": [f"joint{i}" for i in range(state_dim)],
+        }
+    }
+
+
+def _send_policy_instructions(
+    server, client_id: str, policy_type: str, lerobot_features: dict[str, dict], actions_per_chunk: int = 5
+):
+    from lerobot.scripts.server.helpers import RemotePolicyConfig
+    from lerobot.transport import services_pb2  # type: ignore
+
+    context = FakeContext(client_id)
+    server.Ready(None, context)
+    policy_specs = RemotePolicyConfig(policy_type, "mock", lerobot_features, actions_per_chunk)
+    server.SendPolicyInstructions(services_pb2.PolicySetup(data=policy_specs.to_bytes()), context)
+    return server.sessions[client_id]
+
+
+def _make_obs(value: float, timestep: int):
+    from lerobot.scripts.server.helpers import TimedObservation
+
+    return TimedObservation(
+        timestamp=time.time(),
+        timestep=timestep,
+        observation={f"joint{i}": value for i in range(ACTION_DIM)},
+        must_go=True,
+    )
+
+
+def test_observations_of_clients_are_batched(batched_server):
+    from lerobot.scripts.server.helpers import bytes_to_timed_actions
+
+    context_a, session_a = _connect(batched_server, "a", actions_per_chunk=5)
+    context_b, session_b = _connect(batched_server, "b", actions_per_chunk=3)
+
+    batched_server._enqueue_client_observation(session_a, _make_obs(1.0, timestep=10))
+    batched_server._enqueue_client_observation(session_b, _make_obs(2.0, timestep=40))
+
+    # Each client receives its own rows of the batch, with its own chunk length and timesteps
+    for context, value, timestep, actions_per_chunk in [(context_a, 1.0, 10, 5), (context_b, 2.0, 40, 3)]:
+        actions = bytes_to_timed_actions(next(batched_server.StreamActions(None, context)).data)
+        assert [a.get_timestep() for a in actions] == list(range(timestep, timestep + actions_per_chunk))
+        assert all(torch.all(a.get_action() == value) for a in actions)
+
+    # Both observations arrived within the batch window
+    assert batched_server.policy.batch_sizes == [2]
+
+
+def test_predicted_timesteps_are_tracked_per_client(batched_server):
+    _, session_a = _connect(batched_server, "a", actions_per_chunk=5)
+    _, session_b = _connect(batched_server, "b", actions_per_chunk=5)
+    session_a.predicted_timesteps.add(7)
+
+    obs = _make_obs(1.0, timestep=7)
+    obs.must_go = False
+    assert not batched_server._enqueue_client_observation(session_a, obs)
+    assert batched_server._enqueue_client_observation(session_b, obs)
+
+
+def test_max_clients(batched_server):
+    _connect(batched_server, "a", actions_per_chunk=5)
+    _connect(batched_server, "b", actions_per_chunk=5)
+    with pytest.raises(RuntimeError, match="RESOURCE_EXHAUSTED"):
+        batched_server.Ready(None, FakeContext("c"))
+
+    # A connected client can reconnect, and a client that timed out frees its slot
+    batched_server.Ready(None, FakeContext("a"))
+    batched_server.config.client_timeout = 0.0
+    batched_server.Ready(None, FakeContext("c"))
+    assert "c" in batched_server.sessions
+
+
+def test_policy_instructions_are_checked(batched_server):
+    assert _send_policy_instructions(batched_server, "a", "act", _state_features(ACTION_DIM)).configured
+
+    # Stateful policies cannot be shared, and the observations of a client must stack with the others
+    with pytest.raises(RuntimeError, match="INVALID_ARGUMENT.*cannot serve several clients"):
+        _send_policy_instructions(batched_server, "b", "diffusion", _state_features(ACTION_DIM))
+    with pytest.raises(RuntimeError, match=r"INVALID_ARGUMENT.*observation.state of shape \(7,\)"):
+        _send_policy_instructions(batched_server, "b", "act", _state_features(ACTION_DIM + 1))
+    assert not batched_server.sessions["b"].configured
+
+
+def test_actions_per_chunk_follows_the_connected_clients(batched_server):
+    features = _state_features(ACTION_DIM)
+    _send_policy_instructions(batched_server, "a", "act", features, actions_per_chunk=5)
+    session_b = _send_policy_instructions(batched_server, "b", "act", features, actions_per_chunk=10)
+    assert batched_server.actions_per_chunk == 10
+
+    # The longest chunk is no longer predicted once its client disconnects or times out
+    batched_server._remove_session(session_b)
+    assert batched_server.actions_per_chunk == 5
+
+    _send_policy_instructions(batched_server, "b", "act", features, actions_per_chunk=10)
+    batched_server.config.client_timeout = 0.0
+    batched_server.Ready(None, FakeContext("c"))
+    assert batched_server.actions_per_chunk is None
@@ -57,6 +57,7 @@ def test_async_inference_e2e(monkeypatch):
         services_pb2,  # type: ignore
         services_pb2_grpc,  # type: ignore
     )
+    from lerobot.transport.wire_format import ObservationSchema
     from tests.mocks.mock_robot import MockRobotConfig
 
     # Create a stub policy similar to test_policy_server.py
@@ -98,12 +99,14 @@ def test_async_inference_e2e(monkeypatch):
 
     lerobot_features = map_robot_keys_to_lerobot_features(mock_robot)
     policy_server.lerobot_features = lerobot_features
+    # Normally received with the policy instructions, which are bypassed below
+    policy_server.observation_schema = ObservationSchema.from_features(mock_robot.observation_features)
 
     # Force server to produce deterministic action chunks in test mode
     policy_server.policy_type = "act"
 
     def _fake_get_action_chunk(_self, _obs, _type="test"):
-        action_dim = 6
+        action_dim = len(mock_robot.action_features)
         batch_size = 1
         actions_per_chunk = policy_server.actions_per_chunk
 
@@ -118,7 +121,8 @@ def test_async_inference_e2e(monkeypatch):
     monkeypatch.setattr(PolicyServer, "SendPolicyInstructions", _fake_send_policy_instructions, raising=True)
 
     # Build gRPC server running a PolicyServer
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy_server"))
+    # The action stream holds a worker for the whole session, the observations need others
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="policy_server"))
     services_pb2_grpc.add_AsyncInferenceServicer_to_server(policy_server, server)
 
     # Use the host/port specified in the fixture's config
@@ -15,21 +15,32 @@
 import math
 import pickle
 import time
+from queue import Empty
 
 import numpy as np
+import pytest
 import torch
 
 from lerobot.configs.types import FeatureType, PolicyFeature
 from lerobot.scripts.server.helpers import (
+    ActionRingBuffer,
+    DeadlineTracker,
     FPSTracker,
+    ObservationPreprocessor,
+    RemotePolicyConfig,
     TimedAction,
     TimedObservation,
+    bytes_to_timed_actions,
+    bytes_to_timed_observation,
     observations_similar,
     prepare_image,
     prepare_raw_observation,
     raw_observation_to_observation,
     resize_robot_observation_image,
+    timed_actions_to_bytes,
+    timed_observation_to_bytes,
 )
+from lerobot.transport.wire_format import ObservationSchema
 
 # ---------------------------------------------------------------------
 # FPSTracker
@@ -96,6 +107,23 @@ def test_fps_tracker_irregular_intervals():
     assert math.isclose(metrics["avg_fps"], expected_fps, rel_tol=1e-6)
 
 
+def test_deadline_tracker_statistics():
+    tracker = DeadlineTracker(target_period=0.1)
+    for now in [0.0, 0.1, 0.2, 0.35, 0.45]:
+        tracker.tick(now)
+    tracker.miss(2)
+
+    stats = tracker.statistics()
+    assert stats["ticks"] == 5
+    assert stats["missed_deadlines"] == 2
+    assert math.isclose(stats["mean_period_ms"], 112.5)
+    assert math.isclose(stats["max_jitter_ms"], 50.0)
+
+    counts, edges = tracker.histogram(num_bins=2)
+    assert counts.tolist() == [3, 1]
+    assert math.isclose(edges[0], 100.0) and math.isclose(edges[-1], 150.0)
+
+
 # ---------------------------------------------------------------------
 # TimedData helpers
 # ---------------------------------------------------------------------
@@ -164,6 +192,43 @@ def test_timed_data_deserialization_data_getters():
     torch.testing.assert_close(to_out.get_observation()["observation.state"], obs_dict["observation.state"])
 
 
+def test_timed_data_wire_format_round_trip():
+    """TimedAction / TimedObservation survive a round-trip through the binary wire format."""
+    ts = time.time()
+    schema = ObservationSchema.from_features({"shoulder": float, "elbow": float, "front": (4, 6, 3)})
+    obs_dict = {
+        "shoulder": 0.5,
+        "elbow": -1.25,
+        "front": np.random.randint(0, 256, (4, 6, 3), dtype=np.uint8),
+        "task": "pick the cube",
+    }
+    to_in = TimedObservation(timestamp=ts, observation=obs_dict, timestep=7, must_go=True)
+    to_out = bytes_to_timed_observation(bytes(timed_observation_to_bytes(to_in, schema)), schema)
+
+    assert (to_out.get_timestamp(), to_out.get_timestep(), to_out.must_go) == (ts, 7, True)
+    assert to_out.get_observation()["task"] == "pick the cube"
+    assert to_out.get_observation()["elbow"] == -1.25
+    np.testing.assert_array_equal(to_out.get_observation()["front"], obs_dict["front"])
+
+    ta_in = [TimedAction(timestamp=ts + i, action=torch.randn(6), timestep=13 + i) for i in range(3)]
+    ta_out = bytes_to_timed_actions(bytes(timed_actions_to_bytes(ta_in)))
+    assert [a.get_timestep() for a in ta_out] == [13, 14, 15]
+    assert [a.get_timestamp() for a in ta_out] == [a.get_timestamp() for a in ta_in]
+    for a_out, a_in in zip(ta_out, ta_in, strict=True):
+        torch.testing.assert_close(a_out.get_action(), a_in.get_action())
+
+
+def test_remote_policy_config_to_bytes():
+    config = RemotePolicyConfig(
+        "act",
+        "path/to/model",
+        {"observation.state": {"dtype": "float32", "shape": (2,), "names": ["shoulder", "elbow"]}},
+        actions_per_chunk=10,
+        observation_schema=ObservationSchema.from_features({"shoulder": float, "elbow": float}),
+    )
+    assert RemotePolicyConfig.from_bytes(config.to_bytes()) == config
+
+
 # ---------------------------------------------------------------------
 # observations_similar()
 # ---------------------------------------------------------------------
@@ -457,3 +522,87 @@ def test_image_processing_pipeline_preserves_content():
     corner_val = processed_img[:, 5, 5].mean()  # Corner
 
     assert center_val > corner_val, "Image processing should preserve recognizable patterns"
+
+
+def test_observation_preprocessor_matches_per_camera_processing():
+    """The batched preprocessing matches preparing and resizing each camera on its own."""
+    robot_obs = _create_mock_robot_observation()
+    robot_obs["task"] = "pick up the red cube"
+    lerobot_features = _create_mock_lerobot_features()
+    policy_image_features = _create_mock_policy_image_features()
+    # Both cameras share the policy image shape, so they are resized together
+    policy_image_features["observation.images.phone"] = policy_image_features["observation.images.laptop"]
+
+    observation = ObservationPreprocessor(lerobot_features, policy_image_features, "cpu")(robot_obs)
+    expected = prepare_raw_observation(robot_obs, lerobot_features, policy_image_features)
+
+    assert observation["task"] == "pick up the red cube"
+    torch.testing.assert_close(observation["observation.state"], expected["observation.state"])
+    for key in ["observation.images.laptop", "observation.images.phone"]:
+        assert observation[key].is_contiguous()
+        torch.testing.assert_close(observation[key], prepare_image(expected[key]).unsqueeze(0))
+
+
+def test_observation_preprocessor_reuses_buffers_not_outputs():
+    """The staging buffers are reused across calls, the tensors returned by a previous call are untouched."""
+    lerobot_features = _create_mock_lerobot_features()
+    preprocessor = ObservationPreprocessor(lerobot_features, _create_mock_policy_image_features(), "cpu")
+
+    obs1 = preprocessor(_create_mock_robot_observation())
+    obs1_copy = {key: value.clone() for key, value in obs1.items()}
+    obs2 = preprocessor(_create_mock_robot_observation())
+
+    assert len(preprocessor._buffers) == 1
+    for key, value in obs1.items():
+        torch.testing.assert_close(value, obs1_copy[key])
+        assert not torch.equal(value, obs2[key]) or key == "observation.state"
+
+
+# ---------------------------------------------------------------------
+# ActionRingBuffer
+# ---------------------------------------------------------------------
+
+
+def _chunk(first_timestep: int, count: int) -> tuple[list[float], torch.Tensor]:
+    """Timestamps and (count, 2) actions filled with their timestep."""
+    timesteps = torch.arange(first_timestep, first_timestep + count, dtype=torch.float32)
+    return (0.1 * timesteps).tolist(), timesteps.unsqueeze(1).repeat(1, 2)
+
+
+def test_action_ring_buffer_pop_wraps_around():
+    buffer = ActionRingBuffer(capacity=4)
+    for first_timestep in [0, 3, 6]:
+        timestamps, actions = _chunk(first_timestep, 4)
+        buffer.merge(first_timestep, timestamps, actions, latest_timestep=first_timestep - 1)
+        assert buffer.qsize() == 4
+        # Pop the first three actions, the next chunk overlaps the last one
+        for timestep in range(first_timestep, first_timestep + 3):
+            action = buffer.pop()
+            assert action.get_timestep() == timestep
+            assert action.get_timestamp() == pytest.approx(0.1 * timestep)
+            assert torch.equal(action.get_action(), torch.full((2,), float(timestep)))
+
+    assert [a.get_timestep() for a in buffer] == [9]
+    buffer.pop()
+    assert buffer.empty()
+    with pytest.raises(Empty):
+        buffer.pop()
+
+
+def test_action_ring_buffer_merge_aggregates_overlap():
+    buffer = ActionRingBuffer(capacity=4)
+    timestamps, actions = _chunk(2, 4)  # timesteps 2..5
+    buffer.merge(2, timestamps, 10 * actions, latest_timestep=1)
+
+    # Timesteps 0..2 are stale, 3..5 are aggregated, 6..7 are new and the buffer grows to hold them all
+    timestamps, actions = _chunk(0, 8)
+    buffer.merge(0, timestamps, actions, latest_timestep=2, aggregate_fn=lambda old, new: old + new)
+
+    assert list(buffer.timesteps) == [3, 4, 5, 6, 7]
+    assert buffer.capacity == 5
+    expected = [11 * t for t in [3, 4, 5]] + [6, 7]
+    assert [a.get_action()[0].item() for a in buffer] == expected
+
+    # A chunk of stale actions empties the queue
+    buffer.merge(0, timestamps[:2], actions[:2], latest_timestep=2)
+    assert buffer.empty()
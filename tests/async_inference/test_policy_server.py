@@ -213,3 +213,65 @@ def test_predict_action_chunk(monkeypatch, policy_server):
     for i, ta in enumerate(timed_actions):
         expected_ts = obs.get_timestamp() + i * policy_server.config.environment_dt
         assert abs(ta.get_timestamp() - expected_ts) < 1e-6
+
+
+class _FakeContext:
+    """Minimal `grpc.ServicerContext` for calling the RPC handlers directly."""
+
+    def __init__(self):
+        self.active = True
+
+    def peer(self):
+        return "test-client"
+
+    def is_active(self):
+        return self.active
+
+    def abort(self, code, details):
+        raise RuntimeError(f"{code}: {details}")
+
+
+def test_stream_actions(monkeypatch, policy_server):
+    """`StreamActions` pushes a chunk per enqueued observation and closes when a new client connects."""
+    from lerobot.scripts.server.helpers import bytes_to_timed_actions
+    from lerobot.scripts.server.policy_server import PolicyServer
+
+    actions_per_chunk = policy_server.actions_per_chunk
+    monkeypatch.setattr(
+        PolicyServer,
+        "_get_action_chunk",
+        lambda _self, _obs, _type="act": torch.zeros(1, actions_per_chunk, 6),
+        raising=True,
+    )
+    policy_server.config.obs_queue_timeout = 0.01
+    policy_server.shutdown_event.clear()
+
+    context = _FakeContext()
+    stream = policy_server.StreamActions(None, context)
+    for timestep in [3, 7]:
+        policy_server.observation_queue.put(_make_obs(torch.zeros(6), timestep=timestep))
+        timesteps = [a.get_timestep() for a in bytes_to_timed_actions(next(stream).data)]
+        assert timesteps == list(range(timestep, timestep + actions_per_chunk))
+
+    # A new client connecting closes the stream of the previous one
+    policy_server.Ready(None, context)
+    with pytest.raises(StopIteration):
+        next(stream)
+
+    # Cancelled by the client
+    stream = policy_server.StreamActions(None, context)
+    context.active = False
+    with pytest.raises(StopIteration):
+        next(stream)
+
+
+def test_stream_actions_without_policy(policy_server):
+    policy_server.policy = None
+    with pytest.raises(RuntimeError, match="FAILED_PRECONDITION"):
+        next(policy_server.StreamActions(None, _FakeContext()))
+
+
+def test_send_observations_without_schema(policy_server):
+    assert policy_server.observation_schema is None
+    with pytest.raises(RuntimeError, match="FAILED_PRECONDITION"):
+        policy_server.SendObservations(iter([]), _FakeContext())
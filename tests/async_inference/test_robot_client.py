@@ -19,8 +19,9 @@ no real hardware is accessed. Only the queue-update mechanism is verified.
 
 from __future__ import annotations
 
+import threading
 import time
-from queue import Queue
+from types import SimpleNamespace
 
 import pytest
 import torch
@@ -42,7 +43,7 @@ def robot_client():
     from lerobot.scripts.server.robot_client import RobotClient
     from tests.mocks.mock_robot import MockRobotConfig
 
-    test_config = MockRobotConfig()
+    test_config = MockRobotConfig(n_motors=6)  # the actions of `_make_actions` have 6 joints
 
     # gRPC channel is not actually used in tests, so using a dummy address
     test_config = RobotClientConfig(
@@ -102,7 +103,7 @@ def test_update_action_queue_discards_stale(robot_client):
     robot_client._aggregate_action_queues(incoming)
 
     # Extract timesteps from queue
-    resulting_timesteps = [a.get_timestep() for a in robot_client.action_queue.queue]
+    resulting_timesteps = [a.get_timestep() for a in robot_client.action_queue]
 
     assert resulting_timesteps == [5, 6, 7]
 
@@ -138,8 +139,7 @@ def test_aggregate_action_queues_combines_actions_in_overlap(
         for a in current_actions
     ]
 
-    for a in current_actions:
-        robot_client.action_queue.put(a)
+    robot_client._aggregate_action_queues(current_actions)
 
     # Incoming chunk contains timesteps 3..7 -> expect 5,6,7 kept.
     incoming = _make_actions(start_ts=time.time(), start_t=3, count=5)  # 3,4,5,6,7
@@ -153,7 +153,7 @@ def test_aggregate_action_queues_combines_actions_in_overlap(
 
     queue_overlap_actions = []
     queue_non_overlap_actions = []
-    for a in robot_client.action_queue.queue:
+    for a in robot_client.action_queue:
         if a.get_timestep() in overlap_timesteps:
             queue_overlap_actions.append(a)
         elif a.get_timestep() in nonoverlap_timesteps:
@@ -187,12 +187,9 @@ def test_ready_to_send_observation(robot_client, chunk_size: int, queue_len: int
 
     robot_client.action_chunk_size = chunk_size
 
-    # Clear any existing actions then fill with `queue_len` dummy entries ----
-    robot_client.action_queue = Queue()
-
+    # Fill the queue with `queue_len` dummy entries ----
     dummy_actions = _make_actions(start_ts=time.time(), start_t=0, count=queue_len)
-    for act in dummy_actions:
-        robot_client.action_queue.put(act)
+    robot_client._aggregate_action_queues(dummy_actions)
 
     assert robot_client._ready_to_send_observation() is expected
 
@@ -226,9 +223,80 @@ def test_ready_to_send_observation_with_varying_threshold(robot_client, g_thresh
     robot_client._chunk_size_threshold = g_threshold
 
     # Fill queue with dummy actions
-    robot_client.action_queue = Queue()
     dummy_actions = _make_actions(start_ts=time.time(), start_t=0, count=queue_len)
-    for act in dummy_actions:
-        robot_client.action_queue.put(act)
+    robot_client._aggregate_action_queues(dummy_actions)
 
     assert robot_client._ready_to_send_observation() is expected
+
+
+def test_control_loop_performs_actions_while_observation_is_sent(robot_client):
+    """A slow observation must not delay the actions, which keep their period."""
+    robot_client.start_barrier = threading.Barrier(1)  # no action receiver thread
+    robot_client.action_chunk_size = 100
+    robot_client._chunk_size_threshold = 1.0  # always ready to send an observation
+    robot_client._aggregate_action_queues(_make_actions(start_ts=time.time(), start_t=0, count=100))
+
+    sent_observations = []
+
+    def slow_send_observation(obs):
+        sent_observations.append(obs)
+        time.sleep(0.3)
+        return True
+
+    robot_client.send_observation = slow_send_observation
+
+    control_loop = threading.Thread(target=robot_client.control_loop, args=("task",))
+    control_loop.start()
+    time.sleep(0.5)
+    robot_client.shutdown_event.set()
+    control_loop.join()
+
+    assert len(sent_observations) >= 1
+    # 15 actions at 30 fps in 0.5s, a sequential loop would perform one per sent observation
+    assert robot_client.latest_action >= 9
+    assert robot_client.action_loop_timing.ticks == robot_client.latest_action + 1
+
+
+def test_cameras_are_read_outside_the_robot_lock(robot_client, monkeypatch):
+    """Waiting for a camera frame must not hold the lock the actions are sent with."""
+    robot_lock_held = []
+
+    def get_camera_observation():
+        robot_lock_held.append(robot_client.robot_lock.locked())
+        return {"front": "frame"}
+
+    monkeypatch.setattr(robot_client.robot, "get_camera_observation", get_camera_observation)
+
+    observation = robot_client._get_robot_observation()
+
+    assert "motor_1.pos" in observation
+    assert observation["front"] == "frame"
+    assert robot_lock_held == [False]
+
+
+def test_policy_of_the_wrong_action_size_is_rejected_on_start(robot_client):
+    """A policy whose actions do not fit the robot fails the session setup, not the control loop."""
+    from lerobot.scripts.server.constants import POLICY_ACTION_DIM_METADATA_KEY
+
+    num_joints = len(robot_client.robot.action_features)
+
+    class FakeCall:
+        def __init__(self, action_dim: int):
+            self.action_dim = action_dim
+
+        def trailing_metadata(self):
+            return ((POLICY_ACTION_DIM_METADATA_KEY, str(self.action_dim)),)
+
+    class FakeStub:
+        def __init__(self, action_dim: int):
+            self.Ready = lambda request, metadata: None
+            self.SendPolicyInstructions = SimpleNamespace(
+                with_call=lambda request, metadata: (None, FakeCall(action_dim))
+            )
+
+    robot_client.stub = FakeStub(num_joints)
+    assert robot_client.start()
+
+    robot_client.stub = FakeStub(num_joints - 1)
+    with pytest.raises(ValueError, match=f"actions of {num_joints - 1} values"):
+        robot_client.start()
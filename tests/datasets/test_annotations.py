@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from types import SimpleNamespace
+
+import torch
+
+from lerobot.datasets.annotations import (
+    UNKNOWN_ANNOTATION,
+    AnnotationDecoder,
+    build_lookup_table,
+)
+
+
+def _make_meta():
+    return SimpleNamespace(
+        eef_acc_mags={0: "low", 1: "high"},
+        eef_directions={0: "up", 2: "down"},
+        eef_velocities=None,
+        gripper_modes={0: "open", 1: "closed"},
+        gripper_activities={0: "idle", 1: "active"},
+    )
+
+
+def test_build_lookup_table_fills_holes():
+    table = build_lookup_table({0: "up", 2: "down"})
+    assert table.tolist() == ["up", UNKNOWN_ANNOTATION, "down"]
+    assert build_lookup_table(None) is None
+    assert build_lookup_table({}) is None
+
+
+def test_decode_item():
+    decoder = AnnotationDecoder.from_meta(_make_meta())
+    item = {
+        "eef_acc_mag_state": torch.tensor([0, 1]),
+        "eef_direction_action": torch.tensor([2, 0]),
+        "eef_velocity_state": torch.tensor([0, 0]),
+        "gripper_mode_state": torch.tensor([1, 0]),
+    }
+    item = decoder.decode_item(item)
+
+    assert item["left_eef_acc_mag_state"] == "low"
+    assert item["right_eef_acc_mag_state"] == "high"
+    assert item["left_eef_direction_action"] == "down"
+    assert item["right_eef_direction_action"] == "up"
+    assert item["left_gripper_mode_state"] == "closed"
+    assert item["right_gripper_mode_state"] == "open"
+    # No vocabulary for this family
+    assert item["left_eef_velocity_state"] == UNKNOWN_ANNOTATION
+    # Column absent from the item
+    assert item["left_gripper_activity_action"] == UNKNOWN_ANNOTATION
+    assert item["right_eef_acc_mag_action"] == UNKNOWN_ANNOTATION
+
+
+def test_collate_fn_matches_per_item_decoding():
+    decoder = AnnotationDecoder.from_meta(_make_meta())
+    samples = [
+        {
+            "index": torch.tensor(i),
+            "eef_acc_mag_state": torch.tensor([i % 2, (i + 1) % 2]),
+            "gripper_activity_action": torch.tensor([1, i % 2]),
+        }
+        for i in range(4)
+    ]
+
+    batch = decoder.collate_fn([dict(s) for s in samples])
+    expected = torch.utils.data.default_collate([decoder.decode_item(dict(s)) for s in samples])
+
+    for column in decoder.columns:
+        for side in ("left", "right"):
+            key = f"{side}_{column}"
+            assert batch[key] == expected[key]
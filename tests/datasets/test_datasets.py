@@ -16,9 +16,11 @@
 import json
 import logging
 import re
+from concurrent.futures import Future
 from copy import deepcopy
 from itertools import chain
 from pathlib import Path
+from unittest.mock import patch
 
 import numpy as np
 import pytest
@@ -30,7 +32,9 @@ from safetensors.torch import load_file
 import lerobot
 from lerobot.configs.default import DatasetConfig
 from lerobot.configs.train import TrainPipelineConfig
+from lerobot.datasets.columnar_cache import ColumnarCache
 from lerobot.datasets.factory import make_dataset
+from lerobot.datasets.file_manifest import EPISODE_FILES_MANIFEST_PATH, EpisodeFilesManifest
 from lerobot.datasets.image_writer import image_array_to_pil_image
 from lerobot.datasets.lerobot_dataset import (
     LeRobotDataset,
@@ -41,9 +45,10 @@ from lerobot.datasets.utils import (
     flatten_dict,
     unflatten_dict,
 )
+from lerobot.datasets.video_utils import VideoEncodingManager
 from lerobot.envs.factory import make_env_config
 from lerobot.policies.factory import make_policy_config
-from tests.fixtures.constants import DUMMY_CHW, DUMMY_HWC, DUMMY_REPO_ID
+from tests.fixtures.constants import DUMMY_CHW, DUMMY_HWC, DUMMY_MOTOR_FEATURES, DUMMY_REPO_ID
 from tests.utils import require_x86_64_kernel
 
 
@@ -99,6 +104,38 @@ def test_dataset_initialization(tmp_path, lerobot_dataset_factory):
     assert dataset.num_frames == len(dataset)
 
 
+def test_columnar_cache(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(total_episodes=3, total_frames=60, use_videos=False)
+    delta_timestamps = {"action": [-1 / 30, 0, 1 / 30], "state": [-1 / 30, 0]}
+    root = tmp_path / "test"
+    dataset = lerobot_dataset_factory(root=root, info=info, delta_timestamps=delta_timestamps)
+    cached = lerobot_dataset_factory(
+        root=root, info=info, delta_timestamps=delta_timestamps, use_columnar_cache=True
+    )
+
+    assert "action" in cached.columnar_cache
+    assert "laptop" not in cached.columnar_cache
+    assert len(list((root / ".cache" / "columnar").iterdir())) == 1
+    for idx in [0, 19, 20, 59]:
+        expected, item = dataset[idx], cached[idx]
+        assert item.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, torch.Tensor):
+                assert value.dtype == item[key].dtype, key
+                torch.testing.assert_close(item[key], value)
+            else:
+                assert item[key] == value
+
+    # Changing info.json (e.g. after recording more episodes) invalidates the cache
+    cache_dir = cached.columnar_cache.cache_dir
+    info_path = root / "meta" / "info.json"
+    info_path.write_text(json.dumps({**json.loads(info_path.read_text()), "robot_type": "other"}))
+    rebuilt = ColumnarCache.load_or_build(root, cached.hf_dataset)
+    assert rebuilt.cache_dir != cache_dir
+    assert not cache_dir.exists()
+    np.testing.assert_array_equal(rebuilt["index"], cached.columnar_cache["index"])
+
+
 def test_add_frame_missing_feature(tmp_path, empty_lerobot_dataset_factory):
     features = {"state": {"dtype": "float32", "shape": (1,), "names": None}}
     dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
@@ -245,6 +282,175 @@ def test_add_frame_string(tmp_path, empty_lerobot_dataset_factory):
     assert dataset[0]["caption"] == "Dummy caption"
 
 
+def test_save_episode_streaming_encoding(tmp_path, empty_lerobot_dataset_factory):
+    features = {
+        "state": {"dtype": "float32", "shape": (2,), "names": None},
+        "cam": {"dtype": "video", "shape": DUMMY_HWC, "names": ["height", "width", "channels"]},
+    }
+    dataset = empty_lerobot_dataset_factory(
+        root=tmp_path / "test", features=features, streaming_encoding=True
+    )
+    for _ in range(2):
+        for _ in range(10):
+            frame = {
+                "state": np.random.rand(2).astype(np.float32),
+                "cam": np.random.randint(0, 256, DUMMY_HWC, dtype=np.uint8),
+            }
+            dataset.add_frame(frame, task="Dummy task")
+        dataset.save_episode()
+
+    # No intermediate PNG was written
+    assert not (dataset.image_cache_root / "images" / "cam").exists()
+    for ep_idx in range(2):
+        assert (dataset.root / dataset.meta.get_video_file_path(ep_idx, "cam")).is_file()
+        assert dataset.meta.episodes_stats[ep_idx]["cam"]["mean"].shape == (3, 1, 1)
+    assert dataset.meta.info["features"]["cam"]["info"]["video.width"] == DUMMY_HWC[1]
+
+    # Frames of an episode that is discarded are not kept
+    dataset.add_frame(frame, task="Dummy task")
+    dataset.clear_episode_buffer()
+    assert not (dataset.root / dataset.meta.get_video_file_path(2, "cam")).exists()
+
+
+def test_save_episode_video_encoding_pool(tmp_path, empty_lerobot_dataset_factory):
+    features = {
+        "state": {"dtype": "float32", "shape": (2,), "names": None},
+        "cam_left": {"dtype": "video", "shape": DUMMY_HWC, "names": ["height", "width", "channels"]},
+        "cam_right": {"dtype": "video", "shape": DUMMY_HWC, "names": ["height", "width", "channels"]},
+    }
+    dataset = empty_lerobot_dataset_factory(
+        root=tmp_path / "test",
+        features=features,
+        video_encoding_workers=2,
+        video_encoder_threads=1,
+        async_video_encoding=True,
+    )
+    for _ in range(2):
+        for _ in range(5):
+            frame = {
+                "state": np.random.rand(2).astype(np.float32),
+                "cam_left": np.random.randint(0, 256, DUMMY_HWC, dtype=np.uint8),
+                "cam_right": np.random.randint(0, 256, DUMMY_HWC, dtype=np.uint8),
+            }
+            dataset.add_frame(frame, task="Dummy task")
+        dataset.save_episode()
+
+    dataset.wait_video_encoding()
+    assert dataset._pending_video_encodings == []
+    for ep_idx in range(2):
+        for key in ["cam_left", "cam_right"]:
+            assert (dataset.root / dataset.meta.get_video_file_path(ep_idx, key)).is_file()
+            img_dir = dataset._get_cached_image_file_path(ep_idx, key, frame_index=0).parent
+            assert not img_dir.exists()
+    assert dataset.meta.info["features"]["cam_left"]["info"]["video.width"] == DUMMY_HWC[1]
+    dataset.stop_video_encoding_pool()
+    assert dataset.video_encoding_pool is None
+
+
+def test_failed_video_encoding_is_raised_once(tmp_path, empty_lerobot_dataset_factory):
+    features = {
+        "state": {"dtype": "float32", "shape": (2,), "names": None},
+        "cam_left": {"dtype": "video", "shape": DUMMY_HWC, "names": ["height", "width", "channels"]},
+        "cam_right": {"dtype": "video", "shape": DUMMY_HWC, "names": ["height", "width", "channels"]},
+    }
+    dataset = empty_lerobot_dataset_factory(
+        root=tmp_path / "test",
+        features=features,
+        video_encoding_workers=1,
+        video_encoder_threads=1,
+        async_video_encoding=True,
+    )
+    pool = dataset.video_encoding_pool
+    submit = pool.submit
+
+    def submit_failing_right_camera(imgs_dir, video_path, fps):
+        if "cam_right" not in str(video_path):
+            return submit(imgs_dir, video_path, fps)
+        future = Future()
+        future.set_exception(RuntimeError("Encoding failed"))
+        return future
+
+    pool.submit = submit_failing_right_camera
+
+    for _ in range(5):
+        frame = {
+            "state": np.random.rand(2).astype(np.float32),
+            "cam_left": np.random.randint(0, 256, DUMMY_HWC, dtype=np.uint8),
+            "cam_right": np.random.randint(0, 256, DUMMY_HWC, dtype=np.uint8),
+        }
+        dataset.add_frame(frame, task="Dummy task")
+    dataset.save_episode()
+    # The images of an episode interrupted while the failed video is collected are still removed
+    interrupted_img_path = dataset._get_image_file_path(1, "cam_left", frame_index=0)
+    interrupted_img_path.parent.mkdir(parents=True)
+    Image.new("RGB", (2, 2)).save(interrupted_img_path)
+    with pytest.raises(RuntimeError, match="Encoding failed"), VideoEncodingManager(dataset):
+        raise KeyboardInterrupt
+
+    # The failed job is not pending anymore and the video of the other camera is recorded
+    assert dataset._pending_video_encodings == []
+    assert dataset.files_manifest.num_files(".mp4") == 1
+    assert not (dataset.root / "images").exists()
+    dataset.wait_video_encoding()
+    dataset.stop_video_encoding_pool()
+
+
+def test_save_episode_without_keeping_episodes_in_memory(tmp_path, empty_lerobot_dataset_factory):
+    features = {"state": {"dtype": "float32", "shape": (2,), "names": None}}
+    dataset = empty_lerobot_dataset_factory(
+        root=tmp_path / "test", features=features, keep_episodes_in_memory=False
+    )
+    for _ in range(3):
+        for _ in range(4):
+            dataset.add_frame({"state": np.random.rand(2).astype(np.float32)}, task="Dummy task")
+        dataset.save_episode()
+
+    assert dataset.hf_dataset is None
+    assert dataset.num_frames == 12
+    assert dataset.files_manifest.num_files(".parquet") == 3
+    assert dataset.files_manifest.files[2] == {dataset.meta.get_data_file_path(2).as_posix()}
+
+    reloaded = LeRobotDataset(dataset.repo_id, root=dataset.root)
+    assert len(reloaded) == 12
+
+
+def test_saved_episodes_are_appended_to_hf_dataset_when_read(tmp_path, empty_lerobot_dataset_factory):
+    features = {"state": {"dtype": "float32", "shape": (2,), "names": None}}
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    for episode_index in range(3):
+        for _ in range(4):
+            dataset.add_frame({"state": np.full(2, episode_index, dtype=np.float32)}, task="Dummy task")
+        dataset.save_episode()
+        # Read between the saves of the first two episodes only
+        if episode_index < 2:
+            assert len(dataset.hf_dataset) == 4 * (episode_index + 1)
+
+    assert len(dataset._unmerged_episodes) == 1
+    assert len(dataset.hf_dataset) == 12
+    assert dataset._unmerged_episodes == []
+    assert dataset.hf_dataset[11]["episode_index"].item() == 2
+    assert torch.equal(dataset.hf_dataset[8]["state"], torch.full((2,), 2.0))
+
+
+def test_files_manifest_is_rebuilt(tmp_path, empty_lerobot_dataset_factory):
+    features = {"state": {"dtype": "float32", "shape": (2,), "names": None}}
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    for _ in range(2):
+        dataset.add_frame({"state": np.random.rand(2).astype(np.float32)}, task="Dummy task")
+        dataset.save_episode()
+
+    manifest_path = dataset.root / EPISODE_FILES_MANIFEST_PATH
+    lines = manifest_path.read_text().splitlines()
+    assert len(lines) == 2
+
+    # A truncated last line, left by an interrupted save, is ignored and the manifest is rebuilt from disk
+    manifest_path.write_text(lines[0] + "\n" + lines[1][:10])
+    manifest = EpisodeFilesManifest(dataset.root, num_episodes=2)
+    assert manifest.num_files(".parquet") == 2
+    manifest_path.unlink()
+    assert EpisodeFilesManifest(dataset.root).files == manifest.files
+
+
 def test_add_frame_image_wrong_shape(image_dataset):
     dataset = image_dataset
     with pytest.raises(
@@ -427,6 +633,78 @@ def test_multidataset_frames():
             assert torch.equal(sub_dataset_item[k], dataset_item[k])
 
 
+@pytest.fixture
+def sub_datasets(
+    tmp_path, lerobot_dataset_factory, info_factory, tasks_factory, episodes_factory, hf_dataset_factory
+):
+    extra_feature = {"extra": {"dtype": "float32", "shape": (2,), "names": None}}
+    sub_datasets = {}
+    for repo_id, total_frames, motor_features in [
+        ("dummy/a", 30, DUMMY_MOTOR_FEATURES),
+        ("dummy/b", 45, {**DUMMY_MOTOR_FEATURES, **extra_feature}),
+        ("dummy/c", 60, DUMMY_MOTOR_FEATURES),
+    ]:
+        info = info_factory(
+            total_episodes=3, total_frames=total_frames, motor_features=motor_features, camera_features={}
+        )
+        tasks = tasks_factory(total_tasks=1)
+        episodes = episodes_factory(total_episodes=3, total_frames=total_frames, tasks=tasks)
+        hf_dataset = hf_dataset_factory(features=info["features"], tasks=tasks, episodes=episodes)
+        sub_datasets[repo_id] = lerobot_dataset_factory(
+            root=tmp_path / repo_id,
+            repo_id=repo_id,
+            info=info,
+            tasks=tasks,
+            episode_dicts=episodes,
+            hf_dataset=hf_dataset,
+        )
+    return sub_datasets
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_multidataset_indexing(tmp_path, sub_datasets, lazy):
+    with (
+        patch(
+            "lerobot.datasets.lerobot_dataset.LeRobotDataset",
+            side_effect=lambda repo_id, **kwargs: sub_datasets[repo_id],
+        ) as mock_dataset,
+        patch(
+            "lerobot.datasets.lerobot_dataset.LeRobotDatasetMetadata",
+            side_effect=lambda repo_id, **kwargs: sub_datasets[repo_id].meta,
+        ),
+    ):
+        dataset = MultiLeRobotDataset(
+            list(sub_datasets),
+            root=tmp_path,
+            sampling_weights={"dummy/c": 2.0},
+            num_loading_workers=2,
+            lazy=lazy,
+        )
+        assert mock_dataset.call_count == (0 if lazy else 3)
+        assert dataset.disabled_features == {"extra"}
+        assert dataset.sampling_weights == [1.0, 1.0, 2.0]
+        assert dataset.cumulative_sizes == list(np.cumsum([len(d) for d in sub_datasets.values()]))
+        assert len(dataset) == sum(len(d) for d in sub_datasets.values())
+        assert dataset.num_episodes == 9
+
+        if lazy:
+            # Only the sub-dataset holding the requested frame is constructed
+            dataset[len(sub_datasets["dummy/a"])]
+            assert [ds is not None for ds in dataset._datasets] == [False, True, False]
+
+        start = 0
+        for dataset_index, sub_dataset in enumerate(sub_datasets.values()):
+            for frame_index in [0, len(sub_dataset) - 1]:
+                item = dataset[start + frame_index]
+                assert item["dataset_index"] == dataset_index
+                assert "extra" not in item
+                assert torch.equal(item["index"], sub_dataset[frame_index]["index"])
+            start += len(sub_dataset)
+
+        with pytest.raises(IndexError):
+            dataset[len(dataset)]
+
+
 # TODO(aliberts): Move to more appropriate location
 def test_flatten_unflatten_dict():
     d = {
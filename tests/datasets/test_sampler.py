@@ -13,10 +13,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import pytest
+import torch
 from datasets import Dataset
 
 from lerobot.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
-from lerobot.datasets.sampler import EpisodeAwareSampler
+from lerobot.datasets.sampler import EpisodeAwareSampler, WeightedDatasetSampler
 from lerobot.datasets.utils import (
     hf_transform_to_torch,
 )
@@ -88,3 +90,42 @@ def test_shuffle():
     assert sampler.indices == [0, 1, 2, 3, 4, 5]
     assert len(sampler) == 6
     assert set(sampler) == {0, 1, 2, 3, 4, 5}
+
+
+def test_sequential_chunks():
+    dataset = Dataset.from_dict(
+        {
+            "timestamp": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7],
+            "index": [0, 1, 2, 3, 4, 5, 6],
+            "episode_index": [0, 0, 0, 1, 1, 1, 1],
+        },
+    )
+    dataset.set_transform(hf_transform_to_torch)
+    episode_data_index = calculate_episode_data_index(dataset)
+    sampler = EpisodeAwareSampler(episode_data_index, sequential_chunk_size=2, shuffle=True)
+    assert [list(chunk) for chunk in sampler.chunks] == [[0, 1], [2], [3, 4], [5, 6]]
+    assert len(sampler) == 7
+
+    sampled = list(sampler)
+    assert sorted(sampled) == sampler.indices
+    for chunk in sampler.chunks:
+        start = sampled.index(chunk[0])
+        assert sampled[start : start + len(chunk)] == list(chunk)
+
+
+def test_weighted_dataset_sampler():
+    # Datasets of 10, 0 and 90 frames, the first one drawn 3 times more often than the last one
+    cumulative_sizes = [10, 10, 100]
+    sampler = WeightedDatasetSampler(
+        cumulative_sizes, [3.0, 5.0, 1.0], num_samples=4000, generator=torch.Generator().manual_seed(0)
+    )
+    assert len(sampler) == 4000
+
+    indices = torch.tensor(list(sampler))
+    assert indices.min() >= 0 and indices.max() < 100
+    ratio = (indices < 10).float().mean().item()
+    assert abs(ratio - 0.75) < 0.05
+    assert len(set((indices[indices >= 10]).tolist())) > 80
+
+    with pytest.raises(ValueError):
+        WeightedDatasetSampler(cumulative_sizes, [0.0, 1.0, 0.0])
@@ -14,9 +14,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 import torch
 from datasets import Dataset
 from huggingface_hub import DatasetCard
+from PIL import Image as PILImage
 
 from lerobot.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
 from lerobot.datasets.utils import create_lerobot_dataset_card, hf_transform_to_torch
@@ -53,3 +55,15 @@ def test_calculate_episode_data_index():
     episode_data_index = calculate_episode_data_index(dataset)
     assert torch.equal(episode_data_index["from"], torch.tensor([0, 2, 3]))
     assert torch.equal(episode_data_index["to"], torch.tensor([2, 3, 6]))
+
+
+def test_hf_transform_to_torch_uint8_images():
+    rgb = np.random.randint(0, 256, size=(4, 5, 3), dtype=np.uint8)
+    gray = np.random.randint(0, 256, size=(4, 5), dtype=np.uint8)
+    items = {"rgb": [PILImage.fromarray(rgb)], "gray": [PILImage.fromarray(gray)]}
+
+    items = hf_transform_to_torch(items, uint8_images=True)
+
+    assert items["rgb"][0].dtype == torch.uint8
+    assert torch.equal(items["rgb"][0], torch.from_numpy(rgb).permute(2, 0, 1))
+    assert items["gray"][0].shape == (1, 4, 5)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pickle
+import threading
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from lerobot.datasets.video_utils import (
+    DecodedFrameCache,
+    StreamingVideoEncoder,
+    VideoDecoderCache,
+    VideoEncodingPool,
+    decode_video_frames,
+    decode_video_frames_torchvision,
+    encode_and_validate_video,
+    encode_video_frames,
+    validate_video_pyav,
+)
+
+FPS = 10
+NUM_FRAMES = 20
+
+
+def make_frames(num_frames: int = NUM_FRAMES) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, size=(32, 48, 3), dtype=np.uint8) for _ in range(num_frames)]
+
+
+def write_frames(imgs_dir) -> None:
+    imgs_dir.mkdir(parents=True)
+    for i, img in enumerate(make_frames()):
+        Image.fromarray(img).save(imgs_dir / f"frame_{i:06d}.png")
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    imgs_dir = tmp_path / "images"
+    write_frames(imgs_dir)
+    path = tmp_path / "videos" / "episode_000000.mp4"
+    encode_video_frames(imgs_dir, path, FPS, overwrite=True)
+    return path
+
+
+def test_decoder_cache_reuses_decoder():
+    cache = VideoDecoderCache(max_size=2)
+    opened = []
+
+    def open_decoder():
+        opened.append(object())
+        return opened[-1]
+
+    first = cache.get("a.mp4", "torchcodec", open_decoder)
+    assert cache.get("a.mp4", "torchcodec", open_decoder) is first
+    assert len(opened) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_decoder_cache_evicts_least_recently_used():
+    cache = VideoDecoderCache(max_size=2)
+    cache.get("a.mp4", "torchcodec", object)
+    cache.get("b.mp4", "torchcodec", object)
+    cache.get("a.mp4", "torchcodec", object)
+    cache.get("c.mp4", "torchcodec", object)
+
+    assert len(cache) == 2
+    assert set(cache._entries) == {("a.mp4", "torchcodec"), ("c.mp4", "torchcodec")}
+
+
+def test_decoder_cache_is_reset_after_fork_and_pickle():
+    cache = VideoDecoderCache(max_size=2)
+    decoder = cache.get("a.mp4", "torchcodec", object)
+
+    restored = pickle.loads(pickle.dumps(cache))
+    assert len(restored) == 0
+    assert restored.max_size == 2
+
+    # Simulate the cache being inherited by a forked worker
+    cache._pid = os.getpid() + 1
+    assert cache.get("a.mp4", "torchcodec", object) is not decoder
+
+
+def test_decode_video_frames_torchvision_with_cache(video_path):
+    cache = VideoDecoderCache(max_size=1)
+    queries = [[0.0, 0.1], [0.5], [0.3, 0.4, 0.5], [1.5, 1.9], [0.2]]
+    for timestamps in queries:
+        expected = decode_video_frames_torchvision(video_path, timestamps, 1e-4, "pyav")
+        frames = decode_video_frames_torchvision(video_path, timestamps, 1e-4, "pyav", decoder_cache=cache)
+        torch.testing.assert_close(frames, expected)
+
+    assert cache.misses == 1
+    assert cache.hits == len(queries) - 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_frame_cache_is_bounded_in_bytes():
+    frame = torch.zeros(3, 4, 4, dtype=torch.uint8)
+    cache = DecodedFrameCache(max_bytes=3 * frame.numel())
+    for i in range(5):
+        cache.put("a.mp4", i / FPS, frame.clone())
+
+    stats = cache.stats()
+    assert stats["num_frames"] == 3
+    assert stats["num_bytes"] == 3 * frame.numel()
+    assert cache.get("a.mp4", [0.0, 0.4]) == [None, cache._entries[("a.mp4", 4000)]]
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_frame_cache_only_accepts_uint8():
+    cache = DecodedFrameCache(max_bytes=1024)
+    with pytest.raises(TypeError):
+        cache.put("a.mp4", 0.0, torch.zeros(3, 2, 2))
+
+
+def test_decode_video_frames_with_frame_cache(video_path):
+    cache = DecodedFrameCache(max_bytes=2**20)
+    # [0.1, 0.2] were decoded on the way to 0.3 and [0.2, 0.3] are already cached
+    queries = [[0.0, 0.3], [0.1, 0.2], [0.2, 0.3]]
+    for timestamps in queries:
+        expected = decode_video_frames(video_path, timestamps, 1e-4, "pyav")
+        frames = decode_video_frames(video_path, timestamps, 1e-4, "pyav", frame_cache=cache)
+        assert frames.dtype == torch.float32
+        torch.testing.assert_close(frames, expected)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 2)
+    assert stats["num_bytes"] == stats["num_frames"] * 3 * 32 * 48
+
+
+def test_decode_video_frames_uint8(video_path):
+    timestamps = [0.4, 0.5]
+    expected = decode_video_frames(video_path, timestamps, 1e-4, "pyav")
+    frames = decode_video_frames(video_path, timestamps, 1e-4, "pyav", return_uint8=True)
+    assert frames.dtype == torch.uint8
+    torch.testing.assert_close(frames.float() / 255, expected)
+
+    cache = DecodedFrameCache(max_bytes=2**20)
+    for _ in range(2):
+        cached = decode_video_frames(
+            video_path, timestamps, 1e-4, "pyav", frame_cache=cache, return_uint8=True
+        )
+        torch.testing.assert_close(cached, frames)
+
+
+def test_streaming_encoder_matches_png_encoding(tmp_path, video_path):
+    encoder = StreamingVideoEncoder(tmp_path / "streamed.mp4", FPS)
+    for i, img in enumerate(make_frames()):
+        # Accepts both channel last uint8 and channel first float frames
+        encoder.add_frame(img if i % 2 else img.transpose(2, 0, 1).astype(np.float32) / 255)
+    encoder.close()
+
+    assert encoder.num_frames == NUM_FRAMES
+    timestamps = [i / FPS for i in range(NUM_FRAMES)]
+    expected = decode_video_frames(video_path, timestamps, 1e-4, "pyav")
+    frames = decode_video_frames(encoder.video_path, timestamps, 1e-4, "pyav")
+    torch.testing.assert_close(frames, expected, atol=2 / 255, rtol=0)
+    assert encoder.stats_frames.shape == (NUM_FRAMES, 3, 32, 48)
+
+
+def test_streaming_encoder_bounds_stats_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(StreamingVideoEncoder, "MAX_STATS_FRAMES", 4)
+    encoder = StreamingVideoEncoder(tmp_path / "video.mp4", FPS)
+    frames = make_frames()
+    for img in frames:
+        encoder.add_frame(img)
+    encoder.close()
+
+    # The kept frames are halved and the stride doubled each time 4 frames are kept
+    assert len(encoder.stats_frames) == 3
+    for stats_frame, idx in zip(encoder.stats_frames, [0, 8, 16], strict=True):
+        np.testing.assert_array_equal(stats_frame, frames[idx].transpose(2, 0, 1))
+
+
+def test_streaming_encoder_blocks_when_its_queue_is_full(tmp_path, monkeypatch):
+    from lerobot.datasets import video_utils
+
+    encoding = threading.Event()
+    to_hwc_uint8 = video_utils._to_hwc_uint8
+
+    def slow_to_hwc_uint8(image):
+        encoding.wait()
+        return to_hwc_uint8(image)
+
+    monkeypatch.setattr(video_utils, "_to_hwc_uint8", slow_to_hwc_uint8)
+    # A queue of 2 frames, while the first frame is held by the encoding thread
+    encoder = StreamingVideoEncoder(tmp_path / "video.mp4", FPS, queue_seconds=2 / FPS)
+    frames = make_frames(4)
+    for img in frames[:3]:
+        encoder.add_frame(img)
+
+    blocked = threading.Thread(target=encoder.add_frame, args=(frames[3],))
+    blocked.start()
+    blocked.join(timeout=0.2)
+    assert blocked.is_alive()
+
+    encoding.set()
+    blocked.join()
+    encoder.close()
+    assert encoder.num_frames == 4
+
+
+def test_streaming_encoder_abort(tmp_path):
+    encoder = StreamingVideoEncoder(tmp_path / "video.mp4", FPS)
+    encoder.add_frame(make_frames(1)[0])
+    encoder.abort()
+    assert not encoder.video_path.exists()
+
+
+def test_encode_and_validate_video(tmp_path, video_path):
+    imgs_dir = tmp_path / "images_2"
+    write_frames(imgs_dir)
+    path = encode_and_validate_video(imgs_dir, tmp_path / "video.mp4", FPS, encoder_threads=1)
+
+    assert validate_video_pyav(path)
+    assert not imgs_dir.exists()
+    timestamps = [i / FPS for i in range(NUM_FRAMES)]
+    torch.testing.assert_close(
+        decode_video_frames(path, timestamps, 1e-4, "pyav"),
+        decode_video_frames(video_path, timestamps, 1e-4, "pyav"),
+    )
+
+
+def test_video_encoding_pool(tmp_path):
+    pool = VideoEncodingPool(num_workers=2, encoder_threads=1)
+    futures = []
+    for key in ["left", "right", "top"]:
+        write_frames(tmp_path / "images" / key)
+        futures.append(pool.submit(tmp_path / "images" / key, tmp_path / "videos" / f"{key}.mp4", FPS))
+    paths = [future.result() for future in futures]
+    pool.stop()
+
+    for path in paths:
+        assert validate_video_pyav(path)
+    assert list((tmp_path / "images").iterdir()) == []
+
+
+def test_validate_video_pyav(tmp_path, video_path):
+    for full_decode in [False, True]:
+        assert validate_video_pyav(video_path, NUM_FRAMES, full_decode=full_decode)
+        assert not validate_video_pyav(video_path, NUM_FRAMES + 1, full_decode=full_decode)
+    assert validate_video_pyav(video_path, num_sampled_frames=NUM_FRAMES)
+
+    truncated_path = tmp_path / "truncated.mp4"
+    truncated_path.write_bytes(video_path.read_bytes()[: video_path.stat().st_size // 2])
+    assert not validate_video_pyav(truncated_path)
+    assert not validate_video_pyav(tmp_path / "missing.mp4")
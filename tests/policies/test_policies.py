@@ -544,3 +544,99 @@ def test_act_temporal_ensembler():
         assert torch.all(offline_avg <= einops.reduce(seq_slice, "b s 1 -> b 1", "max"))
         # Selected atol=1e-4 keeping in mind actions in [-1, 1] and excepting 0.01% error.
         torch.testing.assert_close(online_avg, offline_avg, rtol=1e-4, atol=1e-4)
+
+
+def make_small_diffusion_policy(**kwargs):
+    from lerobot.policies.diffusion.configuration_diffusion import DiffusionConfig
+    from lerobot.policies.diffusion.modeling_diffusion import DiffusionPolicy
+
+    config = DiffusionConfig(
+        input_features={
+            "observation.images.front": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 32, 32)),
+            "observation.images.wrist": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 32, 32)),
+            OBS_STATE: PolicyFeature(type=FeatureType.STATE, shape=(2,)),
+        },
+        output_features={ACTION: PolicyFeature(type=FeatureType.ACTION, shape=(2,))},
+        normalization_mapping=dict.fromkeys(["VISUAL", "STATE", "ACTION"], NormalizationMode.IDENTITY),
+        n_obs_steps=3,
+        crop_shape=(28, 28),
+        down_dims=(16, 32),
+        device="cpu",
+        **{"num_inference_steps": 2, **kwargs},
+    )
+    with seeded_context(0):
+        return DiffusionPolicy(config).eval()
+
+
+@pytest.mark.parametrize("n_action_steps, precompute_image_features", [(1, False), (4, False), (4, True)])
+def test_diffusion_image_features_cache(n_action_steps: int, precompute_image_features: bool):
+    """Check that the cached image features of DiffusionPolicy give the same actions, encoding each image once."""
+    policy = make_small_diffusion_policy(n_action_steps=n_action_steps, cache_image_features=False)
+    cached_policy = make_small_diffusion_policy(
+        n_action_steps=n_action_steps, precompute_image_features=precompute_image_features
+    )
+    num_encoded_images = {}
+    for name, p in [("uncached", policy), ("cached", cached_policy)]:
+        num_encoded_images[name] = 0
+
+        def count_encoded_images(module, args, output, name=name):
+            num_encoded_images[name] += len(args[0])
+
+        p.diffusion.rgb_encoder.register_forward_hook(count_encoded_images)
+
+    # The last step generates actions, using the images that were precomputed
+    num_steps = 13
+    for step in range(num_steps):
+        with seeded_context(step):
+            observation = {
+                "observation.images.front": torch.rand(1, 3, 32, 32),
+                "observation.images.wrist": torch.rand(1, 3, 32, 32),
+                OBS_STATE: torch.rand(1, 2),
+            }
+        with seeded_context(step):
+            action = policy.select_action(dict(observation))
+        with seeded_context(step):
+            cached_action = cached_policy.select_action(dict(observation))
+        torch.testing.assert_close(cached_action, action)
+
+    # Each generation of actions encodes the images of `n_obs_steps` steps of 2 cameras
+    num_generations = (num_steps + n_action_steps - 1) // n_action_steps
+    assert num_encoded_images["uncached"] == num_generations * 3 * 2
+    # The first step is encoded once, then the steps used by the next generations of actions that are new
+    num_used_steps = 1 + (num_generations - 1) * min(n_action_steps, 3)
+    assert num_encoded_images["cached"] == num_used_steps * 2
+
+
+@pytest.mark.parametrize("prediction_type", ["epsilon", "sample"])
+def test_diffusion_ddim_sampling_matches_ddim_scheduler(prediction_type: str):
+    """Check that the DDIM sampling with precomputed coefficients matches the steps of DDIMScheduler."""
+    policy = make_small_diffusion_policy(
+        prediction_type=prediction_type, inference_noise_scheduler_type="DDIM", num_inference_steps=10
+    )
+    model = policy.diffusion
+    global_cond = torch.randn(2, (2 + 2 * model.rgb_encoder.feature_dim) * model.config.n_obs_steps)
+
+    with seeded_context(0):
+        actions = model.conditional_sample(2, global_cond=global_cond)
+
+    with seeded_context(0):
+        expected = torch.randn(2, model.config.horizon, 2)
+    scheduler = model.inference_noise_scheduler
+    scheduler.set_timesteps(10)
+    for t in scheduler.timesteps:
+        model_output = model.unet(expected, torch.full((2,), t, dtype=torch.long), global_cond=global_cond)
+        expected = scheduler.step(model_output, t, expected).prev_sample
+
+    torch.testing.assert_close(actions, expected)
+
+
+def test_diffusion_dpm_solver_sampling():
+    policy = make_small_diffusion_policy(inference_noise_scheduler_type="DPMSolver", num_inference_steps=5)
+    assert policy.diffusion.noise_scheduler is not policy.diffusion.inference_noise_scheduler
+
+    observation = {
+        "observation.images.front": torch.rand(1, 3, 32, 32),
+        "observation.images.wrist": torch.rand(1, 3, 32, 32),
+        OBS_STATE: torch.rand(1, 2),
+    }
+    assert policy.select_action(observation).shape == (1, 2)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from types import SimpleNamespace
+
+import torch
+from torch import Tensor
+
+from tests.utils import require_package
+
+WIDTH = 64
+IMAGE_SIZE = 28
+TEXT_CONFIG = {
+    "hidden_size": WIDTH,
+    "intermediate_size": 2 * WIDTH,
+    "num_attention_heads": 4,
+    "num_key_value_heads": 1,
+    "head_dim": 16,
+    "num_hidden_layers": 2,
+    "vocab_size": 1000,
+}
+
+
+def make_tiny_pi0(monkeypatch):
+    from transformers.models.auto import CONFIG_MAPPING
+
+    from lerobot.policies.pi0 import modeling_pi0
+    from lerobot.policies.pi0.configuration_pi0 import PI0Config
+    from lerobot.policies.pi0.paligemma_with_expert import PaliGemmaWithExpertConfig
+
+    def tiny_config(**kwargs):
+        config = PaliGemmaWithExpertConfig(**kwargs)
+        config.paligemma_config = CONFIG_MAPPING["paligemma"](
+            hidden_size=WIDTH,
+            projection_dim=WIDTH,
+            image_token_index=TEXT_CONFIG["vocab_size"],
+            text_config={"model_type": "gemma", **TEXT_CONFIG},
+            vision_config={
+                "model_type": "siglip_vision_model",
+                "hidden_size": WIDTH,
+                "intermediate_size": 2 * WIDTH,
+                "num_attention_heads": 4,
+                "num_hidden_layers": 2,
+                "image_size": IMAGE_SIZE,
+                "patch_size": 14,
+                "projection_dim": WIDTH,
+                "vision_use_head": False,
+            },
+        )
+        config.gemma_expert_config = CONFIG_MAPPING["gemma"](**TEXT_CONFIG)
+        return config
+
+    monkeypatch.setattr(modeling_pi0, "PaliGemmaWithExpertConfig", tiny_config)
+    config = PI0Config(
+        resize_imgs_with_padding=(IMAGE_SIZE, IMAGE_SIZE), proj_width=WIDTH, chunk_size=4, n_action_steps=4
+    )
+    return modeling_pi0.PI0FlowMatching(config).eval()
+
+
+def make_tiny_smolvla(monkeypatch):
+    from transformers import SmolVLMConfig
+
+    from lerobot.policies.smolvla import smolvlm_with_expert
+    from lerobot.policies.smolvla.configuration_smolvla import SmolVLAConfig
+    from lerobot.policies.smolvla.modeling_smolvla import VLAFlowMatching
+
+    # Built from a tiny config rather than from the config and processor of the hub
+    vlm_config = SmolVLMConfig(
+        text_config={"model_type": "llama", **TEXT_CONFIG, "num_hidden_layers": 4},
+        vision_config={
+            "hidden_size": WIDTH // 4,
+            "intermediate_size": WIDTH,
+            "num_attention_heads": 2,
+            "num_hidden_layers": 2,
+            "image_size": 32,
+            "patch_size": 8,
+        },
+        scale_factor=2,
+    )
+    tokenizer = SimpleNamespace(fake_image_token_id=1, global_image_token_id=2)
+    monkeypatch.setattr(smolvlm_with_expert.AutoConfig, "from_pretrained", lambda *_: vlm_config)
+    monkeypatch.setattr(
+        smolvlm_with_expert.AutoProcessor, "from_pretrained", lambda *_: SimpleNamespace(tokenizer=tokenizer)
+    )
+    config = SmolVLAConfig(
+        resize_imgs_with_padding=(32, 32),
+        chunk_size=4,
+        n_action_steps=4,
+        num_vlm_layers=4,
+        load_vlm_weights=False,
+    )
+    return VLAFlowMatching(config).eval()
+
+
+def sample_with_and_without_cache(model, inputs: list[dict]) -> None:
+    """Samples the actions of successive inputs with `cache_prefix` and checks them against the actions
+    sampled without it."""
+    torch.manual_seed(0)
+    noise = torch.randn(1, model.config.chunk_size, model.config.max_action_dim)
+
+    model.config.cache_prefix = True
+    model.reset_prefix_cache()
+    with torch.no_grad():
+        cached = [model.sample_actions(**kwargs, noise=noise.clone()) for kwargs in inputs]
+
+    model.config.cache_prefix = False
+    model.reset_prefix_cache()
+    with torch.no_grad():
+        expected = [model.sample_actions(**kwargs, noise=noise.clone()) for kwargs in inputs]
+
+    for actions, expected_actions in zip(cached, expected, strict=True):
+        torch.testing.assert_close(actions, expected_actions)
+
+
+def make_inputs(model, image_size: int, changes: list[str]) -> list[dict]:
+    """Inputs of successive calls with 2 cameras, where each call after the first one changes the frame of the
+    first camera, the state or nothing."""
+    torch.manual_seed(1)
+    images = [torch.rand(1, 3, image_size, image_size) * 2 - 1 for _ in range(2)]
+    state = torch.randn(1, model.config.max_state_dim)
+    lang_tokens = torch.randint(3, TEXT_CONFIG["vocab_size"], (1, 6))
+    inputs = []
+    for change in ["first", *changes]:
+        if change == "camera":
+            images = [torch.rand(1, 3, image_size, image_size) * 2 - 1, images[1]]
+        elif change == "state":
+            state = torch.randn(1, model.config.max_state_dim)
+        inputs.append(
+            {
+                "images": [image.clone() for image in images],
+                "img_masks": [torch.ones(1, dtype=torch.bool) for _ in images],
+                "lang_tokens": lang_tokens.clone(),
+                "lang_masks": torch.ones_like(lang_tokens, dtype=torch.bool),
+                "state": state.clone(),
+            }
+        )
+    return inputs
+
+
+@require_package("transformers")
+def test_pi0_prefix_cache_matches_uncached_sampling(monkeypatch):
+    model = make_tiny_pi0(monkeypatch)
+    embed_image = model.paligemma_with_expert.embed_image
+    num_embedded = []
+
+    def count_embedded(image):
+        num_embedded.append(len(image))
+        return embed_image(image)
+
+    monkeypatch.setattr(model.paligemma_with_expert, "embed_image", count_embedded)
+    # The state is not part of the prefix: a new state alone reuses the whole prefix
+    inputs = make_inputs(model, IMAGE_SIZE, ["nothing", "state", "camera"])
+    sample_with_and_without_cache(model, inputs)
+
+    # With the cache, both cameras are embedded on the first call and the changed camera on the last one
+    assert len(num_embedded) == 3 + 2 * len(inputs)
+
+
+@require_package("transformers")
+def test_smolvla_prefix_cache_matches_uncached_sampling(monkeypatch):
+    model = make_tiny_smolvla(monkeypatch)
+    forward = model.vlm_with_expert.forward
+    prefix_lengths = []
+
+    def record_prefix_length(**kwargs):
+        if kwargs["fill_kv_cache"]:
+            prefix_lengths.append(kwargs["inputs_embeds"][0].shape[1])
+        return forward(**kwargs)
+
+    monkeypatch.setattr(model.vlm_with_expert, "forward", record_prefix_length)
+    inputs = make_inputs(model, 32, ["nothing", "state", "camera"])
+    sample_with_and_without_cache(model, inputs)
+
+    # With the cache, only the state token goes through the VLM when the frames and the task are unchanged
+    full_length = prefix_lengths[0]
+    assert prefix_lengths == [full_length, 1, 1, full_length] + [full_length] * len(inputs)
+
+
+def sample_refilled_in_place(model) -> tuple[Tensor, Tensor]:
+    """Samples the actions of a frame, then of another frame written in place into the same buffer, with
+    `cache_prefix`. Returns the actions of the second call and the ones sampled for it without the cache."""
+    inputs = make_inputs(model, model.config.resize_imgs_with_padding[0], ["camera"])
+    noise = torch.randn(1, model.config.chunk_size, model.config.max_action_dim)
+    model.config.cache_prefix = True
+    model.reset_prefix_cache()
+    with torch.no_grad():
+        model.sample_actions(**inputs[0], noise=noise.clone())
+        inputs[0]["images"][0].copy_(inputs[1]["images"][0])
+        actions = model.sample_actions(**inputs[0], noise=noise.clone())
+
+    model.config.cache_prefix = False
+    with torch.no_grad():
+        expected = model.sample_actions(**inputs[1], noise=noise.clone())
+    return actions, expected
+
+
+@require_package("transformers")
+def test_pi0_prefix_cache_misses_frames_refilled_in_place(monkeypatch):
+    model = make_tiny_pi0(monkeypatch)
+    actions, expected = sample_refilled_in_place(model)
+    torch.testing.assert_close(actions, expected)
+
+
+@require_package("transformers")
+def test_smolvla_prefix_cache_misses_frames_refilled_in_place(monkeypatch):
+    model = make_tiny_smolvla(monkeypatch)
+    actions, expected = sample_refilled_in_place(model)
+    torch.testing.assert_close(actions, expected)
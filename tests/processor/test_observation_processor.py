@@ -20,7 +20,7 @@ import torch
 
 from lerobot.configs.types import FeatureType
 from lerobot.constants import OBS_ENV_STATE, OBS_IMAGE, OBS_IMAGES, OBS_STATE
-from lerobot.processor import VanillaObservationProcessor
+from lerobot.processor import ImageToFloatProcessor, VanillaObservationProcessor
 from lerobot.processor.pipeline import TransitionKey
 from tests.conftest import assert_contract_is_typed
 
@@ -484,3 +484,23 @@ def test_state_processor_feature_contract_prefixed_inputs(policy_feature_factory
     assert OBS_STATE in out and out[OBS_STATE] == features["observation.agent_pos"]
     assert "environment_state" not in out and "agent_pos" not in out
     assert_contract_is_typed(out)
+
+
+def test_image_to_float_processor():
+    """Test that only uint8 camera frames are converted to float32 in [0, 1]."""
+    processor = ImageToFloatProcessor()
+
+    image = torch.randint(0, 256, size=(2, 3, 8, 8), dtype=torch.uint8)
+    float_image = torch.rand(2, 3, 8, 8)
+    state = torch.tensor([[1, 2]], dtype=torch.uint8)
+    observation = {f"{OBS_IMAGES}.top": image, f"{OBS_IMAGES}.wrist": float_image, OBS_STATE: state}
+
+    result = processor(create_transition(observation=observation))
+    processed_obs = result[TransitionKey.OBSERVATION]
+
+    assert processed_obs[f"{OBS_IMAGES}.top"].dtype == torch.float32
+    torch.testing.assert_close(processed_obs[f"{OBS_IMAGES}.top"], image.float() / 255)
+    assert processed_obs[f"{OBS_IMAGES}.wrist"] is float_image
+    assert processed_obs[OBS_STATE] is state
+    # The input observation is not modified in place
+    assert observation[f"{OBS_IMAGES}.top"].dtype == torch.uint8
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from tests.utils import require_package
+
+
+def _state_dicts(step: float) -> dict[str, dict[str, torch.Tensor]]:
+    torch.manual_seed(0)
+    return {
+        "policy": {
+            "encoder.weight": torch.randn(64, 32),  # frozen
+            "head.weight": torch.randn(8, 64) + step,
+            "head.num_batches_tracked": torch.tensor(int(step)),
+        }
+    }
+
+
+@require_package("grpc")
+@pytest.mark.parametrize("dtype, atol", [("float32", 0.0), ("bfloat16", 1e-1), ("int8", 1e-2)])
+def test_deltas_only_hold_changed_tensors(dtype, atol):
+    from lerobot.transport.parameter_sync import ParameterDecoder, ParameterEncoder
+    from lerobot.transport.utils import bytes_to_state_dict
+
+    encoder = ParameterEncoder(dtype=dtype, snapshot_interval=10)
+    decoder = ParameterDecoder()
+
+    snapshot = encoder.encode(_state_dicts(0))
+    assert decoder.decode(snapshot).keys() == {"policy"}
+
+    delta = encoder.encode(_state_dicts(1))
+    assert len(delta) < len(snapshot) / 2
+    assert bytes_to_state_dict(delta)["base"] == bytes_to_state_dict(snapshot)["version"]
+
+    decoded = decoder.decode(delta)["policy"]
+    expected = _state_dicts(1)["policy"]
+    assert decoded.keys() == {"head.weight", "head.num_batches_tracked"}
+    assert torch.allclose(decoded["head.weight"], expected["head.weight"], atol=atol)
+    assert decoded["head.num_batches_tracked"].item() == 1
+
+
+@require_package("grpc")
+def test_snapshots_are_periodic_and_gaps_are_detected():
+    from lerobot.transport.parameter_sync import ParameterDecoder, ParameterEncoder
+    from lerobot.transport.utils import bytes_to_state_dict
+
+    encoder = ParameterEncoder(snapshot_interval=2)
+    messages = [encoder.encode(_state_dicts(step)) for step in range(4)]
+    assert [bytes_to_state_dict(m)["base"] is None for m in messages] == [True, False, True, False]
+
+    # The first snapshot was dropped: its delta is skipped, the next snapshot and its delta are loaded
+    decoder = ParameterDecoder()
+    assert decoder.decode(messages[1]) is None
+    assert decoder.decode(messages[2])["policy"].keys() == _state_dicts(0)["policy"].keys()
+    assert torch.equal(
+        decoder.decode(messages[3])["policy"]["head.weight"], _state_dicts(3)["policy"]["head.weight"]
+    )
@@ -550,6 +550,43 @@ def test_transitions_to_bytes_multiple_transitions():
         assert_transitions_equal(original, reconstructed_item)
 
 
+@require_package("grpc")
+def test_transitions_to_bytes_transition_batch():
+    from lerobot.transport.utils import bytes_to_transition_batch, bytes_to_transitions, transitions_to_bytes
+    from lerobot.utils.transition import stack_transitions
+
+    """Test converting transitions stacked into a columnar transition batch."""
+    transitions = [
+        Transition(
+            state={"image": torch.randn(1, 3, 8, 8), "state": torch.randn(1, 10)},
+            action=torch.randn(1, 3),
+            reward=float(i),
+            done=i == 2,
+            next_state={"image": torch.randn(1, 3, 8, 8), "state": torch.randn(1, 10)},
+            complementary_info={"is_intervention": i % 2, "step": i} if i else {"is_intervention": 0},
+        )
+        for i in range(3)
+    ]
+
+    batch = bytes_to_transition_batch(transitions_to_bytes(stack_transitions(transitions)))
+    assert batch["state"]["image"].shape == (3, 1, 3, 8, 8)
+    assert torch.equal(batch["done"], torch.tensor([False, False, True]))
+    # Only the complementary info keys of every transition are stacked
+    assert batch["complementary_info"].keys() == {"is_intervention"}
+
+    # Either format is read as either
+    assert torch.equal(
+        bytes_to_transition_batch(transitions_to_bytes(transitions))["action"], batch["action"]
+    )
+    reconstructed = bytes_to_transitions(transitions_to_bytes(batch))
+    assert len(reconstructed) == len(transitions)
+    for original, reconstructed_item in zip(transitions, reconstructed, strict=True):
+        assert_transitions_equal(
+            {**original, "reward": torch.tensor(original["reward"]), "done": torch.tensor(original["done"])},
+            reconstructed_item,
+        )
+
+
 @require_package("grpc")
 def test_receive_bytes_in_chunks_unknown_state():
     from lerobot.transport.utils import receive_bytes_in_chunks
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import torch
+
+from lerobot.transport.wire_format import (
+    ALIGNMENT,
+    ObservationSchema,
+    decode_action_chunk,
+    encode_action_chunk,
+)
+
+FEATURES = {"joint_1.pos": float, "joint_2.pos": float, "top": (8, 12, 3), "wrist": (4, 6, 3)}
+
+
+def make_observation() -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        "joint_1.pos": 0.1,
+        "joint_2.pos": -2.5,
+        "top": rng.integers(0, 256, (8, 12, 3), dtype=np.uint8),
+        "wrist": rng.integers(0, 256, (4, 6, 3), dtype=np.uint8),
+        "task": "fold the towel ✓",
+    }
+
+
+def test_observation_round_trip_without_copies():
+    schema = ObservationSchema.from_features(FEATURES)
+    observation = make_observation()
+    data = bytes(schema.encode({**observation, "ignored": 1.0}, timestep=42, timestamp=1.5, must_go=True))
+
+    decoded, timestep, timestamp, must_go = schema.decode(data)
+    assert (timestep, timestamp, must_go) == (42, 1.5, True)
+    assert decoded.keys() == observation.keys()
+    assert decoded["joint_2.pos"] == -2.5
+    assert decoded["task"] == observation["task"]
+    for key in ["top", "wrist"]:
+        np.testing.assert_array_equal(decoded[key], observation[key])
+        # The frames are aligned views of the received bytes
+        assert not decoded[key].flags.owndata
+        offset = decoded[key].__array_interface__["data"][0] - np.frombuffer(data, np.uint8).ctypes.data
+        assert offset % ALIGNMENT == 0
+
+
+def test_schema_is_serializable():
+    schema = ObservationSchema.from_features(FEATURES)
+    restored = ObservationSchema.from_dict(schema.to_dict())
+    assert restored == schema
+    assert restored.schema_id == schema.schema_id
+
+
+def test_observation_schema_mismatch():
+    schema = ObservationSchema.from_features(FEATURES)
+    observation = make_observation()
+    with pytest.raises(ValueError, match="shape"):
+        schema.encode({**observation, "top": observation["wrist"]}, 0, 0.0, False)
+    with pytest.raises(ValueError, match="missing"):
+        schema.encode({k: v for k, v in observation.items() if k != "task"}, 0, 0.0, False)
+
+    other_schema = ObservationSchema.from_features({**FEATURES, "joint_3.pos": float})
+    with pytest.raises(ValueError, match="different schema"):
+        other_schema.decode(schema.encode(observation, 0, 0.0, False))
+
+
+@pytest.mark.parametrize("num_decode_threads", [0, 2])
+def test_compressed_images_round_trip(num_decode_threads):
+    image_codecs = {"top": ("png", None), "wrist": ("jpeg", 95)}
+    schema = ObservationSchema.from_features(FEATURES, image_codecs=image_codecs)
+    assert schema.image_codecs == {"top": ("png", 1), "wrist": ("jpeg", 95)}
+    assert ObservationSchema.from_dict(schema.to_dict()) == schema
+
+    # Smooth frames, which JPEG compresses with little loss
+    observation = make_observation()
+    observation["wrist"] = np.broadcast_to(np.arange(6, dtype=np.uint8)[None, :, None] * 40, (4, 6, 3))
+    data = bytes(schema.encode(observation, 0, 0.0, False))
+    if num_decode_threads:
+        with ThreadPoolExecutor(num_decode_threads) as executor:
+            decoded, *_ = schema.decode(data, executor)
+    else:
+        decoded, *_ = schema.decode(data)
+    assert decoded.keys() == observation.keys()
+    np.testing.assert_array_equal(decoded["top"], observation["top"])  # lossless
+    assert decoded["wrist"].shape == (4, 6, 3)
+    assert np.abs(decoded["wrist"].astype(int) - observation["wrist"]).max() < 16
+    assert decoded["task"] == observation["task"]
+
+
+def test_images_resized_to_policy_shapes():
+    schema = ObservationSchema.from_features(
+        FEATURES, image_codecs={"top": ("png", None)}, resize_images=True
+    )
+    resized = schema.resized({"top": (4, 6, 3), "front": (2, 2, 3)})
+    assert resized.array_keys["top"][1] == (4, 6, 3)
+    assert resized.array_keys["wrist"][1] == (4, 6, 3)
+    assert "front" not in resized.array_keys
+    assert resized.schema_id != schema.schema_id
+
+    observation = make_observation()
+    observation["top"] = np.full((8, 12, 3), 200, dtype=np.uint8)
+    decoded, *_ = resized.decode(resized.encode(observation, 0, 0.0, False))
+    np.testing.assert_array_equal(decoded["top"], np.full((4, 6, 3), 200, dtype=np.uint8))
+
+    # Without `resize_images`, the frames must have the shapes of the schema
+    with pytest.raises(ValueError, match="shape"):
+        ObservationSchema.from_features(FEATURES).resized({"top": (4, 6, 3)}).encode(
+            observation, 0, 0.0, False
+        )
+    with pytest.raises(ValueError, match="codec"):
+        ObservationSchema.from_features(FEATURES, image_codecs={"top": ("webp", None)})
+
+
+def test_action_chunk_round_trip():
+    actions = torch.randn(5, 14)
+    data = bytes(encode_action_chunk([0.0, 0.1, 0.2, 0.3, 0.4], list(range(10, 15)), actions))
+
+    timestamps, timesteps, decoded = decode_action_chunk(data)
+    np.testing.assert_array_equal(timestamps, [0.0, 0.1, 0.2, 0.3, 0.4])
+    np.testing.assert_array_equal(timesteps, list(range(10, 15)))
+    torch.testing.assert_close(decoded, actions)
+
+    _, _, decoded = decode_action_chunk(encode_action_chunk([0.0], [0], actions[:1].bfloat16()))
+    assert decoded.dtype == torch.float32
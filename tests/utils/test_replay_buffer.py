@@ -22,6 +22,7 @@ import torch
 
 from lerobot.datasets.lerobot_dataset import LeRobotDataset
 from lerobot.utils.buffer import BatchTransition, ReplayBuffer, random_crop_vectorized
+from lerobot.utils.transition import Transition
 from tests.fixtures.constants import DUMMY_REPO_ID
 
 
@@ -38,10 +39,15 @@ def clone_state(state: dict) -> dict:
     return {k: v.clone() for k, v in state.items()}
 
 
+# The random images are not 8-bit images, they are stored in full precision except to test the uint8 storage
+FULL_PRECISION_IMAGES = {"observation.image": torch.float32}
+
+
 def create_empty_replay_buffer(
     optimize_memory: bool = False,
     use_drq: bool = False,
     image_augmentation_function: Callable | None = None,
+    state_dtypes: dict[str, torch.dtype] | None = FULL_PRECISION_IMAGES,
 ) -> ReplayBuffer:
     buffer_capacity = 10
     device = "cpu"
@@ -52,6 +58,7 @@ def create_empty_replay_buffer(
         optimize_memory=optimize_memory,
         use_drq=use_drq,
         image_augmentation_function=image_augmentation_function,
+        state_dtypes=state_dtypes,
     )
 
 
@@ -194,16 +201,18 @@ def test_add_transition(replay_buffer, dummy_state, dummy_action):
     assert not replay_buffer.truncateds[0], "Truncated should be False for the first transition."
 
     for dim in state_dims():
-        assert torch.equal(replay_buffer.states[dim][0], dummy_state[dim]), (
+        assert torch.equal(replay_buffer.decode_state(dim, replay_buffer.states[dim][0]), dummy_state[dim]), (
             "Observation should be equal to the first transition."
         )
-        assert torch.equal(replay_buffer.next_states[dim][0], dummy_state[dim]), (
-            "Next observation should be equal to the first transition."
-        )
+        assert torch.equal(
+            replay_buffer.decode_state(dim, replay_buffer.next_states[dim][0]), dummy_state[dim]
+        ), "Next observation should be equal to the first transition."
 
 
 def test_add_over_capacity():
-    replay_buffer = ReplayBuffer(2, "cpu", ["observation", "next_observation"])
+    replay_buffer = ReplayBuffer(
+        2, "cpu", ["observation", "next_observation"], state_dtypes=FULL_PRECISION_IMAGES
+    )
     dummy_state_1 = create_dummy_state()
     dummy_action_1 = create_dummy_action()
 
@@ -220,12 +229,12 @@ def test_add_over_capacity():
     assert len(replay_buffer) == 2, "Replay buffer should have 2 transitions after adding 3."
 
     for dim in state_dims():
-        assert torch.equal(replay_buffer.states[dim][0], dummy_state_3[dim]), (
-            "Observation should be equal to the first transition."
-        )
-        assert torch.equal(replay_buffer.next_states[dim][0], dummy_state_3[dim]), (
-            "Next observation should be equal to the first transition."
-        )
+        assert torch.equal(
+            replay_buffer.decode_state(dim, replay_buffer.states[dim][0]), dummy_state_3[dim]
+        ), "Observation should be equal to the first transition."
+        assert torch.equal(
+            replay_buffer.decode_state(dim, replay_buffer.next_states[dim][0]), dummy_state_3[dim]
+        ), "Next observation should be equal to the first transition."
 
     assert torch.equal(replay_buffer.actions[0], dummy_action_3), (
         "Action should be equal to the last transition."
@@ -386,7 +395,12 @@ def test_to_lerobot_dataset(tmp_path):
             elif feature == "observation.image":
                 # Tenssor -> numpy is not precise, so we have some diff there
                 # TODO: Check and fix it
-                torch.testing.assert_close(value, buffer.states["observation.image"][i], rtol=0.3, atol=0.003)
+                torch.testing.assert_close(
+                    value,
+                    buffer.decode_state("observation.image", buffer.states["observation.image"][i]),
+                    rtol=0.3,
+                    atol=0.003,
+                )
             elif feature == "observation.state":
                 assert torch.equal(value, buffer.states["observation.state"][i])
 
@@ -442,8 +456,10 @@ def test_from_lerobot_dataset(tmp_path):
 
     for i in range(4):
         torch.testing.assert_close(
-            replay_buffer.states["observation.image"][i],
-            reconverted_buffer.states["observation.image"][i],
+            replay_buffer.decode_state("observation.image", replay_buffer.states["observation.image"][i]),
+            reconverted_buffer.decode_state(
+                "observation.image", reconverted_buffer.states["observation.image"][i]
+            ),
             rtol=0.4,
             atol=0.004,
         )
@@ -454,8 +470,12 @@ def test_from_lerobot_dataset(tmp_path):
         next_index = (i + 1) % 4
 
         torch.testing.assert_close(
-            replay_buffer.states["observation.image"][next_index],
-            reconverted_buffer.next_states["observation.image"][i],
+            replay_buffer.decode_state(
+                "observation.image", replay_buffer.states["observation.image"][next_index]
+            ),
+            reconverted_buffer.decode_state(
+                "observation.image", reconverted_buffer.next_states["observation.image"][i]
+            ),
             rtol=0.4,
             atol=0.004,
         )
@@ -552,6 +572,176 @@ def test_memory_optimization():
     )
 
 
+def test_memory_optimization_keeps_next_states_of_episode_ends():
+    buffer = ReplayBuffer(capacity=7, device="cpu", state_keys=["state_value"], use_drq=False)
+
+    # Episodes of 3 transitions whose last next state is not the first state of the next episode, over
+    # more transitions than the capacity
+    for i in range(10):
+        state = {"state_value": torch.tensor([[float(i)]])}
+        next_value = i + 0.5 if i % 3 == 2 else i + 1
+        next_state = {"state_value": torch.tensor([[float(next_value)]])}
+        buffer.add(state, torch.zeros(1, 1), 0.0, next_state, i % 3 == 2, False)
+
+    for _ in range(20):
+        batch = buffer.sample(7)
+        states = batch["state"]["state_value"].flatten()
+        next_states = batch["next_state"]["state_value"].flatten()
+        assert torch.equal(next_states, torch.where(states % 3 == 2, states + 0.5, states + 1))
+        assert set(states.tolist()) <= set(range(3, 10))
+    # Only the episode ends and the last transition keep their next state aside
+    assert sorted(buffer.kept_next_states) == sorted(i % 7 for i in [5, 8, 9])
+
+
+def test_sample_while_adding_from_another_thread():
+    import threading
+
+    buffer = ReplayBuffer(capacity=7, device="cpu", state_keys=["state_value"], use_drq=False)
+    buffer.add({"state_value": torch.zeros(1, 1)}, torch.zeros(1, 1), 0.0, None, True, False)
+
+    # The prefetching thread of `get_iterator` samples while the learner adds transitions
+    errors = []
+    stop = threading.Event()
+
+    def sample():
+        try:
+            while not stop.is_set():
+                buffer.sample(7)
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads as often as possible to interleave the two
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        for i in range(5000):
+            state = {"state_value": torch.tensor([[float(i)]])}
+            next_state = {"state_value": torch.tensor([[i + 0.5]])}
+            buffer.add(state, torch.zeros(1, 1), 0.0, next_state, i % 3 == 2, False)
+    finally:
+        stop.set()
+        sampler.join()
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+
+
+def create_8_bit_image() -> torch.Tensor:
+    return torch.randint(0, 256, (3, 84, 84)) / 255
+
+
+def test_images_are_stored_as_uint8():
+    replay_buffer = create_empty_replay_buffer(optimize_memory=True, state_dtypes=None)
+    state, next_state = create_dummy_state(), create_dummy_state()
+    # Images from 8-bit cameras are stored without loss
+    state["observation.image"] = create_8_bit_image()
+    next_state["observation.image"] = create_8_bit_image()
+    replay_buffer.add(state, create_dummy_action(), 1.0, next_state, True, False)
+
+    assert replay_buffer.states["observation.image"].dtype == torch.uint8
+    assert replay_buffer.states["observation.state"].dtype == torch.float32
+
+    batch = replay_buffer.sample(1)
+    for key in state_dims():
+        assert batch["state"][key].dtype == torch.float32
+        assert torch.equal(batch["state"][key][0], state[key])
+        assert torch.equal(batch["next_state"][key][0], next_state[key])
+
+
+def test_images_stored_as_uint8_must_be_in_unit_range():
+    replay_buffer = create_empty_replay_buffer(state_dtypes=None)
+    state = create_dummy_state()
+    replay_buffer.add(state, create_dummy_action(), 1.0, state, False, False)
+
+    # Normalized images would be clipped
+    state["observation.image"] = state["observation.image"] * 2 - 1
+    with pytest.raises(ValueError, match=r"'observation.image' are in \[-"):
+        replay_buffer.add(state, create_dummy_action(), 1.0, state, False, False)
+
+
+def test_state_dtypes():
+    replay_buffer = ReplayBuffer(
+        10,
+        "cpu",
+        state_dims(),
+        use_drq=False,
+        state_dtypes={"observation.image": torch.float32, "observation.state": torch.float16},
+    )
+    state = create_dummy_state()
+    state["observation.image"] = torch.rand(3, 84, 84)
+    replay_buffer.add(state, create_dummy_action(), 1.0, state, True, False)
+
+    assert replay_buffer.states["observation.image"].dtype == torch.float32
+    assert replay_buffer.states["observation.state"].dtype == torch.float16
+
+    batch = replay_buffer.sample(1)
+    assert torch.equal(batch["state"]["observation.image"][0], state["observation.image"])
+    assert batch["state"]["observation.state"].dtype == torch.float32
+    torch.testing.assert_close(
+        batch["state"]["observation.state"][0], state["observation.state"], atol=1e-2, rtol=1e-3
+    )
+
+
+@pytest.mark.parametrize("optimize_memory", [True, False])
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [(0, 6), (6, 6), (6, 13), (13, 15)],
+        # A single transition, then more transitions than the capacity, split with a remainder of one
+        [(0, 1), (1, 10), (10, 15)],
+    ],
+)
+def test_add_batch_matches_add(optimize_memory, chunks):
+    from lerobot.utils.transition import select_transitions, stack_transitions
+
+    # 3 episodes of 5 transitions, more than the capacity, added in chunks that wrap around the buffer
+    transitions = []
+    for episode in range(3):
+        for step in range(5):
+            state = {
+                "observation.image": torch.full((1, 3, 4, 4), (10 * episode + step) / 255),
+                "observation.state": torch.full((1, 2), float(step)),
+            }
+            next_state = {key: value + 1 / 255 for key, value in state.items()}
+            next_state["observation.state"] = state["observation.state"] + 1
+            transitions.append(
+                Transition(
+                    state=state,
+                    action=torch.full((1, 2), float(step)),
+                    reward=float(step),
+                    next_state=next_state,
+                    done=step == 4,
+                    truncated=False,
+                    complementary_info={"is_intervention": step % 2},
+                )
+            )
+
+    expected = ReplayBuffer(8, "cpu", optimize_memory=optimize_memory, use_drq=False)
+    for transition in transitions:
+        expected.add(**transition)
+
+    replay_buffer = ReplayBuffer(8, "cpu", optimize_memory=optimize_memory, use_drq=False)
+    batch = stack_transitions(transitions)
+    for start, end in chunks:
+        replay_buffer.add_batch(**select_transitions(batch, slice(start, end)))
+
+    assert (replay_buffer.position, replay_buffer.size) == (expected.position, expected.size)
+    for key in expected.states:
+        assert torch.equal(replay_buffer.states[key], expected.states[key])
+        assert torch.equal(replay_buffer.next_states[key], expected.next_states[key])
+    for name in ["actions", "rewards", "dones", "truncateds", "next_state_is_kept"]:
+        assert torch.equal(getattr(replay_buffer, name), getattr(expected, name))
+    assert torch.equal(
+        replay_buffer.complementary_info["is_intervention"], expected.complementary_info["is_intervention"]
+    )
+    assert replay_buffer.kept_next_states.keys() == expected.kept_next_states.keys()
+    for position, kept in expected.kept_next_states.items():
+        for key, value in kept.items():
+            assert torch.equal(replay_buffer.kept_next_states[position][key], value)
+
+
 def test_check_image_augmentations_with_drq_and_dummy_image_augmentation_function(dummy_state, dummy_action):
     def dummy_image_augmentation_function(x):
         return torch.ones_like(x) * 10
@@ -584,6 +774,52 @@ def test_check_image_augmentations_with_drq_and_default_image_augmentation_funct
     assert sampled_transitions["next_state"]["observation.image"].shape == (1, 3, 84, 84)
 
 
+def test_sample_augments_the_images_of_all_keys_at_once():
+    augmented = []
+
+    def recording_image_augmentation_function(x):
+        augmented.append(x.clone())
+        return x
+
+    replay_buffer = ReplayBuffer(
+        10,
+        "cpu",
+        image_augmentation_function=recording_image_augmentation_function,
+        state_dtypes={"observation.images.wrist": torch.float32},
+    )
+    for i in range(4):
+        state = {
+            "observation.images.front": torch.full((1, 3, 8, 8), i / 255),
+            "observation.images.wrist": torch.full((1, 3, 8, 8), i / 10),
+            "observation.state": torch.full((1, 2), float(i)),
+        }
+        next_state = {key: value + 1 / 255 for key, value in state.items()}
+        replay_buffer.add(state, torch.full((1, 2), float(i)), float(i), next_state, i == 3, False, {"id": i})
+
+    batch = replay_buffer.sample(3)
+    previous_batch = {key: value.clone() for key, value in batch["state"].items()}
+    replay_buffer.sample(3)
+
+    # Images of different storage dtypes are concatenated: front states, front next states, wrist states...
+    assert augmented[0].shape == (12, 3, 8, 8)
+    torch.testing.assert_close(augmented[0][:3], batch["state"]["observation.images.front"])
+    torch.testing.assert_close(augmented[0][3:6], batch["next_state"]["observation.images.front"])
+    torch.testing.assert_close(augmented[0][6:9], batch["state"]["observation.images.wrist"])
+
+    ids = batch["reward"].long()
+    torch.testing.assert_close(batch["complementary_info"]["id"], batch["reward"])
+    torch.testing.assert_close(batch["action"][:, 0], batch["reward"])
+    torch.testing.assert_close(batch["state"]["observation.images.front"][:, 0, 0, 0], ids / 255)
+    torch.testing.assert_close(batch["next_state"]["observation.images.front"][:, 0, 0, 0], (ids + 1) / 255)
+    torch.testing.assert_close(batch["state"]["observation.images.wrist"][:, 0, 0, 0], ids / 10)
+    torch.testing.assert_close(batch["next_state"]["observation.state"][:, 0], ids + 1 / 255)
+    torch.testing.assert_close(batch["done"], (ids == 3).float())
+
+    # The batch is not overwritten by the next sample
+    for key, value in previous_batch.items():
+        assert torch.equal(batch["state"][key], value)
+
+
 def test_random_crop_vectorized_basic():
     # Create a batch of 2 images with known patterns
     batch_size, channels, height, width = 2, 3, 10, 8
@@ -622,6 +858,7 @@ def _populate_buffer_for_async_test(capacity: int = 10) -> ReplayBuffer:
         device="cpu",
         state_keys=["observation.image", "observation.state"],
         storage_device="cpu",
+        state_dtypes=FULL_PRECISION_IMAGES,
     )
 
     for i in range(capacity):